@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Conditional GET and cache-effectiveness test.
+
+Replays every GET item twice per iteration: once cold, then once with
+If-None-Match / If-Modified-Since taken from the cold response. Reports
+per endpoint:
+- Hit rate (share of conditional requests answered 304 Not Modified)
+- Response bytes saved per request
+- Cold vs conditional latency
+- Uncacheable endpoints (no ETag or Last-Modified on the response)
+
+Read-heavy lookups (facilities, cameras) with a high hit rate and large
+bodies are where server or CDN caching pays off.
+
+Usage:
+    python cache_bench.py generated/facilities_service.postman_collection.json \\
+        generated/cameras_service.postman_collection.json \\
+        --environment generated/rallymate-development.postman_environment.json --iterations 20
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from collection_runner import (CollectionRunner, RequestResult, RunItem, load_items, load_runner_variables,
+                               parse_vars, resolvable_items)
+from latency_stats import LatencyHistogram
+from variables import VariableCycleError
+
+# Smallest per-request saving worth calling out in the recommendations
+MIN_SAVING_BYTES = 256
+
+
+def conditional_item(item: RunItem, etag: Optional[str], last_modified: Optional[str]) -> RunItem:
+    """Copy of a GET item carrying the validators from an earlier response."""
+    conditional = copy.copy(item)
+    conditional.headers = dict(item.headers)
+    if etag:
+        conditional.headers['If-None-Match'] = etag
+    if last_modified:
+        conditional.headers['If-Modified-Since'] = last_modified
+    return conditional
+
+
+class CacheStats:
+    """Cold vs conditional results for one endpoint."""
+
+    def __init__(self):
+        self.cold = LatencyHistogram()
+        self.conditional = LatencyHistogram()
+        self.cold_bytes = 0
+        self.conditional_bytes = 0
+        self.conditional_requests = 0
+        self.hits = 0
+        self.errors = 0
+        self.etag = 0
+        self.last_modified = 0
+        self.cache_control: Dict[str, int] = {}
+
+    def record_cold(self, result: RequestResult):
+        if not result.ok:
+            self.errors += 1
+            return
+        headers = result.response.headers
+        self.cold.record(result.latency)
+        self.cold_bytes += result.wire_bytes
+        self.etag += 1 if headers.get('etag') else 0
+        self.last_modified += 1 if headers.get('last-modified') else 0
+        control = headers.get('cache-control', '-')
+        self.cache_control[control] = self.cache_control.get(control, 0) + 1
+
+    def record_conditional(self, result: RequestResult):
+        if not result.ok:
+            self.errors += 1
+            return
+        self.conditional_requests += 1
+        self.conditional.record(result.latency)
+        self.conditional_bytes += result.wire_bytes
+        self.hits += 1 if result.status == 304 else 0
+
+    @property
+    def uncacheable(self) -> bool:
+        """No validators seen, or the server forbids storing the response."""
+        no_store = any('no-store' in value for value in self.cache_control)
+        return self.cold.count > 0 and (not (self.etag or self.last_modified) or no_store)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.conditional_requests if self.conditional_requests else 0.0
+
+    @property
+    def saved_per_request(self) -> float:
+        if not self.cold.count or not self.conditional_requests:
+            return 0.0
+        return self.cold_bytes / self.cold.count - self.conditional_bytes / self.conditional_requests
+
+    def summary(self) -> Dict[str, Any]:
+        cold_p50 = self.cold.percentile(50) * 1000
+        conditional_p50 = self.conditional.percentile(50) * 1000
+        return {
+            'validators': [name for name, seen in (('ETag', self.etag), ('Last-Modified', self.last_modified))
+                           if seen],
+            'cache_control': self.cache_control,
+            'uncacheable': self.uncacheable,
+            'conditional_requests': self.conditional_requests,
+            'hits': self.hits,
+            'hit_rate': round(self.hit_rate, 3),
+            'errors': self.errors,
+            'cold_bytes': round(self.cold_bytes / self.cold.count, 1) if self.cold.count else 0.0,
+            'saved_bytes_per_request': round(self.saved_per_request, 1),
+            'cold_p50_ms': round(cold_p50, 3),
+            'conditional_p50_ms': round(conditional_p50, 3),
+            'latency_saved_ms': round(cold_p50 - conditional_p50, 3),
+        }
+
+
+async def bench_cache(items: List[RunItem], variables: Dict, iterations: int,
+                      timeout: float) -> Dict[str, CacheStats]:
+    """Send each item cold and then conditionally, `iterations` times."""
+    stats: Dict[str, CacheStats] = {}
+    runner = CollectionRunner(variables, max_connections=1, timeout=timeout)
+    state = runner.new_state()
+    async with runner.client() as client:
+        for _ in range(iterations):
+            for item in items:
+                entry = stats.setdefault(item.key, CacheStats())
+                cold = await runner.execute(client, item, state)
+                entry.record_cold(cold)
+                if not cold.ok:
+                    continue
+                etag = cold.response.headers.get('etag')
+                last_modified = cold.response.headers.get('last-modified')
+                if etag or last_modified:
+                    entry.record_conditional(await runner.execute(
+                        client, conditional_item(item, etag, last_modified), state))
+    return stats
+
+
+def format_cache_table(stats: Dict[str, CacheStats]) -> str:
+    lines = [f"{'Endpoint':<40} {'validators':<11} {'hit%':>5} {'cold B':>8} {'saved B':>8} "
+             f"{'cold p50':>9} {'304 p50':>8} {'Δ ms':>7}"]
+    lines.append('-' * len(lines[0]))
+    for key, entry in sorted(stats.items()):
+        s = entry.summary()
+        validators = '+'.join('LM' if v == 'Last-Modified' else v for v in s['validators']) or '-'
+        if entry.uncacheable:
+            lines.append(f"{key[:40]:<40} {validators:<11} {'-':>5} {s['cold_bytes']:>8.0f} {'-':>8} "
+                         f"{s['cold_p50_ms']:>9.2f} {'-':>8} {'-':>7}")
+            continue
+        lines.append(f"{key[:40]:<40} {validators:<11} {s['hit_rate'] * 100:>4.0f}% {s['cold_bytes']:>8.0f} "
+                     f"{s['saved_bytes_per_request']:>8.0f} {s['cold_p50_ms']:>9.2f} "
+                     f"{s['conditional_p50_ms']:>8.2f} {s['latency_saved_ms']:>+7.2f}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure conditional GET hit rate and savings per endpoint')
+    parser.add_argument('collections', nargs='+', help='Collection files to take GET requests from')
+    parser.add_argument('--environment', '-e', help='Postman environment file')
+    parser.add_argument('--var', action='append', help='Override a variable (KEY=VALUE)')
+    parser.add_argument('--item', action='append', help='Only use these items (name or Service.Rpc)')
+    parser.add_argument('--iterations', '-n', type=int, default=10, help='Cold + conditional pairs per item')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Request timeout in seconds')
+    parser.add_argument('--report', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.collections]
+    loaded = [item for path in paths for item in load_items(path)]
+    try:
+        variables = load_runner_variables(paths, args.environment, parse_vars(args.var), items=loaded)
+    except VariableCycleError as e:
+        print(f"❌ {e}")
+        return 1
+    items = [item for item in resolvable_items(loaded, variables, args.item)
+             if item.method == 'GET']
+    if not items:
+        print("❌ No GET requests with fully resolved URLs (pass ids with --var or --environment)")
+        return 1
+
+    print("🗄️  rallymate Conditional GET Benchmark")
+    print("=" * 60)
+    print(f"📦 {len(items)} GET requests × {args.iterations} cold + conditional pairs\n")
+
+    stats = asyncio.run(bench_cache(items, variables, args.iterations, args.timeout))
+    print(format_cache_table(stats))
+
+    uncacheable = sorted(key for key, entry in stats.items() if entry.uncacheable)
+    if uncacheable:
+        print(f"\n⚠️  {len(uncacheable)} uncacheable endpoints (no ETag/Last-Modified, or no-store):")
+        for key in uncacheable:
+            print(f"   • {key}")
+    for key, entry in sorted(stats.items(), key=lambda kv: -kv[1].saved_per_request):
+        if not entry.uncacheable and entry.saved_per_request >= MIN_SAVING_BYTES:
+            print(f"💡 {key}: {entry.hit_rate:.0%} revalidated, "
+                  f"{entry.saved_per_request:.0f}B saved per request")
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(
+            {key: entry.summary() for key, entry in sorted(stats.items())}, indent=2))
+        print(f"\n💾 Report saved: {args.report}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Adaptive capacity search for the collection runner.
+
+Finds the highest throughput an endpoint or scenario sustains within an
+SLO, instead of hand-tuning Newman iteration counts. One run of the
+weighted mix (scenario.py) is paced by an AIMD controller that retunes the
+rate every --step seconds:
+- additive increase: while p99 and the error rate meet the SLO, the rate
+  grows by --increase entries/s
+- multiplicative decrease: after a breach it drops to --backoff times the
+  rate and the increase halves, so later probes close in on the limit
+- 429 Too Many Requests, Retry-After and an exhausted RateLimit budget
+  (RateLimit-Remaining: 0) pause every virtual user until the server's
+  reset; such a step counts as throttled, a rate limit rather than a
+  capacity limit, and backs off like a breach
+
+The search stops after --max-breaches breaching or throttled steps, at
+--max-rate or after --max-duration. The report has the knee (the healthy
+step with the highest achieved throughput), the first limit hit and the
+latency curve of every step. The same seed and settings give the same
+sequence of probes, so runs can be compared across releases.
+
+Usage:
+    python collection_runner.py capacity generated/facilities_service.postman_collection.json \\
+        --reads-only --slo-p99 250 --step 15s --report capacity.json
+    python collection_runner.py capacity --scenario scenarios/production-mix.json \\
+        --start-rate 20 --increase 20 --slo-p99 500 --slo-error-rate 0.005 --max-duration 20m
+"""
+
+import argparse
+import asyncio
+import email.utils
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from collection_runner import (CollectionRunner, RequestResult, item_variables, load_runner_resolver,
+                               parse_duration, parse_vars, print_session_summary)
+from latency_stats import EndpointStats
+from metrics_exporter import start_metrics, stop_metrics
+from results_store import close_run_writer, open_run_writer
+from scenario import Scenario, ScenarioRunner, add_mix_arguments, scenario_from_args
+
+THROTTLED = 429
+DEFAULT_VUS = 100
+# (remaining, reset) header pairs; reset is delta seconds or an epoch timestamp
+RATE_LIMIT_HEADERS = [('ratelimit-remaining', 'ratelimit-reset'), ('x-ratelimit-remaining', 'x-ratelimit-reset')]
+
+
+def _reset_delay(reset: Optional[str], now: float) -> Optional[float]:
+    try:
+        seconds = float(reset)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, seconds - now if seconds > 1e9 else seconds)
+
+
+def retry_delay(headers: Dict[str, str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds the server asks clients to wait: Retry-After, or the reset of a spent rate limit."""
+    now = time.time() if now is None else now
+    retry_after = headers.get('retry-after')
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, email.utils.parsedate_to_datetime(retry_after).timestamp() - now)
+            except (TypeError, ValueError):
+                pass
+    pairs = [(headers.get(remaining), headers.get(reset)) for remaining, reset in RATE_LIMIT_HEADERS]
+    if 'ratelimit' in headers:
+        # Structured form: RateLimit: limit=100, remaining=0, reset=5
+        fields = dict(part.strip().partition('=')[::2] for part in headers['ratelimit'].split(','))
+        pairs.append((fields.get('remaining'), fields.get('reset')))
+    for remaining, reset in pairs:
+        if remaining is not None and remaining.strip() == '0':
+            return _reset_delay(reset, now)
+    return None
+
+
+class Slo:
+    """p99 and error-rate objective a step must meet to count as healthy."""
+
+    def __init__(self, p99_ms: float = 500.0, error_rate: float = 0.01, min_requests: int = 20):
+        self.p99_ms = p99_ms
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+
+    def breach(self, stats: EndpointStats) -> Optional[str]:
+        """Why `stats` misses the SLO, or None (steps with too few requests only get the error check)."""
+        if stats.requests and stats.error_rate > self.error_rate:
+            return f"errors {stats.error_rate:.2%} > {self.error_rate:.2%}"
+        p99 = stats.latency.percentile(99) * 1000
+        if stats.requests >= self.min_requests and p99 > self.p99_ms:
+            return f"p99 {p99:.0f}ms > {self.p99_ms:.0f}ms"
+        return None
+
+    def to_dict(self) -> Dict:
+        return {'p99_ms': self.p99_ms, 'error_rate': self.error_rate, 'min_requests': self.min_requests}
+
+
+class Step:
+    """Requests completed while one target rate was in force."""
+
+    def __init__(self, rate: float, start: float, late: int = 0):
+        self.rate = rate
+        self.start = start
+        self.end: Optional[float] = None
+        self.stats = EndpointStats()
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.throttled = 0
+        self.late_start = late
+        self.late = 0
+        self.verdict: Optional[str] = None
+        self.reason: Optional[str] = None
+
+    def record(self, result: RequestResult):
+        if result.status == THROTTLED:
+            self.throttled += 1
+            return
+        self.stats.record(result.latency, result.status, result.ok)
+        self.endpoints.setdefault(result.key, EndpointStats()).record(result.latency, result.status, result.ok)
+
+    @property
+    def achieved(self) -> float:
+        """Completed, non-throttled requests per second."""
+        elapsed = (self.end or time.time()) - self.start
+        return self.stats.requests / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> Dict:
+        latency = self.stats.latency.summary()
+        worst = max(self.endpoints.items(), key=lambda kv: kv[1].latency.percentile(99), default=None)
+        return {
+            'target_rate': round(self.rate, 2),
+            'achieved_rps': round(self.achieved, 2),
+            'requests': self.stats.requests,
+            'p50_ms': latency['p50_ms'],
+            'p90_ms': latency['p90_ms'],
+            'p99_ms': latency['p99_ms'],
+            'error_rate': round(self.stats.error_rate, 4),
+            'throttled': self.throttled,
+            'late_slots': self.late,
+            'verdict': self.verdict,
+            'reason': self.reason,
+            'slowest_endpoint': worst[0] if worst else None,
+        }
+
+
+class CapacitySearch:
+    """AIMD search for the highest rate that keeps a scenario within its SLO."""
+
+    def __init__(self, runner: CollectionRunner, scenario: Scenario, slo: Slo, start_rate: float = 5.0,
+                 increase: float = 5.0, backoff: float = 0.5, step: float = 10.0, max_rate: Optional[float] = None,
+                 max_breaches: int = 3, max_duration: float = 600.0, vus: Optional[int] = None,
+                 seed: Optional[int] = None, quiet: bool = False):
+        self.runner = runner
+        self.scenario_runner = ScenarioRunner(runner, scenario, vus, start_rate, seed)
+        self.pacer = self.scenario_runner.pacer
+        self.slo = slo
+        self.increase = increase
+        self.backoff = backoff
+        self.step_seconds = step
+        self.max_rate = max_rate
+        self.max_breaches = max_breaches
+        self.max_duration = max_duration
+        self.min_rate = min(start_rate, 1.0)
+        self.quiet = quiet
+        self.steps: List[Step] = []
+        self.breaches = 0
+        self.holds = 0
+        self.held_seconds = 0.0
+        self.stop_reason: Optional[str] = None
+        self._current = Step(start_rate, time.time())
+        runner.add_listener(self._record)
+
+    def _record(self, result: RequestResult):
+        self._current.record(result)
+        if result.response is None:
+            return
+        delay = retry_delay(result.response.headers)
+        if delay is not None and (delay > 0 or result.status == THROTTLED):
+            self.holds += 1
+            self.held_seconds += delay
+            self.pacer.hold(delay)
+
+    def _close_step(self) -> Step:
+        step = self._current
+        step.end = time.time()
+        step.late = self.pacer.late - step.late_start
+        reason = self.slo.breach(step.stats)
+        if step.throttled:
+            step.verdict, step.reason = 'throttled', f"{step.throttled} × 429"
+        elif reason:
+            step.verdict, step.reason = 'breach', reason
+        else:
+            step.verdict = 'ok'
+        self.steps.append(step)
+        if not self.quiet:
+            s = step.summary()
+            marker = {'ok': '✅', 'breach': '🔥', 'throttled': '🚦'}[step.verdict]
+            print(f"   {marker} {s['target_rate']:>8.1f}/s → {s['achieved_rps']:>8.1f} rps  "
+                  f"p50 {s['p50_ms']:>7.1f}ms  p99 {s['p99_ms']:>7.1f}ms  errors {s['error_rate'] * 100:5.2f}%"
+                  + (f"  ({step.reason})" if step.reason else '')
+                  + (f"  ⚠️ {step.late} late slots" if step.late else ''))
+        return step
+
+    def next_rate(self, step: Step, increase: float) -> float:
+        if step.verdict == 'ok':
+            return step.rate + increase
+        return max(self.min_rate, step.rate * self.backoff)
+
+    async def _control(self):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_duration
+        increase = self.increase
+        while True:
+            await asyncio.sleep(self.step_seconds)
+            step = self._close_step()
+            if step.verdict != 'ok':
+                self.breaches += 1
+            rate = self.next_rate(step, increase)
+            if step.verdict != 'ok':
+                increase /= 2
+            if self.breaches >= self.max_breaches:
+                self.stop_reason = 'rate limited' if step.verdict == 'throttled' else 'slo'
+            elif self.max_rate and step.verdict == 'ok' and step.rate >= self.max_rate:
+                self.stop_reason = 'max rate'
+            elif loop.time() + self.step_seconds > deadline:
+                self.stop_reason = 'max duration'
+            if self.stop_reason:
+                self.scenario_runner.stop()
+                return
+            if self.max_rate:
+                rate = min(rate, self.max_rate)
+            self.pacer.set_rate(rate)
+            self._current = Step(rate, time.time(), self.pacer.late)
+
+    def knee(self) -> Optional[Step]:
+        """The healthy step with the highest achieved throughput."""
+        healthy = [step for step in self.steps if step.verdict == 'ok']
+        return max(healthy, key=lambda step: step.achieved, default=None)
+
+    async def run(self) -> Dict:
+        self._current = Step(self.pacer.rate, time.time())
+        control = asyncio.ensure_future(self._control())
+        # The controller ends the run; the deadline only bounds a controller that never fires
+        mix = await self.scenario_runner.run(self.max_duration + self.step_seconds)
+        control.cancel()
+        await asyncio.gather(control, return_exceptions=True)
+
+        knee = self.knee()
+        limit = next((step for step in self.steps if step.verdict != 'ok'), None)
+        return {
+            'scenario': self.scenario_runner.scenario.name,
+            'vus': self.scenario_runner.vus,
+            'slo': self.slo.to_dict(),
+            'stop_reason': self.stop_reason or 'max duration',
+            'knee': knee.summary() if knee else None,
+            'first_limit': limit.summary() if limit else None,
+            'curve': [step.summary() for step in self.steps],
+            'rate_limit_holds': {'count': self.holds, 'seconds': round(self.held_seconds, 3)},
+            'iterations': mix['iterations'],
+            'endpoints': mix['endpoints'],
+        }
+
+
+def add_capacity_arguments(parser: argparse.ArgumentParser):
+    add_mix_arguments(parser)
+    parser.add_argument('--slo-p99', type=float, default=500.0, help='p99 objective in ms')
+    parser.add_argument('--slo-error-rate', type=float, default=0.01, help='Error-rate objective (429s excluded)')
+    parser.add_argument('--min-requests', type=int, default=20, help='Requests a step needs before p99 is judged')
+    parser.add_argument('--start-rate', type=float, default=5.0, help='Initial mix entries per second')
+    parser.add_argument('--increase', type=float, default=5.0, help='Additive increase per healthy step (entries/s)')
+    parser.add_argument('--backoff', type=float, default=0.5, help='Rate multiplier after a breach')
+    parser.add_argument('--step', type=parse_duration, default='10s', help='Time spent at each rate')
+    parser.add_argument('--max-rate', type=float, help='Stop once this rate is healthy')
+    parser.add_argument('--max-breaches', type=int, default=3, help='Stop after this many breaching steps')
+    parser.add_argument('--max-duration', type=parse_duration, default='10m', help='Upper bound on the search')
+
+
+def cmd_capacity(args) -> int:
+    try:
+        scenario = scenario_from_args(args)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    resolver = load_runner_resolver(scenario.collections, args.environment, parse_vars(args.var), args.globals)
+    resolver.resolved(item_variables(scenario.items))  # fail fast on variable cycles
+    runner = CollectionRunner(resolver, args.max_connections, args.timeout, connection_mode=args.connection,
+                              accept_encoding=args.accept_encoding, trace_context=args.trace_context,
+                              refresh_margin=args.refresh_margin)
+    slo = Slo(args.slo_p99, args.slo_error_rate, args.min_requests)
+    search = CapacitySearch(runner, scenario, slo, args.start_rate, args.increase, args.backoff, args.step,
+                            args.max_rate, args.max_breaches, args.max_duration, args.vus or DEFAULT_VUS, args.seed)
+    writer = open_run_writer(args, 'capacity', scenario.name)
+    if writer:
+        runner.add_listener(writer.record)
+    exporter = start_metrics(args, runner)
+
+    print("📈 rallymate Capacity Search")
+    print("=" * 60)
+    print(f"📦 {scenario.name}: {len(scenario.entries)} entries, {search.scenario_runner.vus} VUs, "
+          f"SLO p99 ≤ {slo.p99_ms:.0f}ms and errors ≤ {slo.error_rate:.2%}")
+    print(f"   start {args.start_rate}/s, +{args.increase}/s per {args.step:.0f}s step, ×{args.backoff} on breach")
+
+    try:
+        report = asyncio.run(search.run())
+    finally:
+        close_run_writer(writer)
+        stop_metrics(exporter)
+
+    knee = report['knee']
+    print(f"\n🛑 Stopped: {report['stop_reason']} after {len(report['curve'])} steps")
+    if report['rate_limit_holds']['count']:
+        holds = report['rate_limit_holds']
+        print(f"🚦 Honoured {holds['count']} rate-limit signals ({holds['seconds']:.1f}s of holds)")
+    if knee:
+        print(f"🎯 Knee: {knee['achieved_rps']:.1f} rps at {knee['target_rate']:.1f}/s "
+              f"(p99 {knee['p99_ms']:.1f}ms, errors {knee['error_rate']:.2%})")
+        if knee['late_slots']:
+            print("⚠️  Virtual users were saturated at the knee; rerun with more --vus")
+    else:
+        print("❌ No step met the SLO; lower --start-rate or relax the SLO")
+    print_session_summary(runner)
+    if runner.refresher:
+        report['sessions'] = runner.refresher.summary()
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Report saved: {args.report}")
+    return 0 if knee else 1
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Repository-wide index of Postman collection requests.
+
+Walks every *.postman_collection.json in the repository (root,
+collections/rest/, v2/ and v2/generated/) and indexes each request by
+method and normalized path template, so "where is POST
+/api/facilities/{id}/locks tested?" is a dictionary lookup:
+- Path parameters in any spelling ({{facility_id}}, {id}, :id) and concrete
+  ids (numbers, UUIDs) normalize to {}
+- Leading base-URL variables are resolved to their path prefix using the
+  repository's environment files ({{api_base_url}} → /api)
+
+The index is saved next to this script (.collection-index.json) and updated
+incrementally: only collections whose size or mtime changed are re-read.
+The coverage report compares the index with the RPCs ProtoParser finds in
+the protos and lists annotated endpoints no collection exercises.
+
+Usage:
+    python collection_index.py lookup "POST /api/facilities/{id}/locks"
+    python collection_index.py lookup /api/users/42
+    python collection_index.py coverage --exclude 'v2/generated/*'
+    python collection_index.py update --rebuild
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from rpc_catalog import DESCRIPTION_PATTERN, item_url
+
+SCRIPT_DIR = Path(__file__).parent
+REPO_ROOT = SCRIPT_DIR.parent
+DEFAULT_INDEX = SCRIPT_DIR / '.collection-index.json'
+INDEX_VERSION = 1
+SKIP_DIRS = {'.git', 'node_modules', '__pycache__', 'results'}
+METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS')
+
+LEADING_VARIABLE = re.compile(r'^\{\{\s*([\w.-]+)\s*\}\}')
+PARAM_SEGMENT = re.compile(r'^(?:\{\{[^}]+\}\}|\{[^}]+\}|:\w+|\d+|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27})$')
+
+
+def walk_files(root: Path, suffix: str) -> Iterator[Path]:
+    """Files under root ending with suffix, skipping VCS and cache directories."""
+    for directory, subdirs, files in os.walk(root):
+        subdirs[:] = sorted(d for d in subdirs if d not in SKIP_DIRS)
+        for name in sorted(files):
+            if name.endswith(suffix):
+                yield Path(directory) / name
+
+
+def base_prefixes(root: Path) -> Dict[str, str]:
+    """URL variable → path prefix ('api_base_url' → '/api') from environment files.
+
+    Only values that are absolute URLs count; the first definition wins.
+    """
+    prefixes: Dict[str, str] = {}
+    for path in walk_files(root, '.json'):
+        if 'environment' not in path.name and path.parent.name != 'environments':
+            continue
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        for entry in data.get('values', []) if isinstance(data, dict) else []:
+            value = str(entry.get('value', ''))
+            if '://' in value and entry.get('key') not in prefixes:
+                prefixes[entry['key']] = '/' + value.split('://', 1)[1].partition('/')[2].strip('/')
+    return prefixes
+
+
+def normalize_path(url: str, prefixes: Optional[Dict[str, str]] = None) -> Tuple[str, str]:
+    """(normalized key path, readable template) for a request URL or path."""
+    url = url.strip().split('?', 1)[0].split('#', 1)[0]
+    prefix = ''
+    match = LEADING_VARIABLE.match(url)
+    if match:
+        prefix = (prefixes or {}).get(match.group(1), '')
+        url = url[match.end():]
+    elif '://' in url:
+        url = url.split('://', 1)[1].partition('/')[2]
+    template = '/' + '/'.join(s for s in (prefix + '/' + url).split('/') if s)
+    normalized = '/'.join('{}' if PARAM_SEGMENT.match(segment) else segment for segment in template.split('/'))
+    return normalized or '/', template
+
+
+def index_key(method: str, path: str) -> str:
+    return f"{method.upper()} {path}"
+
+
+def parse_query(query: str, prefixes: Optional[Dict[str, str]] = None) -> Tuple[Optional[str], str]:
+    """'POST /api/x/{id}' → ('POST', '/api/x/{}'); a bare path or URL matches any method."""
+    method, _, rest = query.strip().partition(' ')
+    if method.upper() in METHODS and rest:
+        return method.upper(), normalize_path(rest, prefixes)[0]
+    return None, normalize_path(query, prefixes)[0]
+
+
+def iter_requests(items: List[Dict], folders: Tuple[str, ...] = ()) -> Iterator[Tuple[Tuple[str, ...], Dict]]:
+    """(folder names, request item) for every request, descending into folders."""
+    for item in items:
+        if 'item' in item:
+            yield from iter_requests(item['item'], folders + (item.get('name', ''),))
+        elif 'request' in item:
+            yield folders, item
+
+
+def index_collection(path: Path, root: Path, prefixes: Dict[str, str]) -> List[Dict]:
+    """Index entries for every HTTP request in one collection file."""
+    with open(path) as f:
+        collection = json.load(f)
+    relative = path.relative_to(root).as_posix()
+    entries = []
+    for folders, item in iter_requests(collection.get('item', [])):
+        request = item['request']
+        url = item_url(item)
+        if isinstance(request, str) or url.startswith(('grpc://', 'ws://', 'wss://')):
+            continue
+        method = (request.get('method') or 'GET').upper()
+        normalized, template = normalize_path(url, prefixes)
+        rpc = DESCRIPTION_PATTERN.search(request.get('description') or '')
+        entries.append({
+            'key': index_key(method, normalized),
+            'template': template,
+            'name': item.get('name', ''),
+            'folder': ' › '.join(f for f in folders if f),
+            'file': relative,
+            'rpc': rpc.group(1) if rpc else None,
+        })
+    return entries
+
+
+class CollectionIndex:
+    """Persistent method + path index over every collection in the repository."""
+
+    def __init__(self, root: Path = REPO_ROOT, path: Path = DEFAULT_INDEX):
+        self.root = Path(root)
+        self.path = Path(path)
+        self.files: Dict[str, Dict] = {}
+        self.prefixes: Dict[str, str] = {}
+        self._by_key: Optional[Dict[str, List[Dict]]] = None
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+            except ValueError:
+                data = {}
+            if data.get('version') == INDEX_VERSION and data.get('root') == str(self.root.resolve()):
+                self.files = data.get('files', {})
+                self.prefixes = data.get('prefixes', {})
+
+    def update(self, rebuild: bool = False) -> Dict[str, int]:
+        """Re-index new or changed collection files and drop deleted ones."""
+        counts = {'indexed': 0, 'unchanged': 0, 'removed': 0, 'errors': 0}
+        prefixes = base_prefixes(self.root)
+        if rebuild or prefixes != self.prefixes:
+            self.files = {}
+            self.prefixes = prefixes
+        seen = set()
+        for path in walk_files(self.root, '.postman_collection.json'):
+            relative = path.relative_to(self.root).as_posix()
+            seen.add(relative)
+            stat = path.stat()
+            cached = self.files.get(relative)
+            if cached and cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+                counts['unchanged'] += 1
+                continue
+            try:
+                entries = index_collection(path, self.root, self.prefixes)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                entries = []
+                counts['errors'] += 1
+                print(f"⚠️  Could not index {relative}: {e}")
+            self.files[relative] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'entries': entries}
+            counts['indexed'] += 1
+        for relative in set(self.files) - seen:
+            del self.files[relative]
+            counts['removed'] += 1
+        if counts['indexed'] or counts['removed'] or not self.path.exists():
+            self.save()
+        self._by_key = None
+        return counts
+
+    def save(self):
+        temp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        temp.write_text(json.dumps({'version': INDEX_VERSION, 'root': str(self.root.resolve()),
+                                    'updated_at': time.time(), 'prefixes': self.prefixes, 'files': self.files}))
+        os.replace(temp, self.path)
+
+    @property
+    def by_key(self) -> Dict[str, List[Dict]]:
+        if self._by_key is None:
+            self._by_key = {}
+            for data in self.files.values():
+                for entry in data['entries']:
+                    self._by_key.setdefault(entry['key'], []).append(entry)
+        return self._by_key
+
+    def entries(self, exclude: Optional[List[str]] = None) -> Iterator[Dict]:
+        for relative, data in self.files.items():
+            if not any(fnmatch.fnmatch(relative, pattern) for pattern in exclude or []):
+                yield from data['entries']
+
+    def lookup(self, method: Optional[str], path: str) -> List[Dict]:
+        """Entries for a normalized path, for one method or all of them."""
+        if method:
+            return list(self.by_key.get(index_key(method, path), []))
+        return [entry for m in METHODS for entry in self.by_key.get(index_key(m, path), [])]
+
+    def query(self, text: str) -> List[Dict]:
+        method, path = parse_query(text, self.prefixes)
+        return self.lookup(method, path)
+
+
+def proto_endpoints(proto_dir: Path) -> List[Dict]:
+    """Every HTTP-annotated RPC ProtoParser finds in proto_dir."""
+    from generate_postman_collections import ProtoParser
+
+    endpoints = []
+    for proto_file in sorted(proto_dir.glob('*.proto')):
+        service = ProtoParser(proto_file).parse_service()
+        for rpc in (service or {}).get('rpcs', []):
+            method = rpc['http']['method'].upper()
+            normalized, _ = normalize_path(rpc['http']['path'])
+            endpoints.append({'proto': proto_file.name, 'service': service['name'], 'rpc': rpc['name'],
+                              'method': method, 'path': rpc['http']['path'], 'key': index_key(method, normalized)})
+    return endpoints
+
+
+def coverage_report(index: CollectionIndex, endpoints: List[Dict],
+                    exclude: Optional[List[str]] = None) -> Dict:
+    """Per-service covered/total counts and the annotated endpoints with no request."""
+    tested: Dict[str, List[str]] = {}
+    for entry in index.entries(exclude):
+        tested.setdefault(entry['key'], []).append(entry['file'])
+    services: Dict[str, Dict] = {}
+    for endpoint in endpoints:
+        row = services.setdefault(endpoint['service'], {'total': 0, 'covered': 0, 'missing': []})
+        row['total'] += 1
+        if endpoint['key'] in tested:
+            row['covered'] += 1
+        else:
+            row['missing'].append(f"{endpoint['method']} {endpoint['path']} ({endpoint['rpc']})")
+    total = sum(row['total'] for row in services.values())
+    covered = sum(row['covered'] for row in services.values())
+    return {'total': total, 'covered': covered, 'ratio': round(covered / total, 4) if total else 0.0,
+            'services': services}
+
+
+def format_entry(entry: Dict) -> str:
+    location = f"{entry['folder']} › {entry['name']}" if entry['folder'] else entry['name']
+    rpc = f" [{entry['rpc']}]" if entry.get('rpc') else ''
+    return f"   {entry['key'].split(' ', 1)[0]:<6} {entry['template']:<45} {entry['file']} › {location}{rpc}"
+
+
+def cmd_update(args, index: CollectionIndex) -> int:
+    started = time.perf_counter()
+    counts = index.update(args.rebuild)
+    print(f"🗂️  Indexed {counts['indexed']} files ({counts['unchanged']} unchanged, {counts['removed']} removed) "
+          f"in {(time.perf_counter() - started) * 1000:.0f}ms: {len(index.by_key)} endpoints, "
+          f"{sum(len(d['entries']) for d in index.files.values())} requests")
+    return 1 if counts['errors'] else 0
+
+
+def cmd_lookup(args, index: CollectionIndex) -> int:
+    found = 0
+    for query in args.queries:
+        matches = index.query(query)
+        print(f"🔎 {query}: {len(matches)} request{'s' if len(matches) != 1 else ''}")
+        for entry in matches:
+            print(format_entry(entry))
+        found += len(matches)
+    return 0 if found else 1
+
+
+def cmd_coverage(args, index: CollectionIndex) -> int:
+    proto_dir = Path(args.proto_dir)
+    endpoints = proto_endpoints(proto_dir) if proto_dir.is_dir() else []
+    if not endpoints:
+        print(f"❌ No HTTP-annotated RPCs found in {proto_dir}")
+        return 1
+    report = coverage_report(index, endpoints, args.exclude)
+    print(f"📊 Proto coverage: {report['covered']}/{report['total']} endpoints ({report['ratio']:.0%})")
+    for service, row in sorted(report['services'].items()):
+        icon = '✅' if row['covered'] == row['total'] else '⚠️ '
+        print(f"{icon} {service:<28} {row['covered']:>3}/{row['total']:<3}")
+        for missing in row['missing']:
+            print(f"      ✗ {missing}")
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Report saved: {args.report}")
+    return 0 if report['covered'] == report['total'] else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from generate_postman_collections import DEFAULT_PROTO_DIR
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--root', default=str(REPO_ROOT), help='Repository root to index')
+    common.add_argument('--index', default=str(DEFAULT_INDEX), help='Index file')
+    common.add_argument('--no-update', action='store_true', help='Use the saved index as-is')
+
+    parser = argparse.ArgumentParser(description='Index collection requests by method and path template')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    update_parser = subparsers.add_parser('update', parents=[common], help='Refresh the index')
+    update_parser.add_argument('--rebuild', action='store_true', help='Re-read every collection')
+    update_parser.set_defaults(func=cmd_update)
+    lookup_parser = subparsers.add_parser('lookup', parents=[common], help='Find the requests for an endpoint')
+    lookup_parser.add_argument('queries', nargs='+', help="'METHOD /path/{param}', a path, or a URL")
+    lookup_parser.set_defaults(func=cmd_lookup)
+    coverage_parser = subparsers.add_parser('coverage', parents=[common], help='Compare the index with the protos')
+    coverage_parser.add_argument('--proto-dir', default=str(DEFAULT_PROTO_DIR), help='Directory containing protos')
+    coverage_parser.add_argument('--exclude', action='append', help='Ignore collections matching this glob')
+    coverage_parser.add_argument('--report', help='Write the JSON report to this file')
+    coverage_parser.set_defaults(func=cmd_coverage)
+    args = parser.parse_args(argv)
+
+    index = CollectionIndex(Path(args.root), Path(args.index))
+    if args.command != 'update' and not args.no_update:
+        index.update()
+    return args.func(args, index)
+
+
+if __name__ == '__main__':
+    exit(main())
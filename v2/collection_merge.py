@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Merge regenerated items into hand-maintained Postman collections.
+
+Generated items are matched to items in the target collection through a
+hash index on a stable key, tried in order:
+1. The key recorded by an earlier merge (the `// <generated KEY>` marker)
+2. `Service.Rpc` from a generator-style request description
+3. Method + normalized path template (see collection_index.normalize_path)
+
+For every match only the generator-owned parts change:
+- Method and URL (keeping the target's base-URL variable, path parameter
+  names and query parameters)
+- The JSON body skeleton: fields removed from the proto are dropped and new
+  fields added with generated values; existing example values are kept and
+  generator placeholders (ENUM_VALUE_<type>, left when an enum was not
+  resolved) are never copied in
+- A delimited variable-extraction block in the test script
+
+Names, descriptions, headers, auth, saved examples and every human-written
+test line are left untouched. A key matching several target items (e.g. a
+request and its negative tests sharing a route) is ambiguous: none of them
+is merged and they are reported instead. Target items nothing matches are
+reported, never deleted; generated items with no target are reported (or appended to a
+folder with --add-new). Each collection is read once and items are looked
+up by key, so a merge is linear in the number of items.
+
+Usage:
+    python collection_merge.py ../collections/rest/RallyMate_HTTP_REST_API.postman_collection.json --dry-run
+    python collection_merge.py ../RallyMate-CA-Testing.postman_collection.json \\
+        generated/auth_service.postman_collection.json --add-new
+"""
+
+import argparse
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from collection_index import LEADING_VARIABLE, PARAM_SEGMENT, REPO_ROOT, base_prefixes, index_key, normalize_path
+from rpc_catalog import DEFAULT_GENERATED_DIR, item_url, parse_extraction_rules
+
+BLOCK_START = '// <generated {key}> variable extraction, maintained by collection_merge.py'
+BLOCK_START_PATTERN = re.compile(r'^\s*// <generated ([^>]+)>')
+BLOCK_END = '// </generated>'
+NEW_FOLDER = 'Generated (new)'
+RPC_PATTERN = re.compile(r'\*\*RPC:\*\*\s*(\w+)')
+# Unquoted {{variables}} in raw bodies (e.g. "facility_id": {{created_facility_id}}) are not valid JSON
+UNQUOTED_VARIABLE = re.compile(r'(?<=[:\[,])(\s*)\{\{([^}]+)\}\}')
+VARIABLE_SENTINEL = '__rallymate_variable__{}__'
+SENTINEL_PATTERN = re.compile(r'"__rallymate_variable__(.+?)__"')
+# Values the generator writes when it cannot produce a real one (generate_postman_collections.py)
+PLACEHOLDER_PREFIX = 'ENUM_VALUE_'
+
+
+def iter_items(items: List[Dict]) -> Iterator[Dict]:
+    for item in items:
+        if 'item' in item:
+            yield from iter_items(item['item'])
+        elif 'request' in item:
+            yield item
+
+
+def item_keys(item: Dict, service: Optional[str], prefixes: Dict[str, str]) -> List[str]:
+    """Stable keys for an item, most specific first."""
+    keys = []
+    for line in script_lines(item):
+        match = BLOCK_START_PATTERN.match(line)
+        if match:
+            keys.append(match.group(1).strip())
+            break
+    request = item['request']
+    rpc = RPC_PATTERN.search(request.get('description') or '') if isinstance(request, dict) else None
+    if rpc and service:
+        keys.append(f"{service}.{rpc.group(1)}")
+    if isinstance(request, dict):
+        keys.append(index_key(request.get('method', 'GET'), normalize_path(item_url(item), prefixes)[0]))
+    return keys
+
+
+def collection_service(collection: Dict) -> Optional[str]:
+    name = collection.get('info', {}).get('name', '')
+    return name.replace('rallymate ', '', 1) if name.startswith('rallymate ') and ' ' not in name[10:] else None
+
+
+def script_lines(item: Dict) -> List[str]:
+    for event in item.get('event', []):
+        if event.get('listen') == 'test':
+            exec_lines = event.get('script', {}).get('exec', [])
+            return exec_lines.split('\n') if isinstance(exec_lines, str) else exec_lines
+    return []
+
+
+def js_accessor(path: str) -> List[str]:
+    """'facility.id' → ['response.facility', 'response.facility.id'] for a guarded lookup."""
+    expression, parts = 'response', []
+    for part in path.split('.'):
+        expression += f"[{part}]" if part.isdigit() else f".{part}"
+        parts.append(expression)
+    return parts
+
+
+def extraction_block(key: str, rules: List[Tuple[str, str]]) -> List[str]:
+    """Generator-owned test script lines setting collection variables from the response."""
+    lines = [BLOCK_START.format(key=key)]
+    if rules:
+        lines += ["if (pm.response.code === 200) {",
+                  "    try {",
+                  "        const response = pm.response.json();"]
+        for variable, path in rules:
+            accessors = js_accessor(path)
+            lines.append(f"        if ({' && '.join(accessors)} !== undefined) "
+                         f"pm.collectionVariables.set('{variable}', {accessors[-1]});")
+        lines += ["    } catch (e) {",
+                  "        console.log('⚠️ Could not parse response:', e);",
+                  "    }",
+                  "}"]
+    lines.append(BLOCK_END)
+    return lines
+
+
+def replace_block(lines: List[str], block: List[str]) -> List[str]:
+    """Swap the generated block for a new one, or append it after the human-written lines."""
+    start = next((i for i, line in enumerate(lines) if BLOCK_START_PATTERN.match(line)), None)
+    if start is None:
+        return list(lines) + ([''] if lines and lines[-1].strip() else []) + block
+    end = next((i for i in range(start, len(lines)) if lines[i].strip() == BLOCK_END), len(lines) - 1)
+    return lines[:start] + block + lines[end + 1:]
+
+
+def merge_url(target_item: Dict, generated_item: Dict, prefixes: Dict[str, str]) -> Dict:
+    """The generated path expressed with the target's base variable, parameter names and query."""
+    _, generated_path = normalize_path(item_url(generated_item), prefixes)
+    target_raw = item_url(target_item)
+    _, target_path = normalize_path(target_raw, prefixes)
+    base = LEADING_VARIABLE.match(target_raw)
+    prefix = prefixes.get(base.group(1), '').rstrip('/') if base else ''
+    if not base or not generated_path.startswith(prefix + '/'):
+        return generated_item['request']['url']
+
+    new_segments = generated_path.strip('/').split('/')
+    old_segments = target_path.strip('/').split('/')
+    old_params = [s for s in old_segments if PARAM_SEGMENT.match(s)]
+    if len(old_params) == sum(1 for s in new_segments if PARAM_SEGMENT.match(s)):
+        # Keep the target's own names for parameters (e.g. {{created_facility_id}} over {{id}})
+        params = iter(old_params)
+        new_segments = [next(params) if PARAM_SEGMENT.match(s) else s for s in new_segments]
+    path_segments = new_segments[len([s for s in prefix.split('/') if s]):]
+    url = {'raw': f"{base.group(0)}/{'/'.join(path_segments)}", 'host': [base.group(0)], 'path': path_segments}
+    old_url = target_item['request'].get('url')
+    if isinstance(old_url, dict) and old_url.get('query'):
+        url['query'] = old_url['query']
+        enabled = [q for q in old_url['query'] if not q.get('disabled')]
+        if enabled:
+            url['raw'] += '?' + '&'.join(f"{q['key']}={q.get('value', '')}" for q in enabled)
+    return url
+
+
+def load_body(raw: str) -> Any:
+    """Parse a raw JSON body, tolerating unquoted {{variables}}; raises ValueError."""
+    return json.loads(UNQUOTED_VARIABLE.sub(lambda m: m.group(1) + '"' + VARIABLE_SENTINEL.format(m.group(2)) + '"',
+                                            raw))
+
+
+def dump_body(body: Any, raw: str) -> str:
+    indent = 4 if re.search(r'\n {4}"', raw) else 2
+    return SENTINEL_PATTERN.sub(lambda m: '{{' + m.group(1) + '}}', json.dumps(body, indent=indent,
+                                                                               ensure_ascii=False))
+
+
+def is_placeholder(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.startswith(PLACEHOLDER_PREFIX)
+    if isinstance(value, list):
+        return bool(value) and all(is_placeholder(v) for v in value)
+    return False
+
+
+def merge_skeleton(target: Any, generated: Any) -> Any:
+    """Generated fields with the target's example values where both have them (placeholders skipped)."""
+    if isinstance(target, dict) and isinstance(generated, dict):
+        merged = {k: merge_skeleton(v, generated[k]) for k, v in target.items() if k in generated}
+        for k, v in generated.items():
+            if k not in target and not is_placeholder(v):
+                merged[k] = merge_skeleton({}, v) if isinstance(v, dict) else v
+        return merged
+    return target
+
+
+def merge_body(target_request: Dict, generated_request: Dict) -> bool:
+    """Update the target body's field skeleton in place; True when it changed."""
+    generated_raw = (generated_request.get('body') or {}).get('raw')
+    if not generated_raw:
+        return False
+    try:
+        generated = load_body(generated_raw)
+    except ValueError:
+        generated = None
+    target_body = target_request.get('body') or {}
+    if not target_body.get('raw'):
+        target_request['body'] = dict(generated_request['body'])
+        if isinstance(generated, dict):
+            target_request['body']['raw'] = dump_body(merge_skeleton({}, generated), generated_raw)
+        return True
+    try:
+        target = load_body(target_body['raw'])
+    except ValueError:
+        return False
+    if generated is None:
+        return False
+    merged = merge_skeleton(target, generated)
+    if merged == target:
+        return False
+    target_body['raw'] = dump_body(merged, target_body['raw'])
+    return True
+
+
+def merge_item(target: Dict, generated: Dict, key: str, prefixes: Dict[str, str]) -> List[str]:
+    """Apply the generator-owned parts of `generated` to `target`; returns the parts changed."""
+    changed = []
+    request, generated_request = target['request'], generated['request']
+    if request.get('method') != generated_request.get('method'):
+        request['method'] = generated_request['method']
+        changed.append('method')
+    url = merge_url(target, generated, prefixes)
+    if url != request.get('url') and (not isinstance(request.get('url'), dict) or
+                                      url['raw'] != request['url'].get('raw')):
+        request['url'] = url
+        changed.append('url')
+    if merge_body(request, generated_request):
+        changed.append('body')
+
+    lines = script_lines(target)
+    rules = parse_extraction_rules(script_lines(generated))
+    has_block = any(BLOCK_START_PATTERN.match(line) for line in lines)
+    new_lines = replace_block(lines, extraction_block(key, rules)) if rules or has_block else lines
+    if new_lines != lines:
+        event = next((e for e in target.setdefault('event', []) if e.get('listen') == 'test'), None)
+        if event is None:
+            event = {'listen': 'test', 'script': {'type': 'text/javascript'}}
+            target['event'].append(event)
+        event.setdefault('script', {})['exec'] = new_lines
+        changed.append('tests')
+    return changed
+
+
+def merge_collections(target: Dict, generated: List[Dict], prefixes: Dict[str, str],
+                      add_new: bool = False) -> Dict[str, Any]:
+    """Merge generated collections into `target` in place and report what happened."""
+    index: Dict[str, List[Dict]] = {}
+    target_service = collection_service(target)
+    target_items = list(iter_items(target.get('item', [])))
+    for item in target_items:
+        for key in item_keys(item, target_service, prefixes):
+            index.setdefault(key, []).append(item)
+
+    report: Dict[str, Any] = {'updated': {}, 'unchanged': 0, 'new': [], 'ambiguous': {}, 'stale': []}
+    matched = set()
+    new_items = []
+    for collection in generated:
+        service = collection_service(collection)
+        for item in iter_items(collection.get('item', [])):
+            keys = item_keys(item, service, prefixes)
+            stable_key = keys[0]
+            targets = next((index[key] for key in keys if key in index), None)
+            if targets is None:
+                report['new'].append(stable_key)
+                new_items.append(item)
+                continue
+            if len(targets) > 1:
+                # Several requests share the key (e.g. negative tests); merging would touch them all
+                report['ambiguous'][stable_key] = [target_item['name'] for target_item in targets]
+                matched.update(id(target_item) for target_item in targets)
+                continue
+            target_item = targets[0]
+            if id(target_item) in matched:
+                continue
+            matched.add(id(target_item))
+            changed = merge_item(target_item, item, stable_key, prefixes)
+            if changed:
+                report['updated'][f"{target_item['name']} ({stable_key})"] = changed
+            else:
+                report['unchanged'] += 1
+
+    report['stale'] = [item['name'] for item in target_items if id(item) not in matched]
+    if add_new and new_items:
+        target.setdefault('item', []).append({'name': NEW_FOLDER, 'item': new_items})
+    return report
+
+
+def write_like(path: Path, data: Dict, original: str):
+    """Write JSON keeping the original file's indentation and line endings."""
+    match = re.search(r'\n([ \t]+)"', original)
+    indent = match.group(1) if match else '\t'
+    text = json.dumps(data, indent=indent, ensure_ascii=False)
+    if original.endswith(('\n', '\r\n')):
+        text += '\n'
+    if '\r\n' in original:
+        text = text.replace('\n', '\r\n')
+    path.write_text(text, encoding='utf-8', newline='')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge regenerated items into a hand-maintained collection')
+    parser.add_argument('target', help='Hand-maintained collection to update')
+    parser.add_argument('generated', nargs='*', help='Generated collections (default: generated/*_service)')
+    parser.add_argument('--output', '-o', help='Write the merged collection here instead of the target')
+    parser.add_argument('--add-new', action='store_true', help=f"Append unmatched generated items to '{NEW_FOLDER}'")
+    parser.add_argument('--dry-run', action='store_true', help='Report changes without writing')
+    parser.add_argument('--report', help='Write the JSON merge report to this file')
+    args = parser.parse_args()
+
+    target_path = Path(args.target)
+    generated_paths = [Path(p) for p in args.generated] or \
+        sorted(DEFAULT_GENERATED_DIR.glob('*_service.postman_collection.json'))
+    original = target_path.read_bytes().decode('utf-8')
+    target = json.loads(original)
+    generated = [json.loads(p.read_text(encoding='utf-8')) for p in generated_paths]
+
+    report = merge_collections(target, generated, base_prefixes(REPO_ROOT), args.add_new)
+
+    print(f"🔀 Merging {len(generated_paths)} generated collections into {target_path.name}")
+    print(f"   ✏️  {len(report['updated'])} updated, {report['unchanged']} unchanged, "
+          f"{len(report['new'])} new, {len(report['stale'])} without a generated counterpart")
+    for name, parts in report['updated'].items():
+        print(f"      • {name}: {', '.join(parts)}")
+    if report['ambiguous']:
+        print(f"   ⚠️  {len(report['ambiguous'])} keys match several items and were not merged:")
+        for key, names in report['ambiguous'].items():
+            print(f"      • {key}: {', '.join(names)}")
+    if report['new']:
+        action = f"added to '{NEW_FOLDER}'" if args.add_new else 'not in target (use --add-new)'
+        print(f"   🆕 {len(report['new'])} generated items {action}")
+
+    if not args.dry_run:
+        output = Path(args.output) if args.output else target_path
+        write_like(output, target, original)
+        print(f"💾 Saved: {output}")
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2))
+        print(f"💾 Report saved: {args.report}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,565 @@
+#!/usr/bin/env python3
+"""
+Python runner for rallymate Postman collections.
+
+Executes collection items directly (no Newman needed) with:
+- Postman-style variables: globals < collection < environment < --var < extracted,
+  with URLs, headers and bodies compiled once and re-rendered per virtual
+  user only when a variable they depend on changes (variables.py)
+- Collection bearer auth ({{session_token}})
+- Variable extraction taken from each item's test script
+  (pm.collectionVariables.set('name', response.path))
+- Per-endpoint latency histograms and error counts
+- Per-phase timings (DNS, connect, TLS, send, TTFB, transfer) per request,
+  with --connection fresh | pooled | http2 (http2 needs the h2 package)
+- Session refresh shortly before session_expires_at, single-flight across
+  virtual users, with one retry after a 401 (session_refresh.py)
+- Optional W3C traceparent per request (--trace-context) and Server-Timing
+  attribution into network and server phases (trace_context.py)
+
+Modes:
+    run       Execute every item once in file order (like `newman run`)
+    scenario  Run a weighted mix at a target rate (scenario.py)
+    soak      Replay a weighted mix for hours with drift detection (soak_mode.py)
+    compare   Same collection or mix against several environments at once,
+              side by side (env_compare.py)
+    capacity  Ramp a mix with an AIMD controller to the highest rate within
+              a p99/error SLO (capacity_search.py)
+    distribute/worker
+              Split a scenario across worker processes (distributed.py)
+
+Usage:
+    python collection_runner.py run generated/auth_service.postman_collection.json \\
+        --environment generated/rallymate-local.postman_environment.json
+    python collection_runner.py scenario --scenario scenarios/production-mix.json --duration 10m
+    python collection_runner.py soak generated/*_service.postman_collection.json \\
+        --duration 4h --vus 20 --rate 50
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Union
+
+from http_client import HttpClient, HttpError
+from latency_stats import EndpointStats, PhaseStats, format_phase_table, format_stats_table
+from metrics_exporter import add_metrics_arguments, start_metrics, stop_metrics
+from results_store import add_store_argument, close_run_writer, open_run_writer
+from rpc_catalog import (DESCRIPTION_PATTERN, item_test_script, item_url, iter_collection_items,
+                         parse_extraction_rules)
+from session_refresh import DEFAULT_MARGIN, SessionRefresher, is_auth_request, with_session_expiry
+from trace_context import (TraceStats, format_server_timing_table, format_slowest_traces, new_trace_id,
+                           parse_server_timing, traceparent)
+from variables import (VARIABLE_PATTERN, Template, VariableCycleError, VariableResolver, VariableScope,
+                       load_environment, substitute)
+
+CONNECTION_MODES = ('pooled', 'fresh', 'http2')
+
+
+class RunItem:
+    """A collection request prepared for repeated execution."""
+
+    def __init__(self, service: str, name: str, key: str, method: str, url: str,
+                 headers: Dict[str, str], body: Any, extract: List[tuple], bearer: Optional[str],
+                 source: Optional[Path] = None):
+        self.service = service
+        self.name = name
+        self.key = key
+        self.method = method
+        self.url = url
+        self.headers = headers
+        self.body = body
+        self.extract = extract
+        self.bearer = bearer
+        self.source = source
+
+    def template(self, field: str) -> Template:
+        """Compiled url/headers/body/bearer, recompiled only if the field was reassigned."""
+        value = getattr(self, field)
+        cached = self.__dict__.get(f"_{field}_template")
+        if cached is None or cached[0] is not value:
+            cached = (value, Template(value))
+            setattr(self, f"_{field}_template", cached)
+        return cached[1]
+
+    @property
+    def is_read(self) -> bool:
+        return self.method in ('GET', 'HEAD')
+
+    def __repr__(self):
+        return f"RunItem({self.key}: {self.method} {self.url})"
+
+
+class RequestResult:
+    """Outcome of one executed request."""
+
+    def __init__(self, item: RunItem, status: Optional[int], ok: bool, latency: float,
+                 started_at: float, error: Optional[str] = None, response=None,
+                 trace_id: Optional[str] = None):
+        self.item = item
+        self.key = item.key
+        self.status = status
+        self.ok = ok
+        self.latency = latency
+        self.started_at = started_at
+        self.error = error
+        self.response = response
+        self.timings = response.timings if response is not None else None
+        self.wire_bytes = response.wire_bytes if response is not None else 0
+        self.trace_id = trace_id
+        self.server_timing = parse_server_timing(response.headers.get('server-timing')) \
+            if response is not None else {}
+
+    def to_dict(self) -> Dict:
+        data = {
+            'key': self.key,
+            'service': self.item.service,
+            'name': self.item.name,
+            'method': self.item.method,
+            'status': self.status,
+            'ok': self.ok,
+            'latency_ms': round(self.latency * 1000, 3),
+            'started_at': self.started_at,
+            'error': self.error,
+            'wire_bytes': self.wire_bytes,
+        }
+        if self.timings:
+            data['timings'] = self.timings.to_dict()
+        if self.trace_id:
+            data['trace_id'] = self.trace_id
+        if self.server_timing:
+            data['server_timing_ms'] = {k: round(v * 1000, 3) for k, v in self.server_timing.items()}
+        return data
+
+
+def service_name_for(path: Path, collection: Dict) -> str:
+    """Short service name: 'auth' for auth_service.postman_collection.json."""
+    stem = path.name.split('.postman_collection')[0]
+    if stem.endswith('_service'):
+        return stem[:-len('_service')]
+    return collection.get('info', {}).get('name', stem)
+
+
+def load_items(path: Path) -> List[RunItem]:
+    """Load every request in a collection file as a RunItem."""
+    with open(path) as f:
+        collection = json.load(f)
+    service = service_name_for(path, collection)
+    auth = collection.get('auth') or {}
+    collection_bearer = None
+    if auth.get('type') == 'bearer':
+        collection_bearer = next((a['value'] for a in auth.get('bearer', []) if a.get('key') == 'token'), None)
+
+    items = []
+    for item in iter_collection_items(collection.get('item', [])):
+        request = item['request']
+        match = DESCRIPTION_PATTERN.search(request.get('description') or '')
+        if match:
+            key = f"{collection.get('info', {}).get('name', service).replace('rallymate ', '', 1)}.{match.group(1)}"
+        else:
+            key = f"{service}/{item['name']}"
+
+        body = None
+        raw = (request.get('body') or {}).get('raw')
+        if raw:
+            try:
+                body = json.loads(raw)
+            except ValueError:
+                body = raw
+
+        item_auth = request.get('auth')
+        bearer = collection_bearer
+        if item_auth is not None:
+            bearer = next((a['value'] for a in item_auth.get('bearer', []) if a.get('key') == 'token'), None) \
+                if item_auth.get('type') == 'bearer' else None
+
+        headers = {h['key']: h['value'] for h in request.get('header', []) if not h.get('disabled')}
+        extract = with_session_expiry(parse_extraction_rules(item_test_script(item)))
+        items.append(RunItem(service, item['name'], key, request['method'].upper(), item_url(item),
+                             headers, body, extract, bearer, path))
+    return items
+
+
+def load_runner_resolver(collection_paths: List[Path], environment: Optional[Path] = None,
+                         overrides: Optional[Dict[str, str]] = None,
+                         globals_file: Optional[Path] = None) -> VariableResolver:
+    """Layer globals, collection variables, environment values and CLI overrides."""
+    collection: Dict[str, Any] = {}
+    for path in collection_paths:
+        with open(path) as f:
+            collection.update(load_environment(json.load(f)))
+    layers = {}
+    for layer, path in (('globals', globals_file), ('environment', environment)):
+        if path:
+            with open(path) as f:
+                layers[layer] = load_environment(json.load(f))
+    return VariableResolver(collection=collection, overrides=overrides, **layers)
+
+
+def load_runner_variables(collection_paths: List[Path], environment: Optional[Path] = None,
+                          overrides: Optional[Dict[str, str]] = None, globals_file: Optional[Path] = None,
+                          items: Optional[List[RunItem]] = None) -> Dict[str, Any]:
+    """The layered variables flattened and expanded.
+
+    Raises VariableCycleError for a cycle through a variable the items render.
+    """
+    resolver = load_runner_resolver(collection_paths, environment, overrides, globals_file)
+    return resolver.resolved(item_variables(items or []))
+
+
+def item_variables(items: List[RunItem]) -> Set[str]:
+    """Variables the items' URLs, headers, bearer tokens and bodies refer to."""
+    return {name for item in items for field in ('url', 'headers', 'bearer', 'body')
+            for name in item.template(field).names}
+
+
+def extract_value(data: Any, path: str) -> Any:
+    for part in path.split('.'):
+        if isinstance(data, dict):
+            data = data.get(part)
+        elif isinstance(data, list) and part.isdigit() and int(part) < len(data):
+            data = data[int(part)]
+        else:
+            return None
+    return data
+
+
+def resolvable_items(items: List[RunItem], variables: Dict, names: Optional[List[str]] = None,
+                     writes: bool = False) -> List[RunItem]:
+    """Items (named ones, or reads unless writes=True) whose URL resolves with the variables."""
+    if names:
+        selected = [item for item in items if item.name in names or item.key in names]
+    else:
+        selected = [item for item in items if writes or item.is_read]
+    return [item for item in selected if not VARIABLE_PATTERN.search(str(substitute(item.url, variables)))]
+
+
+class CollectionRunner:
+    """Execute RunItems and fan results out to listeners.
+
+    connection_mode picks the transport: 'pooled' (keep-alive HTTP/1.1),
+    'fresh' (new connection per request) or 'http2' (one multiplexed
+    connection per origin). accept_encoding, when set, is sent as the
+    Accept-Encoding header on every request. trace_context adds a W3C
+    traceparent with a new trace ID to every request. refresh_margin
+    (seconds, None to disable) refreshes a virtual user's session that
+    close to its expiry (session_refresh.py). write_guard, when set, must
+    approve every non-GET/HEAD item; refused ones are counted in `blocked`
+    and never sent (env_compare.py uses it to keep writes off production).
+
+    variables is a VariableResolver or a flat dict (used as the environment
+    layer); each virtual user's runtime variables live in a VariableScope
+    from new_state().
+    """
+
+    def __init__(self, variables: Union[VariableResolver, Dict[str, Any]], max_connections: int = 100,
+                 timeout: float = 10.0, listeners: Optional[List[Callable[[RequestResult], None]]] = None,
+                 connection_mode: str = 'pooled', accept_encoding: Optional[str] = None,
+                 trace_context: bool = False, refresh_margin: Optional[float] = DEFAULT_MARGIN,
+                 write_guard: Optional[Callable[[RunItem], bool]] = None):
+        if connection_mode not in CONNECTION_MODES:
+            raise ValueError(f"Unknown connection mode '{connection_mode}' ({', '.join(CONNECTION_MODES)})")
+        self.resolver = variables if isinstance(variables, VariableResolver) else VariableResolver(
+            environment=variables)
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.listeners = listeners or []
+        self.connection_mode = connection_mode
+        self.accept_encoding = accept_encoding
+        self.trace_context = trace_context
+        self.refresher = SessionRefresher(refresh_margin) if refresh_margin is not None else None
+        self.write_guard = write_guard
+        self.blocked: Dict[str, int] = {}
+        self.stats: Dict[str, EndpointStats] = {}
+        self.phase_stats: Dict[str, PhaseStats] = {}
+        self.trace_stats: Dict[str, TraceStats] = {}
+        self.in_flight: Dict[str, int] = {}
+
+    def client(self):
+        headers = {'Accept-Encoding': self.accept_encoding} if self.accept_encoding else None
+        if self.connection_mode == 'http2':
+            from http2_client import Http2Client
+            return Http2Client(max_connections=self.max_connections, timeout=self.timeout, default_headers=headers)
+        return HttpClient(max_connections=self.max_connections, timeout=self.timeout, default_headers=headers,
+                          pool=self.connection_mode == 'pooled')
+
+    def new_state(self, values: Optional[Dict[str, Any]] = None) -> VariableScope:
+        """Runtime variables for one virtual user, seeded with `values`."""
+        return self.resolver.scope(values)
+
+    def add_listener(self, listener: Callable[[RequestResult], None]):
+        self.listeners.append(listener)
+
+    def _emit(self, result: RequestResult) -> RequestResult:
+        self.stats.setdefault(result.key, EndpointStats()).record(result.latency, result.status, result.ok)
+        if result.timings:
+            self.phase_stats.setdefault(result.key, PhaseStats()).record(result.timings)
+        if result.trace_id or result.server_timing:
+            self.trace_stats.setdefault(result.key, TraceStats()).record(
+                result.latency, result.trace_id, result.server_timing, result.status)
+        for listener in self.listeners:
+            listener(result)
+        return result
+
+    async def execute(self, client: HttpClient, item: RunItem,
+                      state: Optional[Dict[str, Any]] = None) -> RequestResult:
+        """Send one item using the runner variables overlaid with `state`.
+
+        Values extracted from the response are written back into `state`,
+        which holds per-virtual-user runtime variables. Pass a VariableScope
+        from new_state() to reuse rendered templates across requests; a
+        plain dict works but is re-rendered every time.
+        """
+        if self.write_guard and not item.is_read and not self.write_guard(item):
+            self.blocked[item.key] = self.blocked.get(item.key, 0) + 1
+            return RequestResult(item, None, False, 0.0, time.time(), 'blocked: write not allowed here')
+        state = state if state is not None else {}
+        scope = state if isinstance(state, VariableScope) else self.new_state(state)
+        refresher = self.refresher if self.refresher and not is_auth_request(item.url) else None
+        if refresher and refresher.due(scope):
+            self._apply_session(await refresher.refresh(self, client, scope), scope, state)
+        result = await self._send(client, item, scope, state)
+        if refresher and result.status == 401 and scope.get('refresh_token'):
+            # Expiry unknown or missed: refresh (shared with other users) and retry once
+            if self._apply_session(await refresher.refresh(self, client, scope), scope, state):
+                result = await self._send(client, item, scope, state)
+        return result
+
+    @staticmethod
+    def _apply_session(session: Optional[Dict[str, Any]], scope: VariableScope, state: Dict[str, Any]) -> bool:
+        """Store refreshed session values; True when the session token changed."""
+        if not session:
+            return False
+        changed = session.get('session_token') != scope.get('session_token')
+        scope.update(session)
+        if scope is not state:
+            state.update(session)
+        return changed
+
+    async def _send(self, client: HttpClient, item: RunItem, scope: VariableScope,
+                    state: Dict[str, Any]) -> RequestResult:
+        started_at = time.time()
+
+        try:
+            url = scope.render(item.template('url'))
+            headers = dict(scope.render(item.template('headers')))
+            token = scope.render(item.template('bearer')) if item.bearer else None
+            body = scope.render(item.template('body'))
+        except VariableCycleError as e:
+            return self._emit(RequestResult(item, None, False, 0.0, started_at, str(e)))
+        unresolved = VARIABLE_PATTERN.search(url)
+        if unresolved:
+            return self._emit(RequestResult(item, None, False, 0.0, started_at,
+                                            f"unresolved variable {unresolved.group(0)}"))
+        if token and not VARIABLE_PATTERN.search(str(token)):
+            headers['Authorization'] = f"Bearer {token}"
+        trace_id = None
+        if self.trace_context:
+            trace_id = new_trace_id()
+            headers['traceparent'] = traceparent(trace_id)
+
+        start = time.perf_counter()
+        self.in_flight[item.key] = self.in_flight.get(item.key, 0) + 1
+        try:
+            response = await client.request(item.method, url, headers=headers, body=body)
+        except HttpError as e:
+            return self._emit(RequestResult(item, None, False, time.perf_counter() - start, started_at, str(e),
+                                            trace_id=trace_id))
+        finally:
+            self.in_flight[item.key] -= 1
+
+        if response.ok and item.extract:
+            try:
+                data = response.json()
+            except ValueError:
+                data = None
+            for variable, path in item.extract:
+                value = extract_value(data, path)
+                if value is not None:
+                    state[variable] = value
+                    if scope is not state:
+                        scope[variable] = value
+
+        error = None if response.ok else f"HTTP {response.status}"
+        return self._emit(RequestResult(item, response.status, response.ok, response.elapsed,
+                                        started_at, error, response, trace_id))
+
+    async def run_sequence(self, items: List[RunItem], iterations: int = 1) -> List[RequestResult]:
+        """Run items in order, sharing extracted variables across the run."""
+        results = []
+        state = self.new_state()
+        async with self.client() as client:
+            for _ in range(iterations):
+                for item in items:
+                    results.append(await self.execute(client, item, state))
+        return results
+
+
+def parse_duration(text: str) -> float:
+    """Parse '90', '30s', '15m', '4h' into seconds."""
+    match = re.fullmatch(r'\s*([\d.]+)\s*([smh]?)\s*', text.lower())
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid duration: {text}")
+    return float(match.group(1)) * {'': 1, 's': 1, 'm': 60, 'h': 3600}[match.group(2)]
+
+
+def parse_vars(pairs: Optional[List[str]]) -> Dict[str, str]:
+    variables = {}
+    for pair in pairs or []:
+        key, _, value = pair.partition('=')
+        variables[key.strip()] = value
+    return variables
+
+
+def add_common_arguments(parser: argparse.ArgumentParser, collections: str = '+'):
+    parser.add_argument('collections', nargs=collections, help='Collection files to load')
+    parser.add_argument('--environment', '-e', help='Postman environment file')
+    parser.add_argument('--globals', help='Postman globals file (lowest-precedence variables)')
+    parser.add_argument('--var', action='append', help='Override a variable (KEY=VALUE)')
+    parser.add_argument('--max-connections', type=int, default=100, help='Connection pool size')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Request timeout in seconds')
+    parser.add_argument('--connection', choices=CONNECTION_MODES, default='pooled',
+                        help='fresh connection per request, pooled keep-alive, or HTTP/2 multiplexed')
+    parser.add_argument('--accept-encoding', help='Accept-Encoding to send (e.g. gzip, br, identity)')
+    parser.add_argument('--trace-context', action='store_true',
+                        help='Send a W3C traceparent with a new trace ID on every request')
+    parser.add_argument('--refresh-margin', type=float, default=DEFAULT_MARGIN, metavar='SECONDS',
+                        help='Refresh session_token this long before session_expires_at')
+    parser.add_argument('--no-session-refresh', dest='refresh_margin', action='store_const', const=None,
+                        help='Never refresh sessions (tokens expire mid-run)')
+    parser.add_argument('--report', help='Write the JSON report to this file')
+
+
+def print_session_summary(runner: CollectionRunner):
+    refresher = runner.refresher
+    if refresher and (refresher.refreshes or refresher.failures):
+        print(f"\n🔄 Session refreshed {refresher.refreshes}× ({refresher.shared} requests shared an "
+              f"in-flight refresh, {refresher.failures} failed)")
+
+
+def print_trace_summary(runner: CollectionRunner):
+    """Server-Timing breakdown and slowest trace IDs, when there is anything to show."""
+    if any(s.timed for s in runner.trace_stats.values()):
+        print("\n🔬 Mean server-timing breakdown (ms)")
+        print(format_server_timing_table(runner.trace_stats))
+    if runner.trace_context and runner.trace_stats:
+        print("\n🐢 Slowest traced requests")
+        print(format_slowest_traces(runner.trace_stats))
+
+
+def cmd_run(args) -> int:
+    paths = [Path(p) for p in args.collections]
+    resolver = load_runner_resolver(paths, args.environment, parse_vars(args.var), args.globals)
+    items = [item for path in paths for item in load_items(path)]
+    resolver.resolved(item_variables(items))  # fail fast on variable cycles
+    runner = CollectionRunner(resolver, args.max_connections, args.timeout, connection_mode=args.connection,
+                              accept_encoding=args.accept_encoding, trace_context=args.trace_context,
+                              refresh_margin=args.refresh_margin)
+    writer = open_run_writer(args, 'run', ' '.join(p.name for p in paths))
+    if writer:
+        runner.add_listener(writer.record)
+    exporter = start_metrics(args, runner)
+
+    print(f"▶️  Running {len(items)} requests × {args.iterations} iterations")
+    try:
+        results = asyncio.run(runner.run_sequence(items, args.iterations))
+    finally:
+        close_run_writer(writer)
+        stop_metrics(exporter)
+    for result in results[:len(items)]:
+        icon = '✅' if result.ok else '❌'
+        detail = f"{result.status}" if result.status else result.error
+        print(f"   {icon} {result.item.method:<6} {result.item.name:<40} {detail} "
+              f"({result.latency * 1000:.1f}ms)")
+
+    print()
+    print(format_stats_table(runner.stats))
+    if args.phases:
+        print(f"\n⏱️  Mean phase timings (ms), {args.connection} connections")
+        print(format_phase_table(runner.phase_stats))
+    print_trace_summary(runner)
+    print_session_summary(runner)
+    if args.report:
+        Path(args.report).write_text(json.dumps({
+            'connection': args.connection,
+            'endpoints': {k: s.summary() for k, s in runner.stats.items()},
+            'phases': {k: s.summary() for k, s in runner.phase_stats.items()},
+            'traces': {k: s.summary() for k, s in runner.trace_stats.items()},
+            'sessions': runner.refresher.summary() if runner.refresher else {},
+            'results': [r.to_dict() for r in results],
+        }, indent=2))
+        print(f"\n💾 Report saved: {args.report}")
+    return 0 if all(r.ok for r in results) else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Run rallymate Postman collections from Python')
+    subparsers = parser.add_subparsers(dest='mode', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Execute every item once in order')
+    add_common_arguments(run_parser)
+    run_parser.add_argument('--iterations', '-n', type=int, default=1, help='Number of passes')
+    run_parser.add_argument('--phases', action='store_true', help='Print the per-phase timing table')
+    add_store_argument(run_parser)
+    add_metrics_arguments(run_parser)
+    run_parser.set_defaults(func=cmd_run)
+
+    from scenario import add_mix_arguments, cmd_scenario
+    scenario_parser = subparsers.add_parser('scenario', help='Run a weighted mix at a target rate')
+    add_common_arguments(scenario_parser, collections='*')
+    add_mix_arguments(scenario_parser)
+    add_store_argument(scenario_parser)
+    add_metrics_arguments(scenario_parser)
+    scenario_parser.add_argument('--duration', type=parse_duration, default='60s', help='Run length')
+    scenario_parser.set_defaults(func=cmd_scenario)
+
+    from soak_mode import add_soak_arguments, cmd_soak
+    soak_parser = subparsers.add_parser('soak', help='Replay a weighted mix for hours with drift detection')
+    add_common_arguments(soak_parser, collections='*')
+    add_soak_arguments(soak_parser)
+    add_store_argument(soak_parser)
+    add_metrics_arguments(soak_parser)
+    soak_parser.set_defaults(func=cmd_soak)
+
+    from env_compare import add_compare_arguments, cmd_compare
+    compare_parser = subparsers.add_parser('compare', help='Run against several environments and compare')
+    add_common_arguments(compare_parser, collections='*')
+    add_compare_arguments(compare_parser)
+    compare_parser.set_defaults(func=cmd_compare)
+
+    from capacity_search import add_capacity_arguments, cmd_capacity
+    capacity_parser = subparsers.add_parser('capacity', help='Find the highest rate that meets a latency SLO')
+    add_common_arguments(capacity_parser, collections='*')
+    add_capacity_arguments(capacity_parser)
+    add_store_argument(capacity_parser)
+    add_metrics_arguments(capacity_parser)
+    capacity_parser.set_defaults(func=cmd_capacity)
+
+    from distributed import add_distribute_arguments, add_worker_arguments, cmd_distribute, cmd_worker
+    distribute_parser = subparsers.add_parser('distribute', help='Coordinate a run across worker processes')
+    add_common_arguments(distribute_parser, collections='*')
+    add_distribute_arguments(distribute_parser)
+    distribute_parser.set_defaults(func=cmd_distribute)
+
+    worker_parser = subparsers.add_parser('worker', help='Run a share of a distributed run')
+    add_worker_arguments(worker_parser)
+    worker_parser.set_defaults(func=cmd_worker)
+
+    args = parser.parse_args(argv)
+    if getattr(args, 'connection', None) == 'http2':
+        from http2_client import http2_available
+        if not http2_available():
+            print("❌ --connection http2 needs the optional 'h2' package (pip install h2)")
+            return 1
+    try:
+        return args.func(args)
+    except VariableCycleError as e:
+        print(f"❌ {e}")
+        return 1
+
+
+if __name__ == '__main__':
+    exit(main())
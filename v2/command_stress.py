@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Burst and concurrency stress for Edge API device commands.
+
+Fires bursts of concurrent "Send Device Command" requests at one or many
+devices through the bridge ({{bridge_host}}:{{bridge_port}}), using the
+requests defined in collections/rest/RallyMate_Edge_API.postman_collection.json,
+and measures:
+- Command latency, plus queueing delay relative to an idle-bridge baseline
+- Serialization: how much each extra in-flight command adds (ms/command)
+- Command-to-status convergence time, polling "Get Device Status"
+- Error rates and status codes
+
+Convergence means the device's state field in the status response
+(lock_state or state, top level or under status/device; --state-field
+overrides) equals the action or its past tense ("unlock", "unlocked",
+"LOCK_STATE_UNLOCKED"). Other fields, such as an echoed command type, are
+ignored. Use --expect FIELD=VALUE for an exact dot-path match.
+
+Usage:
+    python command_stress.py --environment ../environments/edge-api-pi-zero.json \\
+        --devices lock-court-01,lock-court-02,lock-court-03 --burst-size 6 --bursts 20
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from collection_runner import extract_value
+from http_client import HttpClient, HttpError
+from latency_stats import EndpointStats, LatencyHistogram, least_squares_slope
+from rpc_catalog import find_item, item_body, item_url
+from variables import load_environment, resolve_variables, substitute
+
+SCRIPT_DIR = Path(__file__).parent
+EDGE_COLLECTION = SCRIPT_DIR.parent / 'collections' / 'rest' / 'RallyMate_Edge_API.postman_collection.json'
+
+ITEM_NAMES = {
+    'command': 'Send Device Command',
+    'connect': 'Connect to Device',
+    'status': 'Get Device Status',
+}
+# Where a status response holds the device state, in order of preference
+STATE_FIELDS = ('lock_state', 'state', 'status.lock_state', 'status.state', 'device.lock_state', 'device.state')
+
+
+class CommandStress:
+    """Run command bursts against the bridge and collect timing statistics."""
+
+    def __init__(self, collection: Dict, variables: Dict[str, Any], devices: List[str],
+                 burst_size: int = 4, bursts: int = 10, burst_interval: float = 2.0,
+                 alternate: bool = True, expect: Optional[Tuple[str, str]] = None,
+                 convergence_timeout: float = 10.0, poll_interval: float = 0.1,
+                 baseline_samples: int = 5, connect: bool = False, max_connections: int = 64,
+                 state_fields: Tuple[str, ...] = STATE_FIELDS):
+        self.items = {}
+        for role, name in ITEM_NAMES.items():
+            item = find_item(collection, name)
+            if not item:
+                raise ValueError(f"Request '{name}' not found in the Edge API collection")
+            self.items[role] = item
+        self.variables = variables
+        self.devices = devices
+        self.burst_size = burst_size
+        self.bursts = bursts
+        self.burst_interval = burst_interval
+        self.alternate = alternate
+        self.expect = expect
+        self.state_fields = state_fields
+        self.convergence_timeout = convergence_timeout
+        self.poll_interval = poll_interval
+        self.baseline_samples = baseline_samples
+        self.connect = connect
+        self.max_connections = max_connections
+
+        self.base_command = item_body(self.items['command']) or {}
+        self.stats: Dict[str, EndpointStats] = {}
+        self.baseline = LatencyHistogram()
+        self.queueing = LatencyHistogram()
+        self.convergence = LatencyHistogram()
+        self.convergence_timeouts = 0
+        self.burst_reports: List[Dict] = []
+        self.position_points: List[Tuple[float, float]] = []
+
+    def _action(self, burst: int) -> Optional[str]:
+        action = (self.base_command.get('parameters') or {}).get('action')
+        if not self.alternate or action not in ('lock', 'unlock'):
+            return action
+        return action if burst % 2 == 0 else ('lock' if action == 'unlock' else 'unlock')
+
+    async def _send(self, client: HttpClient, role: str, device_id: str,
+                    body: Any = None) -> Tuple[Optional[Any], float]:
+        """Send one Edge API request; returns (decoded JSON or None, seconds)."""
+        item = self.items[role]
+        variables = dict(self.variables, device_id=device_id)
+        url = substitute(item_url(item), variables)
+        if body is None:
+            body = substitute(item_body(item), variables)
+        stats = self.stats.setdefault(role, EndpointStats())
+        start = time.perf_counter()
+        try:
+            response = await client.request(item['request']['method'], url, body=body)
+        except HttpError:
+            elapsed = time.perf_counter() - start
+            stats.record(elapsed, None, False)
+            return None, elapsed
+        stats.record(response.elapsed, response.status, response.ok)
+        if not response.ok:
+            return None, response.elapsed
+        try:
+            return response.json() or {}, response.elapsed
+        except ValueError:
+            return {}, response.elapsed
+
+    def _converged(self, status: Any, action: Optional[str]) -> bool:
+        if self.expect:
+            field, value = self.expect
+            value = value.replace('{action}', action or '')
+            return str(extract_value(status, field)).lower() == value.lower()
+        if not action:
+            return True
+        forms = {action.lower(), action.lower() + 'ed', action.lower() + 'd'}
+        for field in self.state_fields:
+            state = extract_value(status, field)
+            if isinstance(state, str):
+                state = state.lower()
+                return state in forms or state.rsplit('_', 1)[-1] in forms
+        return False
+
+    async def _command(self, client: HttpClient, device_id: str, action: Optional[str],
+                       baseline_p50: float) -> Dict:
+        body = json.loads(json.dumps(self.base_command))
+        if action and isinstance(body.get('parameters'), dict):
+            body['parameters']['action'] = action
+        body = substitute(body, dict(self.variables, device_id=device_id))
+
+        sent = time.perf_counter()
+        result, latency = await self._send(client, 'command', device_id, body)
+        outcome = {'device_id': device_id, 'latency': latency, 'ok': result is not None}
+        if result is None:
+            return outcome
+        self.queueing.record(max(0.0, latency - baseline_p50))
+
+        deadline = sent + self.convergence_timeout
+        while time.perf_counter() < deadline:
+            status, _ = await self._send(client, 'status', device_id)
+            if status is not None and self._converged(status, action):
+                self.convergence.record(time.perf_counter() - sent)
+                outcome['converged'] = True
+                return outcome
+            await asyncio.sleep(self.poll_interval)
+        self.convergence_timeouts += 1
+        outcome['converged'] = False
+        return outcome
+
+    async def run(self) -> Dict:
+        """Connect, measure the idle baseline, then run every burst."""
+        async with HttpClient(max_connections=self.max_connections) as client:
+            if self.connect:
+                for device_id in self.devices:
+                    await self._send(client, 'connect', device_id)
+
+            # Idle baseline: one command at a time, excluded from burst stats
+            for i in range(self.baseline_samples):
+                result, latency = await self._send(client, 'command', self.devices[i % len(self.devices)])
+                if result is not None:
+                    self.baseline.record(latency)
+            self.stats.pop('command', None)
+            baseline_p50 = self.baseline.percentile(50)
+
+            for burst in range(self.bursts):
+                action = self._action(burst)
+                targets = [self.devices[i % len(self.devices)] for i in range(self.burst_size)]
+                start = time.perf_counter()
+                outcomes = await asyncio.gather(
+                    *(self._command(client, device_id, action, baseline_p50) for device_id in targets)
+                )
+                makespan = time.perf_counter() - start
+
+                completed = sorted(o['latency'] for o in outcomes if o['ok'])
+                self.position_points.extend((rank, latency) for rank, latency in enumerate(completed, 1))
+                self.burst_reports.append({
+                    'burst': burst + 1,
+                    'action': action,
+                    'commands': len(outcomes),
+                    'errors': sum(1 for o in outcomes if not o['ok']),
+                    'converged': sum(1 for o in outcomes if o.get('converged')),
+                    'makespan_ms': round(makespan * 1000, 3),
+                    'max_command_ms': round(max(completed) * 1000, 3) if completed else None,
+                })
+                if burst + 1 < self.bursts:
+                    await asyncio.sleep(self.burst_interval)
+
+        command_stats = self.stats.get('command', EndpointStats())
+        return {
+            'devices': len(self.devices),
+            'burst_size': self.burst_size,
+            'bursts': self.bursts,
+            'baseline_command': self.baseline.summary(),
+            'commands': command_stats.summary(),
+            'queueing_delay': self.queueing.summary(),
+            'serialization_ms_per_command': round(least_squares_slope(self.position_points) * 1000, 3),
+            'convergence': self.convergence.summary(),
+            'convergence_timeouts': self.convergence_timeouts,
+            'status_polls': self.stats.get('status', EndpointStats()).summary(),
+            'burst_details': self.burst_reports,
+        }
+
+
+def parse_devices(args, variables: Dict[str, Any]) -> List[str]:
+    if args.devices:
+        return [d.strip() for d in args.devices.split(',') if d.strip()]
+    if args.device_count:
+        return [args.device_pattern.format(n=n) for n in range(1, args.device_count + 1)]
+    return [variables.get('device_id') or 'lock-court-01']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stress Edge API device commands with concurrent bursts')
+    parser.add_argument('--collection', default=str(EDGE_COLLECTION), help='Edge API collection file')
+    parser.add_argument('--environment', help='Postman environment file (e.g. edge-api-pi-zero.json)')
+    parser.add_argument('--bridge-host', help='Override {{bridge_host}}')
+    parser.add_argument('--bridge-port', help='Override {{bridge_port}}')
+    parser.add_argument('--devices', help='Comma-separated device IDs')
+    parser.add_argument('--device-count', type=int, help='Generate N device IDs from --device-pattern')
+    parser.add_argument('--device-pattern', default='lock-court-{n:02d}', help='Device ID pattern')
+    parser.add_argument('--burst-size', type=int, default=4, help='Concurrent commands per burst')
+    parser.add_argument('--bursts', type=int, default=10, help='Number of bursts')
+    parser.add_argument('--burst-interval', type=float, default=2.0, help='Seconds between bursts')
+    parser.add_argument('--no-alternate', action='store_true', help='Always send the same lock action')
+    parser.add_argument('--expect', help='Convergence check FIELD=VALUE ({action} is substituted)')
+    parser.add_argument('--state-field', action='append',
+                        help=f"Status field holding the device state (default: {', '.join(STATE_FIELDS)})")
+    parser.add_argument('--convergence-timeout', type=float, default=10.0, help='Seconds to wait for status')
+    parser.add_argument('--poll-interval', type=float, default=0.1, help='Seconds between status polls')
+    parser.add_argument('--baseline-samples', type=int, default=5, help='Sequential commands for the idle baseline')
+    parser.add_argument('--connect', action='store_true', help='Call "Connect to Device" first')
+    parser.add_argument('--report', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    with open(args.collection) as f:
+        collection = json.load(f)
+    variables = load_environment(collection)
+    if args.environment:
+        with open(args.environment) as f:
+            variables.update(load_environment(json.load(f)))
+    if args.bridge_host:
+        variables['bridge_host'] = args.bridge_host
+    if args.bridge_port:
+        variables['bridge_port'] = args.bridge_port
+    variables = resolve_variables(variables)
+
+    expect = tuple(args.expect.split('=', 1)) if args.expect and '=' in args.expect else None
+    devices = parse_devices(args, variables)
+
+    try:
+        stress = CommandStress(
+            collection, variables, devices, args.burst_size, args.bursts, args.burst_interval,
+            alternate=not args.no_alternate, expect=expect,
+            convergence_timeout=args.convergence_timeout, poll_interval=args.poll_interval,
+            baseline_samples=args.baseline_samples, connect=args.connect,
+            state_fields=tuple(args.state_field or STATE_FIELDS)
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print("🔒 rallymate Edge API Command Stress")
+    print("=" * 60)
+    print(f"🌉 Bridge: {variables.get('base_url')}")
+    print(f"📡 {args.bursts} bursts × {args.burst_size} commands across {len(devices)} devices")
+
+    report = asyncio.run(stress.run())
+
+    commands = report['commands']
+    print(f"\n   ⏱️  Idle baseline p50: {report['baseline_command']['p50_ms']}ms")
+    print(f"   ⏱️  Burst commands: p50 {commands['p50_ms']}ms, p99 {commands['p99_ms']}ms, "
+          f"max {commands['max_ms']}ms")
+    print(f"   🚦 Queueing delay: p50 {report['queueing_delay']['p50_ms']}ms, "
+          f"p99 {report['queueing_delay']['p99_ms']}ms")
+    print(f"   📈 Serialization: +{report['serialization_ms_per_command']}ms per in-flight command")
+    print(f"   🔁 Convergence: p50 {report['convergence']['p50_ms']}ms, p99 {report['convergence']['p99_ms']}ms, "
+          f"{report['convergence_timeouts']} timeouts")
+    print(f"   ❌ Errors: {commands['errors']}/{commands['requests']} ({commands['error_rate'] * 100:.2f}%)")
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Report saved: {args.report}")
+
+    return 1 if commands['errors'] or report['convergence_timeouts'] else 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+HTTP content-coding helpers shared by the client, stub server and benchmarks.
+
+identity, gzip and deflate use the standard library; br needs the optional
+brotli package (pip install brotli) and is left out of available_encodings()
+when it is missing.
+"""
+
+import gzip
+import zlib
+from typing import List, Optional
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+ENCODINGS = ('identity', 'gzip', 'deflate', 'br')
+
+
+class EncodingError(ValueError):
+    """Raised when a payload cannot be decoded."""
+
+
+class UnsupportedEncoding(EncodingError):
+    """Raised for codings this environment cannot handle (e.g. br without brotli)."""
+
+
+def available_encodings() -> List[str]:
+    """Encodings this environment can both produce and decode."""
+    return [e for e in ENCODINGS if e != 'br' or brotli is not None]
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Encode bytes with a content-coding.
+
+    Args:
+        data: Raw payload
+        encoding: identity, gzip, deflate or br
+        level: Compression level (codec default when omitted)
+
+    Returns:
+        The encoded payload
+    """
+    encoding = encoding.lower()
+    if encoding == 'identity':
+        return data
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=9 if level is None else level, mtime=0)
+    if encoding == 'deflate':
+        return zlib.compress(data, -1 if level is None else level)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(data) if level is None else brotli.compress(data, quality=level)
+    raise UnsupportedEncoding(f"Unsupported content encoding: {encoding}")
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    """Decode bytes sent with a Content-Encoding header value."""
+    # Codings are listed in the order they were applied
+    for coding in reversed([c.strip().lower() for c in encoding.split(',') if c.strip()]):
+        if coding == 'identity':
+            continue
+        if coding not in ('gzip', 'x-gzip', 'deflate') and not (coding == 'br' and brotli is not None):
+            raise UnsupportedEncoding(f"Unsupported content encoding: {coding}")
+        try:
+            if coding == 'br':
+                data = brotli.decompress(data)
+            elif coding == 'deflate':
+                try:
+                    data = zlib.decompress(data)
+                except zlib.error:
+                    # Some servers send raw deflate without the zlib wrapper
+                    data = zlib.decompress(data, -zlib.MAX_WBITS)
+            else:
+                data = gzip.decompress(data)
+        except Exception as e:
+            raise EncodingError(f"Corrupt {coding} payload: {e}") from e
+    return data
+
+
+def negotiate(accept_encoding: str, supported: Optional[List[str]] = None) -> str:
+    """Pick the response coding for an Accept-Encoding header (q-values honoured)."""
+    supported = supported or available_encodings()
+    best, best_q = 'identity', 0.0
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name in supported and name != 'identity' and q > best_q:
+            best, best_q = name, q
+    return best
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Compression negotiation benchmark.
+
+Replays each collection item once per Accept-Encoding (identity, gzip and
+br by default; br needs: pip install brotli) and reports, per endpoint:
+- Response bytes on the wire vs decoded, and the compression ratio
+- CPU time spent decoding the response
+- End-to-end latency (p50/p99)
+
+With --writes, items with a JSON body are also sent with the body
+compressed (Content-Encoding: gzip) to see whether the server accepts it
+and how many upload bytes that saves. Requests run one at a time so the
+byte and CPU figures belong to a single request.
+
+Usage:
+    python compression_bench.py generated/facilities_service.postman_collection.json \\
+        generated/videos_service.postman_collection.json \\
+        --environment generated/rallymate-development.postman_environment.json --iterations 20
+"""
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from collection_runner import (CollectionRunner, RequestResult, RunItem, load_items, load_runner_variables,
+                               parse_vars, resolvable_items)
+from compression import ENCODINGS, available_encodings, compress
+from latency_stats import LatencyHistogram
+from variables import VariableCycleError
+
+DEFAULT_ENCODINGS = 'identity,gzip,br'
+# Smallest per-request saving worth calling out in the recommendations
+MIN_SAVING_BYTES = 512
+
+
+class EncodingStats:
+    """Wire/decoded bytes, decode CPU and latency for one endpoint and encoding."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.wire_bytes = 0
+        self.body_bytes = 0
+        self.decode_cpu = 0.0
+        self.latency = LatencyHistogram()
+        self.codings: Dict[str, int] = {}
+
+    def record(self, result: RequestResult):
+        self.requests += 1
+        if not result.ok or result.response is None:
+            self.errors += 1
+            return
+        response = result.response
+        self.wire_bytes += response.wire_bytes
+        self.body_bytes += len(response.body)
+        self.decode_cpu += response.decode_cpu
+        self.latency.record(result.latency)
+        coding = response.headers.get('content-encoding', 'identity').lower()
+        self.codings[coding] = self.codings.get(coding, 0) + 1
+
+    @property
+    def ok(self) -> int:
+        return self.requests - self.errors
+
+    def summary(self) -> Dict[str, Any]:
+        ok = self.ok or 1
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'wire_bytes': round(self.wire_bytes / ok, 1),
+            'decoded_bytes': round(self.body_bytes / ok, 1),
+            'ratio': round(self.wire_bytes / self.body_bytes, 3) if self.body_bytes else 1.0,
+            'decode_us': round(self.decode_cpu / ok * 1e6, 1),
+            'p50_ms': round(self.latency.percentile(50) * 1000, 3),
+            'p99_ms': round(self.latency.percentile(99) * 1000, 3),
+            'served_as': self.codings,
+        }
+
+
+class BodyCompressor:
+    """Client wrapper that sends JSON request bodies with a Content-Encoding."""
+
+    def __init__(self, client, encoding: str):
+        self.client = client
+        self.encoding = encoding
+        self.last: Optional[tuple] = None
+
+    async def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                      body: Any = None, **kwargs):
+        self.last = None
+        if body is None:
+            return await self.client.request(method, url, headers=headers, body=body, **kwargs)
+        raw = body.encode('utf-8') if isinstance(body, str) else json.dumps(body).encode('utf-8')
+        payload = compress(raw, self.encoding)
+        self.last = (len(raw), len(payload))
+        headers = dict(headers or {}, **{'Content-Encoding': self.encoding, 'Content-Type': 'application/json'})
+        return await self.client.request(method, url, headers=headers, body=payload, **kwargs)
+
+
+async def bench_encoding(items: List[RunItem], variables: Dict, encoding: str, iterations: int,
+                         timeout: float) -> Dict[str, EncodingStats]:
+    """Run the items in order `iterations` times with one Accept-Encoding."""
+    stats: Dict[str, EncodingStats] = {}
+    runner = CollectionRunner(variables, max_connections=1, timeout=timeout, accept_encoding=encoding,
+                              listeners=[lambda r: stats.setdefault(r.key, EncodingStats()).record(r)])
+    state = runner.new_state()
+    async with runner.client() as client:
+        for _ in range(iterations):
+            for item in items:
+                await runner.execute(client, item, state)
+    return stats
+
+
+async def bench_request_bodies(items: List[RunItem], variables: Dict, encoding: str, iterations: int,
+                               timeout: float) -> Dict[str, Dict[str, Any]]:
+    """Send items with a body compressed; report acceptance and bytes saved."""
+    rows: Dict[str, Dict[str, Any]] = {}
+    runner = CollectionRunner(variables, max_connections=1, timeout=timeout)
+    state = runner.new_state()
+    async with runner.client() as client:
+        compressor = BodyCompressor(client, encoding)
+        for _ in range(iterations):
+            for item in items:
+                result = await runner.execute(compressor, item, state)
+                if not compressor.last:
+                    continue
+                raw, sent = compressor.last
+                row = rows.setdefault(item.key, {'requests': 0, 'accepted': 0, 'raw_bytes': 0, 'sent_bytes': 0,
+                                                 'statuses': {}})
+                row['requests'] += 1
+                row['accepted'] += 1 if result.ok else 0
+                row['raw_bytes'] += raw
+                row['sent_bytes'] += sent
+                status = str(result.status)
+                row['statuses'][status] = row['statuses'].get(status, 0) + 1
+    for row in rows.values():
+        row['saved_ratio'] = round(1 - row['sent_bytes'] / row['raw_bytes'], 3) if row['raw_bytes'] else 0.0
+    return rows
+
+
+def recommendations(results: Dict[str, Dict[str, EncodingStats]]) -> List[str]:
+    """Endpoints where the best encoding saves meaningful bytes, or is ignored."""
+    lines = []
+    identity = results.get('identity', {})
+    for key, base in sorted(identity.items()):
+        if not base.ok:
+            continue
+        base_bytes = base.wire_bytes / base.ok
+        best = None
+        for encoding, per_key in results.items():
+            stats = per_key.get(key)
+            if encoding == 'identity' or not stats or not stats.ok:
+                continue
+            saved = base_bytes - stats.wire_bytes / stats.ok
+            if best is None or saved > best[1]:
+                best = (encoding, saved, stats)
+        if best is None:
+            continue
+        encoding, saved, stats = best
+        if 'identity' in stats.codings and len(stats.codings) == 1 and base_bytes >= MIN_SAVING_BYTES:
+            lines.append(f"⚠️  {key}: {base_bytes:.0f}B responses are never compressed")
+        elif saved >= MIN_SAVING_BYTES:
+            lines.append(f"💡 {key}: {encoding} saves {saved:.0f}B/request "
+                         f"({saved / base_bytes:.0%}) for {stats.decode_cpu / stats.ok * 1e6:.0f}µs decode CPU")
+    return lines
+
+
+def format_encoding_table(results: Dict[str, Dict[str, EncodingStats]]) -> str:
+    lines = [f"{'Endpoint':<40} {'enc':<9} {'wire B':>9} {'decoded B':>10} {'ratio':>6} "
+             f"{'decode µs':>10} {'p50 ms':>8} {'p99 ms':>8} {'err':>4}"]
+    lines.append('-' * len(lines[0]))
+    keys = sorted({key for per_key in results.values() for key in per_key})
+    for key in keys:
+        for encoding, per_key in results.items():
+            if key not in per_key:
+                continue
+            s = per_key[key].summary()
+            lines.append(f"{key[:40]:<40} {encoding:<9} {s['wire_bytes']:>9.0f} {s['decoded_bytes']:>10.0f} "
+                         f"{s['ratio']:>6.2f} {s['decode_us']:>10.1f} {s['p50_ms']:>8.2f} {s['p99_ms']:>8.2f} "
+                         f"{s['errors']:>4}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare response/request compression per endpoint')
+    parser.add_argument('collections', nargs='+', help='Collection files to take requests from')
+    parser.add_argument('--environment', '-e', help='Postman environment file')
+    parser.add_argument('--var', action='append', help='Override a variable (KEY=VALUE)')
+    parser.add_argument('--item', action='append', help='Only use these items (name or Service.Rpc)')
+    parser.add_argument('--encodings', default=DEFAULT_ENCODINGS,
+                        help=f"Comma-separated Accept-Encodings ({', '.join(ENCODINGS)})")
+    parser.add_argument('--writes', action='store_true',
+                        help='Include write requests and test compressed request bodies')
+    parser.add_argument('--body-encoding', default='gzip', help='Content-Encoding for request bodies')
+    parser.add_argument('--iterations', '-n', type=int, default=10, help='Passes over the items per encoding')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Request timeout in seconds')
+    parser.add_argument('--report', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.collections]
+    loaded = [item for path in paths for item in load_items(path)]
+    try:
+        variables = load_runner_variables(paths, args.environment, parse_vars(args.var), items=loaded)
+    except VariableCycleError as e:
+        print(f"❌ {e}")
+        return 1
+    items = resolvable_items(loaded, variables, args.item, args.writes)
+    if not items:
+        print("❌ No requests with fully resolved URLs (pass ids with --var or --environment)")
+        return 1
+
+    encodings = [e.strip().lower() for e in args.encodings.split(',') if e.strip()]
+    unknown = [e for e in encodings + [args.body_encoding] if e not in ENCODINGS]
+    if unknown:
+        print(f"❌ Unknown encodings: {', '.join(unknown)}")
+        return 1
+    for encoding in [e for e in encodings + [args.body_encoding] if e not in available_encodings()]:
+        print(f"⚠️  Skipping {encoding}: install the optional 'brotli' package (pip install brotli)")
+    encodings = [e for e in encodings if e in available_encodings()]
+    if 'identity' not in encodings:
+        encodings.insert(0, 'identity')
+
+    print("🗜️  rallymate Compression Benchmark")
+    print("=" * 60)
+    print(f"📦 {len(items)} requests × {args.iterations} per encoding: {', '.join(encodings)}")
+
+    results: Dict[str, Dict[str, EncodingStats]] = {}
+    for encoding in encodings:
+        print(f"▶️  Accept-Encoding: {encoding}")
+        results[encoding] = asyncio.run(bench_encoding(items, variables, encoding, args.iterations, args.timeout))
+
+    print()
+    print(format_encoding_table(results))
+
+    bodies = {}
+    body_items = [item for item in items if item.body is not None]
+    if args.writes and body_items and args.body_encoding in available_encodings():
+        bodies = asyncio.run(bench_request_bodies(body_items, variables, args.body_encoding, args.iterations,
+                                                  args.timeout))
+        print(f"\n📤 Request bodies with Content-Encoding: {args.body_encoding}")
+        print(f"{'Endpoint':<40} {'raw B':>8} {'sent B':>8} {'saved':>7} {'accepted':>9}")
+        for key, row in sorted(bodies.items()):
+            n = row['requests']
+            accepted = f"{row['accepted']}/{n}"
+            print(f"{key[:40]:<40} {row['raw_bytes'] / n:>8.0f} {row['sent_bytes'] / n:>8.0f} "
+                  f"{row['saved_ratio']:>7.0%} {accepted:>9}")
+        rejected = [key for key, row in bodies.items() if not row['accepted']]
+        if rejected:
+            print(f"⚠️  {len(rejected)} endpoints reject compressed bodies "
+                  f"(statuses: {', '.join(sorted({s for k in rejected for s in bodies[k]['statuses']}))})")
+
+    advice = recommendations(results)
+    if advice:
+        print()
+        for line in advice:
+            print(line)
+
+    if args.report:
+        Path(args.report).write_text(json.dumps({
+            'responses': {encoding: {key: stats.summary() for key, stats in sorted(per_key.items())}
+                          for encoding, per_key in results.items()},
+            'request_bodies': bodies,
+            'recommendations': advice,
+        }, indent=2))
+        print(f"\n💾 Report saved: {args.report}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Cold vs warm connection latency breakdown.
+
+Sends the same collection requests under each connection mode and splits
+every request into DNS, TCP connect, TLS handshake, send, time-to-first-byte
+and transfer:
+- fresh   a new connection per request (every request pays the handshakes)
+- pooled  keep-alive HTTP/1.1 pool (handshakes only while the pool warms)
+- http2   one multiplexed HTTP/2 connection per origin (needs: pip install h2)
+
+The comparison shows how much of the latency is handshakes rather than
+server time, and what pooling or HTTP/2 would save.
+
+Usage:
+    python connection_bench.py generated/facilities_service.postman_collection.json \\
+        --environment generated/rallymate-production.postman_environment.json \\
+        --requests 200 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+from typing import Dict, List
+
+from collection_runner import (CONNECTION_MODES, CollectionRunner, RunItem, load_items, load_runner_variables,
+                               parse_vars, resolvable_items)
+from http2_client import http2_available
+from latency_stats import EndpointStats, PhaseStats, format_phase_table
+from variables import VariableCycleError
+
+
+async def bench_mode(mode: str, items: List[RunItem], variables: Dict, requests: int,
+                     concurrency: int, timeout: float) -> CollectionRunner:
+    """Send `requests` requests round-robin over items with `concurrency` workers."""
+    runner = CollectionRunner(variables, max_connections=concurrency, timeout=timeout, connection_mode=mode)
+    queue: asyncio.Queue = asyncio.Queue()
+    for index in range(requests):
+        queue.put_nowait(items[index % len(items)])
+
+    async def worker(client):
+        state = runner.new_state()
+        while not queue.empty():
+            await runner.execute(client, queue.get_nowait(), state)
+
+    async with runner.client() as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    return runner
+
+
+def summarize(runner: CollectionRunner) -> Dict:
+    phases, stats = PhaseStats(), EndpointStats()
+    for value in runner.phase_stats.values():
+        phases.merge(value)
+    for value in runner.stats.values():
+        stats.merge(value)
+    return {'phases': phases, 'stats': stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Break request latency into connection phases per mode')
+    parser.add_argument('collections', nargs='+', help='Collection files to take requests from')
+    parser.add_argument('--environment', '-e', help='Postman environment file')
+    parser.add_argument('--var', action='append', help='Override a variable (KEY=VALUE)')
+    parser.add_argument('--item', action='append', help='Only use these items (name or Service.Rpc)')
+    parser.add_argument('--modes', default=','.join(CONNECTION_MODES), help='Comma-separated modes to compare')
+    parser.add_argument('--requests', '-n', type=int, default=100, help='Requests per mode')
+    parser.add_argument('--concurrency', '-c', type=int, default=4, help='Concurrent requests')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Request timeout in seconds')
+    parser.add_argument('--report', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.collections]
+    loaded = [item for path in paths for item in load_items(path)]
+    try:
+        variables = load_runner_variables(paths, args.environment, parse_vars(args.var), items=loaded)
+    except VariableCycleError as e:
+        print(f"❌ {e}")
+        return 1
+    items = resolvable_items(loaded, variables, args.item)
+    if not items:
+        print("❌ No requests with fully resolved URLs (pass ids with --var or --environment)")
+        return 1
+
+    modes = [m.strip() for m in args.modes.split(',') if m.strip()]
+    unknown = [m for m in modes if m not in CONNECTION_MODES]
+    if unknown:
+        print(f"❌ Unknown modes: {', '.join(unknown)}")
+        return 1
+    if 'http2' in modes and not http2_available():
+        print("⚠️  Skipping http2: install the optional 'h2' package (pip install h2)")
+        modes.remove('http2')
+
+    print("🔌 rallymate Connection Phase Benchmark")
+    print("=" * 60)
+    print(f"📦 {len(items)} requests × {args.requests} per mode, concurrency {args.concurrency}")
+
+    results = {}
+    for mode in modes:
+        print(f"\n▶️  {mode}")
+        runner = asyncio.run(bench_mode(mode, items, variables, args.requests, args.concurrency, args.timeout))
+        results[mode] = summarize(runner)
+        if results[mode]['stats'].errors == args.requests:
+            print(f"⚠️  Every {mode} request failed (does the server support this mode?)")
+            continue
+        print(format_phase_table(runner.phase_stats))
+
+    print(f"\n{'Mode':<8} {'p50 ms':>9} {'p99 ms':>9} {'handshake%':>11} {'reused%':>8} {'errors':>7}")
+    for mode, result in results.items():
+        s = result['phases'].summary()
+        print(f"{mode:<8} {s['total']['p50_ms']:>9.2f} {s['total']['p99_ms']:>9.2f} "
+              f"{s['handshake_share'] * 100:>10.1f}% {s['reused_ratio'] * 100:>7.0f}% "
+              f"{result['stats'].errors:>7}")
+
+    if 'fresh' in results and 'pooled' in results:
+        fresh = results['fresh']['phases'].total.percentile(50)
+        pooled = results['pooled']['phases'].total.percentile(50)
+        handshake = results['fresh']['phases'].handshake_share
+        print(f"\n💡 Handshakes are {handshake * 100:.0f}% of cold-request time; "
+              f"pooling changes p50 by {(pooled - fresh) * 1000:+.2f}ms")
+
+    if args.report:
+        Path(args.report).write_text(json.dumps({
+            mode: {'phases': r['phases'].summary(), 'requests': r['stats'].summary()}
+            for mode, r in results.items()
+        }, indent=2))
+        print(f"\n💾 Report saved: {args.report}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Multi-tenant dataset builder for rallymate staging environments.
+
+Seeds a configurable topology through the parsed create/register RPCs:
+
+    F facilities × (U users + memberships, D devices, V videos)
+
+Each facility gets one bridge, with the remaining devices split between
+locks and cameras; videos are uploaded from the facility's cameras.
+Requests run with bounded concurrency, and every created entity is journaled
+to a checkpoint as soon as it exists, so an interrupted (even killed) build
+resumes where it stopped without creating anything twice.
+
+Outputs (in --output-dir):
+- dataset-<run_id>.json: index of every created ID by facility
+- iteration-data-<run_id>.json: one row per facility for `newman run -d`
+- rallymate-<env>-dataset.postman_environment.json: environment for facility #1
+
+Usage:
+    python dataset_builder.py --base-url https://dev.rallymate.io \\
+        --facilities 200 --users 50 --devices 12 --videos 20 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+from generate_postman_collections import generate_environment
+from http_client import HttpClient, HttpError
+from latency_stats import EndpointStats, format_stats_table
+from rpc_catalog import load_services, find_rpc, build_body, expand_path
+
+SCRIPT_DIR = Path(__file__).parent
+
+# (service, RPC candidates, response wrapper key) for each entity type
+ENTITY_RPCS = {
+    'facility': ('facilities', ['CreateFacility'], 'facility'),
+    'user': ('users', ['CreateUser'], 'user'),
+    'membership': ('users', ['CreateMembershipByUserId'], 'membership'),
+    'bridge': ('bridge', ['RegisterBridge'], 'bridge'),
+    'lock': ('locks', ['RegisterLock'], 'lock'),
+    'camera': ('cameras', ['RegisterCamera'], 'camera'),
+    'video': ('videos', ['UploadVideo'], 'video'),
+    'video_association': ('videos', ['AssociateVideoToUser'], None),
+}
+
+
+class Checkpoint:
+    """Created entities as a JSON snapshot plus an append-only journal.
+
+    put() appends the record to <path>.journal before returning, so a killed
+    build loses no creates; the snapshot is rewritten atomically every
+    `flush_every` puts and on flush(), which empties the journal.
+    """
+
+    def __init__(self, path: Path, config: Dict):
+        self.path = path
+        self.journal_path = path.with_suffix(path.suffix + '.journal')
+        self.data = {'config': config, 'entities': {}}
+        self._dirty = 0
+        self._journal = None
+        if path.exists():
+            with open(path) as f:
+                self.data = json.load(f)
+        elif config:
+            self.flush()
+        if self.journal_path.exists():
+            with open(self.journal_path) as f:
+                for line in f:
+                    try:
+                        key, record = json.loads(line)
+                    except ValueError:
+                        continue  # last line torn by the kill
+                    self.data['entities'][key] = record
+                    self._dirty += 1
+            self.flush()
+
+    @property
+    def config(self) -> Dict:
+        return self.data['config']
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self.data['entities'].get(key)
+
+    def put(self, key: str, record: Dict, flush_every: int = 50):
+        self.data['entities'][key] = record
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a')
+        self._journal.write(json.dumps([key, record]) + '\n')
+        self._journal.flush()
+        self._dirty += 1
+        if self._dirty >= flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._dirty and self.path.exists() and not self.journal_path.exists():
+            return
+        tmp = self.path.with_suffix(self.path.suffix + '.tmp')
+        tmp.write_text(json.dumps(self.data))
+        os.replace(tmp, self.path)
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if self.journal_path.exists():
+            self.journal_path.unlink()
+        self._dirty = 0
+
+
+class DatasetBuilder:
+    """Create the facility topology against a target with bounded concurrency."""
+
+    def __init__(self, base_url: str, services: Dict[str, Dict], checkpoint: Checkpoint,
+                 concurrency: int = 16, session_token: Optional[str] = None):
+        self.base_url = base_url.rstrip('/')
+        self.checkpoint = checkpoint
+        self.config = checkpoint.config
+        self.concurrency = concurrency
+        self.session_token = session_token
+        self.stats: Dict[str, EndpointStats] = {}
+        self.failures: List[str] = []
+        self.rpcs = {}
+        for entity, (service, candidates, _) in ENTITY_RPCS.items():
+            rpc = find_rpc(services.get(service, {}), *candidates)
+            if rpc:
+                self.rpcs[entity] = rpc
+        missing = {'facility', 'user'} - set(self.rpcs)
+        if missing:
+            raise ValueError(f"Required RPCs not available for: {', '.join(sorted(missing))}")
+        self._semaphore = None
+        self._client = None
+
+    def device_plan(self) -> List[str]:
+        """Device kinds for one facility: a bridge, then locks and cameras."""
+        total = self.config['devices']
+        if total <= 0:
+            return []
+        cameras = round((total - 1) * self.config['camera_ratio'])
+        plan = ['bridge'] + ['lock'] * (total - 1 - cameras) + ['camera'] * cameras
+        return [kind for kind in plan if kind in self.rpcs]
+
+    def _phone(self, f: int, u: int) -> str:
+        digest = hashlib.sha1(f"{self.config['run_id']}:{f}:{u}".encode()).hexdigest()
+        return f"+1555{int(digest, 16) % 10 ** 7:07d}"
+
+    async def _create(self, key: str, entity: str, variables: Dict[str, Any],
+                      overrides: Dict[str, Any]) -> Optional[Dict]:
+        """Create one entity unless the checkpoint already has it."""
+        done = self.checkpoint.get(key)
+        if done is not None:
+            return done
+
+        rpc = self.rpcs[entity]
+        body = build_body(rpc, variables, overrides)
+        url = self.base_url + expand_path(rpc['http']['path'], variables)
+        stats = self.stats.setdefault(entity, EndpointStats())
+
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                response = await self._client.request(rpc['http']['method'], url, body=body)
+            except HttpError as e:
+                stats.record(time.perf_counter() - start, None, False)
+                self.failures.append(f"{key}: {e}")
+                return None
+        stats.record(response.elapsed, response.status, response.ok)
+        if not response.ok:
+            self.failures.append(f"{key}: HTTP {response.status}")
+            return None
+
+        try:
+            payload = response.json() or {}
+        except ValueError:
+            payload = {}
+        wrapper = ENTITY_RPCS[entity][2]
+        created = payload.get(wrapper, {}) if wrapper and isinstance(payload, dict) else {}
+
+        record = {k: v for k, v in overrides.items() if k in ('device_id', 'phone_number', 'name')}
+        if isinstance(created, dict):
+            for field in ('id', 'device_id'):
+                if created.get(field) is not None:
+                    record[field] = created[field]
+        self.checkpoint.put(key, record)
+        return record
+
+    async def _build_facility(self, f: int):
+        run_id = self.config['run_id']
+        fkey = f"f{f:04d}"
+        facility = await self._create(fkey, 'facility', {}, {
+            'name': f"Load Test Club {run_id} #{f}",
+        })
+        if not facility or facility.get('id') is None:
+            return
+        facility_id = facility['id']
+
+        async def build_user(u: int):
+            ukey = f"{fkey}/u{u:05d}"
+            user = await self._create(ukey, 'user', {'facility_id': facility_id}, {
+                'phone_number': self._phone(f, u),
+                'name': f"Load User {f}-{u}",
+                'email': f"load+{run_id}-f{f}-u{u}@example.com",
+            })
+            if user and user.get('id') is not None and 'membership' in self.rpcs:
+                await self._create(f"{ukey}/membership", 'membership',
+                                   {'facility_id': facility_id, 'user_id': user['id']},
+                                   {'facility_id': facility_id, 'user_id': user['id']})
+
+        async def build_device(d: int, kind: str):
+            device_id = f"{run_id}-{kind}-f{f}-{d:03d}"
+            await self._create(f"{fkey}/d{d:03d}", kind, {'facility_id': facility_id}, {
+                'facility_id': facility_id,
+                'device_id': device_id,
+                'name': f"Load {kind.title()} {d} @ facility {f}",
+            })
+
+        plan = self.device_plan()
+        await asyncio.gather(
+            *(build_user(u) for u in range(1, self.config['users'] + 1)),
+            *(build_device(d, kind) for d, kind in enumerate(plan, 1)),
+        )
+
+        if 'video' not in self.rpcs or not self.config['videos']:
+            return
+        cameras = [
+            self.checkpoint.get(f"{fkey}/d{d:03d}")
+            for d, kind in enumerate(plan, 1) if kind == 'camera'
+        ]
+        cameras = [c['device_id'] for c in cameras if c]
+        users = [self.checkpoint.get(f"{fkey}/u{u:05d}") for u in range(1, self.config['users'] + 1)]
+        users = [u['id'] for u in users if u and u.get('id') is not None]
+
+        async def build_video(v: int):
+            camera = cameras[v % len(cameras)] if cameras else f"{run_id}-camera-f{f}"
+            vkey = f"{fkey}/v{v:05d}"
+            video = await self._create(vkey, 'video', {'facility_id': facility_id}, {
+                'facility_id': facility_id,
+                'camera_device_id': camera,
+                'filename': f"recording-f{f}-v{v}.mp4",
+            })
+            if (video and video.get('id') is not None and users
+                    and self.config['associate_videos'] and 'video_association' in self.rpcs):
+                user_id = users[v % len(users)]
+                await self._create(f"{vkey}/association", 'video_association',
+                                   {'video_id': video['id'], 'user_id': user_id}, {})
+
+        await asyncio.gather(*(build_video(v) for v in range(1, self.config['videos'] + 1)))
+
+    async def build(self):
+        """Create every facility in the topology."""
+        headers = {'Authorization': f"Bearer {self.session_token}"} if self.session_token else {}
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with HttpClient(max_connections=self.concurrency, default_headers=headers) as client:
+            self._client = client
+            try:
+                await asyncio.gather(
+                    *(self._build_facility(f) for f in range(1, self.config['facilities'] + 1))
+                )
+            finally:
+                self.checkpoint.flush()
+
+    def index(self) -> Dict:
+        """Group checkpoint records into a per-facility ID index."""
+        facilities = []
+        plan = self.device_plan()
+        for f in range(1, self.config['facilities'] + 1):
+            fkey = f"f{f:04d}"
+            facility = self.checkpoint.get(fkey)
+            if not facility:
+                continue
+            entry = {'key': fkey, 'id': facility.get('id'), 'users': [], 'devices': {}, 'videos': []}
+            for u in range(1, self.config['users'] + 1):
+                user = self.checkpoint.get(f"{fkey}/u{u:05d}")
+                if user:
+                    membership = self.checkpoint.get(f"{fkey}/u{u:05d}/membership") or {}
+                    entry['users'].append({**user, 'membership_id': membership.get('id')})
+            for d, kind in enumerate(plan, 1):
+                device = self.checkpoint.get(f"{fkey}/d{d:03d}")
+                if device:
+                    entry['devices'].setdefault(kind, []).append(device)
+            for v in range(1, self.config['videos'] + 1):
+                video = self.checkpoint.get(f"{fkey}/v{v:05d}")
+                if video:
+                    entry['videos'].append(video)
+            facilities.append(entry)
+        return {'run_id': self.config['run_id'], 'config': self.config, 'facilities': facilities}
+
+
+def iteration_rows(index: Dict) -> List[Dict]:
+    """One Newman iteration-data row per facility with its first IDs."""
+    rows = []
+    for facility in index['facilities']:
+        row = {'facility_id': facility['id']}
+        if facility['users']:
+            row['user_id'] = facility['users'][0].get('id')
+            row['phone_number'] = facility['users'][0].get('phone_number')
+            row['membership_id'] = facility['users'][0].get('membership_id')
+        for kind, devices in facility['devices'].items():
+            row[f"{kind}_device_id"] = devices[0].get('device_id')
+        if facility['videos']:
+            row['video_id'] = facility['videos'][0].get('id')
+        rows.append({k: v for k, v in row.items() if v is not None})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed a multi-tenant rallymate dataset')
+    parser.add_argument('--base-url', default='http://localhost:8080', help='REST gateway base URL')
+    parser.add_argument('--env-name', default='Staging', help='Name for the generated environment')
+    parser.add_argument('--proto-dir', help='Directory containing proto files')
+    parser.add_argument('--generated-dir', help='Directory with generated collections (fallback model)')
+    parser.add_argument('--facilities', type=int, default=10, help='Facilities to create (F)')
+    parser.add_argument('--users', type=int, default=20, help='Users per facility (U)')
+    parser.add_argument('--devices', type=int, default=6, help='Devices per facility incl. 1 bridge (D)')
+    parser.add_argument('--videos', type=int, default=10, help='Videos per facility (V)')
+    parser.add_argument('--camera-ratio', type=float, default=0.33, help='Share of non-bridge devices that are cameras')
+    parser.add_argument('--no-associate-videos', action='store_true', help='Skip video-to-user associations')
+    parser.add_argument('--concurrency', type=int, default=16, help='Maximum in-flight requests')
+    parser.add_argument('--session-token', default=os.environ.get('RALLYMATE_SESSION_TOKEN'),
+                        help='Bearer token (default: $RALLYMATE_SESSION_TOKEN)')
+    parser.add_argument('--run-id', help='Identifier used in names and device IDs (default: timestamp)')
+    parser.add_argument('--output-dir', default=str(SCRIPT_DIR / 'generated' / 'datasets'))
+    parser.add_argument('--resume', help='Resume from an existing checkpoint file')
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if args.resume:
+        checkpoint = Checkpoint(Path(args.resume), {})
+        if not checkpoint.config:
+            print(f"❌ Checkpoint not found or empty: {args.resume}")
+            return 1
+        print(f"♻️  Resuming run {checkpoint.config['run_id']} "
+              f"({len(checkpoint.data['entities'])} entities already created)")
+    else:
+        run_id = args.run_id or time.strftime('lt%Y%m%d%H%M%S')
+        config = {
+            'run_id': run_id,
+            'base_url': args.base_url,
+            'facilities': args.facilities,
+            'users': args.users,
+            'devices': args.devices,
+            'videos': args.videos,
+            'camera_ratio': args.camera_ratio,
+            'associate_videos': not args.no_associate_videos,
+        }
+        checkpoint = Checkpoint(output_dir / f"checkpoint-{run_id}.json", config)
+
+    services = load_services(['facilities', 'users', 'bridge', 'locks', 'cameras', 'videos'],
+                             args.proto_dir, args.generated_dir)
+    try:
+        builder = DatasetBuilder(checkpoint.config.get('base_url', args.base_url), services, checkpoint,
+                                 args.concurrency, args.session_token)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    config = checkpoint.config
+    print("🏗️  rallymate Dataset Builder")
+    print("=" * 60)
+    print(f"📐 {config['facilities']} facilities × {config['users']} users × "
+          f"{config['devices']} devices × {config['videos']} videos")
+
+    started = time.perf_counter()
+    try:
+        asyncio.run(builder.build())
+    except KeyboardInterrupt:
+        print(f"\n⏸️  Interrupted - resume with: --resume {checkpoint.path}")
+        return 130
+    elapsed = time.perf_counter() - started
+
+    run_id = config['run_id']
+    index = builder.index()
+    index_file = output_dir / f"dataset-{run_id}.json"
+    index_file.write_text(json.dumps(index, indent=2))
+
+    rows = iteration_rows(index)
+    data_file = output_dir / f"iteration-data-{run_id}.json"
+    data_file.write_text(json.dumps(rows, indent=2))
+
+    if rows:
+        env = generate_environment(f"{args.env_name} Dataset", config['base_url'], rows[0])
+        env_file = output_dir / f"rallymate-{args.env_name.lower()}-dataset.postman_environment.json"
+        env_file.write_text(json.dumps(env, indent=2))
+        print(f"   💾 {env_file.name}")
+
+    print(f"   💾 {index_file.name}")
+    print(f"   💾 {data_file.name}")
+    print()
+    print(format_stats_table(builder.stats))
+    print()
+    print(f"✅ {len(index['facilities'])}/{config['facilities']} facilities ready in {elapsed:.1f}s")
+
+    if builder.failures:
+        print(f"⚠️  {len(builder.failures)} requests failed (first 5):")
+        for failure in builder.failures[:5]:
+            print(f"   • {failure}")
+        print(f"   Re-run with --resume {checkpoint.path} to retry them")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Distributed scenario runs: one coordinator, W worker processes.
+
+The coordinator listens on a TCP ("host:port") or Unix ("unix:/path")
+socket, waits for W workers to connect, gives each a share of the virtual
+users and target rate, and merges what they send back. Workers return
+EndpointStats.to_dict() snapshots, whose log-bucket histograms merge
+exactly, so the combined percentiles are the same as one big run.
+
+Messages are newline-delimited JSON:
+    worker → coordinator   {"type": "hello", "host": ..., "pid": ...}
+    coordinator → worker   {"type": "start", "plan": {...}}
+    worker → coordinator   {"type": "result", "stats": {...}, "iterations": {...}, ...}
+
+Usage:
+    # Everything on one box, workers spawned as subprocesses
+    python collection_runner.py distribute --scenario scenarios/production-mix.json \\
+        --workers 4 --spawn --duration 5m
+    # Across hosts: start the coordinator, then a worker per host
+    python collection_runner.py distribute --scenario scenarios/production-mix.json \\
+        --workers 8 --listen 0.0.0.0:7070
+    python collection_runner.py worker --connect coordinator-host:7070
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from collection_runner import CollectionRunner, load_items, load_runner_variables, parse_duration, parse_vars
+from latency_stats import EndpointStats, format_stats_table
+from scenario import Scenario, ScenarioRunner, add_mix_arguments, resolve_weights, scenario_from_args
+from session_refresh import DEFAULT_MARGIN
+
+SCRIPT_DIR = Path(__file__).parent
+MESSAGE_LIMIT = 64 * 1024 * 1024
+
+
+def parse_address(address: str) -> Tuple[str, Any]:
+    """Parse 'unix:/path' or 'host:port' into ('unix', path) or ('tcp', (host, port))."""
+    if address.startswith('unix:'):
+        return 'unix', address[len('unix:'):]
+    host, _, port = address.rpartition(':')
+    if not port.isdigit():
+        raise ValueError(f"Invalid address '{address}' (expected host:port or unix:/path)")
+    return 'tcp', (host or '127.0.0.1', int(port))
+
+
+async def send_message(writer: asyncio.StreamWriter, message: Dict):
+    writer.write(json.dumps(message).encode() + b'\n')
+    await writer.drain()
+
+
+async def read_message(reader: asyncio.StreamReader) -> Optional[Dict]:
+    line = await reader.readline()
+    return json.loads(line) if line else None
+
+
+def split_evenly(total: int, parts: int) -> List[int]:
+    """Split an integer into `parts` shares that differ by at most one."""
+    return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
+
+
+def scenario_from_plan(plan: Dict) -> Scenario:
+    """Rebuild the scenario a coordinator shipped to a worker."""
+    if plan.get('scenario'):
+        scenario = Scenario.from_dict(plan['scenario'], Path(plan.get('base_dir') or '.'))
+    else:
+        items = [item for path in plan['collections'] for item in load_items(Path(path))]
+        if plan.get('reads_only'):
+            items = [item for item in items if item.is_read]
+        scenario = Scenario.from_items('collection-mix', items, resolve_weights(items, plan.get('weights')))
+    if plan.get('think_time') is not None:
+        scenario.think_time = plan['think_time']
+    return scenario
+
+
+class Coordinator:
+    """Hand out shares of a scenario to workers and merge their results."""
+
+    def __init__(self, plan: Dict, workers: int, address: str = '127.0.0.1:0',
+                 connect_timeout: float = 30.0):
+        self.plan = plan
+        self.workers = workers
+        self.address = address
+        self.connect_timeout = connect_timeout
+        self.bound_address: Optional[str] = None
+        self._connections: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter, Dict]] = []
+        self._all_connected = asyncio.Event()
+
+    async def _on_connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        hello = await read_message(reader)
+        if not hello or hello.get('type') != 'hello' or len(self._connections) >= self.workers:
+            writer.close()
+            return
+        self._connections.append((reader, writer, hello))
+        if len(self._connections) == self.workers:
+            self._all_connected.set()
+
+    async def start(self) -> asyncio.AbstractServer:
+        kind, target = parse_address(self.address)
+        if kind == 'unix':
+            if os.path.exists(target):
+                os.unlink(target)
+            server = await asyncio.start_unix_server(self._on_connect, target, limit=MESSAGE_LIMIT)
+            self.bound_address = f"unix:{target}"
+        else:
+            server = await asyncio.start_server(self._on_connect, target[0], target[1], limit=MESSAGE_LIMIT)
+            host, port = server.sockets[0].getsockname()[:2]
+            self.bound_address = f"{host}:{port}"
+        return server
+
+    def worker_plans(self) -> List[Dict]:
+        vus = split_evenly(self.plan['vus'], self.workers)
+        plans = []
+        for index, share in enumerate(vus):
+            rate = self.plan['rate'] * share / self.plan['vus'] if self.plan.get('rate') else None
+            seed = self.plan['seed'] + index if self.plan.get('seed') is not None else None
+            plans.append(dict(self.plan, vus=share, rate=rate, seed=seed, worker=index))
+        return plans
+
+    async def _run_worker(self, reader, writer, hello: Dict, plan: Dict) -> Dict:
+        await send_message(writer, {'type': 'start', 'plan': plan})
+        try:
+            result = await read_message(reader)
+        except (ConnectionError, ValueError):
+            result = None
+        writer.close()
+        if not result or result.get('type') != 'result':
+            return {'worker': plan['worker'], 'host': hello.get('host'), 'failed': True}
+        result.update({'worker': plan['worker'], 'host': hello.get('host'), 'pid': hello.get('pid')})
+        return result
+
+    async def run(self, spawn: bool = False,
+                  on_listening: Optional[Callable[[str], None]] = None) -> Dict:
+        server = await self.start()
+        if on_listening:
+            on_listening(self.bound_address)
+        processes = []
+        try:
+            if spawn:
+                processes = [await spawn_worker(self.bound_address) for _ in range(self.workers)]
+            await asyncio.wait_for(self._all_connected.wait(), self.connect_timeout)
+            started = time.perf_counter()
+            results = await asyncio.gather(*(
+                self._run_worker(reader, writer, hello, plan)
+                for (reader, writer, hello), plan in zip(self._connections, self.worker_plans())
+            ))
+            elapsed = time.perf_counter() - started
+        except BaseException:
+            for _, writer, _ in self._connections:
+                writer.close()
+            for process in processes:
+                if process.returncode is None:
+                    process.terminate()
+            raise
+        finally:
+            server.close()
+            await server.wait_closed()
+            for process in processes:
+                await process.wait()
+        return merge_results(results, elapsed)
+
+
+def merge_results(results: List[Dict], elapsed: float) -> Dict:
+    """Combine worker results into one report."""
+    merged: Dict[str, EndpointStats] = {}
+    iterations: Dict[str, int] = {}
+    per_worker = []
+    for result in results:
+        if result.get('failed'):
+            per_worker.append({'worker': result['worker'], 'host': result.get('host'), 'failed': True})
+            continue
+        requests = 0
+        for key, data in result['stats'].items():
+            stats = EndpointStats.from_dict(data)
+            requests += stats.requests
+            merged.setdefault(key, EndpointStats()).merge(stats)
+        for name, count in result['iterations'].items():
+            iterations[name] = iterations.get(name, 0) + count
+        per_worker.append({
+            'worker': result['worker'], 'host': result.get('host'), 'vus': result['vus'],
+            'requests': requests, 'achieved_rate': result['achieved_rate'],
+        })
+
+    total = EndpointStats()
+    for stats in merged.values():
+        total.merge(stats)
+    return {
+        'workers': per_worker,
+        'failed_workers': sum(1 for w in per_worker if w.get('failed')),
+        'elapsed_s': round(elapsed, 3),
+        'iterations': dict(sorted(iterations.items())),
+        'requests_per_second': round(total.requests / elapsed, 2) if elapsed else 0.0,
+        'overall': total.summary(),
+        'endpoints': {k: s.summary() for k, s in sorted(merged.items())},
+        'stats': {k: s.to_dict() for k, s in sorted(merged.items())},
+    }
+
+
+async def spawn_worker(address: str) -> asyncio.subprocess.Process:
+    """Start a local worker subprocess connected to the coordinator."""
+    return await asyncio.create_subprocess_exec(
+        sys.executable, str(SCRIPT_DIR / 'collection_runner.py'), 'worker', '--connect', address,
+        '--quiet', cwd=str(SCRIPT_DIR),
+    )
+
+
+async def run_worker(address: str, quiet: bool = False) -> int:
+    """Connect to a coordinator, run the assigned share and report back."""
+    kind, target = parse_address(address)
+    if kind == 'unix':
+        reader, writer = await asyncio.open_unix_connection(target, limit=MESSAGE_LIMIT)
+    else:
+        reader, writer = await asyncio.open_connection(target[0], target[1], limit=MESSAGE_LIMIT)
+    await send_message(writer, {'type': 'hello', 'host': socket.gethostname(), 'pid': os.getpid()})
+
+    message = await read_message(reader)
+    if not message or message.get('type') != 'start':
+        writer.close()
+        return 1
+    plan = message['plan']
+    if not quiet:
+        print(f"👷 Worker {plan['worker']}: {plan['vus']} VUs for {plan['duration']:.0f}s")
+
+    runner = CollectionRunner(plan['variables'], plan['max_connections'], plan['timeout'],
+                              connection_mode=plan.get('connection', 'pooled'),
+                              accept_encoding=plan.get('accept_encoding'),
+                              trace_context=plan.get('trace_context', False),
+                              refresh_margin=plan.get('refresh_margin', DEFAULT_MARGIN))
+    iterations, achieved_rate = {}, 0.0
+    if plan['vus']:
+        scenario_runner = ScenarioRunner(runner, scenario_from_plan(plan), plan['vus'], plan['rate'], plan['seed'])
+        report = await scenario_runner.run(plan['duration'])
+        iterations, achieved_rate = scenario_runner.iterations, report['achieved_rate']
+
+    await send_message(writer, {
+        'type': 'result',
+        'vus': plan['vus'],
+        'stats': {key: stats.to_dict() for key, stats in runner.stats.items()},
+        'iterations': iterations,
+        'achieved_rate': achieved_rate,
+    })
+    writer.close()
+    await writer.wait_closed()
+    return 0
+
+
+def add_distribute_arguments(parser):
+    add_mix_arguments(parser)
+    parser.add_argument('--duration', type=parse_duration, default='60s', help='Run length')
+    parser.add_argument('--workers', '-w', type=int, default=2, help='Number of worker processes')
+    parser.add_argument('--listen', default='127.0.0.1:0', help='host:port or unix:/path to listen on')
+    parser.add_argument('--spawn', action='store_true', help='Start the workers as local subprocesses')
+    parser.add_argument('--connect-timeout', type=parse_duration, default='30s',
+                        help='How long to wait for all workers')
+
+
+def add_worker_arguments(parser):
+    parser.add_argument('--connect', required=True, help='Coordinator address (host:port or unix:/path)')
+    parser.add_argument('--quiet', action='store_true', help='Suppress worker output')
+
+
+def cmd_distribute(args) -> int:
+    try:
+        scenario = scenario_from_args(args)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    scenario_data = None
+    if args.scenario:
+        with open(args.scenario) as f:
+            scenario_data = json.load(f)
+    plan = {
+        'scenario': scenario_data,
+        'base_dir': str(Path(args.scenario).parent.resolve()) if args.scenario else None,
+        'collections': [str(Path(p).resolve()) for p in args.collections],
+        'weights': args.weight,
+        'reads_only': args.reads_only,
+        'think_time': args.think_time,
+        'variables': load_runner_variables(scenario.collections, args.environment, parse_vars(args.var),
+                                           args.globals, scenario.items),
+        'duration': args.duration,
+        'vus': args.vus or scenario.vus,
+        'rate': args.rate if args.rate is not None else scenario.rate,
+        'seed': args.seed,
+        'max_connections': args.max_connections,
+        'timeout': args.timeout,
+        'connection': args.connection,
+        'accept_encoding': args.accept_encoding,
+        'trace_context': args.trace_context,
+        'refresh_margin': args.refresh_margin,
+    }
+
+    coordinator = Coordinator(plan, args.workers, args.listen, args.connect_timeout)
+
+    def announce(address: str):
+        print(f"📡 Waiting for {args.workers} workers on {address}")
+
+    print(f"🛰️  Distributed run: {scenario.name}")
+    print("=" * 60)
+    print(f"📦 {plan['vus']} VUs across {args.workers} workers, "
+          f"{'%.1f/s' % plan['rate'] if plan['rate'] else 'unpaced'}, {args.duration:.0f}s")
+    try:
+        report = asyncio.run(coordinator.run(args.spawn, announce))
+    except asyncio.TimeoutError:
+        print(f"❌ Not all {args.workers} workers connected within {args.connect_timeout:.0f}s")
+        return 1
+
+    print()
+    for worker in report['workers']:
+        if worker.get('failed'):
+            print(f"   ❌ worker {worker['worker']} ({worker['host']}) failed")
+        else:
+            print(f"   👷 worker {worker['worker']} ({worker['host']}): {worker['vus']} VUs, "
+                  f"{worker['requests']} reqs, {worker['achieved_rate']}/s")
+    print(f"\n🎯 {report['overall']['requests']} requests, {report['requests_per_second']}/s combined\n")
+    merged = {k: EndpointStats.from_dict(v) for k, v in report['stats'].items()}
+    print(format_stats_table(merged))
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Report saved: {args.report}")
+    return 1 if report['failed_workers'] else 0
+
+
+def cmd_worker(args) -> int:
+    try:
+        return asyncio.run(run_worker(args.connect, args.quiet))
+    except (ConnectionError, OSError) as e:
+        print(f"❌ Cannot reach coordinator at {args.connect}: {e}")
+        return 1
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Run the same collection or scenario against several environments at once.
+
+Each environment (the Local/Development/Production files written by the
+generator, or any Postman environment) gets its own CollectionRunner and
+connection pool, and all of them run concurrently so they see the same
+time window. The result is a side-by-side table per endpoint: requests,
+error rate, p50/p90/p99 and, when the servers send Server-Timing, the split
+into server and network time. The delta of every environment against the
+first one is attributed to the server or the network, which answers "is
+dev slower than prod for this endpoint, or is it the network?".
+
+Write RPCs (anything but GET/HEAD) never reach a protected environment
+unless their key or name is on the --allow-write allowlist; they are
+counted as blocked instead. Session refresh is allowlisted so long runs
+keep their tokens. Every environment is protected unless its base_url is a
+loopback host or it is named with --unprotected, so a production
+environment with an unexpected name is still safe; --protected patterns
+(default "*prod*", matched against the name, file name and base_url host)
+win over both.
+
+Usage:
+    python collection_runner.py compare generated/facilities_service.postman_collection.json \\
+        --target generated/rallymate-development.postman_environment.json \\
+        --target generated/rallymate-production.postman_environment.json --iterations 20
+    python collection_runner.py compare --scenario scenarios/production-mix.json --duration 5m \\
+        --target dev=generated/rallymate-development.postman_environment.json \\
+        --target prod=generated/rallymate-production.postman_environment.json --report compare.json
+    python collection_runner.py compare generated/facilities_service.postman_collection.json \\
+        --target generated/rallymate-local.postman_environment.json \\
+        --target generated/rallymate-development.postman_environment.json --unprotected Development
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import json
+import random
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from collection_runner import (CollectionRunner, RunItem, item_variables, load_items, load_runner_resolver,
+                               parse_duration, parse_vars)
+from scenario import ScenarioRunner, add_mix_arguments, scenario_from_args
+from trace_context import NETWORK
+
+DEFAULT_PROTECTED = ['*prod*']
+DEFAULT_WRITE_ALLOWLIST = ['AuthService.RefreshSession']
+LOOPBACK_HOSTS = {'localhost', '127.0.0.1', '::1'}
+
+
+class Target:
+    """One environment to run against."""
+
+    def __init__(self, name: str, path: Path, protected: bool, host: Optional[str] = None):
+        self.name = name
+        self.path = path
+        self.protected = protected
+        self.host = host
+
+
+def _matches(candidates: List[str], patterns: List[str]) -> bool:
+    return any(fnmatch.fnmatch(candidate.lower(), pattern.lower())
+               for pattern in patterns for candidate in candidates if candidate)
+
+
+def parse_target(text: str, protected_patterns: List[str], unprotected_patterns: Optional[List[str]] = None) -> Target:
+    """'[NAME=]PATH'; the name defaults to the environment's own, e.g. 'Production'.
+
+    Protected unless the base_url host is loopback or the name matches
+    `unprotected_patterns`; `protected_patterns` always protect.
+    """
+    name, _, path = text.rpartition('=')
+    path = Path(path)
+    with open(path) as f:
+        environment = json.load(f)
+    if not name:
+        name = (environment.get('name') or path.stem).replace('rallymate - ', '', 1)
+    base_url = next((str(v.get('value', '')) for v in environment.get('values', []) if v.get('key') == 'base_url'), '')
+    host = urlsplit(base_url).hostname if '{{' not in base_url else None
+    candidates = [name, path.name, host]
+    if _matches(candidates, protected_patterns):
+        protected = True
+    else:
+        protected = host not in LOOPBACK_HOSTS and not _matches([name, host], unprotected_patterns or [])
+    return Target(name, path, protected, host)
+
+
+class WriteGuard:
+    """Allow reads, and writes whose key or name matches the allowlist."""
+
+    def __init__(self, allowlist: List[str]):
+        self.allowlist = allowlist
+
+    def __call__(self, item: RunItem) -> bool:
+        return item.is_read or any(fnmatch.fnmatch(candidate, pattern)
+                                   for pattern in self.allowlist for candidate in (item.key, item.name))
+
+
+def endpoint_row(runner: CollectionRunner, key: str) -> Dict:
+    """Latency summary for one endpoint, with server/network means when timed."""
+    row = runner.stats[key].summary()
+    trace = runner.trace_stats.get(key)
+    if trace and trace.timed and NETWORK in trace.phases:
+        network_ms = trace.phases[NETWORK].mean * 1000
+        row['network_ms'] = round(network_ms, 3)
+        row['server_ms'] = round(row['mean_ms'] - network_ms, 3)
+    return row
+
+
+def compare_runners(runners: Dict[str, CollectionRunner]) -> Dict[str, Dict[str, Dict]]:
+    """endpoint → environment → summary, for every endpoint any environment ran."""
+    keys = sorted({key for runner in runners.values() for key in runner.stats})
+    return {key: {name: endpoint_row(runner, key) for name, runner in runners.items() if key in runner.stats}
+            for key in keys}
+
+
+def attribute_delta(row: Dict, baseline: Dict) -> Dict:
+    """How far an environment is from the baseline, and whether server or network explains it."""
+    delta = {'p50_ms': round(row['p50_ms'] - baseline['p50_ms'], 3),
+             'mean_ms': round(row['mean_ms'] - baseline['mean_ms'], 3)}
+    if 'server_ms' in row and 'server_ms' in baseline:
+        delta['server_ms'] = round(row['server_ms'] - baseline['server_ms'], 3)
+        delta['network_ms'] = round(row['network_ms'] - baseline['network_ms'], 3)
+        delta['cause'] = 'server' if abs(delta['server_ms']) >= abs(delta['network_ms']) else 'network'
+    return delta
+
+
+def format_comparison_table(endpoints: Dict[str, Dict[str, Dict]], names: List[str]) -> str:
+    header = (f"{'Endpoint':<40} {'Environment':<14} {'Reqs':>6} {'Err%':>6} {'p50':>8} {'p90':>8} "
+              f"{'p99':>8} {'Server':>8} {'Network':>8}  vs {names[0]}")
+    lines = [header, '-' * len(header)]
+    for key, rows in endpoints.items():
+        baseline = rows.get(names[0])
+        label = key[:40]
+        for name in names:
+            row = rows.get(name)
+            if row is None:
+                continue
+            server = f"{row['server_ms']:.1f}" if 'server_ms' in row else '-'
+            network = f"{row['network_ms']:.1f}" if 'network_ms' in row else '-'
+            verdict = ''
+            if baseline is not None and name != names[0]:
+                delta = attribute_delta(row, baseline)
+                verdict = f"{delta['p50_ms']:+.1f}ms p50" + (f" ({delta['cause']})" if 'cause' in delta else '')
+            lines.append(f"{label:<40} {name[:14]:<14} {row['requests']:>6} {row['error_rate'] * 100:>5.1f}% "
+                         f"{row['p50_ms']:>8.1f} {row['p90_ms']:>8.1f} {row['p99_ms']:>8.1f} "
+                         f"{server:>8} {network:>8}  {verdict}")
+            label = ''
+    return '\n'.join(lines)
+
+
+def add_compare_arguments(parser: argparse.ArgumentParser):
+    add_mix_arguments(parser)
+    parser.add_argument('--target', action='append', default=[], metavar='[NAME=]PATH',
+                        help='Environment file to compare (repeat; --environment counts as the first)')
+    parser.add_argument('--iterations', '-n', type=int, default=1,
+                        help='Passes over the collections in order (without --scenario/--duration)')
+    parser.add_argument('--duration', type=parse_duration,
+                        help='Replay the weighted mix this long instead of running the collections in order')
+    parser.add_argument('--protected', action='append', metavar='PATTERN',
+                        help=f"Environment names, files or base_url hosts that only get reads and allowlisted "
+                             f"writes, always (default: {', '.join(DEFAULT_PROTECTED)})")
+    parser.add_argument('--unprotected', action='append', default=[], metavar='NAME',
+                        help='Non-loopback environment (name or base_url host, globs ok) allowed to receive writes')
+    parser.add_argument('--allow-write', action='append', default=[], metavar='KEY',
+                        help='Write RPC allowed on protected environments (Service.Rpc or item name, globs ok)')
+
+
+async def run_compare(runners: Dict[str, CollectionRunner], args, items: Optional[List[RunItem]] = None,
+                      scenario=None, seed: Optional[int] = None):
+    """Run every environment concurrently: in order over `items`, or the scenario for args.duration."""
+    if scenario is None:
+        await asyncio.gather(*(runner.run_sequence(items, args.iterations) for runner in runners.values()))
+        return None
+    # One seed for all environments, so they replay the same sequence of picks
+    scenario_runners = {name: ScenarioRunner(runner, scenario, args.vus, args.rate, seed)
+                        for name, runner in runners.items()}
+    reports = await asyncio.gather(*(r.run(args.duration) for r in scenario_runners.values()))
+    return dict(zip(scenario_runners, reports))
+
+
+def cmd_compare(args) -> int:
+    patterns = args.protected or DEFAULT_PROTECTED
+    texts = ([args.environment] if args.environment else []) + args.target
+    targets = [parse_target(text, patterns, args.unprotected) for text in texts]
+    if len(targets) < 2:
+        print("❌ compare needs at least two environments (--target [NAME=]PATH)")
+        return 1
+    if len({t.name for t in targets}) != len(targets):
+        print("❌ Environment names must be unique (use --target NAME=PATH)")
+        return 1
+
+    scenario, items = None, None
+    if args.scenario or args.duration:
+        args.duration = args.duration or 60.0
+        try:
+            scenario = scenario_from_args(args)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        collections = scenario.collections
+    else:
+        if not args.collections:
+            print("❌ Give collections to run in order, or --scenario/--duration for a weighted mix")
+            return 1
+        collections = [Path(p) for p in args.collections]
+        items = [item for path in collections for item in load_items(path)]
+
+    guard = WriteGuard(DEFAULT_WRITE_ALLOWLIST + args.allow_write)
+    runners: Dict[str, CollectionRunner] = {}
+    for target in targets:
+        resolver = load_runner_resolver(collections, target.path, parse_vars(args.var), args.globals)
+        resolver.resolved(item_variables(scenario.items if scenario else items))  # fail fast on variable cycles
+        runners[target.name] = CollectionRunner(
+            resolver, args.max_connections, args.timeout, connection_mode=args.connection,
+            accept_encoding=args.accept_encoding, trace_context=args.trace_context,
+            refresh_margin=args.refresh_margin, write_guard=guard if target.protected else None)
+
+    names = [t.name for t in targets]
+    mode = f"'{scenario.name}' for {args.duration:.0f}s" if scenario else f"{len(items)} requests × {args.iterations}"
+    print(f"⚖️  Comparing {', '.join(names)}: {mode}")
+    for target in targets:
+        if target.protected:
+            print(f"   🛡️  {target.name} is protected: reads and allowlisted writes only "
+                  f"(--unprotected {target.name} allows writes)")
+
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    mixes = asyncio.run(run_compare(runners, args, items, scenario, seed))
+
+    endpoints = compare_runners(runners)
+    print()
+    print(format_comparison_table(endpoints, names))
+    for name, runner in runners.items():
+        if runner.blocked:
+            print(f"\n🛡️  {name}: blocked {sum(runner.blocked.values())} write requests "
+                  f"({', '.join(sorted(runner.blocked))})")
+
+    if args.report:
+        baseline = names[0]
+        report = {
+            'mode': 'scenario' if scenario else 'sequence',
+            'baseline': baseline,
+            'environments': {t.name: {'file': str(t.path), 'protected': t.protected,
+                                      'blocked': runners[t.name].blocked} for t in targets},
+            'endpoints': endpoints,
+            'deltas': {key: {name: attribute_delta(row, rows[baseline])
+                             for name, row in rows.items() if name != baseline}
+                       for key, rows in endpoints.items() if baseline in rows and len(rows) > 1},
+        }
+        if mixes:
+            report['mixes'] = {name: {k: v for k, v in mix.items() if k != 'endpoints'}
+                               for name, mix in mixes.items()}
+        Path(args.report).write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Report saved: {args.report}")
+    return 0
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Export parsed RPCs as ready-to-run k6 and Locust load scripts.
+
+Each service becomes one script that walks its RPCs in collection order with
+the same chaining as the Postman collection: values the test scripts extract
+(session_token, facility_id, video_id, ...) are stored per virtual user and
+substituted into later URLs, bodies and the bearer token.
+
+Usage:
+    python export_load_scripts.py                      # all services, both formats
+    python export_load_scripts.py --format k6 --services auth,facilities
+    k6 run -e BASE_URL=https://dev.rallymate.io generated/load/k6/auth.js
+    locust -f generated/load/locust/auth_locustfile.py --host https://dev.rallymate.io
+"""
+
+import argparse
+import json
+import pprint
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from rpc_catalog import (DEFAULT_GENERATED_DIR, PATH_PARAM_PATTERN, SERVICES, build_body, load_services,
+                         rpc_key)
+from variables import load_environment
+
+SCRIPT_DIR = Path(__file__).parent
+DEFAULT_OUTPUT_DIR = SCRIPT_DIR / "generated" / "load"
+DEFAULT_ENVIRONMENT = DEFAULT_GENERATED_DIR / "rallymate-local.postman_environment.json"
+
+
+def request_plan(service_data: Dict) -> List[Dict]:
+    """Turn a service's RPCs into tool-neutral request steps."""
+    steps = []
+    for rpc in service_data['rpcs']:
+        method = rpc['http']['method']
+        steps.append({
+            'name': rpc_key(service_data, rpc),
+            'method': method,
+            'url': '{{base_url}}' + PATH_PARAM_PATTERN.sub(r'{{\1}}', rpc['http']['path']),
+            'body': build_body(rpc, {}),
+            'extract': [list(rule) for rule in rpc.get('extract', [])],
+        })
+    return steps
+
+
+K6_TEMPLATE = '''// Auto-generated by export_load_scripts.py from {service_name}
+// Run: k6 run -e BASE_URL=http://localhost:8080 {filename}
+import http from 'k6/http';
+import {{ check, sleep }} from 'k6';
+import {{ Counter }} from 'k6/metrics';
+
+export const options = {{
+  vus: Number(__ENV.VUS || 10),
+  duration: __ENV.DURATION || '1m',
+  thresholds: {{ http_req_failed: ['rate<0.01'] }},
+}};
+
+const DEFAULTS = {defaults};
+const STEPS = {steps};
+const skipped = new Counter('skipped_requests');
+
+// Module scope is per VU in k6, so extracted values chain within one user
+const vars = Object.assign({{}}, DEFAULTS, {{ base_url: __ENV.BASE_URL || DEFAULTS.base_url }});
+
+function render(value) {{
+  if (typeof value === 'string') {{
+    const whole = value.match(/^\\{{\\{{\\s*([\\w.-]+)\\s*\\}}\\}}$/);
+    if (whole && vars[whole[1]] !== undefined && vars[whole[1]] !== '') return vars[whole[1]];
+    return value.replace(/\\{{\\{{\\s*([\\w.-]+)\\s*\\}}\\}}/g, (m, k) =>
+      vars[k] !== undefined && vars[k] !== '' ? String(vars[k]) : m);
+  }}
+  if (Array.isArray(value)) return value.map(render);
+  if (value && typeof value === 'object') {{
+    const out = {{}};
+    for (const k of Object.keys(value)) out[k] = render(value[k]);
+    return out;
+  }}
+  return value;
+}}
+
+function pick(data, path) {{
+  return path.split('.').reduce((node, key) => (node == null ? undefined : node[key]), data);
+}}
+
+export default function () {{
+  for (const step of STEPS) {{
+    const url = render(step.url);
+    if (url.includes('{{{{')) {{
+      skipped.add(1, {{ name: step.name }});
+      continue;
+    }}
+    const headers = {{ 'Content-Type': 'application/json' }};
+    if (vars.session_token) headers.Authorization = `Bearer ${{vars.session_token}}`;
+    const body = step.body === null ? null : JSON.stringify(render(step.body));
+    const res = http.request(step.method, url, body, {{ headers, tags: {{ name: step.name }} }});
+    check(res, {{ [`${{step.name}} status 200`]: (r) => r.status === 200 }});
+    if (res.status === 200 && step.extract.length) {{
+      let data = null;
+      try {{ data = res.json(); }} catch (e) {{ data = null; }}
+      for (const [variable, path] of step.extract) {{
+        const value = pick(data, path);
+        if (value !== undefined && value !== null) vars[variable] = value;
+      }}
+    }}
+    sleep(Number(__ENV.THINK_TIME || 0));
+  }}
+}}
+'''
+
+LOCUST_TEMPLATE = '''"""
+Auto-generated by export_load_scripts.py from {service_name}.
+
+Run: locust -f {filename} --host http://localhost:8080
+"""
+
+import json
+import re
+
+from locust import HttpUser, SequentialTaskSet, between, task
+
+DEFAULTS = {defaults}
+STEPS = {steps}
+VARIABLE = re.compile(r'\\{{\\{{\\s*([\\w.-]+)\\s*\\}}\\}}')
+
+
+def render(value, variables):
+    if isinstance(value, str):
+        whole = VARIABLE.fullmatch(value)
+        if whole and variables.get(whole.group(1)) not in (None, ''):
+            return variables[whole.group(1)]
+        return VARIABLE.sub(
+            lambda m: str(variables[m.group(1)]) if variables.get(m.group(1)) not in (None, '') else m.group(0),
+            value)
+    if isinstance(value, list):
+        return [render(v, variables) for v in value]
+    if isinstance(value, dict):
+        return {{k: render(v, variables) for k, v in value.items()}}
+    return value
+
+
+def pick(data, path):
+    for key in path.split('.'):
+        if isinstance(data, dict):
+            data = data.get(key)
+        elif isinstance(data, list) and key.isdigit() and int(key) < len(data):
+            data = data[int(key)]
+        else:
+            return None
+    return data
+
+
+class {class_name}Flow(SequentialTaskSet):
+    """Walk every RPC in collection order, chaining extracted variables."""
+
+    def on_start(self):
+        self.vars = dict(DEFAULTS, base_url=self.user.host or DEFAULTS.get('base_url', ''))
+
+    def send(self, step):
+        url = render(step['url'], self.vars)
+        if VARIABLE.search(url):
+            return
+        headers = {{'Content-Type': 'application/json'}}
+        if self.vars.get('session_token'):
+            headers['Authorization'] = f"Bearer {{self.vars['session_token']}}"
+        body = None if step['body'] is None else json.dumps(render(step['body'], self.vars))
+        with self.client.request(step['method'], url, data=body, headers=headers,
+                                 name=step['name'], catch_response=True) as response:
+            if response.status_code != 200:
+                response.failure(f"HTTP {{response.status_code}}")
+                return
+            response.success()
+            if step['extract']:
+                try:
+                    data = response.json()
+                except ValueError:
+                    data = None
+                for variable, path in step['extract']:
+                    value = pick(data, path)
+                    if value is not None:
+                        self.vars[variable] = value
+
+    @task
+    def run_steps(self):
+        for step in STEPS:
+            self.send(step)
+
+
+class {class_name}User(HttpUser):
+    tasks = [{class_name}Flow]
+    wait_time = between(0.5, 2.0)
+'''
+
+
+def export_k6(service: str, service_data: Dict, defaults: Dict[str, Any]) -> str:
+    """Render a k6 script for one service."""
+    return K6_TEMPLATE.format(
+        service_name=service_data['name'],
+        filename=f"{service}.js",
+        defaults=json.dumps(defaults, indent=2),
+        steps=json.dumps(request_plan(service_data), indent=2),
+    )
+
+
+def export_locust(service: str, service_data: Dict, defaults: Dict[str, Any]) -> str:
+    """Render a Locust file for one service."""
+    return LOCUST_TEMPLATE.format(
+        service_name=service_data['name'],
+        filename=f"{service}_locustfile.py",
+        class_name=service_data['name'].replace('Service', '') or 'Api',
+        defaults=pprint.pformat(defaults, width=100, sort_dicts=False),
+        steps=pprint.pformat(request_plan(service_data), width=100, sort_dicts=False),
+    )
+
+
+def load_defaults(environment: Optional[Path]) -> Dict[str, Any]:
+    """Initial variable values embedded in the scripts (secrets left empty)."""
+    if not environment or not Path(environment).exists():
+        return {'base_url': 'http://localhost:8080'}
+    with open(environment) as f:
+        data = json.load(f)
+    defaults = load_environment(data)
+    for entry in data.get('values') or data.get('variable') or []:
+        if entry.get('type') == 'secret' and entry['key'] in defaults:
+            defaults[entry['key']] = ''
+    return defaults
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Export rallymate RPCs as k6 / Locust load scripts')
+    parser.add_argument('--format', choices=['k6', 'locust', 'both'], default='both', help='Script format')
+    parser.add_argument('--services', help=f"Comma-separated services (default: {','.join(SERVICES)})")
+    parser.add_argument('--environment', type=Path, default=DEFAULT_ENVIRONMENT,
+                        help='Environment whose values become script defaults')
+    parser.add_argument('--output-dir', type=Path, default=DEFAULT_OUTPUT_DIR, help='Output directory')
+    parser.add_argument('--proto-dir', type=Path, help='Proto directory (falls back to generated collections)')
+    args = parser.parse_args(argv)
+
+    services = load_services(args.services.split(',') if args.services else None, args.proto_dir)
+    if not services:
+        print("❌ No services found (protos or generated collections)")
+        return 1
+
+    defaults = load_defaults(args.environment)
+    formats = ['k6', 'locust'] if args.format == 'both' else [args.format]
+
+    print("🏗️  rallymate Load Script Export")
+    print("=" * 60)
+    for service, service_data in services.items():
+        print(f"📄 {service_data['name']}: {len(service_data['rpcs'])} RPCs")
+        for fmt in formats:
+            out_dir = args.output_dir / fmt
+            out_dir.mkdir(parents=True, exist_ok=True)
+            if fmt == 'k6':
+                out_file = out_dir / f"{service}.js"
+                out_file.write_text(export_k6(service, service_data, defaults))
+            else:
+                out_file = out_dir / f"{service}_locustfile.py"
+                out_file.write_text(export_locust(service, service_data, defaults))
+            print(f"   💾 {out_file.relative_to(args.output_dir)}")
+
+    print(f"\n📁 Output directory: {args.output_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Device fleet simulator for rallymate bridge, lock and camera services.
+
+Spins up thousands of lightweight virtual devices on asyncio. Each device
+registers through the parsed Register<Kind> RPC, then heartbeats and reports
+status on jittered schedules until the run ends. The services have no
+dedicated heartbeat RPC, so heartbeats are modelled as lightweight
+Update<Kind> calls carrying only liveness fields (connectivity, firmware,
+state) and status reports as full Update<Kind> calls.
+
+Usage:
+    python fleet_simulator.py --base-url http://localhost:8080 --facilities 50 \\
+        --locks-per-facility 8 --cameras-per-facility 4 --duration 600
+
+    # Capacity curve: repeat the run for growing facility counts
+    python fleet_simulator.py --scale-steps 10,100,500 --duration 300
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+from http_client import HttpClient, HttpError
+from latency_stats import EndpointStats, format_stats_table
+from rpc_catalog import load_services, find_rpc, build_body, expand_path
+
+
+# Candidate RPC names for each device lifecycle role
+DEVICE_KINDS = {
+    'bridge': {
+        'service': 'bridge',
+        'register': ['RegisterBridge'],
+        'heartbeat': ['UpdateBridge'],
+        'status': ['UpdateBridge'],
+        'unregister': ['UnregisterBridge'],
+    },
+    'lock': {
+        'service': 'locks',
+        'register': ['RegisterLock'],
+        'heartbeat': ['UpdateLock'],
+        'status': ['UpdateLock'],
+        'unregister': ['UnregisterLock'],
+    },
+    'camera': {
+        'service': 'cameras',
+        'register': ['RegisterCamera'],
+        'heartbeat': ['UpdateCamera'],
+        'status': ['UpdateCamera'],
+        'unregister': ['UnregisterCamera'],
+    },
+}
+
+# Body fields kept in heartbeat payloads
+LIVENESS_MARKERS = ('connectivity', 'firmware', 'state', 'facility_id')
+
+
+class VirtualDevice:
+    """One simulated device and the variables used to render its requests."""
+
+    def __init__(self, kind: str, device_id: str, facility_id: Any, name: str):
+        self.kind = kind
+        self.device_id = device_id
+        self.facility_id = facility_id
+        self.name = name
+        self.registered = False
+
+    @property
+    def variables(self) -> Dict[str, Any]:
+        return {
+            'device_id': self.device_id,
+            'facility_id': self.facility_id,
+            f"{self.kind}_device_id": self.device_id,
+        }
+
+
+class FleetSimulator:
+    """Drive a fleet of virtual devices against a rallymate REST target."""
+
+    def __init__(self, base_url: str, services: Dict[str, Dict], facility_ids: List[Any],
+                 devices_per_facility: Dict[str, int], heartbeat_interval: float = 30.0,
+                 status_interval: float = 300.0, jitter: float = 0.1, ramp_up: float = 60.0,
+                 duration: float = 300.0, max_connections: int = 200,
+                 session_token: Optional[str] = None, unregister: bool = False,
+                 id_prefix: str = 'sim', seed: Optional[int] = None):
+        self.base_url = base_url.rstrip('/')
+        self.services = services
+        self.facility_ids = facility_ids
+        self.devices_per_facility = devices_per_facility
+        self.heartbeat_interval = heartbeat_interval
+        self.status_interval = status_interval
+        self.jitter = jitter
+        self.ramp_up = ramp_up
+        self.duration = duration
+        self.max_connections = max_connections
+        self.session_token = session_token
+        self.unregister = unregister
+        self.id_prefix = id_prefix
+        self.random = random.Random(seed)
+        self.stats: Dict[str, EndpointStats] = {}
+        self.rpcs = self._resolve_rpcs()
+
+    def _resolve_rpcs(self) -> Dict[str, Dict[str, Dict]]:
+        """Find the parsed RPC for every (kind, role) pair that is available."""
+        resolved = {}
+        for kind, spec in DEVICE_KINDS.items():
+            if not self.devices_per_facility.get(kind):
+                continue
+            service_data = self.services.get(spec['service'])
+            if not service_data:
+                raise ValueError(f"Service '{spec['service']}' is not available for {kind} devices")
+            roles = {}
+            for role in ('register', 'heartbeat', 'status', 'unregister'):
+                rpc = find_rpc(service_data, *spec[role])
+                if rpc:
+                    roles[role] = rpc
+            if 'register' not in roles:
+                raise ValueError(f"No register RPC found for {kind} devices")
+            resolved[kind] = roles
+        return resolved
+
+    def build_fleet(self) -> List[VirtualDevice]:
+        """Create the virtual devices for every facility."""
+        devices = []
+        for facility_id in self.facility_ids:
+            for kind, count in self.devices_per_facility.items():
+                for index in range(1, count + 1):
+                    device_id = f"{self.id_prefix}-{kind}-f{facility_id}-{index:03d}"
+                    name = f"Sim {kind.title()} {index} @ facility {facility_id}"
+                    devices.append(VirtualDevice(kind, device_id, facility_id, name))
+        return devices
+
+    def _interval(self, base: float) -> float:
+        return base * self.random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def _call(self, client: HttpClient, device: VirtualDevice, role: str) -> bool:
+        """Send one lifecycle request for a device and record the outcome."""
+        rpc = self.rpcs[device.kind].get(role)
+        if not rpc:
+            return True
+
+        variables = device.variables
+        body = build_body(rpc, variables)
+        if body is not None:
+            for key in ('device_id', 'facility_id', 'name'):
+                if key in body:
+                    body[key] = getattr(device, key)
+            if role == 'heartbeat':
+                body = {k: v for k, v in body.items() if any(m in k for m in LIVENESS_MARKERS)}
+
+        url = self.base_url + expand_path(rpc['http']['path'], variables)
+        stats = self.stats.setdefault(f"{device.kind}.{role}", EndpointStats())
+        start = time.perf_counter()
+        try:
+            response = await client.request(rpc['http']['method'], url, body=body)
+        except HttpError:
+            stats.record(time.perf_counter() - start, None, False)
+            return False
+        stats.record(response.elapsed, response.status, response.ok)
+        return response.ok
+
+    async def _run_device(self, client: HttpClient, device: VirtualDevice, start_at: float, deadline: float):
+        """Lifecycle of a single device: register, then heartbeat/status until deadline."""
+        loop = asyncio.get_running_loop()
+        await asyncio.sleep(max(0.0, start_at - loop.time()))
+
+        backoff = 1.0
+        while loop.time() < deadline:
+            if await self._call(client, device, 'register'):
+                device.registered = True
+                break
+            await asyncio.sleep(min(backoff, max(0.0, deadline - loop.time())))
+            backoff = min(backoff * 2, 60.0)
+        if not device.registered:
+            return
+
+        # Random phase so the fleet does not heartbeat in lockstep
+        now = loop.time()
+        next_heartbeat = now + self.random.uniform(0, self.heartbeat_interval)
+        next_status = now + self.random.uniform(0, self.status_interval)
+
+        while True:
+            next_event = min(next_heartbeat, next_status)
+            if next_event >= deadline:
+                break
+            await asyncio.sleep(max(0.0, next_event - loop.time()))
+            if next_heartbeat <= next_status:
+                await self._call(client, device, 'heartbeat')
+                next_heartbeat += self._interval(self.heartbeat_interval)
+            else:
+                await self._call(client, device, 'status')
+                next_status += self._interval(self.status_interval)
+
+        if self.unregister:
+            await self._call(client, device, 'unregister')
+
+    async def run(self) -> Dict:
+        """Run the simulation and return the report."""
+        devices = self.build_fleet()
+        headers = {'Authorization': f"Bearer {self.session_token}"} if self.session_token else {}
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + self.duration
+        wall_start = time.time()
+
+        async with HttpClient(max_connections=self.max_connections, default_headers=headers) as client:
+            tasks = [
+                self._run_device(client, device, started + self.random.uniform(0, self.ramp_up), deadline)
+                for device in devices
+            ]
+            await asyncio.gather(*tasks)
+
+        elapsed = loop.time() - started
+        total_requests = sum(s.requests for s in self.stats.values())
+        return {
+            'started_at': wall_start,
+            'duration_s': round(elapsed, 3),
+            'facilities': len(self.facility_ids),
+            'devices': len(devices),
+            'devices_by_kind': {k: v * len(self.facility_ids) for k, v in self.devices_per_facility.items() if v},
+            'registered': sum(1 for d in devices if d.registered),
+            'requests': total_requests,
+            'throughput_rps': round(total_requests / elapsed, 2) if elapsed else 0.0,
+            'endpoints': {name: s.summary() for name, s in sorted(self.stats.items())},
+        }
+
+
+def parse_facility_ids(args) -> List[Any]:
+    if args.facility_ids:
+        return [int(f) if f.isdigit() else f for f in args.facility_ids.split(',')]
+    return list(range(args.facility_id_start, args.facility_id_start + args.facilities))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate a fleet of rallymate bridge, lock and camera devices')
+    parser.add_argument('--base-url', default='http://localhost:8080', help='REST gateway base URL')
+    parser.add_argument('--proto-dir', help='Directory containing proto files')
+    parser.add_argument('--generated-dir', help='Directory with generated collections (fallback model)')
+    parser.add_argument('--facilities', type=int, default=10, help='Number of facilities')
+    parser.add_argument('--facility-id-start', type=int, default=1, help='First numeric facility ID')
+    parser.add_argument('--facility-ids', help='Explicit comma-separated facility IDs')
+    parser.add_argument('--bridges-per-facility', type=int, default=1)
+    parser.add_argument('--locks-per-facility', type=int, default=8)
+    parser.add_argument('--cameras-per-facility', type=int, default=4)
+    parser.add_argument('--heartbeat-interval', type=float, default=30.0, help='Seconds between heartbeats')
+    parser.add_argument('--status-interval', type=float, default=300.0, help='Seconds between status reports')
+    parser.add_argument('--jitter', type=float, default=0.1, help='Relative schedule jitter (0.1 = ±10%%)')
+    parser.add_argument('--ramp-up', type=float, default=60.0, help='Seconds over which devices register')
+    parser.add_argument('--duration', type=float, default=300.0, help='Run length in seconds')
+    parser.add_argument('--max-connections', type=int, default=200, help='Connection pool size')
+    parser.add_argument('--session-token', default=os.environ.get('RALLYMATE_SESSION_TOKEN'),
+                        help='Bearer token (default: $RALLYMATE_SESSION_TOKEN)')
+    parser.add_argument('--unregister', action='store_true', help='Unregister devices at the end of the run')
+    parser.add_argument('--id-prefix', default='sim', help='Prefix for virtual device IDs')
+    parser.add_argument('--scale-steps', help='Comma-separated facility counts to run in sequence')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible schedules')
+    parser.add_argument('--report', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    services = load_services(['bridge', 'locks', 'cameras'], args.proto_dir, args.generated_dir)
+    devices_per_facility = {
+        'bridge': args.bridges_per_facility,
+        'lock': args.locks_per_facility,
+        'camera': args.cameras_per_facility,
+    }
+
+    steps = [int(s) for s in args.scale_steps.split(',')] if args.scale_steps else [None]
+
+    print("🚀 rallymate Device Fleet Simulator")
+    print("=" * 60)
+
+    reports = []
+    for step in steps:
+        if step is None:
+            facility_ids = parse_facility_ids(args)
+        else:
+            facility_ids = list(range(args.facility_id_start, args.facility_id_start + step))
+
+        try:
+            simulator = FleetSimulator(
+                args.base_url, services, facility_ids, devices_per_facility,
+                heartbeat_interval=args.heartbeat_interval, status_interval=args.status_interval,
+                jitter=args.jitter, ramp_up=args.ramp_up, duration=args.duration,
+                max_connections=args.max_connections, session_token=args.session_token,
+                unregister=args.unregister, id_prefix=args.id_prefix, seed=args.seed
+            )
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+
+        print(f"\n📡 {len(facility_ids)} facilities, {len(simulator.build_fleet())} devices, "
+              f"{args.duration:.0f}s against {args.base_url}")
+        report = asyncio.run(simulator.run())
+        reports.append(report)
+
+        print(f"   ✅ Registered {report['registered']}/{report['devices']} devices")
+        print(f"   📈 {report['requests']} requests, {report['throughput_rps']} req/s")
+        print()
+        print(format_stats_table(simulator.stats))
+
+    if len(reports) > 1:
+        print("\n📊 Scaling summary")
+        print(f"{'Facilities':>10} {'Devices':>8} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'Err%':>6}")
+        for report in reports:
+            endpoints = report['endpoints'].values()
+            requests = sum(e['requests'] for e in endpoints) or 1
+            worst_p99 = max((e['p99_ms'] for e in endpoints), default=0.0)
+            worst_p50 = max((e['p50_ms'] for e in endpoints), default=0.0)
+            errors = sum(e['errors'] for e in endpoints)
+            print(f"{report['facilities']:>10} {report['devices']:>8} {report['throughput_rps']:>9.1f} "
+                  f"{worst_p50:>9.2f} {worst_p99:>9.2f} {errors / requests * 100:>6.2f}")
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(reports if len(reports) > 1 else reports[0], indent=2))
+        print(f"\n💾 Report saved: {args.report}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -16,8 +16,8 @@ fi
 echo "📦 Running comprehensive collection generator..."
 echo ""
 
-# Run the generator
-python3 generate_postman_collections.py
+# Run the generator (extra arguments are passed through, e.g. --trace-context)
+python3 rallymate.py generate "$@"
 
 echo ""
 echo "✨ All done!"
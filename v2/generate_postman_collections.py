@@ -7,28 +7,52 @@ Generates comprehensive Postman collections from proto files with:
 - Automated test scripts with variable extraction
 - Request chaining support
 - Complete authentication flows
+- Optional W3C trace context (--trace-context): a collection-level
+  pre-request script sends a traceparent with a fresh trace ID on every
+  request and logs it with the response's Server-Timing header
+- A collection-level pre-request script that refreshes session_token
+  shortly before session_expires_at, once, using refresh_token
+  (--no-session-refresh to omit; session_refresh.py is the runner side)
+- Optional per-stage profiling (--profile): wall time and allocations per
+  service for each parse/generate/write stage (see generator_profile.py)
 
 Usage:
     python generate_postman_collections.py
+    python generate_postman_collections.py --trace-context
+    python generate_postman_collections.py --profile --profile-dump generator.prof --profile-tracemalloc 15
 """
 
+import argparse
+import contextlib
 import os
+import sys
 import re
 import json
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 
+from generator_profile import NULL_PROFILER
+from session_refresh import AUTH_PATH_PREFIX, DEFAULT_MARGIN, REFRESH_COOLDOWN, REFRESH_PATH
+
+SCRIPT_DIR = Path(__file__).parent
+DEFAULT_PROTO_DIR = SCRIPT_DIR.parent.parent / "rallymate-api" / "protos"
+DEFAULT_OUTPUT_DIR = SCRIPT_DIR / "generated"
+SERVICES = ['auth', 'users', 'facilities', 'locks', 'cameras', 'videos', 'bridge', 'system_support']
+
 
 class ProtoParser:
     """Enhanced parser for proto3 files with support for complex types."""
     
-    def __init__(self, proto_file: Path):
+    def __init__(self, proto_file: Path, profiler=NULL_PROFILER):
         self.proto_file = proto_file
-        self.content = proto_file.read_text()
+        with profiler.stage('read'):
+            self.content = proto_file.read_text()
         self.package_name = self._extract_package()
-        self.messages = self._parse_messages()
-        self.enums = self._parse_enums()
+        with profiler.stage('messages'):
+            self.messages = self._parse_messages()
+        with profiler.stage('enums'):
+            self.enums = self._parse_enums()
     
     def _find_matching_brace(self, text: str, start_pos: int) -> int:
         """Find the position of the matching closing brace.
@@ -102,7 +126,7 @@ class ProtoParser:
         """Parse fields from a message body."""
         fields = []
         # Pattern for field definition: [repeated] type name = number;
-        field_pattern = r'(repeated\s+)?([\w.]+)\s+(\w+)\s*=\s*\d+;'
+        field_pattern = r'(repeated\s+)?([\w.]+)\s+(\w+)\s*=\s*(\d+);'
         
         for match in re.finditer(field_pattern, msg_body):
             is_repeated = bool(match.group(1))
@@ -112,7 +136,8 @@ class ProtoParser:
             fields.append({
                 'name': field_name,
                 'type': field_type,
-                'repeated': is_repeated
+                'repeated': is_repeated,
+                'number': int(match.group(4))
             })
         
         return fields
@@ -421,10 +446,14 @@ class TestDataGenerator:
 class PostmanCollectionGenerator:
     """Generate Postman v2.1 collection from parsed proto data."""
     
-    def __init__(self, service_data: Dict, proto_parser: ProtoParser, base_url: str = "{{base_url}}"):
+    def __init__(self, service_data: Dict, proto_parser: ProtoParser, base_url: str = "{{base_url}}",
+                 trace_context: bool = False, profiler=NULL_PROFILER, session_refresh: bool = True):
         self.service_data = service_data
         self.parser = proto_parser
         self.base_url = base_url
+        self.trace_context = trace_context
+        self.session_refresh = session_refresh
+        self.profiler = profiler
         self.data_gen = TestDataGenerator()
     
     def generate_collection(self) -> Dict:
@@ -459,6 +488,10 @@ class PostmanCollectionGenerator:
             "item": []
         }
         
+        events = self._generate_collection_events()
+        if events:
+            collection['event'] = events
+        
         # Generate requests for each RPC
         for rpc in self.service_data['rpcs']:
             request_item = self._generate_request(rpc)
@@ -490,10 +523,12 @@ class PostmanCollectionGenerator:
         # Build request body example
         request_body = None
         if method in ['POST', 'PUT', 'PATCH']:
-            request_body = self._generate_request_body(rpc, path_params)
+            with self.profiler.stage('body'):
+                request_body = self._generate_request_body(rpc, path_params)
         
         # Build test script
-        test_script = self._generate_test_script(rpc)
+        with self.profiler.stage('test_script'):
+            test_script = self._generate_test_script(rpc)
         
         request_item = {
             "name": self._format_request_name(rpc['name']),
@@ -612,7 +647,8 @@ class PostmanCollectionGenerator:
         rpc_lower = rpc['name'].lower()
         
         # Session token extraction (auth endpoints)
-        if 'verify' in rpc_lower and 'session' in str(self.parser.messages.get(response_type, [])).lower():
+        if ('verify' in rpc_lower or 'refresh' in rpc_lower) and \
+                'session' in str(self.parser.messages.get(response_type, [])).lower():
             lines.extend([
                 "        // Extract session tokens",
                 "        if (response.session && response.session.session_token) {",
@@ -629,6 +665,9 @@ class PostmanCollectionGenerator:
                 "        if (response.session && response.session.device_id) {",
                 "            pm.collectionVariables.set('device_id', response.session.device_id);",
                 "        }",
+                "        if (response.session && response.session.expires_at) {",
+                "            pm.collectionVariables.set('session_expires_at', response.session.expires_at);",
+                "        }",
                 ""
             ])
         
@@ -749,6 +788,97 @@ class PostmanCollectionGenerator:
         
         return lines
     
+    def _generate_collection_events(self) -> List[Dict]:
+        """Collection-level pre-request/test events for the enabled options."""
+        scripts: Dict[str, List[str]] = {}
+        sources = []
+        if self.session_refresh:
+            sources.append(self._generate_session_refresh_events())
+        if self.trace_context:
+            sources.append(self._generate_trace_events())
+        for events in sources:
+            for event in events:
+                lines = scripts.setdefault(event['listen'], [])
+                if lines:
+                    lines.append("")
+                lines.extend(event['script']['exec'])
+        return [{"listen": listen, "script": {"exec": lines, "type": "text/javascript"}}
+                for listen, lines in scripts.items()]
+    
+    def _refresh_path(self) -> str:
+        """RefreshSession's path from this service's protos, or the auth service default."""
+        for rpc in self.service_data['rpcs']:
+            if rpc['name'] == 'RefreshSession':
+                return rpc['http']['path']
+        return REFRESH_PATH
+    
+    def _generate_session_refresh_events(self) -> List[Dict]:
+        """Pre-request script refreshing session_token shortly before session_expires_at."""
+        margin_ms = int(DEFAULT_MARGIN * 1000)
+        prerequest = [
+            f"// Session refresh: renew session_token {int(DEFAULT_MARGIN)}s before it expires, one refresh at a time",
+            "const refreshToken = pm.collectionVariables.get('refresh_token');",
+            "const rawExpiry = pm.collectionVariables.get('session_expires_at');",
+            "const expiryNumber = Number(rawExpiry);",
+            "const expiryMs = isNaN(expiryNumber) ? Date.parse(rawExpiry) : "
+            "(expiryNumber > 1e12 ? expiryNumber : expiryNumber * 1000);",
+            "const refreshStarted = Number(pm.collectionVariables.get('session_refresh_started') || 0);",
+            f"if (refreshToken && expiryMs && Date.now() > expiryMs - {margin_ms} &&",
+            f"        !pm.request.url.getPath().startsWith('{AUTH_PATH_PREFIX}') && "
+            f"Date.now() - refreshStarted > {int(REFRESH_COOLDOWN * 1000)}) {{",
+            "    pm.collectionVariables.set('session_refresh_started', Date.now());",
+            "    pm.sendRequest({",
+            f"        url: pm.variables.replaceIn('{self.base_url}{self._refresh_path()}'),",
+            "        method: 'POST',",
+            "        header: {'Content-Type': 'application/json'},",
+            "        body: {mode: 'raw', raw: JSON.stringify({refresh_token: refreshToken})}",
+            "    }, function (err, res) {",
+            "        if (err || res.code !== 200) {",
+            "            // Keep the guard set to the failure time: no new attempt until the cooldown passes",
+            "            pm.collectionVariables.set('session_refresh_started', Date.now());",
+            "            console.log('⚠️ Session refresh failed:', err || res.code);",
+            "            return;",
+            "        }",
+            "        pm.collectionVariables.unset('session_refresh_started');",
+            "        const session = res.json().session || {};",
+            "        if (session.session_token) { "
+            "pm.collectionVariables.set('session_token', session.session_token); }",
+            "        if (session.refresh_token) { "
+            "pm.collectionVariables.set('refresh_token', session.refresh_token); }",
+            "        if (session.expires_at) { pm.collectionVariables.set('session_expires_at', session.expires_at); }",
+            "        console.log('🔄 Session refreshed');",
+            "    });",
+            "}"
+        ]
+        return [{"listen": "prerequest", "script": {"exec": prerequest, "type": "text/javascript"}}]
+    
+    def _generate_trace_events(self) -> List[Dict]:
+        """Collection-level scripts injecting a W3C traceparent and logging Server-Timing."""
+        prerequest = [
+            "// W3C trace context: a new trace ID for every request",
+            "const randomHex = (length) => "
+            "Array.from({length: length}, () => Math.floor(Math.random() * 16).toString(16)).join('');",
+            "const traceId = randomHex(32);",
+            "pm.variables.set('trace_id', traceId);",
+            "pm.request.headers.upsert({key: 'traceparent', value: '00-' + traceId + '-' + randomHex(16) + '-01'});"
+        ]
+        test = [
+            "// Record the trace ID and the server's own timing breakdown",
+            "const serverTiming = pm.response.headers.get('Server-Timing');",
+            "const phases = {};",
+            "(serverTiming || '').split(',').forEach(function(entry) {",
+            "    const parts = entry.split(';').map(function(p) { return p.trim(); });",
+            "    const dur = parts.find(function(p) { return p.indexOf('dur=') === 0; });",
+            "    if (parts[0] && dur) { phases[parts[0]] = (phases[parts[0]] || 0) + parseFloat(dur.slice(4)); }",
+            "});",
+            "console.log('🔎 trace_id:', pm.variables.get('trace_id'), pm.response.responseTime + 'ms', "
+            "JSON.stringify(phases));"
+        ]
+        return [
+            {"listen": "prerequest", "script": {"exec": prerequest, "type": "text/javascript"}},
+            {"listen": "test", "script": {"exec": test, "type": "text/javascript"}}
+        ]
+    
     def _format_request_name(self, rpc_name: str) -> str:
         """Convert RPC name to human-readable request name."""
         # Convert CamelCase to Title Case with spaces
@@ -761,10 +891,16 @@ class PostmanCollectionGenerator:
         return str(uuid.uuid4())
 
 
-def generate_environment(name: str, base_url: str) -> Dict:
-    """Generate Postman environment file."""
-    return {
-        "id": f"rallymate-{name.lower()}",
+def generate_environment(name: str, base_url: str, overrides: Optional[Dict[str, Any]] = None) -> Dict:
+    """Generate Postman environment file.
+
+    Args:
+        name: Environment display name
+        base_url: API base URL
+        overrides: Optional variable values replacing or extending the defaults
+    """
+    environment = {
+        "id": f"rallymate-{re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')}",
         "name": f"rallymate - {name}",
         "values": [
             {
@@ -814,33 +950,110 @@ def generate_environment(name: str, base_url: str) -> Dict:
         "_postman_exported_at": datetime.now().isoformat() + "Z",
         "_postman_exported_using": "Postman Collection Generator"
     }
+    
+    for key, value in (overrides or {}).items():
+        existing = next((v for v in environment['values'] if v['key'] == key), None)
+        if existing:
+            existing['value'] = str(value)
+        else:
+            environment['values'].append({
+                "key": key,
+                "value": str(value),
+                "type": "default",
+                "enabled": True
+            })
+    
+    return environment
+
+
+def print_profile(profiler, args, profile=None):
+    """Print the per-stage table and write the optional cProfile/tracemalloc/JSON outputs."""
+    from generator_profile import format_profile_table, format_tracemalloc_top
+    
+    print("\n⏱️  Generator profile")
+    print(format_profile_table(profiler))
+    if args.profile_tracemalloc:
+        import tracemalloc
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        print(f"\n🧠 Top {args.profile_tracemalloc} allocation sites")
+        print(format_tracemalloc_top(snapshot, args.profile_tracemalloc))
+    if profile is not None:
+        profile.disable()
+        profile.dump_stats(args.profile_dump)
+        print(f"\n💾 cProfile stats saved: {args.profile_dump} (python -m pstats {args.profile_dump})")
+    if args.profile_report:
+        with open(args.profile_report, 'w') as f:
+            json.dump(profiler.report(), f, indent=2)
+        print(f"\n💾 Profile report saved: {args.profile_report}")
 
 
-def main():
+def main(argv: Optional[List[str]] = None) -> int:
     """Main execution function."""
+    arg_parser = argparse.ArgumentParser(description='Generate rallymate Postman collections from proto files')
+    arg_parser.add_argument('services', nargs='*', metavar='SERVICE',
+                            help=f"Services to generate (default: all of {', '.join(SERVICES)})")
+    arg_parser.add_argument('--proto-dir', type=Path, default=DEFAULT_PROTO_DIR,
+                            help='Directory containing proto files')
+    arg_parser.add_argument('--output-dir', type=Path, default=DEFAULT_OUTPUT_DIR, help='Where collections are written')
+    arg_parser.add_argument('--output', help="Write a single service's collection to this file ('-' for stdout)")
+    arg_parser.add_argument('--base-url', default='{{base_url}}', help='Base URL used in request URLs')
+    arg_parser.add_argument('--no-environments', action='store_true', help='Do not write environment files')
+    arg_parser.add_argument('--trace-context', action='store_true',
+                            help='Add a pre-request script sending a W3C traceparent per request')
+    arg_parser.add_argument('--no-session-refresh', action='store_true',
+                            help='Omit the pre-request script that refreshes session_token before it expires')
+    arg_parser.add_argument('--profile', action='store_true',
+                            help='Report wall time and allocations per stage and service')
+    arg_parser.add_argument('--profile-dump', help='Also write cProfile stats to this file (implies --profile)')
+    arg_parser.add_argument('--profile-tracemalloc', type=int, metavar='N',
+                            help='Trace allocations and print the top N sites (implies --profile)')
+    arg_parser.add_argument('--profile-report', help='Write the per-stage profile as JSON (implies --profile)')
+    args = arg_parser.parse_args(argv)
+    
+    if args.output and len(args.services) != 1:
+        arg_parser.error('--output needs exactly one SERVICE')
+    if args.output == '-':
+        # Keep stdout for the collection JSON; progress goes to stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            collection = generate(args)
+        if collection is None:
+            return 1
+        json.dump(collection, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+        return 0
+    return 0 if generate(args) is not None or not args.services else 1
+
+
+def generate(args) -> Optional[Dict]:
+    """Generate the requested collections; returns the last one, or None when none were generated."""
+    profiler = NULL_PROFILER
+    profile = None
+    if args.profile or args.profile_dump or args.profile_tracemalloc or args.profile_report:
+        from generator_profile import StageProfiler
+        profiler = StageProfiler()
+        if args.profile_tracemalloc:
+            import tracemalloc
+            tracemalloc.start()
+        if args.profile_dump:
+            import cProfile
+            profile = cProfile.Profile()
+            profile.enable()
+    
     # Setup paths
-    script_dir = Path(__file__).parent
-    proto_dir = script_dir.parent.parent / "rallymate-api" / "protos"
-    output_dir = script_dir / "generated"
-    output_dir.mkdir(exist_ok=True)
+    proto_dir = args.proto_dir
+    output_dir = args.output_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
     
     # Proto files to process
-    services = [
-        'auth',
-        'users',
-        'facilities',
-        'locks',
-        'cameras',
-        'videos',
-        'bridge',
-        'system_support'
-    ]
+    services = args.services or SERVICES
     
     print("🚀 rallymate Postman Collection Generator")
     print("=" * 60)
     print()
     
     collections_generated = []
+    collection = None
     
     # Generate collection for each service
     for service in services:
@@ -852,43 +1065,55 @@ def main():
         
         print(f"📄 Processing {service}.proto...")
         
-        try:
-            # Parse proto file
-            parser = ProtoParser(proto_file)
-            service_data = parser.parse_service()
-            
-            if not service_data:
-                print(f"   ⚠️  No service found in proto file")
-                continue
-            
-            if not service_data['rpcs']:
-                print(f"   ⚠️  Service '{service_data.get('name', 'Unknown')}' has no RPCs with HTTP annotations")
-                continue
-            
-            print(f"   ✅ Found {len(service_data['rpcs'])} RPCs with HTTP annotations")
-            
-            # Generate collection
-            generator = PostmanCollectionGenerator(service_data, parser)
-            collection = generator.generate_collection()
-            
-            # Write collection file
-            output_file = output_dir / f"{service}_service.postman_collection.json"
-            with open(output_file, 'w') as f:
-                json.dump(collection, f, indent=2)
-            
-            print(f"   💾 Collection saved: {output_file.name}")
-            collections_generated.append(service)
-            
-        except Exception as e:
-            print(f"   ❌ Error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        with profiler.service(service):
+            try:
+                # Parse proto file
+                parser = ProtoParser(proto_file, profiler=profiler)
+                with profiler.stage('parse_service'):
+                    service_data = parser.parse_service()
+                
+                if not service_data:
+                    print(f"   ⚠️  No service found in proto file")
+                    continue
+                
+                if not service_data['rpcs']:
+                    print(f"   ⚠️  Service '{service_data.get('name', 'Unknown')}' "
+                          "has no RPCs with HTTP annotations")
+                    continue
+                
+                print(f"   ✅ Found {len(service_data['rpcs'])} RPCs with HTTP annotations")
+                
+                # Generate collection
+                generator = PostmanCollectionGenerator(service_data, parser, args.base_url,
+                                                       trace_context=args.trace_context, profiler=profiler,
+                                                       session_refresh=not args.no_session_refresh)
+                collection = generator.generate_collection()
+                
+                # Write collection file
+                if args.output == '-':
+                    collections_generated.append(service)
+                    continue
+                output_file = Path(args.output) if args.output else \
+                    output_dir / f"{service}_service.postman_collection.json"
+                with profiler.stage('write'), open(output_file, 'w') as f:
+                    json.dump(collection, f, indent=2)
+                
+                print(f"   💾 Collection saved: {output_file.name}")
+                collections_generated.append(service)
+                
+            except Exception as e:
+                print(f"   ❌ Error: {str(e)}")
+                import traceback
+                traceback.print_exc()
     
     print()
     print("=" * 60)
     
+    if profiler.enabled:
+        print_profile(profiler, args, profile)
+    
     # Generate environment files
-    if collections_generated:
+    if collections_generated and not (args.output or args.no_environments):
         print("\n📦 Generating environment files...")
         
         environments = [
@@ -917,7 +1142,7 @@ def main():
     print("📥 Import these files into Postman to start testing!")
     print(f"📁 Output directory: {output_dir}")
     
-    return 0
+    return collection if collections_generated else None
 
 
 if __name__ == '__main__':
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Per-stage profiling for generate_postman_collections.py.
+
+The generator reports each stage per service through a StageProfiler:
+    read            proto file read
+    messages        ProtoParser._parse_messages
+    enums           ProtoParser._parse_enums
+    parse_service   ProtoParser.parse_service
+    body            request body generation
+    test_script     _generate_test_script
+    write           JSON serialization and file write
+
+Each stage records wall time and the net number of allocated memory blocks
+(sys.getallocatedblocks); with tracemalloc running it also records the bytes
+allocated and the peak. Hooks receive every StageSample as it completes, so
+the benchmark suite and CI can collect the same numbers programmatically:
+
+    profiler = StageProfiler(hooks=[samples.append])
+    profile_service(proto_dir / 'facilities.proto', profiler)
+    profiler.report()
+
+Usage:
+    python generate_postman_collections.py --profile
+    python generate_postman_collections.py --profile --profile-dump gen.prof --profile-tracemalloc 15
+"""
+
+import contextlib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import tracemalloc
+
+STAGES = ('read', 'messages', 'enums', 'parse_service', 'body', 'test_script', 'write')
+
+
+class StageSample:
+    """One completed stage invocation."""
+
+    def __init__(self, service: str, stage: str, seconds: float, blocks: int,
+                 bytes_allocated: Optional[int] = None, peak_bytes: Optional[int] = None):
+        self.service = service
+        self.stage = stage
+        self.seconds = seconds
+        self.blocks = blocks
+        self.bytes_allocated = bytes_allocated
+        self.peak_bytes = peak_bytes
+
+    def to_dict(self) -> Dict:
+        return {'service': self.service, 'stage': self.stage, 'seconds': self.seconds, 'blocks': self.blocks,
+                'bytes_allocated': self.bytes_allocated, 'peak_bytes': self.peak_bytes}
+
+
+class StageTotals:
+    """Accumulated samples for one service and stage."""
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.blocks = 0
+        self.bytes_allocated = 0
+        self.peak_bytes = 0
+
+    def add(self, sample: StageSample):
+        self.calls += 1
+        self.seconds += sample.seconds
+        self.blocks += sample.blocks
+        self.bytes_allocated += sample.bytes_allocated or 0
+        self.peak_bytes = max(self.peak_bytes, sample.peak_bytes or 0)
+
+    def summary(self) -> Dict:
+        return {'calls': self.calls, 'ms': round(self.seconds * 1000, 3), 'blocks': self.blocks,
+                'bytes_allocated': self.bytes_allocated, 'peak_bytes': self.peak_bytes}
+
+
+class StageProfiler:
+    """Collect per-service, per-stage wall time and allocations.
+
+    The generator's stages do not nest, so the per-stage times add up to
+    the time spent generating.
+    """
+
+    enabled = True
+
+    def __init__(self, hooks: Optional[List[Callable[[StageSample], None]]] = None):
+        self.hooks = list(hooks or [])
+        self.current_service = '-'
+        self.totals: Dict[str, Dict[str, StageTotals]] = {}
+
+    def add_hook(self, hook: Callable[[StageSample], None]):
+        self.hooks.append(hook)
+
+    @contextlib.contextmanager
+    def service(self, name: str):
+        """Attribute the stages run inside the block to `name`."""
+        previous, self.current_service = self.current_service, name
+        try:
+            yield self
+        finally:
+            self.current_service = previous
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        import tracemalloc
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            before_bytes, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            sample = StageSample(self.current_service, name, seconds, sys.getallocatedblocks() - blocks)
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                sample.bytes_allocated = current - before_bytes
+                sample.peak_bytes = peak - before_bytes
+            self.record(sample)
+
+    def record(self, sample: StageSample):
+        self.totals.setdefault(sample.service, {}).setdefault(sample.stage, StageTotals()).add(sample)
+        for hook in self.hooks:
+            hook(sample)
+
+    def report(self) -> Dict[str, Dict[str, Dict]]:
+        return {service: {stage: totals.summary() for stage, totals in stages.items()}
+                for service, stages in self.totals.items()}
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off; every stage is a no-op."""
+
+    enabled = False
+
+    def service(self, name: str):
+        return contextlib.nullcontext(self)
+
+    def stage(self, name: str):
+        return contextlib.nullcontext()
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def profile_service(proto_file: Path, profiler: StageProfiler, output_file: Optional[Path] = None,
+                    trace_context: bool = False) -> Optional[Dict]:
+    """Run every generator stage for one proto file under `profiler`.
+
+    The collection is serialized even without `output_file` so the write
+    stage is comparable between runs. Returns the collection, or None when
+    the file has no service.
+    """
+    from generate_postman_collections import PostmanCollectionGenerator, ProtoParser
+
+    with profiler.service(proto_file.stem):
+        parser = ProtoParser(proto_file, profiler=profiler)
+        with profiler.stage('parse_service'):
+            service_data = parser.parse_service()
+        if not service_data:
+            return None
+        collection = PostmanCollectionGenerator(service_data, parser, trace_context=trace_context,
+                                                profiler=profiler).generate_collection()
+        with profiler.stage('write'):
+            text = json.dumps(collection, indent=2)
+            if output_file:
+                output_file.write_text(text)
+    return collection
+
+
+def format_profile_table(profiler: StageProfiler) -> str:
+    """Wall ms / net blocks (and KiB with tracemalloc) per service and stage."""
+    tracing = any(t.bytes_allocated or t.peak_bytes for stages in profiler.totals.values()
+                  for t in stages.values())
+    header = f"{'Service':<16} {'Stage':<14} {'calls':>6} {'ms':>9} {'blocks':>9}"
+    if tracing:
+        header += f" {'alloc KiB':>10} {'peak KiB':>9}"
+    lines = [header, '-' * len(header)]
+    total_seconds = 0.0
+    for service in sorted(profiler.totals):
+        stages = profiler.totals[service]
+        for stage in sorted(stages, key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES)):
+            totals = stages[stage]
+            line = f"{service[:16]:<16} {stage:<14} {totals.calls:>6} {totals.seconds * 1000:>9.2f} {totals.blocks:>9}"
+            if tracing:
+                line += f" {totals.bytes_allocated / 1024:>10.1f} {totals.peak_bytes / 1024:>9.1f}"
+            lines.append(line)
+            total_seconds += totals.seconds
+    lines.append('-' * len(header))
+    lines.append(f"{'total':<16} {'':<14} {'':>6} {total_seconds * 1000:>9.2f}")
+    return '\n'.join(lines)
+
+
+def format_tracemalloc_top(snapshot: 'tracemalloc.Snapshot', limit: int) -> str:
+    """Top allocation sites by size from a tracemalloc snapshot."""
+    import tracemalloc
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ))
+    lines = []
+    for stat in snapshot.statistics('lineno')[:limit]:
+        frame = stat.traceback[0]
+        lines.append(f"   {stat.size / 1024:>9.1f} KiB {stat.count:>8} blocks  "
+                     f"{Path(frame.filename).name}:{frame.lineno}")
+    return '\n'.join(lines)
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Native gRPC vs HTTP-transcoded latency per RPC.
+
+Every generated RPC has a google.api.http annotation, so it can be called
+through the REST gateway (JSON over HTTP/1.1, as the Postman collections
+do) or natively over gRPC (protobuf over HTTP/2, like the
+RallyMate-CA-gRPC-Testing collection). This benchmark sends the same
+parsed RPCs over both with equivalent payloads - the REST body plus path
+parameters make up the gRPC request message, which is what transcoding
+does - and reports per RPC:
+- latency (p50/p99) and the transcoding overhead REST minus gRPC
+- request and response body bytes on each transport
+- client CPU per call (encode, send, receive, decode)
+
+Calls run one at a time, alternating transports, so the two sides see the
+same server and network conditions. Only read RPCs run unless --writes is
+given (or the write RPC is named with --rpc). The gRPC target is plaintext
+h2c unless --grpc-tls is given or it is an https:// URL, which negotiates h2
+via ALPN.
+
+When the protos are available, messages are encoded as protobuf from the
+parsed message definitions. Services recovered from generated collections
+have no schema and use the gRPC JSON codec (application/grpc+json), which
+the server must have registered; the report records the codec per RPC.
+
+Native gRPC needs the optional h2 package (pip install h2); grpcio is not
+required. Try it against the local stubs:
+    python stub_server.py --port 8080 --grpc-port 50051 --latency-ms 2
+
+Usage:
+    python grpc_bench.py --services facilities,locks --var id=1 --calls 200
+    python grpc_bench.py --environment generated/rallymate-development.postman_environment.json \\
+        --grpc-target dev.rallymate.local:50051 --grpc-tls --proto-dir ../../rallymate-api/protos --report grpc.json
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import struct
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from collection_runner import load_runner_variables, parse_vars
+from http2_client import Http2Client, http2_available
+from http_client import HttpClient, HttpError
+from latency_stats import EndpointStats
+from rpc_catalog import SERVICES, build_body, expand_path, load_services, rpc_key
+from variables import substitute
+
+DEFAULT_GRPC_TARGET = 'localhost:50051'
+GRPC_TARGET_VARIABLES = ('grpc_url', 'rallymate_services_grpc_url')
+TRANSPORTS = ('rest', 'grpc')
+
+VARINT_TYPES = {'int32', 'int64', 'uint32', 'uint64', 'bool'}
+ZIGZAG_TYPES = {'sint32', 'sint64'}
+FIXED32_TYPES = {'fixed32': '<I', 'sfixed32': '<i', 'float': '<f'}
+FIXED64_TYPES = {'fixed64': '<Q', 'sfixed64': '<q', 'double': '<d'}
+FIXED_SIZES = {kind: struct.calcsize(fmt) for kind, fmt in {**FIXED32_TYPES, **FIXED64_TYPES}.items()}
+# seconds/nanos messages that JSON writes as strings
+WELL_KNOWN = {
+    'Timestamp': [{'name': 'seconds', 'type': 'int64', 'repeated': False, 'number': 1},
+                  {'name': 'nanos', 'type': 'int32', 'repeated': False, 'number': 2}],
+    'Duration': [{'name': 'seconds', 'type': 'int64', 'repeated': False, 'number': 1},
+                 {'name': 'nanos', 'type': 'int32', 'repeated': False, 'number': 2}],
+}
+
+
+def _varint(value: int) -> bytes:
+    value &= 0xFFFFFFFFFFFFFFFF  # negative ints take ten bytes, as in protobuf
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _seconds_nanos(type_name: str, value: str) -> Dict[str, int]:
+    """RFC 3339 Timestamp or '1.5s' Duration JSON string as seconds/nanos."""
+    if type_name == 'Duration':
+        seconds = float(value.rstrip('s'))
+    else:
+        seconds = datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    return {'seconds': int(seconds), 'nanos': int(round((seconds - int(seconds)) * 1e9))}
+
+
+class ProtoCodec:
+    """proto3 wire encoding driven by ProtoParser's message and enum tables.
+
+    Fields are matched by proto name or lowerCamelCase JSON name; fields
+    missing from the schema, map fields and unknown types are skipped.
+    """
+
+    def __init__(self, messages: Dict[str, List[Dict]], enums: Optional[Dict[str, List[str]]] = None):
+        self.messages = dict(WELL_KNOWN, **messages)
+        self.enums = enums or {}
+        self._by_name: Dict[str, Dict[str, Dict]] = {}
+
+    def knows(self, type_name: str) -> bool:
+        return type_name.rsplit('.', 1)[-1] in self.messages
+
+    def _fields(self, type_name: str) -> Dict[str, Dict]:
+        short = type_name.rsplit('.', 1)[-1]
+        fields = self._by_name.get(short)
+        if fields is None:
+            fields = self._by_name[short] = {}
+            for field in self.messages.get(short, []):
+                fields[field['name']] = field
+                head, *rest = field['name'].split('_')
+                fields.setdefault(head + ''.join(p.title() for p in rest), field)
+        return fields
+
+    def encode(self, type_name: str, value: Dict[str, Any]) -> bytes:
+        out = bytearray()
+        fields = self._fields(type_name)
+        for name, item in value.items():
+            field = fields.get(name)
+            if field is None or item is None:
+                continue
+            for element in (item if field['repeated'] and isinstance(item, list) else [item]):
+                out += self._encode_field(field, element)
+        return bytes(out)
+
+    def _encode_field(self, field: Dict, value: Any) -> bytes:
+        kind = field['type'].rsplit('.', 1)[-1]
+        number = field['number']
+        if kind in VARINT_TYPES:
+            return _varint(number << 3) + _varint(int(value))
+        if kind in ZIGZAG_TYPES:
+            value = int(value)
+            return _varint(number << 3) + _varint((value << 1) ^ (value >> 63))
+        if kind in self.enums:
+            if value in self.enums[kind]:
+                value = self.enums[kind].index(value)
+            return _varint(number << 3) + _varint(int(value) if str(value).lstrip('-').isdigit() else 0)
+        if kind in FIXED32_TYPES:
+            return _varint(number << 3 | 5) + struct.pack(FIXED32_TYPES[kind], value)
+        if kind in FIXED64_TYPES:
+            return _varint(number << 3 | 1) + struct.pack(FIXED64_TYPES[kind], value)
+        if kind == 'string':
+            payload = str(value).encode('utf-8')
+        elif kind == 'bytes':
+            payload = base64.b64decode(value)
+        elif kind in self.messages:
+            if isinstance(value, str) and kind in WELL_KNOWN:
+                value = _seconds_nanos(kind, value)
+            payload = self.encode(kind, value) if isinstance(value, dict) else b''
+        else:
+            return b''
+        return _varint(number << 3 | 2) + _varint(len(payload)) + payload
+
+    def decode(self, type_name: str, data: bytes) -> Dict[str, Any]:
+        by_number = {f['number']: f for f in self.messages.get(type_name.rsplit('.', 1)[-1], [])}
+        result: Dict[str, Any] = {}
+        pos = 0
+        while pos < len(data):
+            key, pos = _read_varint(data, pos)
+            number, wire = key >> 3, key & 7
+            if wire == 0:
+                raw, pos = _read_varint(data, pos)
+            elif wire == 1:
+                raw, pos = data[pos:pos + 8], pos + 8
+            elif wire == 5:
+                raw, pos = data[pos:pos + 4], pos + 4
+            elif wire == 2:
+                size, pos = _read_varint(data, pos)
+                raw, pos = data[pos:pos + size], pos + size
+            else:
+                raise ValueError(f"Unsupported wire type {wire}")
+            field = by_number.get(number)
+            if field is None:
+                continue
+            if wire == 2 and field['repeated'] and self._packable(field):
+                result.setdefault(field['name'], []).extend(self._decode_packed(field, raw))
+                continue
+            value = self._decode_value(field, wire, raw)
+            if field['repeated']:
+                result.setdefault(field['name'], []).append(value)
+            else:
+                result[field['name']] = value
+        return result
+
+    def _packable(self, field: Dict) -> bool:
+        kind = field['type'].rsplit('.', 1)[-1]
+        return kind in VARINT_TYPES or kind in ZIGZAG_TYPES or kind in FIXED_SIZES or kind in self.enums
+
+    def _decode_packed(self, field: Dict, data: bytes) -> List[Any]:
+        """Repeated scalars, which proto3 writes as one length-delimited run."""
+        kind = field['type'].rsplit('.', 1)[-1]
+        values, pos = [], 0
+        while pos < len(data):
+            if kind in FIXED_SIZES:
+                size = FIXED_SIZES[kind]
+                values.append(self._decode_value(field, 5 if size == 4 else 1, data[pos:pos + size]))
+                pos += size
+            else:
+                raw, pos = _read_varint(data, pos)
+                values.append(self._decode_value(field, 0, raw))
+        return values
+
+    def _decode_value(self, field: Dict, wire: int, raw: Any) -> Any:
+        kind = field['type'].rsplit('.', 1)[-1]
+        if wire == 0:
+            if kind in ZIGZAG_TYPES:
+                return (raw >> 1) ^ -(raw & 1)
+            if kind in self.enums and raw < len(self.enums[kind]):
+                return self.enums[kind][raw]
+            if kind == 'bool':
+                return bool(raw)
+            return raw - (1 << 64) if raw >= 1 << 63 else raw
+        if wire == 5:
+            return struct.unpack(FIXED32_TYPES.get(kind, '<I'), raw)[0]
+        if wire == 1:
+            return struct.unpack(FIXED64_TYPES.get(kind, '<Q'), raw)[0]
+        if kind == 'string':
+            return raw.decode('utf-8', 'replace')
+        if kind in self.messages:
+            try:
+                return self.decode(kind, raw)
+            except (ValueError, IndexError, struct.error):
+                return {}
+        return base64.b64encode(raw).decode('ascii')
+
+
+def grpc_frame(message: bytes) -> bytes:
+    """Length-prefixed, uncompressed gRPC message."""
+    return b'\x00' + len(message).to_bytes(4, 'big') + message
+
+
+def grpc_unframe(body: bytes) -> bytes:
+    if len(body) < 5:
+        return b''
+    return body[5:5 + int.from_bytes(body[1:5], 'big')]
+
+
+class RpcCall:
+    """One RPC prepared for both transports with equivalent payloads."""
+
+    def __init__(self, key: str, rpc: Dict, rest_url: str, rest_body: Optional[Dict], grpc_path: str,
+                 message: Dict[str, Any], codec: Optional[ProtoCodec]):
+        self.key = key
+        self.rpc = rpc
+        self.method = rpc['http']['method']
+        self.rest_url = rest_url
+        self.rest_body = rest_body
+        self.grpc_path = grpc_path
+        self.message = message
+        self.codec = codec if codec and codec.knows(rpc['request_type']) else None
+        self.content_type = 'application/grpc+proto' if self.codec else 'application/grpc+json'
+
+    def encode_message(self) -> bytes:
+        if self.codec:
+            return self.codec.encode(self.rpc['request_type'], self.message)
+        return json.dumps(self.message).encode('utf-8')
+
+    def decode_message(self, data: bytes) -> Any:
+        if self.codec:
+            return self.codec.decode(self.rpc['response_type'], data)
+        return json.loads(data) if data else None
+
+
+def prepare_calls(services: Dict[str, Dict], variables: Dict[str, Any], package: Optional[str] = None,
+                  only: Optional[List[str]] = None, writes: bool = False) -> Tuple[List[RpcCall], List[str]]:
+    """RpcCalls for the named RPCs (or reads unless writes=True) whose path parameters resolve,
+    and the keys skipped."""
+    base_url = str(variables.get('base_url', '')).rstrip('/')
+    calls, skipped = [], []
+    for service_data in services.values():
+        codec = ProtoCodec(service_data['messages'], service_data.get('enums')) \
+            if service_data.get('messages') else None
+        prefix = package if package is not None else service_data.get('package', '')
+        for rpc in service_data['rpcs']:
+            key = rpc_key(service_data, rpc)
+            if only and key not in only and rpc['name'] not in only and rpc.get('item_name') not in only:
+                continue
+            if not only and not writes and rpc['http']['method'] not in ('GET', 'HEAD'):
+                continue
+            params = {name: variables[name] for name in rpc['path_params'] if name in variables}
+            try:
+                path = expand_path(rpc['http']['path'], params)
+            except KeyError:
+                skipped.append(key)
+                continue
+            body = build_body(rpc, variables)
+            message = dict(substitute(params, variables), **(body or {}))
+            service = f"{prefix}.{service_data['name']}" if prefix else service_data['name']
+            calls.append(RpcCall(key, rpc, base_url + path, body, f"/{service}/{rpc['name']}", message, codec))
+    return calls, skipped
+
+
+class TransportStats:
+    """Latency, body bytes and client CPU of one RPC on one transport."""
+
+    def __init__(self):
+        self.latency = EndpointStats()
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.cpu = 0.0
+
+    def record(self, seconds: float, cpu: float, ok: bool, status: Optional[int], sent: int, received: int):
+        self.latency.record(seconds, status, ok)
+        self.cpu += cpu
+        self.request_bytes += sent
+        self.response_bytes += received
+
+    def summary(self) -> Dict:
+        calls = self.latency.requests or 1
+        summary = self.latency.summary()
+        summary.update({
+            'request_bytes': round(self.request_bytes / calls, 1),
+            'response_bytes': round(self.response_bytes / calls, 1),
+            'cpu_us': round(self.cpu / calls * 1e6, 1),
+        })
+        return summary
+
+
+async def call_rest(client: HttpClient, call: RpcCall) -> Tuple[bool, Optional[int], int, int]:
+    payload = json.dumps(call.rest_body).encode('utf-8') if call.rest_body is not None else None
+    response = await client.request(call.method, call.rest_url,
+                                    {'Content-Type': 'application/json'} if payload else None, payload)
+    response.json()
+    return response.ok, response.status, len(payload or b''), response.wire_bytes
+
+
+def grpc_base_url(target: str, tls: bool = False) -> str:
+    """Origin URL for a 'host:port' target (h2c, or TLS with ALPN h2) or a full http(s):// URL."""
+    if '://' in target:
+        return target.rstrip('/')
+    return f"{'https' if tls else 'http'}://{target}"
+
+
+async def call_grpc(client: Http2Client, base_url: str, call: RpcCall) -> Tuple[bool, Optional[int], int, int]:
+    frame = grpc_frame(call.encode_message())
+    response = await client.request('POST', f"{base_url}{call.grpc_path}",
+                                    {'content-type': call.content_type, 'te': 'trailers'}, frame)
+    status = response.headers.get('grpc-status')
+    ok = response.status == 200 and status == '0'
+    if ok:
+        call.decode_message(grpc_unframe(response.body))
+    return ok, int(status) if status is not None else None, len(frame), response.wire_bytes
+
+
+async def bench_calls(calls: List[RpcCall], grpc_target: str, iterations: int, timeout: float = 10.0,
+                      tls: bool = False) -> Dict[str, Dict[str, TransportStats]]:
+    """Alternate REST and gRPC calls per RPC, one at a time, after one warm-up call each."""
+    results = {call.key: {t: TransportStats() for t in TRANSPORTS} for call in calls}
+    grpc_url = grpc_base_url(grpc_target, tls)
+    async with HttpClient(max_connections=1, timeout=timeout) as rest, \
+            Http2Client(max_connections=1, timeout=timeout) as grpc:
+        send = {'rest': lambda call: call_rest(rest, call), 'grpc': lambda call: call_grpc(grpc, grpc_url, call)}
+        for call in calls:
+            for transport in TRANSPORTS:
+                try:
+                    await send[transport](call)
+                except (HttpError, ValueError):
+                    pass
+            for i in range(iterations):
+                for transport in (TRANSPORTS if i % 2 == 0 else TRANSPORTS[::-1]):
+                    started, cpu = time.perf_counter(), time.process_time()
+                    try:
+                        ok, status, sent, received = await send[transport](call)
+                    except (HttpError, ValueError):
+                        ok, status, sent, received = False, None, 0, 0
+                    results[call.key][transport].record(time.perf_counter() - started,
+                                                        time.process_time() - cpu, ok, status, sent, received)
+    return results
+
+
+def overhead(rest: Dict, grpc: Dict) -> Dict:
+    """What transcoding costs over native gRPC (positive = REST is worse)."""
+    return {
+        'p50_ms': round(rest['p50_ms'] - grpc['p50_ms'], 3),
+        'p50_pct': round((rest['p50_ms'] / grpc['p50_ms'] - 1) * 100, 1) if grpc['p50_ms'] else None,
+        'p99_ms': round(rest['p99_ms'] - grpc['p99_ms'], 3),
+        'bytes': round(rest['request_bytes'] + rest['response_bytes']
+                       - grpc['request_bytes'] - grpc['response_bytes'], 1),
+        'cpu_us': round(rest['cpu_us'] - grpc['cpu_us'], 1),
+    }
+
+
+def build_report(calls: List[RpcCall], results: Dict[str, Dict[str, TransportStats]]) -> Dict[str, Dict]:
+    report = {}
+    for call in calls:
+        rest, grpc = (results[call.key][t].summary() for t in TRANSPORTS)
+        report[call.key] = {'codec': 'proto' if call.codec else 'json', 'rest': rest, 'grpc': grpc,
+                            'overhead': overhead(rest, grpc)}
+    return report
+
+
+def format_report_table(report: Dict[str, Dict]) -> str:
+    header = (f"{'RPC':<40} {'Codec':<6} {'REST p50':>9} {'gRPC p50':>9} {'Δ p50':>8} {'Δ %':>7} "
+              f"{'REST B':>8} {'gRPC B':>8} {'REST µs':>8} {'gRPC µs':>8} {'Err':>4}")
+    lines = [header, '-' * len(header)]
+    for key, row in sorted(report.items(), key=lambda kv: -kv[1]['overhead']['p50_ms']):
+        rest, grpc, delta = row['rest'], row['grpc'], row['overhead']
+        pct = f"{delta['p50_pct']:+.0f}%" if delta['p50_pct'] is not None else '-'
+        lines.append(f"{key[:40]:<40} {row['codec']:<6} {rest['p50_ms']:>9.2f} {grpc['p50_ms']:>9.2f} "
+                     f"{delta['p50_ms']:>+8.2f} {pct:>7} "
+                     f"{rest['request_bytes'] + rest['response_bytes']:>8.0f} "
+                     f"{grpc['request_bytes'] + grpc['response_bytes']:>8.0f} "
+                     f"{rest['cpu_us']:>8.0f} {grpc['cpu_us']:>8.0f} {rest['errors'] + grpc['errors']:>4}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Compare native gRPC and REST-transcoded latency per RPC')
+    parser.add_argument('--services', help=f"Comma-separated services (default: {','.join(SERVICES)})")
+    parser.add_argument('--rpc', action='append', help='Only these RPCs (Service.Rpc, RPC or item name)')
+    parser.add_argument('--environment', '-e', help='Postman environment file (base_url, ids)')
+    parser.add_argument('--var', action='append', help='Override a variable (KEY=VALUE)')
+    parser.add_argument('--grpc-target', help=f"gRPC host:port (default: grpc_url variable or {DEFAULT_GRPC_TARGET})")
+    parser.add_argument('--grpc-tls', action='store_true', help='Connect to the gRPC target over TLS (ALPN h2)')
+    parser.add_argument('--grpc-package', help='Proto package for method paths (default: from the protos)')
+    parser.add_argument('--proto-dir', type=Path, help='Proto directory (falls back to generated collections)')
+    parser.add_argument('--calls', '-n', type=int, default=100, help='Calls per RPC and transport')
+    parser.add_argument('--writes', action='store_true', help='Include write RPCs (sent on both transports)')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Request timeout in seconds')
+    parser.add_argument('--report', help='Write the JSON report to this file')
+    args = parser.parse_args(argv)
+
+    if not http2_available():
+        print("❌ Native gRPC needs the optional 'h2' package (pip install h2)")
+        return 1
+    services = load_services(args.services.split(',') if args.services else None, args.proto_dir)
+    if not services:
+        print("❌ No services found (protos or generated collections)")
+        return 1
+
+    variables = load_runner_variables([], args.environment, parse_vars(args.var))
+    target = args.grpc_target or next((str(variables[name]) for name in GRPC_TARGET_VARIABLES if variables.get(name)),
+                                      DEFAULT_GRPC_TARGET)
+    calls, skipped = prepare_calls(services, variables, args.grpc_package, args.rpc, args.writes)
+    if not calls:
+        print("❌ No RPCs with resolved path parameters (pass ids with --var or --environment)")
+        return 1
+
+    print("⚡ rallymate gRPC vs REST Benchmark")
+    print("=" * 60)
+    print(f"📦 {len(calls)} RPCs × {args.calls} calls per transport")
+    print(f"   REST {variables.get('base_url')}  ·  gRPC {grpc_base_url(target, args.grpc_tls)}")
+    if skipped:
+        print(f"   ⏭️  Skipped {len(skipped)} RPCs with unresolved path parameters")
+    json_codec = [call.key for call in calls if not call.codec]
+    if json_codec:
+        print(f"   ⚠️  {len(json_codec)} RPCs have no proto schema and use application/grpc+json")
+
+    report = build_report(calls, asyncio.run(bench_calls(calls, target, args.calls, args.timeout, args.grpc_tls)))
+    print()
+    print(format_report_table(report))
+
+    measured = sorted(row['overhead']['p50_ms'] for row in report.values()
+                      if not row['rest']['errors'] and not row['grpc']['errors'])
+    if measured:
+        print(f"\n💡 Transcoding adds {measured[len(measured) // 2]:+.2f}ms p50 on the median RPC "
+              f"({measured[0]:+.2f} to {measured[-1]:+.2f}ms across {len(measured)} error-free RPCs)")
+
+    if args.report:
+        Path(args.report).write_text(json.dumps({'grpc_target': target, 'rpcs': report, 'skipped': skipped},
+                                                indent=2))
+        print(f"\n💾 Report saved: {args.report}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
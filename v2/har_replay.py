@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Import a HAR capture and replay it against a new build.
+
+Entries are mapped onto collection items by method and path template
+({{param}} segments match any single path segment; the most literal template
+wins), so replay stats line up with the Service.Rpc names used everywhere
+else. The session is then replayed with:
+- Original timing (--speed 1), an N× speed-up (--speed N), or
+- As fast as possible (--asap), sequentially in capture order
+
+IDs created during the replay differ from the captured ones. Values the
+matched item's test script extracts (session_token, facility_id, ...) are
+compared between the captured and replayed responses, and every old value
+is rewritten to the new one in later requests. Only whole values are
+swapped (path segments, query values, words of a header value and JSON body
+leaves), so ID 101 never rewrites part of 1015 or a timestamp. Header names
+are matched case-insensitively and HTTP/2 pseudo-headers are dropped.
+
+Usage:
+    python har_replay.py session.har --map-only
+    python har_replay.py session.har --target http://localhost:8080 --speed 4
+    python har_replay.py session.har --target https://staging.rallymate.io --asap
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from collection_runner import RunItem, extract_value, load_items
+from http_client import HttpClient, HttpError, set_header
+from latency_stats import EndpointStats, LatencyHistogram, format_stats_table
+from rpc_catalog import DEFAULT_GENERATED_DIR
+from variables import VARIABLE_PATTERN
+
+SKIP_HEADERS = {'host', 'content-length', 'connection', 'accept-encoding', 'transfer-encoding',
+                'keep-alive', 'upgrade', 'te'}
+
+
+def template_path(url: str) -> str:
+    """Path part of a request URL template ('{{base_url}}/api/x/{{id}}' → '/api/x/{{id}}')."""
+    url = re.sub(r'^\{\{[^}]+\}\}', '', url)
+    if '://' in url:
+        url = url.split('://', 1)[1].partition('/')[2]
+    return '/' + url.split('?')[0].lstrip('/')
+
+
+class TemplateIndex:
+    """Match concrete request paths against collection URL templates."""
+
+    def __init__(self, items: List[RunItem]):
+        self.routes: List[Tuple[str, re.Pattern, int, RunItem]] = []
+        for item in items:
+            path = template_path(item.url)
+            pattern = ''
+            literal = 0
+            for segment in path.strip('/').split('/'):
+                match = VARIABLE_PATTERN.fullmatch(segment) or re.fullmatch(r'\{(\w+)\}', segment)
+                if match:
+                    pattern += r'/(?P<%s>[^/]+)' % re.sub(r'\W', '_', match.group(1))
+                else:
+                    pattern += '/' + re.escape(segment)
+                    literal += 1
+            self.routes.append((item.method, re.compile(f"^{pattern or '/'}/?$"), literal, item))
+        # Most literal template wins: /api/facilities/user/{id} beats /api/facilities/{a}/{b}
+        self.routes.sort(key=lambda route: -route[2])
+
+    def match(self, method: str, path: str) -> Tuple[Optional[RunItem], Dict[str, str]]:
+        for route_method, pattern, _, item in self.routes:
+            if route_method != method:
+                continue
+            found = pattern.match(path)
+            if found:
+                return item, found.groupdict()
+        return None, {}
+
+
+class HarEntry:
+    """One captured request, mapped (or not) onto a collection item."""
+
+    def __init__(self, offset: float, method: str, url: str, headers: Dict[str, str],
+                 body: Optional[str], status: int, duration: float, response_text: Optional[str]):
+        self.offset = offset
+        self.method = method
+        self.url = url
+        self.headers = headers
+        self.body = body
+        self.status = status
+        self.duration = duration
+        self.response_text = response_text
+        self.item: Optional[RunItem] = None
+        self.params: Dict[str, str] = {}
+
+    @property
+    def path(self) -> str:
+        return urlsplit(self.url).path or '/'
+
+    @property
+    def key(self) -> str:
+        return self.item.key if self.item else f"UNMATCHED {self.method} {self.path}"
+
+
+def _timestamp(value: str) -> float:
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+def load_har(path: Path) -> List[HarEntry]:
+    """Read HAR entries in start order with offsets relative to the first."""
+    with open(path) as f:
+        har = json.load(f)
+    raw = sorted(har.get('log', {}).get('entries', []), key=lambda e: _timestamp(e['startedDateTime']))
+    if not raw:
+        return []
+    start = _timestamp(raw[0]['startedDateTime'])
+
+    entries = []
+    for entry in raw:
+        request = entry['request']
+        response = entry.get('response', {})
+        headers: Dict[str, str] = {}
+        for header in request.get('headers', []):
+            if header['name'].lower() not in SKIP_HEADERS and not header['name'].startswith(':'):
+                set_header(headers, header['name'], header['value'])
+        entries.append(HarEntry(
+            _timestamp(entry['startedDateTime']) - start,
+            request['method'].upper(),
+            request['url'],
+            headers,
+            (request.get('postData') or {}).get('text'),
+            response.get('status', 0),
+            max(entry.get('time', 0.0), 0.0) / 1000.0,
+            (response.get('content') or {}).get('text'),
+        ))
+    return entries
+
+
+def map_entries(entries: List[HarEntry], index: TemplateIndex) -> Dict[str, int]:
+    """Attach collection items to entries; return match counts per key."""
+    counts: Dict[str, int] = {}
+    for entry in entries:
+        entry.item, entry.params = index.match(entry.method, entry.path)
+        counts[entry.key] = counts.get(entry.key, 0) + 1
+    return counts
+
+
+class HarReplayer:
+    """Replay mapped HAR entries against a target base URL."""
+
+    def __init__(self, entries: List[HarEntry], target: str, speed: float = 1.0, asap: bool = False,
+                 include_unmatched: bool = False, max_connections: int = 100, timeout: float = 10.0):
+        self.entries = [e for e in entries if e.item or include_unmatched]
+        self.target = target.rstrip('/')
+        self.speed = speed
+        self.asap = asap
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.stats: Dict[str, EndpointStats] = {}
+        self.original: Dict[str, LatencyHistogram] = {}
+        self.remap: Dict[str, str] = {}
+        self.lateness = LatencyHistogram()
+
+    def _swap(self, value: str) -> str:
+        return self.remap.get(value, value)
+
+    def rewrite_path(self, path: str) -> str:
+        """Replace captured IDs that make up a whole path segment."""
+        return '/'.join(self._swap(segment) for segment in path.split('/'))
+
+    def rewrite_query(self, query: str) -> str:
+        """Replace captured IDs that make up a whole query value."""
+        pairs = []
+        for pair in query.split('&'):
+            name, separator, value = pair.partition('=')
+            pairs.append(name + separator + self._swap(value) if separator else pair)
+        return '&'.join(pairs)
+
+    def rewrite_header(self, value: str) -> str:
+        """Replace captured tokens that make up a whole word ('Bearer <token>')."""
+        return ' '.join(self._swap(word) for word in value.split(' '))
+
+    def rewrite_body(self, body: Optional[str]) -> Optional[str]:
+        """Replace captured IDs that are whole JSON leaf values; other bodies are sent as captured."""
+        if not body or not self.remap:
+            return body
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return body
+        rewritten = self._rewrite_json(data)
+        return body if rewritten == data else json.dumps(rewritten)
+
+    def _rewrite_json(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            return {key: self._rewrite_json(child) for key, child in value.items()}
+        if isinstance(value, list):
+            return [self._rewrite_json(child) for child in value]
+        if isinstance(value, str):
+            return self._swap(value)
+        if isinstance(value, int) and not isinstance(value, bool) and str(value) in self.remap:
+            new = self.remap[str(value)]
+            return int(new) if new.lstrip('-').isdigit() else new
+        return value
+
+    def _learn(self, entry: HarEntry, body: bytes):
+        if not entry.item or not entry.item.extract or not entry.response_text:
+            return
+        try:
+            captured = json.loads(entry.response_text)
+            replayed = json.loads(body)
+        except ValueError:
+            return
+        for _, path in entry.item.extract:
+            old, new = extract_value(captured, path), extract_value(replayed, path)
+            if isinstance(old, (str, int)) and new is not None and str(old) != str(new) and len(str(old)) > 2:
+                self.remap[str(old)] = str(new)
+
+    async def send(self, client: HttpClient, entry: HarEntry):
+        parts = urlsplit(entry.url)
+        url = self.target + self.rewrite_path(parts.path)
+        if parts.query:
+            url += f"?{self.rewrite_query(parts.query)}"
+        headers = {name: self.rewrite_header(value) for name, value in entry.headers.items()}
+        body = self.rewrite_body(entry.body)
+
+        self.original.setdefault(entry.key, LatencyHistogram()).record(entry.duration)
+        stats = self.stats.setdefault(entry.key, EndpointStats())
+        start = time.perf_counter()
+        try:
+            response = await client.request(entry.method, url, headers=headers, body=body)
+        except HttpError:
+            stats.record(time.perf_counter() - start, None, False)
+            return
+        stats.record(response.elapsed, response.status, response.ok)
+        if response.ok:
+            self._learn(entry, response.body)
+
+    async def run(self) -> Dict:
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        async with HttpClient(max_connections=self.max_connections, timeout=self.timeout) as client:
+            if self.asap:
+                for entry in self.entries:
+                    await self.send(client, entry)
+            else:
+                origin = loop.time()
+                tasks = []
+                for entry in self.entries:
+                    due = origin + entry.offset / self.speed
+                    delay = due - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    self.lateness.record(max(0.0, loop.time() - due))
+                    tasks.append(asyncio.ensure_future(self.send(client, entry)))
+                await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+        comparison = {}
+        for key, stats in sorted(self.stats.items()):
+            original_p50 = self.original[key].percentile(50)
+            replay_p50 = stats.latency.percentile(50)
+            comparison[key] = {
+                'requests': stats.requests,
+                'errors': stats.errors,
+                'captured_p50_ms': round(original_p50 * 1000, 3),
+                'replay_p50_ms': round(replay_p50 * 1000, 3),
+                'replay_p99_ms': round(stats.latency.percentile(99) * 1000, 3),
+                'ratio': round(replay_p50 / original_p50, 3) if original_p50 and stats.latency.count else None,
+            }
+        captured_span = self.entries[-1].offset if self.entries else 0.0
+        return {
+            'mode': 'asap' if self.asap else f"{self.speed:g}x",
+            'entries': len(self.entries),
+            'captured_span_s': round(captured_span, 3),
+            'elapsed_s': round(elapsed, 3),
+            'schedule_lateness_ms': self.lateness.summary() if self.lateness.count else None,
+            'remapped_values': len(self.remap),
+            'endpoints': comparison,
+        }
+
+
+def default_collections() -> List[Path]:
+    return sorted(DEFAULT_GENERATED_DIR.glob('*_service.postman_collection.json'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Map a HAR capture onto collection items and replay it')
+    parser.add_argument('har', help='HAR file (browser or mobile app export)')
+    parser.add_argument('--collection', action='append', help='Collection(s) to map against '
+                        '(default: generated/*_service collections)')
+    parser.add_argument('--target', help='Base URL to replay against (e.g. http://localhost:8080)')
+    parser.add_argument('--speed', type=float, default=1.0, help='Replay N× faster than captured')
+    parser.add_argument('--asap', action='store_true', help='Replay sequentially without delays')
+    parser.add_argument('--include-unmatched', action='store_true', help='Also replay unmapped entries')
+    parser.add_argument('--map-only', action='store_true', help='Only print the entry → item mapping')
+    parser.add_argument('--max-connections', type=int, default=100, help='Connection pool size')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Request timeout in seconds')
+    parser.add_argument('--report', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    collections = [Path(p) for p in args.collection] if args.collection else default_collections()
+    index = TemplateIndex([item for path in collections for item in load_items(path)])
+    entries = load_har(Path(args.har))
+    if not entries:
+        print("❌ HAR file has no entries")
+        return 1
+    counts = map_entries(entries, index)
+    matched = sum(1 for e in entries if e.item)
+
+    print("🎞️  rallymate HAR Replay")
+    print("=" * 60)
+    print(f"📄 {len(entries)} entries over {entries[-1].offset:.1f}s, {matched} mapped to collection items")
+    for key, count in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])):
+        icon = '⚠️ ' if key.startswith('UNMATCHED') else '✅'
+        print(f"   {icon} {count:>5}  {key}")
+
+    if args.map_only:
+        return 0
+    if not args.target:
+        print("❌ --target is required to replay")
+        return 1
+    if args.speed <= 0:
+        print("❌ --speed must be positive")
+        return 1
+
+    replayer = HarReplayer(entries, args.target, args.speed, args.asap, args.include_unmatched,
+                           args.max_connections, args.timeout)
+    print(f"\n▶️  Replaying {len(replayer.entries)} entries against {args.target} "
+          f"({'as fast as possible' if args.asap else f'{args.speed:g}× speed'})")
+    report = asyncio.run(replayer.run())
+
+    print(f"\n⏱️  {report['elapsed_s']}s (captured {report['captured_span_s']}s), "
+          f"{report['remapped_values']} IDs/tokens remapped\n")
+    print(format_stats_table(replayer.stats))
+    print(f"\n{'Endpoint':<40} {'captured p50':>13} {'replay p50':>11} {'ratio':>7}")
+    for key, row in report['endpoints'].items():
+        ratio = f"{row['ratio']:.2f}" if row['ratio'] is not None else '-'
+        print(f"{key[:40]:<40} {row['captured_p50_ms']:>13.2f} {row['replay_p50_ms']:>11.2f} {ratio:>7}")
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Report saved: {args.report}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+HTTP/2 client for the rallymate load tools (optional dependency: h2).
+
+One connection per origin carries every request as a separate stream, so
+only the first request pays for DNS, connect and TLS. Exposes the same
+request()/Response/Timings interface as http_client.HttpClient.
+
+https URLs negotiate "h2" via ALPN; http URLs use prior-knowledge h2c.
+Trailers (e.g. gRPC's grpc-status) are merged into the response headers.
+
+Install with:
+    pip install h2
+"""
+
+import asyncio
+import ssl
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from http_client import HttpClient, HttpError, Response, Timings, decode_content, open_timed_connection
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.exceptions
+except ImportError:  # pragma: no cover - optional dependency
+    h2 = None
+
+READ_SIZE = 65536
+
+
+def http2_available() -> bool:
+    return h2 is not None
+
+
+class _StreamState:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.headers: Dict[str, str] = {}
+        self.status = 0
+        self.body = bytearray()
+        self.first_byte: Optional[float] = None
+        self.done = loop.create_future()
+        # Connection failures may land after the request already gave up
+        self.done.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+
+class _Http2Connection:
+    """A single multiplexed HTTP/2 connection and its frame reader task."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        config = h2.config.H2Configuration(client_side=True, header_encoding='utf-8')
+        self.conn = h2.connection.H2Connection(config)
+        self.conn.initiate_connection()
+        self.streams: Dict[int, _StreamState] = {}
+        self.window_open = asyncio.Event()
+        self.closed = False
+        self.writer.write(self.conn.data_to_send())
+        self._reader_task = asyncio.ensure_future(self._read_frames())
+
+    async def _read_frames(self):
+        try:
+            while True:
+                data = await self.reader.read(READ_SIZE)
+                if not data:
+                    break
+                for event in self.conn.receive_data(data):
+                    self._handle(event)
+                if self.writer.is_closing():
+                    break
+                self.writer.write(self.conn.data_to_send())
+        except (OSError, h2.exceptions.ProtocolError) as e:
+            self._fail(e)
+        finally:
+            self.writer.close()
+            self._fail(ConnectionError("HTTP/2 connection closed"))
+
+    def _handle(self, event):
+        state = self.streams.get(getattr(event, 'stream_id', None))
+        if isinstance(event, h2.events.ResponseReceived) and state:
+            state.first_byte = time.perf_counter()
+            for name, value in event.headers:
+                if name == ':status':
+                    state.status = int(value)
+                else:
+                    state.headers[name.lower()] = value
+        elif isinstance(event, h2.events.TrailersReceived) and state:
+            state.headers.update((name.lower(), value) for name, value in event.headers)
+        elif isinstance(event, h2.events.DataReceived) and state:
+            state.body.extend(event.data)
+            self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+        elif isinstance(event, h2.events.StreamEnded) and state:
+            if not state.done.done():
+                state.done.set_result(None)
+        elif isinstance(event, h2.events.StreamReset) and state:
+            if not state.done.done():
+                state.done.set_exception(ConnectionError(f"stream reset (error {event.error_code})"))
+        elif isinstance(event, h2.events.WindowUpdated):
+            self.window_open.set()
+        elif isinstance(event, h2.events.ConnectionTerminated):
+            self._fail(ConnectionError(f"GOAWAY (error {event.error_code})"))
+
+    def _fail(self, error: Exception):
+        self.closed = True
+        self.window_open.set()
+        for state in self.streams.values():
+            if not state.done.done():
+                state.done.set_exception(error)
+
+    async def send_body(self, stream_id: int, payload: bytes):
+        view = memoryview(payload)
+        while view:
+            window = min(self.conn.local_flow_control_window(stream_id), self.conn.max_outbound_frame_size)
+            if window <= 0:
+                self.window_open.clear()
+                self.writer.write(self.conn.data_to_send())
+                await self.window_open.wait()
+                if self.closed:
+                    raise ConnectionError("HTTP/2 connection closed")
+                continue
+            self.conn.send_data(stream_id, bytes(view[:window]))
+            view = view[window:]
+            self.writer.write(self.conn.data_to_send())
+            await self.writer.drain()
+        self.conn.end_stream(stream_id)
+        self.writer.write(self.conn.data_to_send())
+
+    def close(self):
+        self.closed = True
+        self._reader_task.cancel()
+        try:
+            self.conn.close_connection()
+            self.writer.write(self.conn.data_to_send())
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class Http2Client:
+    """Async HTTP/2 client with one multiplexed connection per origin."""
+
+    def __init__(self, max_connections: int = 100, timeout: float = 10.0,
+                 default_headers: Optional[Dict[str, str]] = None,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        if h2 is None:
+            raise HttpError("HTTP/2 mode needs the optional 'h2' package (pip install h2)")
+        self.max_streams = max_connections
+        self.timeout = timeout
+        self.default_headers = default_headers or {}
+        self._connections: Dict[Tuple[str, str, int], _Http2Connection] = {}
+        self._connecting: Dict[Tuple[str, str, int], asyncio.Future] = {}
+        self._limits: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+        self._ssl_context = ssl_context
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        for connection in self._connections.values():
+            connection.close()
+        self._connections.clear()
+
+    async def _connection(self, origin: Tuple[str, str, int], timings: Timings) -> _Http2Connection:
+        connection = self._connections.get(origin)
+        if connection and not connection.closed:
+            timings.reused = True
+            return connection
+        pending = self._connecting.get(origin)
+        if pending:
+            # Another request is already handshaking; share its connection
+            timings.reused = True
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._connecting[origin] = future
+        scheme, host, port = origin
+        try:
+            context = None
+            if scheme == 'https':
+                if self._ssl_context is None:
+                    self._ssl_context = ssl.create_default_context()
+                    self._ssl_context.set_alpn_protocols(['h2'])
+                context = self._ssl_context
+            reader, writer = await open_timed_connection(host, port, context, timings, self.timeout)
+            if context is not None and writer.get_extra_info('ssl_object').selected_alpn_protocol() != 'h2':
+                writer.close()
+                raise HttpError(f"{host}:{port} did not negotiate HTTP/2 via ALPN")
+            connection = _Http2Connection(reader, writer)
+            self._connections[origin] = connection
+            future.set_result(connection)
+            return connection
+        except HttpError as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        except (OSError, asyncio.TimeoutError) as e:
+            error = HttpError(f"Could not connect to {host}:{port}: {e!r}")
+            future.set_exception(error)
+            future.exception()
+            raise error from e
+        finally:
+            self._connecting.pop(origin, None)
+
+    async def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                      body: Any = None, **_) -> Response:
+        """Send a request on a multiplexed stream and read the full response."""
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise HttpError(f"Unsupported URL scheme: {url}")
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        origin = (parts.scheme, parts.hostname, port)
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+
+        payload, content_type = HttpClient._encode_body(body)
+        request_headers = [(':method', method.upper()), (':scheme', parts.scheme),
+                           (':authority', parts.netloc), (':path', target)]
+        # Keyed by lowercase name so 'Accept' from the caller replaces the default 'accept'
+        extra = {'accept': 'application/json'}
+        extra.update((k.lower(), v) for k, v in self.default_headers.items())
+        if content_type:
+            extra['content-type'] = content_type
+        extra.update((k.lower(), v) for k, v in (headers or {}).items())
+        if payload is not None:
+            extra['content-length'] = str(len(payload))
+        request_headers += [(k, str(v)) for k, v in extra.items()
+                            if k not in ('host', 'connection', 'transfer-encoding', 'keep-alive')]
+
+        limit = self._limits.setdefault(origin, asyncio.Semaphore(self.max_streams))
+        async with limit:
+            timings = Timings()
+            start = time.perf_counter()
+            connection = await self._connection(origin, timings)
+            stream_id = None
+            try:
+                sent_at = time.perf_counter()
+                stream_id = connection.conn.get_next_available_stream_id()
+                state = _StreamState(asyncio.get_running_loop())
+                connection.streams[stream_id] = state
+                connection.conn.send_headers(stream_id, request_headers, end_stream=payload is None)
+                connection.writer.write(connection.conn.data_to_send())
+                if payload is not None:
+                    await connection.send_body(stream_id, payload)
+                await connection.writer.drain()
+                timings.send = time.perf_counter() - sent_at
+                waiting = time.perf_counter()
+                await asyncio.wait_for(state.done, self.timeout)
+            except (OSError, ConnectionError, asyncio.TimeoutError, h2.exceptions.ProtocolError) as e:
+                raise HttpError(f"{method} {url} failed: {e!r}") from e
+            finally:
+                connection.streams.pop(stream_id, None)
+
+            first_byte = state.first_byte or time.perf_counter()
+            timings.ttfb = first_byte - waiting
+            timings.transfer = time.perf_counter() - first_byte
+            body = bytes(state.body)
+            try:
+                decoded, decode_cpu = decode_content(state.headers, body)
+            except ValueError as e:
+                raise HttpError(f"{method} {url} failed: {e!r}") from e
+            elapsed = time.perf_counter() - start
+
+        return Response(state.status, '', state.headers, decoded, elapsed, timings, len(body), decode_cpu)
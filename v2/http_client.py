@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Minimal asyncio HTTP/1.1 client for the rallymate load tools.
+
+Only depends on the standard library so the simulators and runners work
+anywhere the generator does. Supports:
+- Keep-alive connection pooling per host with a connection cap
+- Content-Length and chunked response bodies
+- JSON request bodies and bearer authentication
+- Streaming request bodies from async iterables (chunked or sized)
+- Per-phase timings (DNS, connect, TLS, send, TTFB, transfer) on every response
+- A fresh-connection mode (pool=False) for cold-connection measurements
+- Transparent gzip/deflate/br response decoding with wire size and decode CPU
+"""
+
+import asyncio
+import json
+import socket
+import ssl
+import time
+from typing import AsyncIterable, Callable, Dict, List, Optional, Any, Tuple
+from urllib.parse import urlsplit
+
+from compression import UnsupportedEncoding, decompress
+
+
+class HttpError(Exception):
+    """Raised when a request cannot be completed at the transport level."""
+
+
+class Timings:
+    """Per-phase timing of one request, in seconds.
+
+    dns/connect/tls are 0.0 when a pooled connection was reused. ttfb is the
+    wait between the request being written and the first response byte;
+    transfer is the time spent reading the rest of the response.
+    """
+
+    PHASES = ('dns', 'connect', 'tls', 'send', 'ttfb', 'transfer')
+
+    def __init__(self):
+        self.dns = 0.0
+        self.connect = 0.0
+        self.tls = 0.0
+        self.send = 0.0
+        self.ttfb = 0.0
+        self.transfer = 0.0
+        self.reused = False
+
+    @property
+    def handshake(self) -> float:
+        return self.dns + self.connect + self.tls
+
+    @property
+    def total(self) -> float:
+        return self.handshake + self.send + self.ttfb + self.transfer
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {f"{phase}_ms": round(getattr(self, phase) * 1000, 3) for phase in self.PHASES}
+        data['reused'] = self.reused
+        return data
+
+
+class Response:
+    """A fully-read HTTP response.
+
+    body is always decoded; wire_bytes is the body size as received and
+    decode_cpu the CPU seconds spent undoing its Content-Encoding.
+    """
+
+    def __init__(self, status: int, reason: str, headers: Dict[str, str], body: bytes, elapsed: float,
+                 timings: Optional[Timings] = None, wire_bytes: Optional[int] = None, decode_cpu: float = 0.0):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.elapsed = elapsed
+        self.timings = timings or Timings()
+        self.wire_bytes = len(body) if wire_bytes is None else wire_bytes
+        self.decode_cpu = decode_cpu
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 400
+
+    def json(self) -> Any:
+        """Decode the body as JSON (empty body decodes to None)."""
+        if not self.body:
+            return None
+        return json.loads(self.body.decode('utf-8'))
+
+
+class _Connection:
+    """A single pooled TCP/TLS connection."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+def set_header(headers: Dict[str, str], name: str, value: str):
+    """Set a header, replacing it under any other capitalisation (header names are case-insensitive)."""
+    lower = name.lower()
+    for existing in [key for key in headers if key.lower() == lower and key != name]:
+        del headers[existing]
+    headers[name] = value
+
+
+def merge_headers(headers: Dict[str, str], extra: Dict[str, str]):
+    """set_header() for every header in `extra`; the spelling of `extra` wins."""
+    for name, value in extra.items():
+        set_header(headers, name, value)
+
+
+class HttpClient:
+    """Async HTTP/1.1 client with a bounded keep-alive pool per origin.
+
+    With pool=False every request opens (and closes) its own connection, so
+    each response carries the full DNS/connect/TLS cost.
+    """
+
+    def __init__(self, max_connections: int = 100, timeout: float = 10.0,
+                 default_headers: Optional[Dict[str, str]] = None, pool: bool = True,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.default_headers = default_headers or {}
+        self.pool = pool
+        self._idle: Dict[Tuple[str, str, int], List[_Connection]] = {}
+        self._limits: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+        self._ssl_context = ssl_context
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        """Close every idle pooled connection."""
+        for connections in self._idle.values():
+            for conn in connections:
+                conn.close()
+        self._idle.clear()
+
+    async def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                      body: Any = None, content_length: Optional[int] = None,
+                      on_chunk: Optional[Callable[[int, float], None]] = None) -> Response:
+        """Send a request and read the full response.
+
+        Args:
+            method: HTTP method
+            url: Absolute http:// or https:// URL
+            headers: Extra request headers
+            body: bytes, str, a JSON-serialisable object, or an async iterable
+                of bytes chunks which is streamed without buffering
+            content_length: Total size of a streamed body; when omitted the
+                body is sent with chunked transfer encoding
+            on_chunk: Called with (chunk size, seconds to write and drain it)
+                for every streamed chunk
+
+        Returns:
+            The decoded Response
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise HttpError(f"Unsupported URL scheme: {url}")
+
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        origin = (parts.scheme, parts.hostname, port)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+
+        streaming = hasattr(body, '__aiter__')
+        payload, content_type = (None, 'application/octet-stream') if streaming else self._encode_body(body)
+        request_headers = {
+            'Host': parts.netloc,
+            'Connection': 'keep-alive' if self.pool else 'close',
+            'Accept': 'application/json',
+        }
+        merge_headers(request_headers, self.default_headers)
+        if content_type:
+            set_header(request_headers, 'Content-Type', content_type)
+        if headers:
+            merge_headers(request_headers, headers)
+        if streaming:
+            if content_length is None:
+                set_header(request_headers, 'Transfer-Encoding', 'chunked')
+            else:
+                set_header(request_headers, 'Content-Length', str(content_length))
+        elif payload is not None or method.upper() in ('POST', 'PUT', 'PATCH'):
+            set_header(request_headers, 'Content-Length', str(len(payload or b'')))
+
+        head = f"{method.upper()} {target} HTTP/1.1\r\n"
+        head += ''.join(f"{k}: {v}\r\n" for k, v in request_headers.items())
+        head += "\r\n"
+
+        limit = self._limits.setdefault(origin, asyncio.Semaphore(self.max_connections))
+        async with limit:
+            timings = Timings()
+            start = time.perf_counter()
+            conn = await self._acquire(origin, timings)
+            try:
+                sent_at = time.perf_counter()
+                if streaming:
+                    conn.writer.write(head.encode('latin-1'))
+                    await self._stream_body(conn.writer, body, content_length is None, on_chunk)
+                else:
+                    conn.writer.write(head.encode('latin-1') + (payload or b''))
+                    await conn.writer.drain()
+                timings.send = time.perf_counter() - sent_at
+                status, reason, resp_headers, resp_body = await asyncio.wait_for(
+                    self._read_response(conn.reader, method, timings), self.timeout)
+                wire_bytes = len(resp_body)
+                resp_body, decode_cpu = decode_content(resp_headers, resp_body)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as e:
+                conn.close()
+                raise HttpError(f"{method} {url} failed: {e!r}") from e
+
+            elapsed = time.perf_counter() - start
+            if not self.pool or resp_headers.get('connection', '').lower() == 'close':
+                conn.close()
+            else:
+                self._idle.setdefault(origin, []).append(conn)
+
+        return Response(status, reason, resp_headers, resp_body, elapsed, timings, wire_bytes, decode_cpu)
+
+    async def _stream_body(self, writer: asyncio.StreamWriter, chunks: AsyncIterable[bytes],
+                           chunked: bool, on_chunk: Optional[Callable[[int, float], None]]):
+        """Write an async iterable body, draining after every chunk.
+
+        The transport's write buffer limit is zero while streaming, so each
+        drain() waits for that chunk to leave the buffer and its time is real
+        network backpressure. The original limits are restored for the pool.
+        """
+        transport = writer.transport
+        low, high = transport.get_write_buffer_limits()
+        transport.set_write_buffer_limits(high=0)
+        try:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                chunk_start = time.perf_counter()
+                if chunked:
+                    writer.write(f"{len(chunk):x}\r\n".encode('latin-1') + chunk + b"\r\n")
+                else:
+                    writer.write(chunk)
+                await asyncio.wait_for(writer.drain(), self.timeout)
+                if on_chunk:
+                    on_chunk(len(chunk), time.perf_counter() - chunk_start)
+            if chunked:
+                writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        finally:
+            transport.set_write_buffer_limits(high=high, low=low)
+
+    async def _acquire(self, origin: Tuple[str, str, int], timings: Optional[Timings] = None) -> _Connection:
+        """Reuse an idle connection for the origin or open a new one."""
+        timings = timings or Timings()
+        idle = self._idle.get(origin)
+        while idle:
+            conn = idle.pop()
+            if not conn.reader.at_eof() and not conn.writer.is_closing():
+                timings.reused = True
+                return conn
+            conn.close()
+
+        scheme, host, port = origin
+        ssl_context = None
+        if scheme == 'https':
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            ssl_context = self._ssl_context
+        try:
+            reader, writer = await open_timed_connection(host, port, ssl_context, timings, self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise HttpError(f"Could not connect to {host}:{port}: {e!r}") from e
+        return _Connection(reader, writer)
+
+    @staticmethod
+    def _encode_body(body: Any) -> Tuple[Optional[bytes], Optional[str]]:
+        """Encode a request body, returning (payload, default content type)."""
+        if body is None:
+            return None, None
+        if isinstance(body, bytes):
+            return body, 'application/octet-stream'
+        if isinstance(body, str):
+            return body.encode('utf-8'), 'application/json'
+        return json.dumps(body).encode('utf-8'), 'application/json'
+
+    @staticmethod
+    async def _read_response(reader: asyncio.StreamReader, method: str, timings: Optional[Timings] = None):
+        """Read status line, headers and body from the stream."""
+        waiting = time.perf_counter()
+        status_line = await reader.readline()
+        first_byte = time.perf_counter()
+        if timings:
+            timings.ttfb = first_byte - waiting
+        if not status_line:
+            raise ValueError("connection closed before response")
+        _, status, *reason = status_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            key = key.strip().lower()
+            value = value.strip()
+            headers[key] = f"{headers[key]}, {value}" if key in headers else value
+
+        status_code = int(status)
+        if method.upper() == 'HEAD' or status_code in (204, 304) or 100 <= status_code < 200:
+            if timings:
+                timings.transfer = time.perf_counter() - first_byte
+            return status_code, reason[0] if reason else '', headers, b''
+
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            chunks = []
+            while True:
+                size_line = await reader.readline()
+                size = int(size_line.split(b';', 1)[0].strip() or b'0', 16)
+                if size == 0:
+                    # Consume trailers up to the terminating blank line
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()
+            headers['connection'] = 'close'
+
+        if timings:
+            timings.transfer = time.perf_counter() - first_byte
+        return status_code, reason[0] if reason else '', headers, body
+
+
+def decode_content(headers: Dict[str, str], body: bytes) -> Tuple[bytes, float]:
+    """Undo a response Content-Encoding, returning (body, CPU seconds spent).
+
+    Unknown codings are left as-is so the caller still sees the raw bytes;
+    corrupt payloads raise compression.EncodingError (a ValueError).
+    """
+    encoding = headers.get('content-encoding', '').strip()
+    if not body or encoding.lower() in ('', 'identity'):
+        return body, 0.0
+    start = time.process_time()
+    try:
+        body = decompress(body, encoding)
+    except UnsupportedEncoding:
+        pass
+    return body, time.process_time() - start
+
+
+async def open_timed_connection(host: str, port: int, ssl_context: Optional[ssl.SSLContext],
+                                timings: Timings, timeout: float):
+    """Open a TCP (and TLS) connection, recording DNS, connect and TLS time.
+
+    Args:
+        host: Hostname or IP address
+        port: TCP port
+        ssl_context: TLS context for https (None for plain TCP)
+        timings: Receives the dns, connect and tls phases
+        timeout: Limit for each phase in seconds
+
+    Returns:
+        (reader, writer) streams
+    """
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    infos = await asyncio.wait_for(loop.getaddrinfo(host, port, type=socket.SOCK_STREAM), timeout)
+    resolved = time.perf_counter()
+    timings.dns = resolved - start
+
+    # StreamWriter.start_tls (3.11+) lets the TLS handshake be timed on its own;
+    # older Pythons handshake during connect and report it as connect time
+    split_tls = ssl_context is not None and hasattr(asyncio.StreamWriter, 'start_tls')
+    # Try each address in turn (e.g. ::1 then 127.0.0.1 for localhost); only the one that answers is timed
+    error: Optional[BaseException] = None
+    for family, _, _, _, address in infos:
+        attempt = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(
+                address[0], address[1], family=family,
+                ssl=None if split_tls else ssl_context,
+                server_hostname=host if ssl_context is not None and not split_tls else None), timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            error = e
+            continue
+        connected = time.perf_counter()
+        timings.connect = connected - attempt
+        break
+    else:
+        raise error or OSError(f"No addresses for {host}")
+
+    if split_tls:
+        await asyncio.wait_for(writer.start_tls(ssl_context, server_hostname=host), timeout)
+        timings.tls = time.perf_counter() - connected
+    return reader, writer
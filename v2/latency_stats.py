@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Latency statistics shared by the rallymate load tools.
+
+LatencyHistogram stores samples in logarithmic buckets (~1% relative error),
+so memory stays constant no matter how many requests are recorded, and two
+histograms can be merged exactly by adding bucket counts.
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with exact count/min/max/mean."""
+
+    GROWTH = 1.02
+    _LOG_GROWTH = math.log(GROWTH)
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def record(self, seconds: float, count: int = 1):
+        """Record a latency sample (in seconds)."""
+        micros = max(seconds * 1e6, 1.0)
+        index = int(math.log(micros) / self._LOG_GROWTH)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += count
+        self.total += seconds * count
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """Add another histogram's samples into this one."""
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Return the latency (seconds) at percentile p (0-100)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * p / 100.0))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # Midpoint of the bucket, clamped to the observed range
+                value = self.GROWTH ** (index + 0.5) / 1e6
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def count_above(self, seconds: float) -> int:
+        """Approximate number of samples slower than the given latency."""
+        threshold = int(math.log(max(seconds * 1e6, 1.0)) / self._LOG_GROWTH)
+        return sum(count for index, count in self.buckets.items() if index > threshold)
+
+    def summary(self) -> Dict[str, float]:
+        """Return count and common percentiles in milliseconds."""
+        return {
+            'count': self.count,
+            'mean_ms': round(self.mean * 1000, 3),
+            'min_ms': round((self.min or 0.0) * 1000, 3),
+            'p50_ms': round(self.percentile(50) * 1000, 3),
+            'p90_ms': round(self.percentile(90) * 1000, 3),
+            'p99_ms': round(self.percentile(99) * 1000, 3),
+            'max_ms': round((self.max or 0.0) * 1000, 3),
+        }
+
+    def to_dict(self) -> Dict:
+        """Serialise to a JSON-friendly dict."""
+        return {
+            'buckets': {str(k): v for k, v in self.buckets.items()},
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LatencyHistogram':
+        """Rebuild a histogram produced by to_dict()."""
+        hist = cls()
+        hist.buckets = {int(k): v for k, v in data.get('buckets', {}).items()}
+        hist.count = data.get('count', 0)
+        hist.total = data.get('total', 0.0)
+        hist.min = data.get('min')
+        hist.max = data.get('max')
+        return hist
+
+    @classmethod
+    def from_samples(cls, samples: Iterable[float]) -> 'LatencyHistogram':
+        """Build a histogram from an iterable of latencies in seconds."""
+        hist = cls()
+        for sample in samples:
+            hist.record(sample)
+        return hist
+
+
+class EndpointStats:
+    """Per-endpoint request counters plus a latency histogram."""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.requests = 0
+        self.errors = 0
+        self.status_codes: Dict[int, int] = {}
+
+    def record(self, seconds: float, status: Optional[int], ok: bool):
+        """Record one request outcome (status is None for transport errors)."""
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+        if status is not None:
+            self.status_codes[status] = self.status_codes.get(status, 0) + 1
+            self.latency.record(seconds)
+
+    def merge(self, other: 'EndpointStats') -> 'EndpointStats':
+        self.latency.merge(other.latency)
+        self.requests += other.requests
+        self.errors += other.errors
+        for status, count in other.status_codes.items():
+            self.status_codes[status] = self.status_codes.get(status, 0) + count
+        return self
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    def summary(self) -> Dict:
+        data = self.latency.summary()
+        data.update({
+            'requests': self.requests,
+            'errors': self.errors,
+            'error_rate': round(self.error_rate, 4),
+            'status_codes': {str(k): v for k, v in sorted(self.status_codes.items())},
+        })
+        return data
+
+    def to_dict(self) -> Dict:
+        return {
+            'latency': self.latency.to_dict(),
+            'requests': self.requests,
+            'errors': self.errors,
+            'status_codes': {str(k): v for k, v in self.status_codes.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'EndpointStats':
+        stats = cls()
+        stats.latency = LatencyHistogram.from_dict(data.get('latency', {}))
+        stats.requests = data.get('requests', 0)
+        stats.errors = data.get('errors', 0)
+        stats.status_codes = {int(k): v for k, v in data.get('status_codes', {}).items()}
+        return stats
+
+
+class PhaseStats:
+    """Latency histograms per connection phase (see http_client.Timings)."""
+
+    PHASES = ('dns', 'connect', 'tls', 'send', 'ttfb', 'transfer')
+
+    def __init__(self):
+        self.phases: Dict[str, LatencyHistogram] = {phase: LatencyHistogram() for phase in self.PHASES}
+        self.total = LatencyHistogram()
+        self.requests = 0
+        self.reused = 0
+
+    def record(self, timings):
+        """Record a Timings object (anything with the phase attributes)."""
+        self.requests += 1
+        self.reused += 1 if timings.reused else 0
+        for phase in self.PHASES:
+            self.phases[phase].record(getattr(timings, phase))
+        self.total.record(sum(getattr(timings, phase) for phase in self.PHASES))
+
+    def merge(self, other: 'PhaseStats') -> 'PhaseStats':
+        for phase in self.PHASES:
+            self.phases[phase].merge(other.phases[phase])
+        self.total.merge(other.total)
+        self.requests += other.requests
+        self.reused += other.reused
+        return self
+
+    @property
+    def handshake_share(self) -> float:
+        """Fraction of total time spent in DNS, connect and TLS."""
+        handshake = sum(self.phases[p].total for p in ('dns', 'connect', 'tls'))
+        return handshake / self.total.total if self.total.total else 0.0
+
+    def summary(self) -> Dict:
+        data = {
+            phase: {'mean_ms': round(hist.mean * 1000, 3),
+                    'p50_ms': round(hist.percentile(50) * 1000, 3),
+                    'p99_ms': round(hist.percentile(99) * 1000, 3)}
+            for phase, hist in self.phases.items()
+        }
+        data['total'] = {'mean_ms': round(self.total.mean * 1000, 3),
+                         'p50_ms': round(self.total.percentile(50) * 1000, 3),
+                         'p99_ms': round(self.total.percentile(99) * 1000, 3)}
+        data['requests'] = self.requests
+        data['reused_ratio'] = round(self.reused / self.requests, 4) if self.requests else 0.0
+        data['handshake_share'] = round(self.handshake_share, 4)
+        return data
+
+
+def format_phase_table(stats: Dict[str, PhaseStats]) -> str:
+    """Render mean per-phase latency (ms) per row as a fixed-width table."""
+    phases = PhaseStats.PHASES + ('total',)
+    header = f"{'Endpoint':<40} " + ' '.join(f"{p:>9}" for p in phases) + f" {'reused':>7} {'hs%':>6}"
+    lines = [header, '-' * len(header)]
+    for name in sorted(stats):
+        s = stats[name].summary()
+        lines.append(
+            f"{name[:40]:<40} " + ' '.join(f"{s[p]['mean_ms']:>9.2f}" for p in phases)
+            + f" {s['reused_ratio'] * 100:>6.0f}% {s['handshake_share'] * 100:>5.1f}%"
+        )
+    return '\n'.join(lines)
+
+
+def format_stats_table(stats: Dict[str, EndpointStats]) -> str:
+    """Render per-endpoint stats as a fixed-width text table."""
+    header = f"{'Endpoint':<40} {'Reqs':>8} {'Err%':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    lines = [header, '-' * len(header)]
+    for name in sorted(stats):
+        s = stats[name].summary()
+        lines.append(
+            f"{name[:40]:<40} {s['requests']:>8} {s['error_rate'] * 100:>6.2f} "
+            f"{s['p50_ms']:>9.2f} {s['p90_ms']:>9.2f} {s['p99_ms']:>9.2f} {s['max_ms']:>9.2f}"
+        )
+    return '\n'.join(lines)
+
+
+def normal_sf(z: float) -> float:
+    """Upper-tail probability of the standard normal distribution."""
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def least_squares_slope(points: Sequence[Tuple[float, float]]) -> float:
+    """Slope of the least-squares line through (x, y) points."""
+    n = len(points)
+    if n < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var_x:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def pearson(xs: Sequence[float], ys: Sequence[float]) -> float:
+    """Pearson correlation coefficient (0.0 when undefined)."""
+    n = min(len(xs), len(ys))
+    if n < 3:
+        return 0.0
+    mean_x = sum(xs[:n]) / n
+    mean_y = sum(ys[:n]) / n
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    var_x = sum((x - mean_x) ** 2 for x in xs[:n])
+    var_y = sum((y - mean_y) ** 2 for y in ys[:n])
+    if not var_x or not var_y:
+        return 0.0
+    return cov / math.sqrt(var_x * var_y)
+
+
+def mann_kendall(series: List[float]) -> Dict[str, float]:
+    """Mann-Kendall monotonic trend test.
+
+    Returns the S statistic, its z-score and the two-sided p-value; a small
+    p-value with positive z means the series is trending upwards.
+    """
+    n = len(series)
+    s = 0
+    for i in range(n - 1):
+        for j in range(i + 1, n):
+            diff = series[j] - series[i]
+            s += (diff > 0) - (diff < 0)
+    if n < 3:
+        return {'s': s, 'z': 0.0, 'p_value': 1.0}
+    variance = n * (n - 1) * (2 * n + 5) / 18.0
+    if s > 0:
+        z = (s - 1) / math.sqrt(variance)
+    elif s < 0:
+        z = (s + 1) / math.sqrt(variance)
+    else:
+        z = 0.0
+    return {'s': s, 'z': round(z, 3), 'p_value': min(1.0, 2 * normal_sf(abs(z)))}
+
+
+def two_proportion_test(x1: int, n1: int, x2: int, n2: int) -> float:
+    """One-sided p-value that the second proportion (x2/n2) is larger than the first."""
+    if not n1 or not n2:
+        return 1.0
+    pooled = (x1 + x2) / (n1 + n2)
+    if pooled in (0.0, 1.0):
+        return 1.0
+    z = (x2 / n2 - x1 / n1) / math.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+    return normal_sf(z)
+
+
+def mann_whitney(baseline: LatencyHistogram, candidate: LatencyHistogram) -> Dict[str, float]:
+    """One-sided Mann-Whitney U test that candidate latencies are stochastically larger.
+
+    Works on the histogram buckets, so samples sharing a bucket count as ties
+    (which only makes the test more conservative). Returns U, its z-score,
+    the p-value and P(candidate > baseline) as the effect size.
+    """
+    n1, n2 = baseline.count, candidate.count
+    if not n1 or not n2:
+        return {'u': 0.0, 'z': 0.0, 'p_value': 1.0, 'prob_slower': 0.5}
+    u = 0.0
+    below = 0
+    ties = 0
+    for index in sorted(set(baseline.buckets) | set(candidate.buckets)):
+        base, cand = baseline.buckets.get(index, 0), candidate.buckets.get(index, 0)
+        u += cand * (below + 0.5 * base)
+        below += base
+        tied = base + cand
+        ties += tied ** 3 - tied
+    n = n1 + n2
+    variance = n1 * n2 / 12.0 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0.0
+    mean = n1 * n2 / 2.0
+    z = (u - mean - 0.5) / math.sqrt(variance) if variance > 0 else 0.0
+    return {'u': u, 'z': round(z, 3), 'p_value': normal_sf(z), 'prob_slower': round(u / (n1 * n2), 4)}
+
+
+def ks_shift(baseline: LatencyHistogram, candidate: LatencyHistogram) -> Dict[str, float]:
+    """One-sided two-sample Kolmogorov-Smirnov test that candidate is slower.
+
+    D is the largest amount by which the baseline CDF exceeds the candidate
+    CDF; the p-value uses the asymptotic exp(-2 n D²) bound.
+    """
+    n1, n2 = baseline.count, candidate.count
+    if not n1 or not n2:
+        return {'d': 0.0, 'p_value': 1.0}
+    d = 0.0
+    seen1 = seen2 = 0
+    for index in sorted(set(baseline.buckets) | set(candidate.buckets)):
+        seen1 += baseline.buckets.get(index, 0)
+        seen2 += candidate.buckets.get(index, 0)
+        d = max(d, seen1 / n1 - seen2 / n2)
+    effective = n1 * n2 / (n1 + n2)
+    return {'d': round(d, 4), 'p_value': min(1.0, math.exp(-2 * effective * d * d))}
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Prometheus / OpenMetrics exporter for live runner metrics.
+
+While run, scenario or soak is in progress the runner's results are exposed
+as:
+- rallymate_runner_requests_total{service,rpc,method,code}     counter
+- rallymate_runner_errors_total{service,rpc}                   counter
+- rallymate_runner_request_duration_seconds{service,rpc}       histogram
+- rallymate_runner_in_flight_requests{service,rpc}             gauge
+
+either on a local /metrics endpoint (--metrics-port, scraped by Prometheus)
+or in a node_exporter textfile-collector file (--metrics-textfile) that is
+rewritten atomically every few seconds. Client-side latency can then be
+overlaid on the server dashboards during a load test.
+
+Usage:
+    python collection_runner.py soak --scenario scenarios/production-mix.json --duration 4h \\
+        --metrics-port 9464 --metrics-buckets 0.025,0.05,0.1,0.25,0.5,1,2
+    python collection_runner.py run generated/*_service.postman_collection.json \\
+        --metrics-textfile /var/lib/node_exporter/textfile/rallymate_runner.prom
+"""
+
+import argparse
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROMETHEUS_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+OPENMETRICS_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+PREFIX = 'rallymate_runner'
+
+
+def endpoint_labels(key: str) -> Tuple[str, str]:
+    """('FacilitiesService', 'GetFacilities') for 'FacilitiesService.GetFacilities' or 'auth/Send OTP'."""
+    separator = '.' if '.' in key else '/'
+    service, _, rpc = key.partition(separator)
+    return service, rpc or key
+
+
+def escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    return '{' + ','.join(f'{k}="{escape_label(v)}"' for k, v in labels.items()) + '}'
+
+
+def format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def parse_buckets(text: Optional[str]) -> Tuple[float, ...]:
+    """'0.05,0.1,0.5' → sorted upper bounds in seconds (defaults when empty)."""
+    if not text:
+        return DEFAULT_BUCKETS
+    try:
+        buckets = sorted({float(part) for part in text.split(',') if part.strip()})
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid bucket list: {text}")
+    if not buckets or buckets[0] <= 0:
+        raise argparse.ArgumentTypeError("Buckets must be positive numbers of seconds")
+    return tuple(buckets)
+
+
+class RunnerMetrics:
+    """Thread-safe counters and fixed-bucket histograms fed by runner results.
+
+    Register record() as a CollectionRunner listener; in-flight gauges are
+    read from the runner itself at scrape time.
+    """
+
+    def __init__(self, runner=None, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.runner = runner
+        self.buckets = tuple(sorted(buckets))
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self.requests: Dict[Tuple[str, str, str, str], int] = {}
+        self.errors: Dict[Tuple[str, str], int] = {}
+        # (service, rpc) → [per-bucket counts..., +Inf count], sum
+        self.histograms: Dict[Tuple[str, str], List[int]] = {}
+        self.sums: Dict[Tuple[str, str], float] = {}
+
+    def record(self, result):
+        """CollectionRunner listener."""
+        endpoint = endpoint_labels(result.key)
+        code = str(result.status) if result.status else 'error'
+        with self._lock:
+            key = (*endpoint, result.item.method, code)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            if not result.ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+            if result.status is None:
+                return
+            counts = self.histograms.setdefault(endpoint, [0] * (len(self.buckets) + 1))
+            for index, bound in enumerate(self.buckets):
+                if result.latency <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self.sums[endpoint] = self.sums.get(endpoint, 0.0) + result.latency
+
+    def render(self, openmetrics: bool = False) -> str:
+        """Exposition text in Prometheus 0.0.4 or OpenMetrics 1.0 format."""
+        lines = []
+
+        def family(name: str, kind: str, help_text: str):
+            # OpenMetrics names counter families without the _total suffix
+            shown = name[:-len('_total')] if openmetrics and kind == 'counter' else name
+            lines.append(f"# HELP {shown} {help_text}")
+            lines.append(f"# TYPE {shown} {kind}")
+
+        with self._lock:
+            requests = dict(self.requests)
+            errors = dict(self.errors)
+            histograms = {k: list(v) for k, v in self.histograms.items()}
+            sums = dict(self.sums)
+        in_flight = dict(self.runner.in_flight) if self.runner is not None else {}
+
+        family(f"{PREFIX}_requests_total", 'counter', 'Requests completed by the load runner.')
+        for (service, rpc, method, code), value in sorted(requests.items()):
+            labels = format_labels({'service': service, 'rpc': rpc, 'method': method, 'code': code})
+            lines.append(f"{PREFIX}_requests_total{labels} {value}")
+
+        family(f"{PREFIX}_errors_total", 'counter', 'Failed requests (transport errors and non-2xx/3xx).')
+        for (service, rpc), value in sorted(errors.items()):
+            lines.append(f"{PREFIX}_errors_total{format_labels({'service': service, 'rpc': rpc})} {value}")
+
+        name = f"{PREFIX}_request_duration_seconds"
+        family(name, 'histogram', 'Client-side request latency.')
+        for (service, rpc), counts in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = format_labels({'service': service, 'rpc': rpc, 'le': format_value(float(bound))})
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+            labels = format_labels({'service': service, 'rpc': rpc})
+            lines.append(f"{name}_sum{labels} {format_value(sums.get((service, rpc), 0.0))}")
+            lines.append(f"{name}_count{labels} {cumulative}")
+
+        family(f"{PREFIX}_in_flight_requests", 'gauge', 'Requests currently waiting for a response.')
+        for key, value in sorted(in_flight.items()):
+            service, rpc = endpoint_labels(key)
+            lines.append(f"{PREFIX}_in_flight_requests{format_labels({'service': service, 'rpc': rpc})} {value}")
+
+        family(f"{PREFIX}_start_time_seconds", 'gauge', 'Unix time the run started.')
+        lines.append(f"{PREFIX}_start_time_seconds {format_value(self.started_at)}")
+        if openmetrics:
+            lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsServer:
+    """Serve /metrics from a background thread (the run keeps its event loop)."""
+
+    def __init__(self, metrics: RunnerMetrics, host: str = '127.0.0.1', port: int = 9464):
+        # Imported here so runs without --metrics-port don't pay for http.server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics_ref = metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                openmetrics = 'application/openmetrics-text' in self.headers.get('Accept', '')
+                body = metrics_ref.render(openmetrics).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', OPENMETRICS_TYPE if openmetrics else PROMETHEUS_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name='metrics-server', daemon=True)
+
+    def start(self) -> 'MetricsServer':
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TextfileWriter:
+    """Rewrite a textfile-collector .prom file every `interval` seconds."""
+
+    def __init__(self, metrics: RunnerMetrics, path: Path, interval: float = 5.0):
+        self.metrics = metrics
+        self.path = Path(path)
+        self.interval = interval
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._loop, name='metrics-textfile', daemon=True)
+
+    def write(self):
+        # Write then rename so node_exporter never reads a half-written file
+        temp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        temp.write_text(self.metrics.render())
+        os.replace(temp, self.path)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def start(self) -> 'TextfileWriter':
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.write()
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.thread.join()
+        self.write()
+
+
+class MetricsExporter:
+    """The metrics plus whichever outputs were requested."""
+
+    def __init__(self, metrics: RunnerMetrics, server: Optional[MetricsServer] = None,
+                 textfile: Optional[TextfileWriter] = None):
+        self.metrics = metrics
+        self.server = server
+        self.textfile = textfile
+
+    def stop(self):
+        if self.server:
+            self.server.stop()
+        if self.textfile:
+            self.textfile.stop()
+
+
+def add_metrics_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--metrics-port', type=int, help='Serve Prometheus metrics on this port (/metrics)')
+    parser.add_argument('--metrics-host', default='127.0.0.1', help='Bind address for --metrics-port')
+    parser.add_argument('--metrics-textfile', help='Rewrite this textfile-collector .prom file while running')
+    parser.add_argument('--metrics-interval', type=float, default=5.0, help='Textfile rewrite interval (seconds)')
+    parser.add_argument('--metrics-buckets', type=parse_buckets, default=DEFAULT_BUCKETS,
+                        help='Histogram upper bounds in seconds (e.g. 0.05,0.1,0.25,0.5,1)')
+
+
+def start_metrics(args, runner) -> Optional[MetricsExporter]:
+    """Attach metrics to a runner when --metrics-port or --metrics-textfile is given."""
+    if getattr(args, 'metrics_port', None) is None and not getattr(args, 'metrics_textfile', None):
+        return None
+    metrics = RunnerMetrics(runner, args.metrics_buckets)
+    runner.add_listener(metrics.record)
+    server = textfile = None
+    if args.metrics_port is not None:
+        server = MetricsServer(metrics, args.metrics_host, args.metrics_port).start()
+        print(f"📊 Metrics on http://{args.metrics_host}:{server.port}/metrics")
+    if args.metrics_textfile:
+        textfile = TextfileWriter(metrics, Path(args.metrics_textfile), args.metrics_interval).start()
+        print(f"📊 Metrics textfile: {args.metrics_textfile}")
+    return MetricsExporter(metrics, server, textfile)
+
+
+def stop_metrics(exporter: Optional[MetricsExporter]):
+    if exporter is not None:
+        exporter.stop()
@@ -33,28 +33,11 @@ for service in "${SERVICES[@]}"; do
 done
 echo ""
 
-# Generate collection for each service
-for service in "${SERVICES[@]}"; do
-    echo "⚙️  Processing $service..."
-    
-    proto_file="$PROTO_DIR/${service}.proto"
-    
-    if [ ! -f "$proto_file" ]; then
-        echo "  ⚠️  Proto file not found: $proto_file (skipping)"
-        continue
-    fi
-    
-    output_file="$OUTPUT_DIR/rallymate_${service^}_Service.postman_collection.json"
-    
-    python3 generate_collection.py \
-        --proto-dir "$PROTO_DIR" \
-        --service "$service" \
-        --output "$output_file" \
-        --base-url "{{base_url}}"
-    
-    echo "  ✅ Generated: $output_file"
-    echo ""
-done
+# Generate the collections in one run of the shared generator
+python3 rallymate.py generate "${SERVICES[@]}" \
+    --proto-dir "$PROTO_DIR" \
+    --output-dir "$OUTPUT_DIR" \
+    --base-url "{{base_url}}"
 
 echo ""
 echo "✨ Collection generation complete!"
@@ -62,14 +45,11 @@ echo ""
 echo "📋 Next steps:"
 echo "  1. Review generated collections in: $OUTPUT_DIR/"
 echo "  2. Import collections into Postman"
-echo "  3. Create environment variables (base_url, session_token, etc.)"
+echo "  3. Import the rallymate-*.postman_environment.json environments"
 echo "  4. Customize test data in request bodies"
-echo "  5. Enhance test scripts for your specific needs"
 echo ""
 echo "💡 Tip: The generated collections are starting points."
 echo "   You'll want to:"
-echo "   - Add realistic test data"
-echo "   - Enhance test scripts with variable extraction"
-echo "   - Add request descriptions"
+echo "   - Customize test data for your environment"
 echo "   - Organize into folders by feature"
 echo ""
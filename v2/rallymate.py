@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the rallymate collection tools.
+
+Subcommands forward to the existing scripts, which are imported only when
+their subcommand runs, so `--help` and single-service generation start
+quickly (pre-commit hooks call this on every commit):
+
+    generate   Postman collections from protos      (generate_postman_collections.py)
+    data       Multi-tenant dataset builder          (dataset_builder.py)
+    run        Runner: run/scenario/soak/compare/capacity/distribute (collection_runner.py)
+    bench      Benchmarks: connection, compression, cache, grpc, upload, commands, har
+    mock       Local stub gateway                     (stub_server.py)
+    index      Endpoint lookup and proto coverage     (collection_index.py)
+    merge      Merge regenerated items into a collection (collection_merge.py)
+
+Usage:
+    python rallymate.py generate facilities --output -
+    python rallymate.py run generated/auth_service.postman_collection.json \\
+        -e generated/rallymate-local.postman_environment.json
+    python rallymate.py run soak --scenario scenarios/production-mix.json --duration 4h
+    python rallymate.py bench cache generated/facilities_service.postman_collection.json --var id=1
+    python rallymate.py mock --port 8080 --latency-ms 5
+    python rallymate.py index lookup "POST /api/facilities/{id}/locks"
+"""
+
+import argparse
+import importlib
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# command → (module, help); modules are imported on dispatch only
+COMMANDS: Dict[str, Tuple[str, str]] = {
+    'generate': ('generate_postman_collections', 'Generate Postman collections from proto files'),
+    'data': ('dataset_builder', 'Build a multi-tenant test dataset'),
+    'run': ('collection_runner', 'Run collections (run, scenario, soak, compare, capacity, distribute, worker)'),
+    'bench': ('', 'Run a benchmark (see: bench --help)'),
+    'mock': ('stub_server', 'Run the local stub gateway'),
+    'index': ('collection_index', 'Find where an endpoint is tested; proto coverage report'),
+    'merge': ('collection_merge', 'Merge regenerated items into a hand-maintained collection'),
+}
+
+BENCHMARKS: Dict[str, Tuple[str, str]] = {
+    'connection': ('connection_bench', 'Per-phase timings for fresh, pooled and HTTP/2 connections'),
+    'compression': ('compression_bench', 'Accept-Encoding and compressed request bodies per endpoint'),
+    'cache': ('cache_bench', 'Conditional GET hit rate and savings'),
+    'grpc': ('grpc_bench', 'Native gRPC vs REST-transcoded latency per RPC'),
+    'upload': ('upload_bench', 'Video upload throughput'),
+    'commands': ('command_stress', 'Edge API command stress'),
+    'har': ('har_replay', 'Replay a HAR capture'),
+}
+
+RUNNER_MODES = ('run', 'scenario', 'soak', 'compare', 'capacity', 'distribute', 'worker')
+
+
+def build_parser(prog: str, description: str, commands: Dict[str, Tuple[str, str]]) -> argparse.ArgumentParser:
+    """Parser used only for help and usage errors; arguments go to the subcommand's own parser."""
+    parser = argparse.ArgumentParser(prog=prog, description=description)
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    for name, (_, help_text) in commands.items():
+        subparsers.add_parser(name, help=help_text, add_help=False)
+    return parser
+
+
+def dispatch(module_name: str, prog: str, argv: List[str]) -> int:
+    """Import a tool and run its main() as if it had been called as `prog argv...`."""
+    module = importlib.import_module(module_name)
+    saved = sys.argv
+    sys.argv = [prog] + argv
+    try:
+        return module.main() or 0
+    finally:
+        sys.argv = saved
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    parser = build_parser('rallymate', 'rallymate collection generator, runner and benchmarks', COMMANDS)
+    if not argv or argv[0] in ('-h', '--help'):
+        parser.print_help()
+        return 0 if argv else 2
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        parser.error(f"unknown command '{command}' (choose from {', '.join(COMMANDS)})")
+
+    if command == 'bench':
+        bench_parser = build_parser('rallymate bench', 'rallymate benchmarks', BENCHMARKS)
+        if not rest or rest[0] in ('-h', '--help'):
+            bench_parser.print_help()
+            return 0 if rest else 2
+        if rest[0] not in BENCHMARKS:
+            bench_parser.error(f"unknown benchmark '{rest[0]}' (choose from {', '.join(BENCHMARKS)})")
+        return dispatch(BENCHMARKS[rest[0]][0], f"rallymate bench {rest[0]}", rest[1:])
+
+    if command == 'run' and (not rest or rest[0] not in RUNNER_MODES + ('-h', '--help')):
+        # `rallymate run <collections>` is shorthand for `rallymate run run <collections>`
+        rest = ['run'] + rest
+    return dispatch(COMMANDS[command][0], f"rallymate {command}", rest)
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,690 @@
+#!/usr/bin/env python3
+"""
+Persistent, append-only store of per-request run results with trend queries.
+
+Layout (no database server, standard library only):
+
+    results/
+      index.jsonl                 one line per finished run: id, time span,
+                                  git revision, and per-endpoint
+                                  requests/errors/p50/p99
+      runs/<run_id>/
+        meta.json                 run metadata + endpoint dictionary
+        summary.json              mergeable EndpointStats per endpoint
+        endpoint.u16 offset_ms.u32 latency_us.u32 status.u16 ok.u8 wire_bytes.u32
+                                  one fixed-width column file per field
+
+Rows are buffered and appended to the column files in blocks, so a soak run
+with millions of requests never holds them in memory. A run directory is
+written as <run_id>.partial and renamed when the run closes, then its index
+line is appended; crashed runs never show up in queries.
+
+Trend queries read only index.jsonl (by run) or the summary.json of the
+matching runs (by git revision, merging histograms exactly), so they stay
+fast after months of nightly runs. Column files are read only for per-run
+timelines.
+
+compare tests a candidate run against a baseline per Service.Rpc on the
+whole latency distribution (Mann-Whitney U for the body, a tail exceedance
+test for p99, a two-proportion test for errors; Bonferroni-corrected) and
+exits 1 when an endpoint is both significantly and materially slower.
+
+Usage:
+    python collection_runner.py run generated/*_service.postman_collection.json --store results
+    python results_store.py import-newman newman-report.json --store results
+    python results_store.py runs --store results
+    python results_store.py trend FacilitiesService.GetFacilities --by rev --since 90d
+    python results_store.py show 20250115-020000-ab12 --timeline 60
+    python results_store.py compare previous latest --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from latency_stats import EndpointStats, format_stats_table, ks_shift, mann_whitney, two_proportion_test
+from rpc_catalog import DESCRIPTION_PATTERN
+
+SCRIPT_DIR = Path(__file__).parent
+DEFAULT_STORE = Path(os.environ.get('RALLYMATE_RESULTS_STORE', SCRIPT_DIR / 'results'))
+
+# (column, array typecode); every column has exactly one entry per row
+COLUMNS = (
+    ('endpoint', 'H'),     # index into meta.json 'endpoints'
+    ('offset_ms', 'I'),    # start time relative to the run start
+    ('latency_us', 'I'),
+    ('status', 'H'),       # 0 when the request failed at transport level
+    ('ok', 'B'),
+    ('wire_bytes', 'I'),
+)
+SUFFIXES = {'B': 'u8', 'H': 'u16', 'I': 'u32'}
+FLUSH_ROWS = 65536
+UINT32_MAX = 2 ** 32 - 1
+
+
+def git_revision(cwd: Path = SCRIPT_DIR) -> Optional[str]:
+    """Short commit hash of the working tree, or None outside a git checkout."""
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=cwd, capture_output=True,
+                                text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if output.returncode != 0:
+        return None
+    return output.stdout.strip() or None
+
+
+def column_path(run_dir: Path, name: str, typecode: str) -> Path:
+    return run_dir / f"{name}.{SUFFIXES[typecode]}"
+
+
+def endpoint_matches(key: str, service: Optional[str] = None, rpc: Optional[str] = None) -> bool:
+    """Match 'FacilitiesService.GetFacilities' / 'auth/Send OTP' keys by service and RPC name."""
+    if '.' in key:
+        key_service, _, key_rpc = key.partition('.')
+    else:
+        key_service, _, key_rpc = key.partition('/')
+    if service and service.lower().replace('_', '') not in key_service.lower():
+        return False
+    return not rpc or rpc.lower() in (key_rpc.lower(), key.lower())
+
+
+class RunWriter:
+    """Append one run's per-request rows to the store.
+
+    Use as a CollectionRunner listener (writer.record) and close() when the
+    run ends; the run becomes visible to queries only then.
+    """
+
+    def __init__(self, store: 'ResultStore', command: str, label: str = '', rev: Optional[str] = None,
+                 flush_rows: int = FLUSH_ROWS, started_at: Optional[float] = None):
+        self.store = store
+        self.started_at = time.time() if started_at is None else started_at
+        stamp = datetime.fromtimestamp(self.started_at).strftime('%Y%m%d-%H%M%S')
+        self.run_id = f"{stamp}-{uuid.uuid4().hex[:4]}"
+        self.meta = {
+            'run_id': self.run_id,
+            'command': command,
+            'label': label,
+            'rev': rev if rev is not None else git_revision(),
+            'host': socket.gethostname(),
+            'started_at': self.started_at,
+            'byteorder': sys.byteorder,
+        }
+        self.flush_rows = flush_rows
+        self.endpoints: Dict[str, int] = {}
+        self.stats: Dict[str, EndpointStats] = {}
+        self.rows = 0
+        self.last_at = self.started_at
+        self.dir = store.runs_dir / f"{self.run_id}.partial"
+        self.dir.mkdir(parents=True)
+        self._buffers = {name: array(code) for name, code in COLUMNS}
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, key: str, started_at: float, latency: float, status: Optional[int], ok: bool,
+            wire_bytes: int = 0):
+        """Append one request row."""
+        index = self.endpoints.setdefault(key, len(self.endpoints))
+        buffers = self._buffers
+        buffers['endpoint'].append(index)
+        buffers['offset_ms'].append(min(max(int((started_at - self.started_at) * 1000), 0), UINT32_MAX))
+        buffers['latency_us'].append(min(int(latency * 1e6), UINT32_MAX))
+        buffers['status'].append(status or 0)
+        buffers['ok'].append(1 if ok else 0)
+        buffers['wire_bytes'].append(min(wire_bytes or 0, UINT32_MAX))
+        self.stats.setdefault(key, EndpointStats()).record(latency, status, ok)
+        self.last_at = max(self.last_at, started_at + latency)
+        self.rows += 1
+        if len(buffers['ok']) >= self.flush_rows:
+            self.flush()
+
+    def record(self, result):
+        """CollectionRunner listener: store a RequestResult."""
+        self.add(result.key, result.started_at, result.latency, result.status, result.ok,
+                 getattr(result, 'wire_bytes', 0))
+
+    def flush(self):
+        for name, code in COLUMNS:
+            buffer = self._buffers[name]
+            if buffer:
+                with open(column_path(self.dir, name, code), 'ab') as f:
+                    buffer.tofile(f)
+                self._buffers[name] = array(code)
+
+    def close(self) -> Optional[str]:
+        """Finish the run; returns its id (None if nothing was recorded)."""
+        if self.closed:
+            return self.run_id if self.rows else None
+        self.closed = True
+        self.flush()
+        if not self.rows:
+            for path in self.dir.iterdir():
+                path.unlink()
+            self.dir.rmdir()
+            return None
+
+        self.meta.update({
+            'ended_at': self.last_at,
+            'rows': self.rows,
+            'endpoints': sorted(self.endpoints, key=self.endpoints.get),
+        })
+        (self.dir / 'meta.json').write_text(json.dumps(self.meta, indent=2))
+        (self.dir / 'summary.json').write_text(json.dumps(
+            {key: stats.to_dict() for key, stats in self.stats.items()}))
+        self.dir.rename(self.store.runs_dir / self.run_id)
+        self.store.append_index({
+            **{k: self.meta[k] for k in ('run_id', 'command', 'label', 'rev', 'host', 'started_at', 'ended_at',
+                                         'rows')},
+            'endpoints': {
+                key: [s.requests, s.errors, round(s.latency.percentile(50) * 1000, 3),
+                      round(s.latency.percentile(99) * 1000, 3)]
+                for key, s in sorted(self.stats.items())
+            },
+        })
+        return self.run_id
+
+
+class ResultStore:
+    """A directory of append-only run segments plus an index."""
+
+    def __init__(self, root: Path = DEFAULT_STORE):
+        self.root = Path(root)
+        self.runs_dir = self.root / 'runs'
+        self.index_path = self.root / 'index.jsonl'
+
+    def writer(self, command: str, label: str = '', rev: Optional[str] = None, **kwargs) -> RunWriter:
+        self.runs_dir.mkdir(parents=True, exist_ok=True)
+        return RunWriter(self, command, label, rev, **kwargs)
+
+    def append_index(self, entry: Dict[str, Any]):
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        # One write per line with O_APPEND keeps concurrent writers from interleaving
+        fd = os.open(self.index_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode('utf-8'))
+        finally:
+            os.close(fd)
+
+    def runs(self, since: Optional[float] = None, until: Optional[float] = None, rev: Optional[str] = None,
+             service: Optional[str] = None, rpc: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Index entries (oldest first) filtered by time, revision and endpoint."""
+        if not self.index_path.exists():
+            return
+        with open(self.index_path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if since is not None and entry['ended_at'] < since:
+                    continue
+                if until is not None and entry['started_at'] > until:
+                    continue
+                if rev and not (entry.get('rev') or '').startswith(rev):
+                    continue
+                if (service or rpc) and not any(endpoint_matches(k, service, rpc) for k in entry['endpoints']):
+                    continue
+                yield entry
+
+    def meta(self, run_id: str) -> Dict[str, Any]:
+        with open(self.runs_dir / run_id / 'meta.json') as f:
+            return json.load(f)
+
+    def summary(self, run_id: str) -> Dict[str, EndpointStats]:
+        with open(self.runs_dir / run_id / 'summary.json') as f:
+            return {key: EndpointStats.from_dict(data) for key, data in json.load(f).items()}
+
+    def resolve(self, ref: str) -> Tuple[List[str], Dict[str, EndpointStats]]:
+        """Run ids and merged stats for a run id, 'latest', 'previous' or a git revision prefix."""
+        if ref in ('latest', 'previous'):
+            entries = list(self.runs())
+            position = -1 if ref == 'latest' else -2
+            if len(entries) < -position:
+                raise ValueError(f"Not enough stored runs for '{ref}'")
+            ref = entries[position]['run_id']
+        if (self.runs_dir / ref).is_dir():
+            return [ref], self.summary(ref)
+        run_ids = [entry['run_id'] for entry in self.runs(rev=ref)]
+        if not run_ids:
+            raise ValueError(f"No run or git revision matches '{ref}'")
+        merged: Dict[str, EndpointStats] = {}
+        for run_id in run_ids:
+            for key, stats in self.summary(run_id).items():
+                merged.setdefault(key, EndpointStats()).merge(stats)
+        return run_ids, merged
+
+    def columns(self, run_id: str, names: Optional[List[str]] = None) -> Dict[str, array]:
+        """Load a run's column files (all, or the named ones)."""
+        run_dir = self.runs_dir / run_id
+        swap = self.meta(run_id).get('byteorder', sys.byteorder) != sys.byteorder
+        data = {}
+        for name, code in COLUMNS:
+            if names and name not in names:
+                continue
+            values = array(code)
+            path = column_path(run_dir, name, code)
+            with open(path, 'rb') as f:
+                values.fromfile(f, path.stat().st_size // values.itemsize)
+            if swap:
+                values.byteswap()
+            data[name] = values
+        return data
+
+    def trend(self, service: Optional[str] = None, rpc: Optional[str] = None, by: str = 'run',
+              since: Optional[float] = None, until: Optional[float] = None,
+              rev: Optional[str] = None) -> List[Dict[str, Any]]:
+        """p50/p99/error-rate per run or per git revision for matching endpoints.
+
+        by='run' reads only the index (several endpoints are combined by
+        request-weighted p50/p99); by='rev' merges the runs' histograms.
+        """
+        points: List[Dict[str, Any]] = []
+        groups: Dict[str, Dict[str, Any]] = {}
+        for entry in self.runs(since, until, rev, service, rpc):
+            matched = {k: v for k, v in entry['endpoints'].items() if endpoint_matches(k, service, rpc)}
+            if by == 'run':
+                requests = sum(v[0] for v in matched.values())
+                errors = sum(v[1] for v in matched.values())
+                weight = requests or 1
+                points.append({
+                    'run_id': entry['run_id'],
+                    'rev': entry.get('rev'),
+                    'started_at': entry['started_at'],
+                    'requests': requests,
+                    'error_rate': errors / requests if requests else 0.0,
+                    'p50_ms': round(sum(v[0] * v[2] for v in matched.values()) / weight, 3),
+                    'p99_ms': round(sum(v[0] * v[3] for v in matched.values()) / weight, 3),
+                })
+                continue
+            group = groups.setdefault(entry.get('rev') or 'unknown', {
+                'rev': entry.get('rev') or 'unknown', 'started_at': entry['started_at'], 'runs': 0,
+                'stats': EndpointStats(),
+            })
+            group['runs'] += 1
+            for key, stats in self.summary(entry['run_id']).items():
+                if key in matched:
+                    group['stats'].merge(stats)
+
+        for group in groups.values():
+            stats = group.pop('stats')
+            points.append({
+                **group,
+                'requests': stats.requests,
+                'error_rate': stats.error_rate,
+                'p50_ms': round(stats.latency.percentile(50) * 1000, 3),
+                'p99_ms': round(stats.latency.percentile(99) * 1000, 3),
+            })
+        return sorted(points, key=lambda p: p['started_at'])
+
+    def timeline(self, run_id: str, window: float, service: Optional[str] = None,
+                 rpc: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Bucket a run's rows into windows of `window` seconds."""
+        endpoints = self.meta(run_id)['endpoints']
+        wanted = {i for i, key in enumerate(endpoints) if endpoint_matches(key, service, rpc)}
+        cols = self.columns(run_id, ['endpoint', 'offset_ms', 'latency_us', 'status', 'ok'])
+        width = max(int(window * 1000), 1)
+        buckets: Dict[int, EndpointStats] = {}
+        for endpoint, offset, latency, status, ok in zip(cols['endpoint'], cols['offset_ms'], cols['latency_us'],
+                                                         cols['status'], cols['ok']):
+            if endpoint in wanted:
+                buckets.setdefault(offset // width, EndpointStats()).record(latency / 1e6, status or None,
+                                                                            bool(ok))
+        return [{
+            'start_s': index * width / 1000,
+            'requests': stats.requests,
+            'error_rate': stats.error_rate,
+            'p50_ms': round(stats.latency.percentile(50) * 1000, 3),
+            'p99_ms': round(stats.latency.percentile(99) * 1000, 3),
+        } for index, stats in sorted(buckets.items())]
+
+
+def compare_stats(baseline: Dict[str, EndpointStats], candidate: Dict[str, EndpointStats],
+                  threshold: float = 0.2, alpha: float = 0.01, min_samples: int = 20,
+                  max_error_increase: float = 0.01) -> List[Dict[str, Any]]:
+    """Per-endpoint verdicts for a candidate against a baseline.
+
+    An endpoint regresses when a test is significant at alpha (Bonferroni-
+    corrected over the compared endpoints) and the effect is material:
+    p50 or p99 at least `threshold` slower, or the error rate up by at least
+    `max_error_increase`. With large samples even tiny shifts are
+    significant, so both conditions are required.
+
+    Args:
+        baseline: EndpointStats per Service.Rpc of the baseline
+        candidate: EndpointStats per Service.Rpc of the candidate
+        threshold: Relative slowdown that counts (0.2 = 20%)
+        alpha: Family-wise significance level
+        min_samples: Fewer requests on either side → 'insufficient'
+        max_error_increase: Absolute error-rate increase that counts
+
+    Returns:
+        One row per endpoint with percentiles, ratios, p-values and a verdict
+        (regression, faster, ok, insufficient, new, missing)
+    """
+    keys = sorted(set(baseline) | set(candidate))
+    comparable = [k for k in keys if k in baseline and k in candidate
+                  and min(baseline[k].requests, candidate[k].requests) >= min_samples]
+    corrected = alpha / max(len(comparable), 1)
+    rows = []
+    for key in keys:
+        base, cand = baseline.get(key), candidate.get(key)
+        row: Dict[str, Any] = {'endpoint': key}
+        if base is None or cand is None:
+            row['verdict'] = 'new' if base is None else 'missing'
+            rows.append(row)
+            continue
+        base_p50, cand_p50 = base.latency.percentile(50), cand.latency.percentile(50)
+        base_p99, cand_p99 = base.latency.percentile(99), cand.latency.percentile(99)
+        row.update({
+            'baseline_requests': base.requests,
+            'candidate_requests': cand.requests,
+            'baseline_p50_ms': round(base_p50 * 1000, 3),
+            'candidate_p50_ms': round(cand_p50 * 1000, 3),
+            'baseline_p99_ms': round(base_p99 * 1000, 3),
+            'candidate_p99_ms': round(cand_p99 * 1000, 3),
+            'p50_ratio': round(cand_p50 / base_p50, 3) if base_p50 else None,
+            'p99_ratio': round(cand_p99 / base_p99, 3) if base_p99 else None,
+            'baseline_error_rate': round(base.error_rate, 4),
+            'candidate_error_rate': round(cand.error_rate, 4),
+        })
+        if key not in comparable:
+            row['verdict'] = 'insufficient'
+            rows.append(row)
+            continue
+
+        slower = mann_whitney(base.latency, cand.latency)
+        faster = mann_whitney(cand.latency, base.latency)
+        # Share of requests slower than the baseline p99, baseline vs candidate
+        tail_p = two_proportion_test(base.latency.count_above(base_p99), base.latency.count,
+                                     cand.latency.count_above(base_p99), cand.latency.count)
+        error_p = two_proportion_test(base.errors, base.requests, cand.errors, cand.requests)
+        row.update({
+            'prob_slower': slower['prob_slower'],
+            'mann_whitney_p': slower['p_value'],
+            'ks': ks_shift(base.latency, cand.latency),
+            'tail_p': tail_p,
+            'error_p': error_p,
+        })
+
+        reasons = []
+        if slower['p_value'] < corrected and (row['p50_ratio'] or 0) >= 1 + threshold:
+            reasons.append(f"p50 ×{row['p50_ratio']:.2f}")
+        if tail_p < corrected and (row['p99_ratio'] or 0) >= 1 + threshold:
+            reasons.append(f"p99 ×{row['p99_ratio']:.2f}")
+        if error_p < corrected and cand.error_rate - base.error_rate >= max_error_increase:
+            reasons.append(f"errors {base.error_rate:.1%} → {cand.error_rate:.1%}")
+        if reasons:
+            row['verdict'] = 'regression'
+            row['reasons'] = reasons
+        elif faster['p_value'] < corrected and (row['p50_ratio'] or 1) <= 1 / (1 + threshold):
+            row['verdict'] = 'faster'
+        else:
+            row['verdict'] = 'ok'
+        rows.append(row)
+    return rows
+
+
+def newman_key(collection_name: str, execution: Dict) -> str:
+    """Service.Rpc key for a Newman execution, matching collection_runner.load_items."""
+    item = execution.get('item', {})
+    description = item.get('request', {}).get('description') or ''
+    if isinstance(description, dict):
+        description = description.get('content', '')
+    match = DESCRIPTION_PATTERN.search(description)
+    if match:
+        return f"{collection_name.replace('rallymate ', '', 1)}.{match.group(1)}"
+    return f"{collection_name}/{item.get('name', '?')}"
+
+
+def import_newman(store: ResultStore, report_path: Path, rev: Optional[str] = None) -> Optional[str]:
+    """Store the executions of a Newman JSON reporter file as one run."""
+    with open(report_path) as f:
+        report = json.load(f)
+    run = report.get('run', {})
+    collection_name = report.get('collection', {}).get('info', {}).get('name', report_path.stem)
+    started = run.get('timings', {}).get('started')
+    started_at = started / 1000.0 if started else report_path.stat().st_mtime
+
+    writer = store.writer('newman', collection_name, rev, started_at=started_at)
+    offset = 0.0
+    for execution in run.get('executions', []):
+        response = execution.get('response') or {}
+        latency = (response.get('responseTime') or 0) / 1000.0
+        status = response.get('code')
+        failed_assertion = any(a.get('error') for a in execution.get('assertions') or [])
+        ok = bool(status) and status < 400 and not execution.get('requestError') and not failed_assertion
+        writer.add(newman_key(collection_name, execution), started_at + offset, latency, status, ok,
+                   response.get('responseSize') or 0)
+        offset += latency
+    return writer.close()
+
+
+def parse_since(text: Optional[str]) -> Optional[float]:
+    """'30d', '12h', '90m' back from now, or an ISO date."""
+    if not text:
+        return None
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([dhm])', text.strip())
+    if match:
+        return time.time() - float(match.group(1)) * {'d': 86400, 'h': 3600, 'm': 60}[match.group(2)]
+    return datetime.fromisoformat(text).timestamp()
+
+
+def split_endpoint(endpoint: Optional[str]):
+    """'FacilitiesService.GetFacilities' → (service, rpc); a bare name is treated as a service."""
+    if not endpoint:
+        return None, None
+    if '.' in endpoint or '/' in endpoint:
+        service, _, rpc = endpoint.replace('/', '.', 1).partition('.')
+        return service, rpc
+    return endpoint, None
+
+
+def _date(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M')
+
+
+def cmd_runs(store: ResultStore, args) -> int:
+    service, rpc = split_endpoint(args.endpoint)
+    entries = list(store.runs(parse_since(args.since), rev=args.rev, service=service, rpc=rpc))
+    print(f"{'Run':<22} {'Started':<17} {'Rev':<10} {'Command':<9} {'Rows':>9} {'Endpoints':>9}  Label")
+    for entry in entries[-args.limit:]:
+        print(f"{entry['run_id']:<22} {_date(entry['started_at']):<17} {entry.get('rev') or '-':<10} "
+              f"{entry['command']:<9} {entry['rows']:>9} {len(entry['endpoints']):>9}  {entry.get('label', '')}")
+    print(f"\n📚 {len(entries)} runs in {store.root}")
+    return 0
+
+
+def cmd_trend(store: ResultStore, args) -> int:
+    service, rpc = split_endpoint(args.endpoint)
+    points = store.trend(service, rpc, args.by, parse_since(args.since), rev=args.rev)
+    if not points:
+        print(f"❌ No runs found for {args.endpoint or 'any endpoint'}")
+        return 1
+    label = 'Run' if args.by == 'run' else 'Rev'
+    print(f"📈 {args.endpoint or 'all endpoints'} by {args.by}\n")
+    print(f"{label:<22} {'Started':<17} {'Rev':<10} {'Requests':>9} {'p50 ms':>9} {'p99 ms':>9} {'Errors':>8}")
+    for point in points:
+        name = point.get('run_id') or f"{point['rev']} ({point['runs']} runs)"
+        print(f"{name:<22} {_date(point['started_at']):<17} {point.get('rev') or '-':<10} "
+              f"{point['requests']:>9} {point['p50_ms']:>9.2f} {point['p99_ms']:>9.2f} "
+              f"{point['error_rate'] * 100:>7.2f}%")
+    if len(points) > 1:
+        first, last = points[0], points[-1]
+        print(f"\n🔁 p99 {first['p99_ms']:.2f} → {last['p99_ms']:.2f}ms, "
+              f"errors {first['error_rate']:.2%} → {last['error_rate']:.2%} over {len(points)} points")
+    if args.report:
+        Path(args.report).write_text(json.dumps(points, indent=2))
+        print(f"\n💾 Report saved: {args.report}")
+    return 0
+
+
+def cmd_show(store: ResultStore, args) -> int:
+    if not (store.runs_dir / args.run_id).is_dir():
+        print(f"❌ Unknown run: {args.run_id}")
+        return 1
+    meta = store.meta(args.run_id)
+    print(f"🗃️  Run {meta['run_id']} ({meta['command']}, rev {meta.get('rev') or '-'}, {meta['rows']} rows)")
+    print(f"   {_date(meta['started_at'])} → {_date(meta['ended_at'])}  {meta.get('label', '')}\n")
+    service, rpc = split_endpoint(args.endpoint)
+    if args.timeline:
+        print(f"{'Window':>8} {'Requests':>9} {'p50 ms':>9} {'p99 ms':>9} {'Errors':>8}")
+        for row in store.timeline(args.run_id, args.timeline, service, rpc):
+            print(f"{row['start_s']:>7.6g}s {row['requests']:>9} {row['p50_ms']:>9.2f} {row['p99_ms']:>9.2f} "
+                  f"{row['error_rate'] * 100:>7.2f}%")
+        return 0
+    stats = {k: v for k, v in store.summary(args.run_id).items() if endpoint_matches(k, service, rpc)}
+    print(format_stats_table(stats))
+    return 0
+
+
+VERDICT_ICONS = {'regression': '🔴', 'faster': '🟢', 'ok': '✅', 'insufficient': '⚪',
+                 'new': '🆕', 'missing': '➖'}
+
+
+def cmd_compare(store: ResultStore, args) -> int:
+    try:
+        baseline_runs, baseline = store.resolve(args.baseline)
+        candidate_runs, candidate = store.resolve(args.candidate)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+    service, rpc = split_endpoint(args.endpoint)
+    baseline = {k: v for k, v in baseline.items() if endpoint_matches(k, service, rpc)}
+    candidate = {k: v for k, v in candidate.items() if endpoint_matches(k, service, rpc)}
+    rows = compare_stats(baseline, candidate, args.threshold, args.alpha, args.min_samples,
+                         args.max_error_increase)
+
+    print(f"⚖️  Baseline {args.baseline} ({len(baseline_runs)} runs) vs candidate {args.candidate} "
+          f"({len(candidate_runs)} runs)")
+    print(f"   regression = significant at α={args.alpha} (Bonferroni) and ≥{args.threshold:.0%} slower "
+          f"or errors +{args.max_error_increase:.1%}\n")
+    print(f"{'Endpoint':<40} {'p50 base':>9} {'p50 cand':>9} {'p99 base':>9} {'p99 cand':>9} "
+          f"{'P(slower)':>9}  Verdict")
+    for row in rows:
+        icon = VERDICT_ICONS[row['verdict']]
+        if 'baseline_p50_ms' not in row:
+            print(f"{row['endpoint'][:40]:<40} {'':>49}  {icon} {row['verdict']}")
+            continue
+        detail = ', '.join(row.get('reasons', []))
+        prob = f"{row['prob_slower']:.2f}" if 'prob_slower' in row else '-'
+        print(f"{row['endpoint'][:40]:<40} {row['baseline_p50_ms']:>9.2f} {row['candidate_p50_ms']:>9.2f} "
+              f"{row['baseline_p99_ms']:>9.2f} {row['candidate_p99_ms']:>9.2f} {prob:>9}  "
+              f"{icon} {row['verdict']}{f' ({detail})' if detail else ''}")
+
+    regressions = [row for row in rows if row['verdict'] == 'regression']
+    if args.report:
+        Path(args.report).write_text(json.dumps({
+            'baseline': {'ref': args.baseline, 'runs': baseline_runs},
+            'candidate': {'ref': args.candidate, 'runs': candidate_runs},
+            'threshold': args.threshold,
+            'alpha': args.alpha,
+            'endpoints': rows,
+        }, indent=2))
+        print(f"\n💾 Report saved: {args.report}")
+    if regressions:
+        print(f"\n❌ {len(regressions)} endpoints regressed")
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+
+def add_store_argument(parser: argparse.ArgumentParser):
+    parser.add_argument('--store', default=os.environ.get('RALLYMATE_RESULTS_STORE'),
+                        help='Append per-request results to this results store '
+                             '(default: $RALLYMATE_RESULTS_STORE; off when unset)')
+
+
+def open_run_writer(args, command: str, label: str = '') -> Optional[RunWriter]:
+    """RunWriter for runner commands given --store, else None."""
+    if not getattr(args, 'store', None):
+        return None
+    return ResultStore(Path(args.store)).writer(command, label)
+
+
+def close_run_writer(writer: Optional[RunWriter]):
+    if writer is None:
+        return
+    run_id = writer.close()
+    if run_id:
+        print(f"🗃️  Stored {writer.rows} results as run {run_id} in {writer.store.root}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Query the persistent run-results store')
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--store', type=Path, default=DEFAULT_STORE,
+                        help='Store directory (default: $RALLYMATE_RESULTS_STORE or v2/results)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    runs_parser = subparsers.add_parser('runs', parents=[common], help='List stored runs')
+    runs_parser.add_argument('endpoint', nargs='?', help='Only runs with this Service.Rpc or service')
+    runs_parser.add_argument('--since', help="Only runs since '30d', '12h' or an ISO date")
+    runs_parser.add_argument('--rev', help='Only runs of this git revision')
+    runs_parser.add_argument('--limit', type=int, default=50, help='Show the most recent N runs')
+
+    trend_parser = subparsers.add_parser('trend', parents=[common],
+                                         help='p50/p99/error trend across runs or revisions')
+    trend_parser.add_argument('endpoint', nargs='?', help='Service.Rpc (e.g. FacilitiesService.GetFacilities) '
+                              'or a service name; all endpoints when omitted')
+    trend_parser.add_argument('--by', choices=['run', 'rev'], default='run', help='Point per run or git revision')
+    trend_parser.add_argument('--since', help="Only runs since '30d', '12h' or an ISO date")
+    trend_parser.add_argument('--rev', help='Only runs of this git revision')
+    trend_parser.add_argument('--report', help='Write the trend points as JSON')
+
+    show_parser = subparsers.add_parser('show', parents=[common], help='Per-endpoint stats or timeline of one run')
+    show_parser.add_argument('run_id', help='Run id (see runs)')
+    show_parser.add_argument('--endpoint', help='Only this Service.Rpc or service')
+    show_parser.add_argument('--timeline', type=float, help='Bucket rows into windows of N seconds')
+
+    compare_parser = subparsers.add_parser('compare', parents=[common],
+                                           help='Detect latency/error regressions between two runs')
+    compare_parser.add_argument('baseline', help="Run id, git revision, 'latest' or 'previous'")
+    compare_parser.add_argument('candidate', help="Run id, git revision, 'latest' or 'previous'")
+    compare_parser.add_argument('--threshold', type=float, default=0.2,
+                                help='Relative p50/p99 slowdown that fails (default 0.2 = 20%%)')
+    compare_parser.add_argument('--alpha', type=float, default=0.01, help='Family-wise significance level')
+    compare_parser.add_argument('--min-samples', type=int, default=20, help='Requests needed on both sides')
+    compare_parser.add_argument('--max-error-increase', type=float, default=0.01,
+                                help='Absolute error-rate increase that fails (default 0.01)')
+    compare_parser.add_argument('--endpoint', help='Only this Service.Rpc or service')
+    compare_parser.add_argument('--report', help='Write the comparison as JSON')
+
+    import_parser = subparsers.add_parser('import-newman', parents=[common],
+                                          help='Store a Newman JSON reporter file as a run')
+    import_parser.add_argument('reports', nargs='+', help='newman run ... -r json --reporter-json-export FILE')
+    import_parser.add_argument('--rev', help='Git revision the run was made against (default: current HEAD)')
+
+    args = parser.parse_args(argv)
+    store = ResultStore(args.store)
+    if args.command == 'runs':
+        return cmd_runs(store, args)
+    if args.command == 'trend':
+        return cmd_trend(store, args)
+    if args.command == 'show':
+        return cmd_show(store, args)
+    if args.command == 'compare':
+        return cmd_compare(store, args)
+
+    for report in args.reports:
+        run_id = import_newman(store, Path(report), args.rev)
+        print(f"🗃️  {report}: " + (f"stored as run {run_id}" if run_id else "no executions"))
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
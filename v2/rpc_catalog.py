@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Load the parsed RPC model used by the rallymate load tools.
+
+The model matches ProtoParser.parse_service() output, with each RPC extended by:
+- 'service': short service name (e.g. 'bridge')
+- 'item_name': the Postman request name (e.g. 'Register Bridge')
+- 'path_params': names of {param} segments in the HTTP path
+- 'example_body': the generated example request body (or None)
+- 'extract': (variable, response path) pairs set by the item's test script
+
+Protos are parsed directly when available; otherwise the model is recovered
+from the generated collections, whose request descriptions record the RPC,
+message types and endpoint. Services parsed from protos also carry the
+'messages' and 'enums' tables, enough to encode protobuf (grpc_bench.py).
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+from generate_postman_collections import (DEFAULT_OUTPUT_DIR, DEFAULT_PROTO_DIR, SERVICES, ProtoParser,
+                                          PostmanCollectionGenerator)
+from variables import substitute
+
+DEFAULT_GENERATED_DIR = DEFAULT_OUTPUT_DIR
+
+PATH_PARAM_PATTERN = re.compile(r'\{(\w+)\}')
+DESCRIPTION_PATTERN = re.compile(
+    r'\*\*RPC:\*\*\s*(\w+).*?\*\*Request:\*\*\s*([\w.]+).*?\*\*Response:\*\*\s*([\w.]+)'
+    r'.*?\*\*Endpoint:\*\*\s*(\w+)\s+(\S+)',
+    re.DOTALL
+)
+EXTRACT_PATTERN = re.compile(
+    r"pm\.(?:collectionVariables|environment|globals|variables)\.set\(\s*['\"](\w+)['\"]\s*,\s*"
+    r"(?:response|jsonData|data)((?:\.\w+|\[\d+\])+)\s*\)"
+)
+
+
+def load_service(service: str, proto_dir: Optional[Path] = None,
+                 generated_dir: Optional[Path] = None) -> Optional[Dict]:
+    """Load the RPC model for a service from its proto or generated collection."""
+    proto_file = Path(proto_dir or DEFAULT_PROTO_DIR) / f"{service}.proto"
+    if proto_file.exists():
+        return _load_from_proto(service, proto_file)
+
+    collection_file = Path(generated_dir or DEFAULT_GENERATED_DIR) / f"{service}_service.postman_collection.json"
+    if collection_file.exists():
+        with open(collection_file) as f:
+            return service_from_collection(service, json.load(f))
+
+    return None
+
+
+def load_services(services: Optional[List[str]] = None, proto_dir: Optional[Path] = None,
+                  generated_dir: Optional[Path] = None) -> Dict[str, Dict]:
+    """Load several services, skipping any that cannot be found."""
+    loaded = {}
+    for service in services or SERVICES:
+        data = load_service(service, proto_dir, generated_dir)
+        if data:
+            loaded[service] = data
+    return loaded
+
+
+def _load_from_proto(service: str, proto_file: Path) -> Optional[Dict]:
+    parser = ProtoParser(proto_file)
+    service_data = parser.parse_service()
+    if not service_data:
+        return None
+
+    generator = PostmanCollectionGenerator(service_data, parser)
+    for rpc in service_data['rpcs']:
+        method = rpc['http']['method']
+        path_params = PATH_PARAM_PATTERN.findall(rpc['http']['path'])
+        rpc['service'] = service
+        rpc['item_name'] = generator._format_request_name(rpc['name'])
+        rpc['path_params'] = path_params
+        rpc['example_body'] = (
+            generator._generate_request_body(rpc, path_params)
+            if method in ['POST', 'PUT', 'PATCH'] else None
+        )
+        rpc['extract'] = parse_extraction_rules(generator._generate_test_script(rpc))
+    service_data['messages'] = parser.messages
+    service_data['enums'] = parser.enums
+    return service_data
+
+
+def service_from_collection(service: str, collection: Dict) -> Dict:
+    """Recover the RPC model from a collection produced by the generator."""
+    info_name = collection.get('info', {}).get('name', '')
+    service_name = info_name.replace('rallymate ', '', 1) or service
+
+    rpcs = []
+    for item in iter_collection_items(collection.get('item', [])):
+        request = item.get('request', {})
+        match = DESCRIPTION_PATTERN.search(request.get('description') or '')
+        if not match:
+            continue
+        rpc_name, request_type, response_type, method, path = match.groups()
+
+        body_field = None
+        example_body = None
+        raw = (request.get('body') or {}).get('raw')
+        if raw:
+            body_field = '*'
+            try:
+                example_body = json.loads(raw)
+            except ValueError:
+                example_body = None
+
+        rpcs.append({
+            'name': rpc_name,
+            'request_type': request_type,
+            'response_type': response_type,
+            'http': {'method': method, 'path': path, 'body': body_field},
+            'service': service,
+            'item_name': item.get('name', rpc_name),
+            'path_params': PATH_PARAM_PATTERN.findall(path),
+            'example_body': example_body,
+            'extract': parse_extraction_rules(item_test_script(item)),
+        })
+
+    return {'name': service_name, 'rpcs': rpcs, 'package': ''}
+
+
+def iter_collection_items(items: List[Dict]):
+    """Yield leaf request items, descending into folders."""
+    for item in items:
+        if 'item' in item:
+            yield from iter_collection_items(item['item'])
+        elif 'request' in item:
+            yield item
+
+
+def item_test_script(item: Dict) -> List[str]:
+    """Return the lines of a request item's test script."""
+    lines = []
+    for event in item.get('event', []):
+        if event.get('listen') == 'test':
+            lines.extend(event.get('script', {}).get('exec', []))
+    return lines
+
+
+def parse_extraction_rules(script_lines: List[str]) -> List[tuple]:
+    """Extract (variable, response path) pairs from a Postman test script."""
+    script = '\n'.join(script_lines) if isinstance(script_lines, list) else script_lines or ''
+    rules = []
+    for variable, path in EXTRACT_PATTERN.findall(script):
+        dotted = re.sub(r'\[(\d+)\]', r'.\1', path).lstrip('.')
+        if (variable, dotted) not in rules:
+            rules.append((variable, dotted))
+    return rules
+
+
+def find_item(collection: Dict, name: str) -> Optional[Dict]:
+    """Return the first request item with the given name (any folder depth)."""
+    for item in iter_collection_items(collection.get('item', [])):
+        if item.get('name') == name:
+            return item
+    return None
+
+
+def item_body(item: Dict) -> Optional[Any]:
+    """Decode a request item's raw JSON body, if it has one."""
+    raw = (item.get('request', {}).get('body') or {}).get('raw')
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def item_url(item: Dict) -> str:
+    """Return the raw URL template of a request item."""
+    url = item.get('request', {}).get('url', '')
+    return url.get('raw', '') if isinstance(url, dict) else url
+
+
+def find_rpc(service_data: Dict, *names: str) -> Optional[Dict]:
+    """Return the first RPC whose name matches one of the candidates."""
+    by_name = {rpc['name']: rpc for rpc in service_data.get('rpcs', [])}
+    for name in names:
+        if name in by_name:
+            return by_name[name]
+    return None
+
+
+def rpc_key(service_data: Dict, rpc: Dict) -> str:
+    """Stable 'Service.Rpc' identifier used in reports."""
+    return f"{service_data['name']}.{rpc['name']}"
+
+
+def build_body(rpc: Dict, variables: Dict[str, Any],
+               overrides: Optional[Dict[str, Any]] = None) -> Optional[Dict]:
+    """Build a concrete request body from the RPC's example body.
+
+    Variables are substituted, path parameters and unresolved enum
+    placeholders are dropped, and overrides win over example values.
+    """
+    if rpc['http']['method'] not in ['POST', 'PUT', 'PATCH']:
+        return None
+    body = substitute(rpc.get('example_body') or {}, variables)
+    body = {
+        key: value for key, value in body.items()
+        if key not in rpc.get('path_params', [])
+        and not (isinstance(value, str) and value.startswith('ENUM_VALUE_'))
+    }
+    body.update(overrides or {})
+    return body
+
+
+def expand_path(path: str, params: Dict[str, Any]) -> str:
+    """Fill {param} segments of an HTTP path template."""
+    def replace(match):
+        name = match.group(1)
+        if name not in params:
+            raise KeyError(f"Missing path parameter '{name}' for {path}")
+        return str(params[name])
+    return PATH_PARAM_PATTERN.sub(replace, path)
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Weighted traffic scenarios built from collection items.
+
+A scenario is a JSON file that references collection items by service and
+name and says how often each one runs:
+
+    {
+      "name": "production-mix",
+      "rate": 50,
+      "vus": 20,
+      "think_time": [0.5, 2.0],
+      "setup": [{"service": "auth", "item": "Verify OTP"}],
+      "mix": [
+        {"service": "facilities", "item": "Get Facilities", "weight": 70},
+        {"service": "videos", "item": "Get Video", "weight": 20},
+        {"service": "auth", "item": "Verify OTP", "weight": 5},
+        {"name": "unlock", "weight": 5, "steps": [
+          {"service": "locks", "item": "Get Locks"},
+          {"service": "locks", "item": "Lock Control", "body": {"action": "UNLOCK"},
+           "think_time": 1}
+        ]}
+      ]
+    }
+
+- "item" matches the Postman request name or the RPC name (GetFacilities)
+- "collection" may point at any collection file instead of "service"
+- "body" on a step is merged over the item's example body
+- "variables" seed every virtual user's state (ids the mix needs up front)
+- think_time is a mean in seconds (exponential) or a [min, max] range
+- "setup" steps run once per virtual user; values extracted by any step
+  (session_token, facility_id, ...) stay in that user's state
+- "rate" is the target number of mix entries started per second across all
+  virtual users; without it each user runs back to back
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import random
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Union
+
+from collection_runner import (CollectionRunner, RunItem, item_variables, load_items, load_runner_resolver,
+                               parse_vars, print_session_summary, print_trace_summary)
+from http_client import HttpClient
+from latency_stats import format_stats_table
+from metrics_exporter import start_metrics, stop_metrics
+from results_store import close_run_writer, open_run_writer
+from rpc_catalog import DEFAULT_GENERATED_DIR
+
+ThinkTime = Union[None, float, List[float]]
+
+
+class ScenarioStep:
+    """One collection item to execute, with an optional think time after it."""
+
+    def __init__(self, item: RunItem, think_time: ThinkTime = None):
+        self.item = item
+        self.think_time = think_time
+
+
+class ScenarioEntry:
+    """A weighted entry of the mix: a single item or a short flow of steps."""
+
+    def __init__(self, name: str, weight: float, steps: List[ScenarioStep]):
+        self.name = name
+        self.weight = weight
+        self.steps = steps
+
+
+class Scenario:
+    """A weighted mix of collection items plus per-user setup."""
+
+    def __init__(self, name: str, entries: List[ScenarioEntry], setup: Optional[List[ScenarioStep]] = None,
+                 think_time: ThinkTime = None, rate: Optional[float] = None, vus: int = 10,
+                 variables: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.entries = entries
+        self.setup = setup or []
+        self.think_time = think_time
+        self.rate = rate
+        self.vus = vus
+        self.variables = variables or {}
+
+    @property
+    def weights(self) -> List[float]:
+        return [entry.weight for entry in self.entries]
+
+    @property
+    def items(self) -> List[RunItem]:
+        """Every item the scenario sends, setup first."""
+        return [step.item for step in self.setup + [step for entry in self.entries for step in entry.steps]]
+
+    @property
+    def collections(self) -> List[Path]:
+        """Collection files referenced by the scenario (for variable loading)."""
+        paths = []
+        for item in self.items:
+            if item.source and item.source not in paths:
+                paths.append(item.source)
+        return paths
+
+    def shares(self) -> Dict[str, float]:
+        """Fraction of iterations each entry is expected to receive."""
+        total = sum(self.weights)
+        return {entry.name: entry.weight / total for entry in self.entries}
+
+    @classmethod
+    def from_items(cls, name: str, items: List[RunItem], weights: List[float],
+                   think_time: ThinkTime = None, rate: Optional[float] = None, vus: int = 10) -> 'Scenario':
+        """Build a scenario where every item is its own weighted entry."""
+        entries = [ScenarioEntry(item.key, weight, [ScenarioStep(item)])
+                   for item, weight in zip(items, weights) if weight > 0]
+        return cls(name, entries, think_time=think_time, rate=rate, vus=vus)
+
+    @classmethod
+    def load(cls, path: Path, generated_dir: Optional[Path] = None) -> 'Scenario':
+        """Load a scenario file, resolving item references against collections."""
+        path = Path(path)
+        with open(path) as f:
+            data = json.load(f)
+        data.setdefault('name', path.stem)
+        return cls.from_dict(data, path.parent, generated_dir)
+
+    @classmethod
+    def from_dict(cls, data: Dict, base_dir: Path = Path('.'),
+                  generated_dir: Optional[Path] = None) -> 'Scenario':
+        """Build a scenario from its JSON document.
+
+        Args:
+            data: Parsed scenario document
+            base_dir: Directory that relative "collection" paths are resolved from
+            generated_dir: Where "service" references look for generated collections
+        """
+        resolver = ItemResolver(generated_dir or DEFAULT_GENERATED_DIR, Path(base_dir))
+
+        entries = []
+        for spec in data.get('mix', []):
+            weight = float(spec.get('weight', 1))
+            if 'steps' in spec:
+                steps = [resolver.step(step) for step in spec['steps']]
+            else:
+                steps = [resolver.step(spec)]
+            name = spec.get('name') or ' → '.join(step.item.name for step in steps)
+            entries.append(ScenarioEntry(name, weight, steps))
+        if not entries:
+            raise ValueError(f"Scenario '{data.get('name', '?')}' has an empty 'mix'")
+
+        return cls(
+            data.get('name', 'scenario'),
+            entries,
+            setup=[resolver.step(step) for step in data.get('setup', [])],
+            think_time=data.get('think_time'),
+            rate=data.get('rate'),
+            vus=data.get('vus', 10),
+            variables=data.get('variables'),
+        )
+
+
+class ItemResolver:
+    """Find collection items by service/collection and item or RPC name."""
+
+    def __init__(self, generated_dir: Path, base_dir: Path):
+        self.generated_dir = Path(generated_dir)
+        self.base_dir = base_dir
+        self._cache: Dict[Path, List[RunItem]] = {}
+
+    def items(self, spec: Dict) -> List[RunItem]:
+        if 'collection' in spec:
+            path = Path(spec['collection'])
+            if not path.is_absolute():
+                path = self.base_dir / path
+        elif 'service' in spec:
+            path = self.generated_dir / f"{spec['service']}_service.postman_collection.json"
+        else:
+            raise ValueError(f"Scenario step needs 'service' or 'collection': {spec}")
+        if path not in self._cache:
+            if not path.exists():
+                raise ValueError(f"Collection not found: {path}")
+            self._cache[path] = load_items(path)
+        return self._cache[path]
+
+    def step(self, spec: Dict) -> ScenarioStep:
+        name = spec.get('item')
+        items = self.items(spec)
+        for matches in (lambda i: i.name == name,
+                        lambda i: i.key.rsplit('.', 1)[-1] == name,
+                        lambda i: i.name.lower() == str(name).lower()):
+            found = [item for item in items if matches(item)]
+            if found:
+                item = found[0]
+                if spec.get('body'):
+                    item = copy.copy(item)
+                    item.body = {**(item.body if isinstance(item.body, dict) else {}), **spec['body']}
+                return ScenarioStep(item, spec.get('think_time'))
+        available = ', '.join(item.name for item in items)
+        raise ValueError(f"Item '{name}' not found in {spec.get('service') or spec.get('collection')} "
+                         f"(available: {available})")
+
+
+class RatePacer:
+    """Hand out start slots at a fixed rate shared by all virtual users.
+
+    Users waiting for a slot are rescheduled when the rate changes or a
+    hold starts, so adjustments apply at once rather than after every
+    already-reserved slot.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next: Optional[float] = None
+        self._hold_until = 0.0
+        self._waiters: Set[asyncio.Future] = set()
+        self.late = 0
+
+    @property
+    def rate(self) -> float:
+        return 1.0 / self.interval
+
+    def set_rate(self, rate: float):
+        self.interval = 1.0 / rate
+        self._reschedule(0.0)
+
+    def hold(self, seconds: float):
+        """Give out no slot for `seconds` (e.g. a server's Retry-After)."""
+        self._reschedule(seconds)
+
+    def _reschedule(self, hold: float):
+        now = asyncio.get_running_loop().time()
+        self._hold_until = max(self._hold_until, now + hold)
+        self._next = max(now, self._hold_until)
+        for waiter in list(self._waiters):
+            _wake(waiter, True)
+
+    async def wait(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            if self._next is None:
+                self._next = now
+            slot = self._next
+            if slot < now - self.interval:
+                # Every user was busy past this slot; skip ahead instead of bursting
+                self.late += 1
+                slot = now
+            self._next = slot + self.interval
+            if slot <= now:
+                return
+            waiter = loop.create_future()
+            timer = loop.call_at(slot, _wake, waiter, False)
+            self._waiters.add(waiter)
+            try:
+                rescheduled = await waiter
+            finally:
+                self._waiters.discard(waiter)
+                timer.cancel()
+            if not rescheduled:
+                return
+
+
+def _wake(waiter: asyncio.Future, rescheduled: bool):
+    if not waiter.done():
+        waiter.set_result(rescheduled)
+
+
+class ScenarioRunner:
+    """Execute a scenario with virtual users at a target rate."""
+
+    def __init__(self, runner: CollectionRunner, scenario: Scenario, vus: Optional[int] = None,
+                 rate: Optional[float] = None, seed: Optional[int] = None):
+        self.runner = runner
+        self.scenario = scenario
+        self.vus = vus or scenario.vus
+        self.rate = rate if rate is not None else scenario.rate
+        self.random = random.Random(seed)
+        self.pacer = RatePacer(self.rate) if self.rate else None
+        self.iterations: Dict[str, int] = {}
+        self.stopped = False
+
+    def stop(self):
+        """End the run early: virtual users finish their current entry and exit."""
+        self.stopped = True
+
+    async def think(self, think_time: ThinkTime):
+        if think_time is None:
+            return
+        if isinstance(think_time, (list, tuple)):
+            delay = self.random.uniform(think_time[0], think_time[1])
+        else:
+            delay = self.random.expovariate(1.0 / think_time) if think_time > 0 else 0.0
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def run_steps(self, client: HttpClient, steps: List[ScenarioStep], state: Dict[str, Any]):
+        for step in steps:
+            await self.runner.execute(client, step.item, state)
+            await self.think(step.think_time)
+
+    async def virtual_user(self, client: HttpClient, deadline: float):
+        """Run setup once, then weighted entries until the deadline."""
+        loop = asyncio.get_running_loop()
+        state = self.runner.new_state(self.scenario.variables)
+        await self.run_steps(client, self.scenario.setup, state)
+        entries, weights = self.scenario.entries, self.scenario.weights
+        while not self.stopped and loop.time() < deadline:
+            if self.pacer:
+                await self.pacer.wait()
+                if self.stopped or loop.time() >= deadline:
+                    break
+            entry = self.random.choices(entries, weights)[0]
+            self.iterations[entry.name] = self.iterations.get(entry.name, 0) + 1
+            await self.run_steps(client, entry.steps, state)
+            await self.think(self.scenario.think_time)
+
+    async def run(self, duration: float) -> Dict:
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        deadline = loop.time() + duration
+        async with self.runner.client() as client:
+            await asyncio.gather(*(self.virtual_user(client, deadline) for _ in range(self.vus)))
+        elapsed = time.perf_counter() - started
+
+        total = sum(self.iterations.values())
+        return {
+            'scenario': self.scenario.name,
+            'vus': self.vus,
+            'target_rate': self.rate,
+            'achieved_rate': round(total / elapsed, 2) if elapsed else 0.0,
+            'late_slots': self.pacer.late if self.pacer else 0,
+            'iterations': total,
+            'mix': {
+                name: {'expected': round(share, 4),
+                       'actual': round(self.iterations.get(name, 0) / total, 4) if total else 0.0}
+                for name, share in self.scenario.shares().items()
+            },
+            'endpoints': {k: s.summary() for k, s in sorted(self.runner.stats.items())},
+        }
+
+
+def resolve_weights(items: List[RunItem], specs: Optional[List[str]]) -> List[float]:
+    """Apply NAME=WEIGHT overrides (matching item name or key) to a default weight of 1."""
+    overrides = {}
+    for spec in specs or []:
+        name, _, weight = spec.rpartition('=')
+        overrides[name.strip()] = float(weight)
+    return [overrides.get(item.key, overrides.get(item.name, 1.0)) for item in items]
+
+
+def parse_think_time(text: str) -> ThinkTime:
+    """Parse '1.5' (mean) or '0.5-2' (uniform range) into a think time."""
+    low, sep, high = text.partition('-')
+    return [float(low), float(high)] if sep else float(low)
+
+
+def add_mix_arguments(parser: argparse.ArgumentParser):
+    """Options shared by every mode that replays a weighted mix."""
+    parser.add_argument('--scenario', help='Scenario file (JSON) instead of an even collection mix')
+    parser.add_argument('--vus', type=int, help='Concurrent virtual users (default: scenario or 10)')
+    parser.add_argument('--rate', type=float, help='Target mix entries per second across all VUs')
+    parser.add_argument('--think-time', type=parse_think_time, help='Think time: mean seconds or MIN-MAX')
+    parser.add_argument('--weight', action='append', help='Item weight NAME=WEIGHT (default 1)')
+    parser.add_argument('--reads-only', action='store_true', help='Only replay GET items')
+    parser.add_argument('--seed', type=int, help='Random seed for the item mix')
+
+
+def scenario_from_args(args) -> Scenario:
+    """Load --scenario, or build an item mix from the given collections."""
+    if args.scenario:
+        scenario = Scenario.load(Path(args.scenario))
+    else:
+        items = [item for path in args.collections for item in load_items(Path(path))]
+        if args.reads_only:
+            items = [item for item in items if item.is_read]
+        weights = resolve_weights(items, args.weight)
+        if not any(weights):
+            raise ValueError("No items to replay")
+        scenario = Scenario.from_items('collection-mix', items, weights)
+    if args.think_time is not None:
+        scenario.think_time = args.think_time
+    return scenario
+
+
+def cmd_scenario(args) -> int:
+    try:
+        scenario = scenario_from_args(args)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    resolver = load_runner_resolver(scenario.collections, args.environment, parse_vars(args.var), args.globals)
+    resolver.resolved(item_variables(scenario.items))  # fail fast on variable cycles
+    runner = CollectionRunner(resolver, args.max_connections, args.timeout, connection_mode=args.connection,
+                              accept_encoding=args.accept_encoding, trace_context=args.trace_context,
+                              refresh_margin=args.refresh_margin)
+    scenario_runner = ScenarioRunner(runner, scenario, args.vus, args.rate, args.seed)
+    writer = open_run_writer(args, 'scenario', scenario.name)
+    if writer:
+        runner.add_listener(writer.record)
+    exporter = start_metrics(args, runner)
+
+    print(f"🎭 Scenario: {scenario.name}")
+    print("=" * 60)
+    print(f"📦 {len(scenario.entries)} entries, {scenario_runner.vus} VUs, "
+          f"{'%.1f/s' % scenario_runner.rate if scenario_runner.rate else 'unpaced'}, {args.duration:.0f}s")
+
+    try:
+        report = asyncio.run(scenario_runner.run(args.duration))
+    finally:
+        close_run_writer(writer)
+        stop_metrics(exporter)
+
+    print(f"\n🎯 {report['iterations']} iterations, {report['achieved_rate']}/s achieved"
+          + (f", {report['late_slots']} late slots" if report['late_slots'] else ''))
+    print(f"\n{'Entry':<40} {'Expected':>9} {'Actual':>9}")
+    for name, share in report['mix'].items():
+        print(f"{name[:40]:<40} {share['expected'] * 100:>8.1f}% {share['actual'] * 100:>8.1f}%")
+    print()
+    print(format_stats_table(runner.stats))
+    print_trace_summary(runner)
+    print_session_summary(runner)
+    if runner.trace_stats:
+        report['traces'] = {k: s.summary() for k, s in runner.trace_stats.items()}
+    if runner.refresher:
+        report['sessions'] = runner.refresher.summary()
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Report saved: {args.report}")
+    return 0
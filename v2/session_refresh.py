@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Proactive session refresh for the collection runner.
+
+VerifyOTP, VerifyOTC and RefreshSession responses carry `session.expires_at`;
+the generated test scripts store it as `session_expires_at` next to
+`session_token` and `refresh_token`. Before each request the runner asks
+SessionRefresher whether the virtual user's token is within the refresh
+margin of expiry and, if so, calls RefreshSession once:
+
+- Single flight: virtual users holding the same refresh token (e.g. one
+  token seeded from the environment) wait on the same call and share its
+  result, so the auth service sees one refresh, not a stampede.
+- A user still holding an already-rotated refresh token is handed the
+  result of the earlier refresh instead of spending the old token again.
+- When the expiry is unknown, a 401 triggers the same refresh and the
+  request is retried once.
+- After a failed refresh the token is not tried again for 30s, like the
+  session_refresh_started guard in the Postman script.
+
+Collections generated before session_expires_at was stored only extract
+session_token; load_items adds the matching expires_at extraction so the
+proactive refresh works with them too.
+
+The generator emits the Postman equivalent as a collection-level
+pre-request script (generate_postman_collections.py).
+"""
+
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+REFRESH_PATH = '/api/auth/session/refresh'
+AUTH_PATH_PREFIX = '/api/auth/'
+DEFAULT_MARGIN = 60.0
+REFRESH_COOLDOWN = 30.0
+SESSION_VARIABLES = ('session_token', 'refresh_token', 'session_expires_at')
+SESSION_EXTRACT = [
+    ('session_token', 'session.session_token'),
+    ('refresh_token', 'session.refresh_token'),
+    ('session_expires_at', 'session.expires_at'),
+]
+
+
+def parse_expiry(value: Any) -> Optional[float]:
+    """Epoch seconds from seconds, milliseconds, {'seconds': n} or an RFC 3339 timestamp."""
+    if isinstance(value, dict):
+        value = value.get('seconds')
+    if value is None or value == '' or isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        try:
+            return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+    return number / 1000.0 if number > 1e12 else number
+
+
+def with_session_expiry(rules: List[tuple]) -> List[tuple]:
+    """Extraction rules plus session_expires_at wherever session_token is extracted."""
+    if any(variable == 'session_expires_at' for variable, _ in rules):
+        return rules
+    for variable, path in rules:
+        if variable == 'session_token':
+            parent = path.rpartition('.')[0]
+            return rules + [('session_expires_at', f"{parent}.expires_at" if parent else 'expires_at')]
+    return rules
+
+
+def refresh_item(base_url: str = '{{base_url}}'):
+    """RunItem calling RefreshSession with the user's refresh token."""
+    from collection_runner import RunItem
+    return RunItem('auth', 'Refresh Session', 'AuthService.RefreshSession', 'POST', base_url + REFRESH_PATH,
+                   {'Content-Type': 'application/json'}, {'refresh_token': '{{refresh_token}}'},
+                   SESSION_EXTRACT, None)
+
+
+def is_auth_request(url: str) -> bool:
+    return AUTH_PATH_PREFIX in url
+
+
+class SessionRefresher:
+    """Refresh session tokens shortly before expiry, once per refresh token."""
+
+    def __init__(self, margin: float = DEFAULT_MARGIN, item=None, clock: Callable[[], float] = time.time,
+                 cooldown: float = REFRESH_COOLDOWN):
+        self.margin = margin
+        self.cooldown = cooldown
+        self.item = item or refresh_item()
+        self.clock = clock
+        self.refreshes = 0
+        self.shared = 0
+        self.failures = 0
+        self._pending: Dict[str, Any] = {}
+        # rotated refresh token → the session values that replaced it
+        self._results: Dict[str, Dict[str, Any]] = {}
+        # refresh token → when refreshing it last failed
+        self._failed: Dict[str, float] = {}
+
+    def due(self, state: Dict[str, Any]) -> bool:
+        if not state.get('refresh_token'):
+            return False
+        expires = parse_expiry(state.get('session_expires_at'))
+        return expires is not None and self.clock() >= expires - self.margin
+
+    async def refresh(self, runner, client, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """New session values for `state`'s refresh token (None if the refresh failed)."""
+        import asyncio  # only runners refresh; the generator imports this module for its constants
+        token = str(state.get('refresh_token') or '')
+        if not token:
+            return None
+        result = self._results.get(token)
+        if result is not None:
+            self.shared += 1
+            return result
+        failed = self._failed.get(token)
+        if failed is not None and self.clock() - failed < self.cooldown:
+            return None
+        task = self._pending.get(token)
+        if task is None:
+            task = self._pending[token] = asyncio.ensure_future(self._refresh(runner, client, state, token))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    async def _refresh(self, runner, client, state: Dict[str, Any], token: str) -> Optional[Dict[str, Any]]:
+        try:
+            scope = runner.new_state(dict(state))
+            response = await runner.execute(client, self.item, scope)
+            result = {name: scope[name] for name in SESSION_VARIABLES if name in scope}
+            if not response.ok or result.get('session_token') == state.get('session_token'):
+                self.failures += 1
+                self._failed[token] = self.clock()
+                return None
+            self.refreshes += 1
+            self._results[token] = result
+            return result
+        finally:
+            self._pending.pop(token, None)
+
+    def summary(self) -> Dict[str, int]:
+        return {'refreshes': self.refreshes, 'shared': self.shared, 'failures': self.failures}
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Soak mode for the collection runner.
+
+Replays a weighted mix of collection items (or a scenario file, see
+scenario.py) for hours and keeps a rolling series of per-window latency
+histograms. Each closed window is compared with a baseline (the windows
+right after warm-up):
+- p99 drift: binomial test on how many requests exceeded the baseline p99
+  (expected 1%), flagged when significant and the p99 grew by --min-ratio
+- Error-rate drift: two-proportion z-test against the baseline error rate
+At the end a Mann-Kendall test reports any monotonic p99 trend.
+
+With --bridge-url, "Get Performance Metrics" and "Get System Information"
+from the Edge API collection are polled too, so bridge memory growth can
+be correlated with client latency.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from collection_runner import (CollectionRunner, RequestResult, item_variables, load_runner_resolver,
+                               parse_duration, parse_vars, print_session_summary,
+                               print_trace_summary)
+from http_client import HttpClient, HttpError
+from latency_stats import (EndpointStats, least_squares_slope, mann_kendall, normal_sf, pearson,
+                           two_proportion_test)
+from metrics_exporter import start_metrics, stop_metrics
+from results_store import close_run_writer, open_run_writer
+from rpc_catalog import find_item, item_url
+from scenario import Scenario, ScenarioRunner, add_mix_arguments, scenario_from_args
+from variables import substitute
+
+SCRIPT_DIR = Path(__file__).parent
+EDGE_COLLECTION = SCRIPT_DIR.parent / 'collections' / 'rest' / 'RallyMate_Edge_API.postman_collection.json'
+BRIDGE_ITEMS = ['Get Performance Metrics', 'Get System Information']
+MEMORY_MARKERS = ('mem', 'rss', 'heap', 'alloc')
+OVERALL = '*'
+
+
+class Window:
+    """Per-endpoint stats for one time window."""
+
+    def __init__(self, start: float):
+        self.start = start
+        self.end: Optional[float] = None
+        self.endpoints: Dict[str, EndpointStats] = {}
+
+    def record(self, result: RequestResult):
+        self.endpoints.setdefault(result.key, EndpointStats()).record(result.latency, result.status, result.ok)
+
+    def stats(self, key: str) -> EndpointStats:
+        if key != OVERALL:
+            return self.endpoints.get(key, EndpointStats())
+        merged = EndpointStats()
+        for stats in self.endpoints.values():
+            merged.merge(stats)
+        return merged
+
+    def summary(self) -> Dict:
+        overall = self.stats(OVERALL).summary()
+        return {
+            'start': self.start,
+            'end': self.end,
+            'overall': overall,
+            'p99_ms_by_endpoint': {k: s.latency.summary()['p99_ms'] for k, s in sorted(self.endpoints.items())},
+        }
+
+
+class DriftDetector:
+    """Flag statistically significant p99 or error-rate drift per window."""
+
+    def __init__(self, warmup_windows: int = 1, baseline_windows: int = 3, alpha: float = 0.001,
+                 min_ratio: float = 1.2, min_samples: int = 50, min_error_delta: float = 0.005):
+        self.warmup_windows = warmup_windows
+        self.baseline_windows = baseline_windows
+        self.alpha = alpha
+        self.min_ratio = min_ratio
+        self.min_samples = min_samples
+        self.min_error_delta = min_error_delta
+
+    def baseline(self, windows: List[Window], key: str) -> Optional[EndpointStats]:
+        first = self.warmup_windows
+        last = first + self.baseline_windows
+        if len(windows) < last:
+            return None
+        merged = EndpointStats()
+        for window in windows[first:last]:
+            merged.merge(window.stats(key))
+        return merged
+
+    def check(self, windows: List[Window]) -> List[Dict]:
+        """Compare the latest window against the baseline for every endpoint."""
+        if len(windows) <= self.warmup_windows + self.baseline_windows:
+            return []
+        current = windows[-1]
+        alerts = []
+        for key in [OVERALL] + sorted(current.endpoints):
+            baseline = self.baseline(windows, key)
+            stats = current.stats(key)
+            if baseline is None:
+                continue
+
+            # Transport errors record no latency, so a window of failures has requests but no samples
+            if baseline.latency.count >= self.min_samples and stats.latency.count >= self.min_samples:
+                base_p99 = baseline.latency.percentile(99)
+                cur_p99 = stats.latency.percentile(99)
+                n = stats.latency.count
+                exceed = stats.latency.count_above(base_p99)
+                z = (exceed - n * 0.01) / math.sqrt(n * 0.01 * 0.99)
+                p_value = normal_sf(z)
+                if p_value < self.alpha and cur_p99 > base_p99 * self.min_ratio:
+                    alerts.append({
+                        'endpoint': key, 'metric': 'p99', 'window_start': current.start,
+                        'baseline_ms': round(base_p99 * 1000, 3), 'current_ms': round(cur_p99 * 1000, 3),
+                        'p_value': p_value,
+                    })
+
+            if baseline.requests < self.min_samples or stats.requests < self.min_samples:
+                continue
+            if stats.error_rate - baseline.error_rate >= self.min_error_delta:
+                p_value = two_proportion_test(baseline.errors, baseline.requests, stats.errors, stats.requests)
+                if p_value < self.alpha:
+                    alerts.append({
+                        'endpoint': key, 'metric': 'error_rate', 'window_start': current.start,
+                        'baseline': round(baseline.error_rate, 4), 'current': round(stats.error_rate, 4),
+                        'p_value': p_value,
+                    })
+        return alerts
+
+
+def flatten_numbers(data: Any, prefix: str = '') -> Dict[str, float]:
+    """Flatten numeric leaves of a JSON document into dot paths."""
+    flat = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            flat.update(flatten_numbers(value, f"{prefix}{key}."))
+    elif isinstance(data, list):
+        for index, value in enumerate(data):
+            flat.update(flatten_numbers(value, f"{prefix}{index}."))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        flat[prefix.rstrip('.')] = float(data)
+    return flat
+
+
+class BridgePoller:
+    """Periodically sample the bridge's health endpoints."""
+
+    def __init__(self, base_url: str, interval: float = 60.0, collection_path: Path = EDGE_COLLECTION):
+        with open(collection_path) as f:
+            collection = json.load(f)
+        self.urls = {}
+        for name in BRIDGE_ITEMS:
+            item = find_item(collection, name)
+            if item:
+                self.urls[name] = substitute(item_url(item), {'base_url': base_url.rstrip('/')})
+        self.interval = interval
+        self.samples: List[Dict] = []
+        self.errors = 0
+
+    async def poll_once(self, client: HttpClient):
+        metrics = {}
+        for name, url in self.urls.items():
+            try:
+                response = await client.request('GET', url)
+                if response.ok:
+                    metrics.update(flatten_numbers(response.json() or {}, f"{name}."))
+                else:
+                    self.errors += 1
+            except (HttpError, ValueError):
+                self.errors += 1
+        if metrics:
+            self.samples.append({'t': time.time(), 'metrics': metrics})
+
+    async def run(self, stop: asyncio.Event):
+        async with HttpClient(max_connections=2) as client:
+            while not stop.is_set():
+                await self.poll_once(client)
+                try:
+                    await asyncio.wait_for(stop.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def memory_report(self, windows: List[Window]) -> Dict[str, Dict]:
+        """Growth rate of memory-like metrics and their correlation with p99."""
+        if len(self.samples) < 2:
+            return {}
+        t0 = self.samples[0]['t']
+        keys = {k for s in self.samples for k in s['metrics'] if any(m in k.lower() for m in MEMORY_MARKERS)}
+        window_p99 = [(w.start, w.end or w.start, w.stats(OVERALL).latency.percentile(99)) for w in windows]
+
+        report = {}
+        for key in sorted(keys):
+            points = [((s['t'] - t0) / 3600.0, s['metrics'][key]) for s in self.samples if key in s['metrics']]
+            if len(points) < 2:
+                continue
+            # Average the metric over each window to line it up with that window's p99
+            paired_metric, paired_p99 = [], []
+            for start, end, p99 in window_p99:
+                inside = [s['metrics'][key] for s in self.samples
+                          if key in s['metrics'] and start <= s['t'] <= end]
+                if inside:
+                    paired_metric.append(sum(inside) / len(inside))
+                    paired_p99.append(p99)
+            report[key] = {
+                'first': points[0][1],
+                'last': points[-1][1],
+                'growth_per_hour': round(least_squares_slope(points), 3),
+                'p99_correlation': round(pearson(paired_metric, paired_p99), 3),
+            }
+        return report
+
+
+class SoakRunner:
+    """Drive virtual users through a weighted item mix and watch for drift."""
+
+    def __init__(self, runner: CollectionRunner, scenario: Scenario, duration: float = 3600.0,
+                 vus: Optional[int] = None, rate: Optional[float] = None, window: float = 60.0,
+                 detector: Optional[DriftDetector] = None, poller: Optional[BridgePoller] = None,
+                 seed: Optional[int] = None, quiet: bool = False):
+        self.runner = runner
+        self.scenario_runner = ScenarioRunner(runner, scenario, vus, rate, seed)
+        self.duration = duration
+        self.window_seconds = window
+        self.detector = detector or DriftDetector()
+        self.poller = poller
+        self.quiet = quiet
+        self.windows: List[Window] = []
+        self.alerts: List[Dict] = []
+        self._current = Window(time.time())
+        runner.add_listener(lambda result: self._current.record(result))
+
+    def _roll_window(self):
+        closed = self._current
+        closed.end = time.time()
+        self._current = Window(closed.end)
+        self.windows.append(closed)
+        alerts = self.detector.check(self.windows)
+        self.alerts.extend(alerts)
+        if not self.quiet:
+            overall = closed.stats(OVERALL).summary()
+            print(f"   🪟 window {len(self.windows):>4}: {overall['requests']:>7} reqs, "
+                  f"p50 {overall['p50_ms']:.1f}ms, p99 {overall['p99_ms']:.1f}ms, "
+                  f"errors {overall['error_rate'] * 100:.2f}%")
+            for alert in alerts:
+                if alert['metric'] == 'p99':
+                    print(f"   ⚠️  p99 drift on {alert['endpoint']}: {alert['baseline_ms']}ms → "
+                          f"{alert['current_ms']}ms (p={alert['p_value']:.2g})")
+                else:
+                    print(f"   ⚠️  error-rate drift on {alert['endpoint']}: {alert['baseline']:.2%} → "
+                          f"{alert['current']:.2%} (p={alert['p_value']:.2g})")
+
+    async def _window_clock(self, stop: asyncio.Event):
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), self.window_seconds)
+            except asyncio.TimeoutError:
+                self._roll_window()
+
+    async def run(self) -> Dict:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.duration
+        stop = asyncio.Event()
+        self._current = Window(time.time())
+        background = [asyncio.ensure_future(self._window_clock(stop))]
+        if self.poller:
+            background.append(asyncio.ensure_future(self.poller.run(stop)))
+
+        async with self.runner.client() as client:
+            vus = self.scenario_runner.vus
+            await asyncio.gather(*(self.scenario_runner.virtual_user(client, deadline) for _ in range(vus)))
+        stop.set()
+        await asyncio.gather(*background)
+        if self._current.endpoints:
+            self._roll_window()
+
+        p99_series = [w.stats(OVERALL).latency.percentile(99) for w in self.windows]
+        report = {
+            'duration_s': self.duration,
+            'scenario': self.scenario_runner.scenario.name,
+            'vus': self.scenario_runner.vus,
+            'iterations': dict(sorted(self.scenario_runner.iterations.items())),
+            'windows': [w.summary() for w in self.windows],
+            'alerts': self.alerts,
+            'p99_trend': mann_kendall(p99_series),
+            'endpoints': {k: s.summary() for k, s in sorted(self.runner.stats.items())},
+        }
+        if self.poller:
+            report['bridge'] = {
+                'samples': len(self.poller.samples),
+                'errors': self.poller.errors,
+                'memory': self.poller.memory_report(self.windows),
+            }
+        return report
+
+
+def add_soak_arguments(parser: argparse.ArgumentParser):
+    add_mix_arguments(parser)
+    parser.add_argument('--duration', type=parse_duration, default='1h', help='Run length (e.g. 90m, 6h)')
+    parser.add_argument('--window', type=parse_duration, default='60s', help='Rolling window length')
+    parser.add_argument('--warmup-windows', type=int, default=1, help='Windows ignored at the start')
+    parser.add_argument('--baseline-windows', type=int, default=3, help='Windows forming the baseline')
+    parser.add_argument('--alpha', type=float, default=0.001, help='Significance level for drift')
+    parser.add_argument('--min-ratio', type=float, default=1.2, help='Minimum p99 growth to flag')
+    parser.add_argument('--bridge-url', help='Edge API base URL to poll for bridge metrics')
+    parser.add_argument('--bridge-interval', type=parse_duration, default='60s', help='Bridge poll interval')
+
+
+def cmd_soak(args) -> int:
+    try:
+        scenario = scenario_from_args(args)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    resolver = load_runner_resolver(scenario.collections, args.environment, parse_vars(args.var), args.globals)
+    resolver.resolved(item_variables(scenario.items))  # fail fast on variable cycles
+    runner = CollectionRunner(resolver, args.max_connections, args.timeout, connection_mode=args.connection,
+                              accept_encoding=args.accept_encoding, trace_context=args.trace_context,
+                              refresh_margin=args.refresh_margin)
+    detector = DriftDetector(args.warmup_windows, args.baseline_windows, args.alpha, args.min_ratio)
+    poller = BridgePoller(args.bridge_url, args.bridge_interval) if args.bridge_url else None
+    soak = SoakRunner(runner, scenario, args.duration, args.vus, args.rate, args.window,
+                      detector, poller, args.seed)
+    writer = open_run_writer(args, 'soak', scenario.name)
+    if writer:
+        runner.add_listener(writer.record)
+    exporter = start_metrics(args, runner)
+
+    print("🕰️  rallymate Soak Run")
+    print("=" * 60)
+    print(f"📦 {scenario.name}: {len(scenario.entries)} entries, {soak.scenario_runner.vus} VUs, "
+          f"{args.duration / 3600:.2f}h, "
+          f"{args.window:.0f}s windows" + (f", bridge {args.bridge_url}" if poller else ''))
+
+    try:
+        report = asyncio.run(soak.run())
+    finally:
+        close_run_writer(writer)
+        stop_metrics(exporter)
+
+    trend = report['p99_trend']
+    print(f"\n📈 p99 trend: z={trend['z']}, p={trend['p_value']:.3g}")
+    print(f"⚠️  {len(report['alerts'])} drift alerts")
+    for key, memory in report.get('bridge', {}).get('memory', {}).items():
+        print(f"🌉 {key}: {memory['first']} → {memory['last']} "
+              f"({memory['growth_per_hour']:+}/h, r={memory['p99_correlation']} with p99)")
+    print_trace_summary(runner)
+    print_session_summary(runner)
+    if runner.trace_stats:
+        report['traces'] = {k: s.summary() for k, s in runner.trace_stats.items()}
+    if runner.refresher:
+        report['sessions'] = runner.refresher.summary()
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Report saved: {args.report}")
+    return 1 if report['alerts'] else 0
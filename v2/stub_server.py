@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+"""
+Local stub of the rallymate REST gateway for exercising the load tools.
+
+Answers every request with JSON shaped like the real services
+(e.g. POST /api/facilities -> {"facility": {"id": 1, ...}}), with optional
+artificial latency and error injection. Edge API device commands
+(POST /api/devices/{id}/command) are executed one at a time, like the
+bridge's single radio, and show up in GET /api/devices/{id}/status.
+Responses honour Accept-Encoding above a minimum size and gzip/deflate
+request bodies are accepted (Content-Encoding), like a typical gateway.
+GET responses carry ETag/Last-Modified validators and answer conditional
+requests with 304 Not Modified. Every response reports its gateway and
+handler time in a Server-Timing header, and incoming W3C traceparent trace
+IDs are remembered (trace_ids) so tests can check propagation. Sessions
+expire after --session-ttl; with --enforce-sessions expired bearer tokens
+get 401 and refresh tokens are single-use, like the auth service.
+--max-concurrency limits requests handled at once (the rest queue, so
+latency climbs past a knee) and --rate-limit answers 429 with Retry-After
+and RateLimit-* headers above a per-second budget.
+Uses only the standard library; the optional gRPC stub (--grpc-port, for
+grpc_bench.py) needs h2.
+
+Usage:
+    python stub_server.py --port 8080 --latency-ms 5 --error-rate 0.01
+    python stub_server.py --no-compression --no-validators --no-server-timing
+    python stub_server.py --enforce-sessions --session-ttl 120
+    python stub_server.py --port 8080 --grpc-port 50051
+    python stub_server.py --latency-ms 10 --max-concurrency 4 --rate-limit 300
+"""
+
+import argparse
+import asyncio
+import collections
+import email.utils
+import hashlib
+import itertools
+import json
+import math
+import random
+import re
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from compression import EncodingError, UnsupportedEncoding, compress, decompress, negotiate
+
+RESOURCE_ALIASES = {
+    'system-support': 'system_support',
+    'otp': 'session',
+    'otc': 'session',
+    'session': 'session',
+}
+
+STATUS_REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 401: 'Unauthorized',
+                  415: 'Unsupported Media Type', 429: 'Too Many Requests', 503: 'Service Unavailable'}
+
+EDGE_DEVICE_PATTERN = re.compile(r'^/api/devices/([^/?]+)/(command|status|connect)(?:\?.*)?$')
+
+
+def resource_name(path: str) -> Optional[str]:
+    """Map a request path to the response wrapper key used by the services."""
+    segments = [s for s in path.split('?', 1)[0].split('/') if s and s != 'api']
+    for segment in reversed(segments):
+        if segment in RESOURCE_ALIASES:
+            return RESOURCE_ALIASES[segment]
+        if segment.endswith('ies'):
+            return segment[:-3] + 'y'
+        if segment.endswith('s') and not segment.isdigit():
+            return segment[:-1]
+    return None
+
+
+class StubServer:
+    """Asyncio HTTP/1.1 server returning canned rallymate-style responses."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, error_rate: float = 0.0, seed: Optional[int] = None,
+                 command_ms: float = 0.0, compression: bool = True, compress_min_bytes: int = 256,
+                 validators: bool = True, server_timing: bool = True, session_ttl: float = 3600.0,
+                 enforce_sessions: bool = False, max_concurrency: Optional[int] = None,
+                 rate_limit: Optional[int] = None):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.command_ms = command_ms
+        self.compression = compression
+        self.compress_min_bytes = compress_min_bytes
+        self.validators = validators
+        self.server_timing = server_timing
+        self.trace_ids = collections.deque(maxlen=10000)
+        self.session_ttl = session_ttl
+        self.enforce_sessions = enforce_sessions
+        self.sessions: Dict[str, float] = {}
+        self.refresh_tokens: Set[str] = set()
+        self.refreshes = 0
+        self.max_concurrency = max_concurrency
+        self.rate_limit = rate_limit
+        self.throttled = 0
+        self._window = (0, 0)  # (second, requests admitted in it)
+        self.last_modified = email.utils.formatdate(time.time() - 60, usegmt=True)
+        self.device_states: Dict[str, Dict] = {}
+        self._command_lock = asyncio.Lock()
+        self._capacity = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self.request_counts: Dict[Tuple[str, str], int] = {}
+        self._ids = itertools.count(1)
+        self._server = None
+        self._handlers = set()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> 'StubServer':
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            # Idle keep-alive handlers would otherwise be torn down with the loop
+            for task in list(self._handlers):
+                task.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body, received = request
+                gateway_started = time.perf_counter()
+                if 'traceparent' in headers:
+                    parts = headers['traceparent'].split('-')
+                    if len(parts) == 4:
+                        self.trace_ids.append(parts[1])
+                key = (method, path.split('?', 1)[0])
+                self.request_counts[key] = self.request_counts.get(key, 0) + 1
+
+                rejected = None
+                encoding = headers.get('content-encoding', 'identity').lower()
+                if encoding != 'identity':
+                    rejected, body = self._decode_request(encoding, body)
+
+                limit_headers, limited = self._rate_limit_headers()
+                handler_started = time.perf_counter()
+                delay = self.latency_ms + self.random.uniform(0, self.jitter_ms)
+                if delay > 0 and not limited:
+                    if self._capacity:
+                        # Requests beyond capacity queue here, as on a saturated service
+                        async with self._capacity:
+                            await asyncio.sleep(delay / 1000.0)
+                    else:
+                        await asyncio.sleep(delay / 1000.0)
+
+                if rejected:
+                    status, payload = rejected
+                elif limited:
+                    self.throttled += 1
+                    status, payload = 429, {'error': 'rate limit exceeded'}
+                elif self.error_rate and self.random.random() < self.error_rate:
+                    status, payload = 503, {'error': 'injected failure'}
+                elif self.enforce_sessions and self._unauthorized(path, headers, body):
+                    status, payload = 401, {'error': 'session expired or unknown'}
+                elif EDGE_DEVICE_PATTERN.match(path):
+                    status, payload = 200, await self._respond_edge(method, path, body)
+                else:
+                    status, payload = 200, self._respond(method, path, body)
+                    if not body and received:
+                        payload['received_bytes'] = received
+
+                data = json.dumps(payload).encode('utf-8')
+                handler_ms = (time.perf_counter() - handler_started) * 1000
+                extra = limit_headers
+                if self.validators and method == 'GET' and status == 200:
+                    status, extra = self._conditional(headers, data)
+                    if status == 304:
+                        data = b''
+                if self.compression and data:
+                    extra += 'Vary: Accept-Encoding\r\n'
+                    encoding = negotiate(headers.get('accept-encoding', ''))
+                    if encoding != 'identity' and len(data) >= self.compress_min_bytes:
+                        data = compress(data, encoding, 6)
+                        extra += f"Content-Encoding: {encoding}\r\n"
+                if self.server_timing:
+                    gateway_ms = (time.perf_counter() - gateway_started) * 1000 - handler_ms
+                    extra += f"Server-Timing: gateway;dur={gateway_ms:.3f}, handler;dur={handler_ms:.3f}\r\n"
+                close = headers.get('connection', '').lower() == 'close'
+                length = '' if status == 304 else f"Content-Length: {len(data)}\r\n"
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_REASONS.get(status, 'Error')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"{length}{extra}"
+                    f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, asyncio.CancelledError):
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+
+    def _rate_limit_headers(self) -> Tuple[str, bool]:
+        """RateLimit-* header lines for this request and whether it is over the budget."""
+        if not self.rate_limit:
+            return '', False
+        now = time.time()
+        second, used = self._window
+        if int(now) != second:
+            second, used = int(now), 0
+        limited = used >= self.rate_limit
+        self._window = (second, used if limited else used + 1)
+        reset = max(1, math.ceil(second + 1 - now))
+        lines = (f"RateLimit-Limit: {self.rate_limit}\r\n"
+                 f"RateLimit-Remaining: {max(0, self.rate_limit - self._window[1])}\r\nRateLimit-Reset: {reset}\r\n")
+        return lines + (f"Retry-After: {reset}\r\n" if limited else ''), limited
+
+    def _conditional(self, headers: Dict[str, str], data: bytes) -> Tuple[int, str]:
+        """Validators for a GET response: (200 or 304, extra header lines)."""
+        etag = f'W/"{hashlib.sha1(data).hexdigest()[:16]}"'
+        extra = f"ETag: {etag}\r\nLast-Modified: {self.last_modified}\r\nCache-Control: private, no-cache\r\n"
+        if 'if-none-match' in headers:
+            # Weak comparison, as RFC 9110 requires for If-None-Match
+            tags = [t.strip().removeprefix('W/') for t in headers['if-none-match'].split(',')]
+            return (304 if '*' in tags or etag.removeprefix('W/') in tags else 200), extra
+        if 'if-modified-since' in headers:
+            try:
+                since = email.utils.parsedate_to_datetime(headers['if-modified-since'])
+                if since >= email.utils.parsedate_to_datetime(self.last_modified):
+                    return 304, extra
+            except (TypeError, ValueError):
+                pass
+        return 200, extra
+
+    def _decode_request(self, encoding: str, body: bytes) -> Tuple[Optional[Tuple[int, Dict]], bytes]:
+        """Decode a compressed request body: ((status, error payload) or None, body)."""
+        try:
+            if not self.compression:
+                raise UnsupportedEncoding(encoding)
+            return None, decompress(body, encoding)
+        except UnsupportedEncoding:
+            return (415, {'error': f"Content-Encoding {encoding} not accepted"}), b''
+        except EncodingError as e:
+            return (400, {'error': str(e)}), b''
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, path, _ = request_line.decode('latin-1').split(' ', 2)
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            headers[key.strip().lower()] = value.strip()
+
+        # Only JSON bodies are kept; uploads are drained and counted so
+        # multi-GB streams never sit in memory
+        keep = 'json' in headers.get('content-type', 'application/json')
+        chunks = []
+        received = 0
+
+        async def consume(size: int):
+            nonlocal received
+            while size > 0:
+                piece = await reader.readexactly(min(size, 1 << 20))
+                received += len(piece)
+                size -= len(piece)
+                if keep:
+                    chunks.append(piece)
+
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            while True:
+                size = int((await reader.readline()).split(b';', 1)[0].strip() or b'0', 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                await consume(size)
+                await reader.readexactly(2)
+        else:
+            await consume(int(headers.get('content-length', 0)))
+        return method, path, headers, b''.join(chunks), received
+
+    async def _respond_edge(self, method: str, path: str, body: bytes) -> Dict:
+        """Emulate the bridge's device command queue and status endpoint."""
+        device_id, action = EDGE_DEVICE_PATTERN.match(path).groups()
+        state = self.device_states.setdefault(device_id, {'device_id': device_id, 'state': 'lock', 'commands': 0})
+        if method == 'POST' and action == 'command':
+            try:
+                command = json.loads(body) if body else {}
+            except ValueError:
+                command = {}
+            async with self._command_lock:
+                if self.command_ms:
+                    await asyncio.sleep(self.command_ms / 1000.0)
+                new_state = (command.get('parameters') or {}).get('action')
+                if new_state:
+                    state['state'] = new_state
+                state['commands'] += 1
+            return {'success': True, 'device_id': device_id, 'result': state['state']}
+        return {'success': True, **state}
+
+    def _respond(self, method: str, path: str, body: bytes) -> Dict:
+        """Build a response payload wrapping the echoed request fields."""
+        try:
+            fields = json.loads(body) if body else {}
+        except ValueError:
+            fields = {}
+        if not isinstance(fields, dict):
+            fields = {}
+
+        resource = resource_name(path)
+        if method == 'GET' or resource is None:
+            return {'success': True, 'path': path.split('?', 1)[0]}
+
+        record = dict(fields)
+        if method == 'POST':
+            record.setdefault('id', next(self._ids))
+        if resource == 'session':
+            if path.endswith('/refresh'):
+                self.refreshes += 1
+                self.refresh_tokens.discard(fields.get('refresh_token'))
+            record.update({
+                'session_token': f"stub-session-{next(self._ids)}",
+                'refresh_token': f"stub-refresh-{next(self._ids)}",
+                'expires_at': round(time.time() + self.session_ttl, 3),
+            })
+            self.sessions[record['session_token']] = record['expires_at']
+            self.refresh_tokens.add(record['refresh_token'])
+        return {'success': True, resource: record}
+
+    def _unauthorized(self, path: str, headers: Dict[str, str], body: bytes) -> bool:
+        """Expired or unknown bearer tokens; refresh tokens are single-use."""
+        if path.startswith('/api/auth/'):
+            if not path.split('?', 1)[0].endswith('/refresh'):
+                return False
+            try:
+                return json.loads(body or b'{}').get('refresh_token') not in self.refresh_tokens
+            except (ValueError, AttributeError):
+                return True
+        token = headers.get('authorization', '').removeprefix('Bearer ').strip()
+        return self.sessions.get(token, 0.0) < time.time()
+
+
+class GrpcStubServer:
+    """Native gRPC stub (HTTP/2 cleartext): every unary call echoes its request message.
+
+    Any /package.Service/Method path is accepted, with the same latency
+    settings as StubServer, so the REST and gRPC paths of a benchmark differ
+    only in transport and encoding. calls counts requests per method path.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, seed: Optional[int] = None):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.random = random.Random(seed)
+        self.calls: Dict[str, int] = {}
+        self._server = None
+        self._handlers = set()
+
+    @property
+    def target(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    async def start(self) -> 'GrpcStubServer':
+        import h2.config  # noqa: F401 - fail at start, not on the first call, without h2
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            for task in list(self._handlers):
+                task.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        import h2.config
+        import h2.connection
+        import h2.events
+        import h2.exceptions
+
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding='utf-8'))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+        streams: Dict[int, Tuple[Dict[str, str], bytearray]] = {}
+        calls = set()
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                for event in conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        streams[event.stream_id] = (dict(event.headers), bytearray())
+                    elif isinstance(event, h2.events.DataReceived) and event.stream_id in streams:
+                        streams[event.stream_id][1].extend(event.data)
+                        conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                    elif isinstance(event, h2.events.StreamEnded) and event.stream_id in streams:
+                        headers, body = streams.pop(event.stream_id)
+                        call = asyncio.ensure_future(self._respond(conn, writer, event.stream_id, headers,
+                                                                   bytes(body)))
+                        calls.add(call)
+                        call.add_done_callback(calls.discard)
+                writer.write(conn.data_to_send())
+                await writer.drain()
+        except (ConnectionError, h2.exceptions.ProtocolError, asyncio.CancelledError):
+            pass
+        finally:
+            for call in calls:
+                call.cancel()
+            self._handlers.discard(task)
+            writer.close()
+
+    async def _respond(self, conn, writer: asyncio.StreamWriter, stream_id: int, headers: Dict[str, str],
+                       body: bytes):
+        path = headers.get(':path', '')
+        self.calls[path] = self.calls.get(path, 0) + 1
+        delay = self.latency_ms + self.random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+        content_type = headers.get('content-type', 'application/grpc')
+        if not content_type.startswith('application/grpc'):
+            conn.send_headers(stream_id, [(':status', '415')], end_stream=True)
+        else:
+            # Echo the first length-prefixed message (or an empty one)
+            message = body[:5 + int.from_bytes(body[1:5], 'big')] if len(body) >= 5 else b'\x00' * 5
+            conn.send_headers(stream_id, [(':status', '200'), ('content-type', content_type)])
+            conn.send_data(stream_id, message)
+            conn.send_headers(stream_id, [('grpc-status', '0')], end_stream=True)
+        writer.write(conn.data_to_send())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local rallymate REST stub server')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address')
+    parser.add_argument('--port', type=int, default=8080, help='Listen port')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Fixed response delay')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Extra random delay (uniform)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--command-ms', type=float, default=0.0, help='Serialized Edge API command execution time')
+    parser.add_argument('--no-compression', action='store_true',
+                        help='Ignore Accept-Encoding and reject compressed request bodies')
+    parser.add_argument('--compress-min-bytes', type=int, default=256,
+                        help='Smallest response body worth compressing')
+    parser.add_argument('--no-validators', action='store_true',
+                        help='Send no ETag/Last-Modified and ignore conditional requests')
+    parser.add_argument('--no-server-timing', action='store_true', help='Omit the Server-Timing header')
+    parser.add_argument('--session-ttl', type=float, default=3600.0, help='Seconds until issued sessions expire')
+    parser.add_argument('--enforce-sessions', action='store_true',
+                        help='Answer 401 to expired/unknown bearer tokens and reused refresh tokens')
+    parser.add_argument('--max-concurrency', type=int,
+                        help='Requests handled at once; the rest queue, so latency grows past capacity')
+    parser.add_argument('--rate-limit', type=int, help='Requests per second before answering 429 Too Many Requests')
+    parser.add_argument('--grpc-port', type=int,
+                        help='Also serve native gRPC (h2c) on this port, echoing each request (needs h2)')
+    args = parser.parse_args()
+
+    server = StubServer(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate,
+                        command_ms=args.command_ms, compression=not args.no_compression,
+                        compress_min_bytes=args.compress_min_bytes, validators=not args.no_validators,
+                        server_timing=not args.no_server_timing, session_ttl=args.session_ttl,
+                        enforce_sessions=args.enforce_sessions, max_concurrency=args.max_concurrency,
+                        rate_limit=args.rate_limit)
+    print(f"🧪 Stub server listening on http://{args.host}:{args.port}")
+    servers = [server.serve_forever()]
+    if args.grpc_port is not None:
+        grpc_server = GrpcStubServer(args.host, args.grpc_port, args.latency_ms, args.jitter_ms)
+        servers.append(grpc_server.serve_forever())
+        print(f"🧪 gRPC stub listening on {args.host}:{args.grpc_port}")
+
+    async def serve():
+        await asyncio.gather(*servers)
+
+    try:
+        asyncio.run(serve())
+    except ImportError:
+        print("❌ The gRPC stub needs the optional 'h2' package (pip install h2)")
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the conditional GET / cache-effectiveness benchmark.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cache_bench import bench_cache, conditional_item
+from collection_runner import load_items
+from stub_server import StubServer
+
+FACILITIES = Path(__file__).parent / 'generated' / 'facilities_service.postman_collection.json'
+VARIABLES = {'id': '1', 'user_id': '2'}
+
+
+def run_bench(validators: bool):
+    items = [i for i in load_items(FACILITIES) if i.method == 'GET']
+
+    async def run():
+        async with StubServer(validators=validators) as server:
+            return await bench_cache(items, dict(VARIABLES, base_url=server.base_url), 3, 5.0)
+
+    return asyncio.run(run())
+
+
+def test_conditional_item():
+    """Validators are added without touching the original item."""
+    print("\n🧪 Testing conditional items...")
+    item = next(i for i in load_items(FACILITIES) if i.name == 'Get Facilities')
+    conditional = conditional_item(item, 'W/"abc"', None)
+    assert conditional.headers['If-None-Match'] == 'W/"abc"'
+    assert 'If-Modified-Since' not in conditional.headers
+    assert 'If-None-Match' not in item.headers
+    print("   ✅ If-None-Match added to a copy")
+
+
+def test_revalidation_hits():
+    """A server with validators answers every conditional request with 304."""
+    print("\n🧪 Testing 304 hit rate...")
+    stats = run_bench(validators=True)
+    for key, entry in stats.items():
+        summary = entry.summary()
+        assert not entry.uncacheable, key
+        assert summary['validators'] == ['ETag', 'Last-Modified']
+        assert entry.hit_rate == 1.0 and entry.conditional_requests == 3
+        assert entry.saved_per_request == summary['cold_bytes'] > 0
+    print(f"   ✅ {len(stats)} endpoints revalidated at 100%")
+
+
+def test_uncacheable_flag():
+    """Endpoints without validators are flagged and not sent conditionally."""
+    print("\n🧪 Testing uncacheable endpoints...")
+    stats = run_bench(validators=False)
+    assert stats and all(entry.uncacheable for entry in stats.values())
+    assert all(entry.conditional_requests == 0 for entry in stats.values())
+    print(f"   ✅ {len(stats)} endpoints flagged uncacheable")
+
+
+if __name__ == '__main__':
+    test_conditional_item()
+    test_revalidation_hits()
+    test_uncacheable_flag()
+    print("\n🎉 All cache benchmark tests passed!")
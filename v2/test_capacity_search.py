@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the adaptive capacity search (AIMD ramp, SLO stop, rate-limit handling).
+"""
+
+import asyncio
+import email.utils
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from capacity_search import CapacitySearch, Slo, retry_delay
+from collection_runner import CollectionRunner, load_items
+from scenario import Scenario
+from stub_server import StubServer
+
+FACILITIES = Path(__file__).parent / 'generated' / 'facilities_service.postman_collection.json'
+VARIABLES = {'id': '1', 'user_id': '2'}
+
+
+def search_stub(stub: StubServer, **options) -> dict:
+    """Run a quick capacity search over the facilities reads against `stub`."""
+    items = [item for item in load_items(FACILITIES) if item.is_read]
+
+    async def run():
+        async with stub:
+            runner = CollectionRunner(dict(VARIABLES, base_url=stub.base_url))
+            scenario = Scenario.from_items('facility-reads', items, [1.0] * len(items))
+            search = CapacitySearch(runner, scenario, Slo(p99_ms=40.0, min_requests=10), vus=50, seed=1,
+                                    quiet=True, **options)
+            return await search.run()
+
+    return asyncio.run(run())
+
+
+def test_retry_delay():
+    """Retry-After and RateLimit headers become a pause in seconds."""
+    print("\n🧪 Testing rate-limit headers...")
+    now = 1_760_000_000.0
+    assert retry_delay({'retry-after': '3'}, now) == 3.0
+    assert retry_delay({'retry-after': email.utils.formatdate(now + 5, usegmt=True)}, now) == 5.0
+    assert retry_delay({'ratelimit-remaining': '0', 'ratelimit-reset': '2'}, now) == 2.0
+    assert retry_delay({'x-ratelimit-remaining': '0', 'x-ratelimit-reset': str(int(now) + 7)}, now) == 7.0
+    assert retry_delay({'ratelimit': 'limit=100, remaining=0, reset=4'}, now) == 4.0
+    assert retry_delay({'ratelimit-remaining': '12', 'ratelimit-reset': '2'}, now) is None
+    assert retry_delay({}, now) is None
+    print("   ✅ Retry-After (seconds and date), RateLimit-* and X-RateLimit-* parsed")
+
+
+def test_knee_at_capacity():
+    """Latency climbs once the stub's capacity is exceeded; the knee sits just below it."""
+    print("\n🧪 Testing knee detection...")
+    # One request at a time, 10ms each: about 90 requests/s
+    report = search_stub(StubServer(latency_ms=10, max_concurrency=1), start_rate=20, increase=30, step=0.4,
+                         max_breaches=2, max_duration=20)
+    verdicts = [step['verdict'] for step in report['curve']]
+    assert report['stop_reason'] == 'slo' and verdicts.count('breach') == 2 and verdicts[0] == 'ok'
+    knee = report['knee']
+    assert 30 <= knee['achieved_rps'] <= 100 and knee['p99_ms'] <= 40
+    assert report['first_limit']['p99_ms'] > 40 and report['first_limit']['target_rate'] > knee['target_rate'] - 31
+    # Multiplicative decrease after each breach
+    for before, after in zip(report['curve'], report['curve'][1:]):
+        if before['verdict'] == 'breach':
+            assert after['target_rate'] == max(1.0, before['target_rate'] * 0.5)
+    print(f"   ✅ Knee {knee['achieved_rps']:.0f} rps, {len(verdicts)} steps, stopped on the SLO")
+
+
+def test_rate_limit_respected():
+    """429s pause the virtual users for Retry-After and end the search as rate limited."""
+    print("\n🧪 Testing 429 / Retry-After handling...")
+    stub = StubServer(latency_ms=1, rate_limit=40)
+    report = search_stub(stub, start_rate=20, increase=30, step=0.5, max_breaches=1, max_duration=20)
+    assert report['stop_reason'] == 'rate limited'
+    assert report['curve'][-1]['verdict'] == 'throttled' and report['rate_limit_holds']['count'] >= 1
+    assert stub.throttled <= 3, stub.throttled
+    assert report['knee']['target_rate'] < report['curve'][-1]['target_rate']
+    print(f"   ✅ {stub.throttled} × 429 before backing off, {report['rate_limit_holds']['count']} holds")
+
+
+if __name__ == '__main__':
+    test_retry_delay()
+    test_knee_at_capacity()
+    test_rate_limit_respected()
+    print("\n🎉 All capacity search tests passed!")
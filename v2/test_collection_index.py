@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for the repository-wide collection index and proto coverage report.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from collection_index import CollectionIndex, coverage_report, normalize_path, parse_query, proto_endpoints
+
+PROTO = '''
+syntax = "proto3";
+package rallymate.locks;
+
+message LockRequest {
+  string facility_id = 1;
+}
+
+service LocksService {
+  rpc ListLocks(LockRequest) returns (LockRequest) {
+    option (google.api.http) = {
+      get: "/api/facilities/{facility_id}/locks"
+    };
+  }
+  rpc AddLock(LockRequest) returns (LockRequest) {
+    option (google.api.http) = {
+      post: "/api/facilities/{facility_id}/locks"
+      body: "*"
+    };
+  }
+}
+'''
+
+
+def request(name: str, method: str, url: str) -> dict:
+    return {'name': name, 'request': {'method': method, 'url': {'raw': url}}}
+
+
+def write_repo(root: Path):
+    (root / 'environments').mkdir()
+    (root / 'environments' / 'local.json').write_text(json.dumps({'values': [
+        {'key': 'base_url', 'value': 'http://localhost:8080'},
+        {'key': 'api_base_url', 'value': 'http://localhost:8080/api'},
+    ]}))
+    (root / 'rest').mkdir()
+    (root / 'rest' / 'hand.postman_collection.json').write_text(json.dumps({'item': [
+        {'name': 'Locks', 'item': [request('List Locks', 'GET', '{{api_base_url}}/facilities/{{facility_id}}/locks')]},
+    ]}))
+    (root / 'generated.postman_collection.json').write_text(json.dumps({'item': [
+        request('List Locks', 'GET', '{{base_url}}/api/facilities/{{id}}/locks?page=1'),
+        request('Ping', 'GET', 'grpc://{{grpc_url}}/ping.Service/Ping'),
+    ]}))
+
+
+def test_normalize_path():
+    """Parameter spellings, ids, hosts and base variables normalize alike."""
+    print("\n🧪 Testing path normalization...")
+    prefixes = {'api_base_url': '/api'}
+    expected = '/api/facilities/{}/locks'
+    for url in ('{{base_url}}/api/facilities/{{facility_id}}/locks', '{{api_base_url}}/facilities/{id}/locks',
+                'https://api.rallymate.io/api/facilities/42/locks?x=1', '/api/facilities/:id/locks/',
+                '/api/facilities/3f2b8c1e-1d2a-4c3b-9a8e-0123456789ab/locks'):
+        assert normalize_path(url, prefixes)[0] == expected, url
+    assert parse_query('post /api/facilities/{id}/locks') == ('POST', expected)
+    assert parse_query('/api/facilities/7/locks') == (None, expected)
+    print("   ✅ Five spellings map to one key")
+
+
+def test_incremental_index():
+    """Lookups span folders and files; only changed files are re-read."""
+    print("\n🧪 Testing incremental index...")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_repo(root)
+        index = CollectionIndex(root, root / 'index.json')
+        assert index.update()['indexed'] == 2
+        matches = index.query('GET /api/facilities/{id}/locks')
+        assert sorted(m['file'] for m in matches) == ['generated.postman_collection.json',
+                                                      'rest/hand.postman_collection.json']
+        assert any(m['folder'] == 'Locks' for m in matches)
+        assert not index.query('GET /ping.Service/Ping')
+
+        reloaded = CollectionIndex(root, root / 'index.json')
+        assert reloaded.update() == {'indexed': 0, 'unchanged': 2, 'removed': 0, 'errors': 0}
+        (root / 'generated.postman_collection.json').unlink()
+        assert reloaded.update()['removed'] == 1
+        assert len(reloaded.query('/api/facilities/1/locks')) == 1
+    print("   ✅ Unchanged files reused, deleted files dropped")
+
+
+def test_coverage_report():
+    """Annotated endpoints without a request are reported missing."""
+    print("\n🧪 Testing proto coverage...")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_repo(root)
+        (root / 'protos').mkdir()
+        (root / 'protos' / 'locks.proto').write_text(PROTO)
+        index = CollectionIndex(root, root / 'index.json')
+        index.update()
+        endpoints = proto_endpoints(root / 'protos')
+        report = coverage_report(index, endpoints)
+        assert (report['covered'], report['total']) == (1, 2)
+        assert report['services']['LocksService']['missing'] == ['POST /api/facilities/{facility_id}/locks (AddLock)']
+        assert coverage_report(index, endpoints, exclude=['rest/*'])['covered'] == 1
+        assert coverage_report(index, endpoints, exclude=['*'])['covered'] == 0
+    print("   ✅ 1/2 endpoints covered, AddLock missing")
+
+
+if __name__ == '__main__':
+    test_normalize_path()
+    test_incremental_index()
+    test_coverage_report()
+    print("\n🎉 All collection index tests passed!")
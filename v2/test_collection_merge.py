@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for merging regenerated items into hand-maintained collections.
+"""
+
+import copy
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from collection_merge import merge_collections, script_lines, write_like
+
+PREFIXES = {'base_url': '', 'api_base_url': '/api'}
+
+
+def generated_collection(path: str = '/api/facilities/{{facility_id}}') -> dict:
+    return {'info': {'name': 'rallymate FacilitiesService'}, 'item': [{
+        'name': 'Update Facility',
+        'event': [{'listen': 'test', 'script': {'exec': [
+            "pm.test('Status code is 200', function () {});",
+            "pm.collectionVariables.set('facility_id', response.facility.id);",
+        ]}}],
+        'request': {
+            'method': 'PUT',
+            'url': {'raw': '{{base_url}}' + path},
+            'body': {'mode': 'raw', 'raw': json.dumps({'name': 'Facility', 'timezone': 'UTC', 'address': '1 Main St'},
+                                                      indent=2)},
+            'description': ('**RPC:** UpdateFacility\n\n**Request:** UpdateFacilityRequest\n\n'
+                            '**Response:** UpdateFacilityResponse'),
+        },
+    }]}
+
+
+def hand_collection() -> dict:
+    return {'info': {'name': 'rallymate HTTP REST API'}, 'item': [{'name': 'Facilities', 'item': [
+        {
+            'name': 'Update My Facility',
+            'event': [{'listen': 'test', 'script': {'exec': [
+                'pm.test("Name updated", function () {',
+                '    pm.expect(pm.response.json().facility.name).to.eql("Court House");',
+                '});',
+            ]}}],
+            'request': {
+                'method': 'PUT',
+                'header': [{'key': 'X-Tenant', 'value': 'acme'}],
+                'url': {'raw': '{{api_base_url}}/facilities/{{created_facility_id}}?notify=true',
+                        'query': [{'key': 'notify', 'value': 'true'}]},
+                'body': {'mode': 'raw', 'raw': '{\n    "name": "Court House",\n    "owner_id": {{user_id}},\n'
+                                               '    "legacy_code": "X1"\n}'},
+                'description': 'Hand-written description',
+            },
+            'response': [{'name': 'Example 200'}],
+        },
+        {'name': 'Health', 'request': {'method': 'GET', 'url': '{{base_url}}/health'}},
+    ]}]}
+
+
+def test_merge_preserves_human_parts():
+    """Path match updates the body skeleton and extraction, keeping everything human-written."""
+    print("\n🧪 Testing keyed merge...")
+    target = hand_collection()
+    report = merge_collections(target, [generated_collection()], PREFIXES)
+    item = target['item'][0]['item'][0]
+    assert report['updated'] == {'Update My Facility (FacilitiesService.UpdateFacility)': ['body', 'tests']}
+    assert report['stale'] == ['Health'] and report['new'] == []
+
+    assert item['request']['body']['raw'] == ('{\n    "name": "Court House",\n    "timezone": "UTC",\n'
+                                              '    "address": "1 Main St"\n}')
+    assert item['request']['url']['raw'] == '{{api_base_url}}/facilities/{{created_facility_id}}?notify=true'
+    assert item['request']['header'] and item['response'] and item['name'] == 'Update My Facility'
+    lines = script_lines(item)
+    assert lines[:3] == hand_collection()['item'][0]['item'][0]['event'][0]['script']['exec']
+    assert lines[4].startswith('// <generated FacilitiesService.UpdateFacility>')
+    assert any("pm.collectionVariables.set('facility_id', response.facility.id)" in line for line in lines)
+
+    again = copy.deepcopy(target)
+    report = merge_collections(again, [generated_collection()], PREFIXES)
+    assert again == target and report['updated'] == {} and report['unchanged'] == 1
+    print("   ✅ Human values, tests, headers and examples kept; second merge is a no-op")
+
+
+def test_marker_survives_path_change():
+    """Once merged, an item is matched by its marker even after the route moves."""
+    print("\n🧪 Testing marker key after a route change...")
+    target = hand_collection()
+    merge_collections(target, [generated_collection()], PREFIXES)
+    moved = generated_collection('/api/v2/facilities/{{facility_id}}')
+    moved['item'][0]['request']['method'] = 'PATCH'
+    report = merge_collections(target, [moved], PREFIXES, add_new=True)
+    item = target['item'][0]['item'][0]
+    assert report['new'] == [] and len(target['item']) == 1
+    assert item['request']['method'] == 'PATCH'
+    assert item['request']['url']['raw'] == '{{api_base_url}}/v2/facilities/{{created_facility_id}}?notify=true'
+    assert item['request']['url']['path'] == ['v2', 'facilities', '{{created_facility_id}}']
+    print("   ✅ Method and path updated in place, parameter name and query kept")
+
+
+def test_write_like_keeps_format():
+    """Indentation, CRLF line endings and the missing final newline round-trip."""
+    print("\n🧪 Testing output formatting...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'c.json'
+        original = '{\r\n    "a": [\r\n        1\r\n    ]\r\n}'
+        write_like(path, json.loads(original), original)
+        assert path.read_bytes().decode() == original
+    print("   ✅ Byte-identical when nothing changed")
+
+
+def test_placeholders_and_ambiguous_keys():
+    """Unresolved enum placeholders are never copied; a key shared by several items merges none."""
+    print("\n🧪 Testing placeholders and ambiguous keys...")
+    generated = generated_collection()
+    generated['item'][0]['request']['body']['raw'] = json.dumps(
+        {'name': 'Facility', 'status': 'ENUM_VALUE_rallymate.common.ConnectivityStatus',
+         'tags': ['ENUM_VALUE_Tag'], 'hours': {'open': '08:00', 'kind': 'ENUM_VALUE_HoursKind'}})
+    target = hand_collection()
+    merge_collections(target, [generated], PREFIXES)
+    assert json.loads(target['item'][0]['item'][0]['request']['body']['raw'].replace('{{user_id}}', '0')) == \
+        {'name': 'Court House', 'hours': {'open': '08:00'}}
+
+    target = hand_collection()
+    negative = copy.deepcopy(target['item'][0]['item'][0])
+    negative['name'] = 'Update My Facility - missing name'
+    negative['request']['body']['raw'] = '{\n    "legacy_code": "X1"\n}'
+    target['item'][0]['item'].append(negative)
+    before = copy.deepcopy(target)
+    report = merge_collections(target, [generated_collection()], PREFIXES)
+    assert target == before and report['updated'] == {}
+    assert report['ambiguous'] == {'FacilitiesService.UpdateFacility': ['Update My Facility',
+                                                                       'Update My Facility - missing name']}
+    assert report['stale'] == ['Health']
+    print("   ✅ Placeholders skipped; 2 items sharing a key reported, not merged")
+
+
+if __name__ == '__main__':
+    test_merge_preserves_human_parts()
+    test_marker_survives_path_change()
+    test_placeholders_and_ambiguous_keys()
+    test_write_like_keeps_format()
+    print("\n🎉 All collection merge tests passed!")
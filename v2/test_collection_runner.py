@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Tests for the Python collection runner and its soak mode.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from collection_runner import (CollectionRunner, item_variables, load_items, load_runner_resolver,
+                               load_runner_variables, parse_duration)
+from latency_stats import EndpointStats
+from scenario import Scenario
+from soak_mode import DriftDetector, SoakRunner, Window, flatten_numbers
+from stub_server import StubServer
+
+AUTH_COLLECTION = Path(__file__).parent / 'generated' / 'auth_service.postman_collection.json'
+EDGE_COLLECTION = Path(__file__).parent.parent / 'collections' / 'rest' / 'RallyMate_Edge_API.postman_collection.json'
+
+
+def test_load_items():
+    """Items carry Service.Rpc keys, bearer auth and extraction rules."""
+    print("\n🧪 Testing item loading...")
+    items = {item.name: item for item in load_items(AUTH_COLLECTION)}
+    verify = items['Verify OTP']
+    assert verify.key == 'AuthService.VerifyOTP'
+    assert ('session_token', 'session.session_token') in verify.extract
+    assert verify.bearer == '{{session_token}}'
+    assert parse_duration('4h') == 14400 and parse_duration('90s') == 90
+    print(f"   ✅ {len(items)} items loaded")
+
+
+def test_run_extracts_variables():
+    """Values extracted from one response feed later requests."""
+    print("\n🧪 Testing run with extraction...")
+    items = [i for i in load_items(AUTH_COLLECTION) if i.name in ('Verify OTP', 'Validate Session')]
+
+    async def run():
+        async with StubServer() as server:
+            variables = load_runner_variables([AUTH_COLLECTION], overrides={'base_url': server.base_url})
+            runner = CollectionRunner(variables)
+            state = {}
+            async with runner.client() as client:
+                for item in items:
+                    await runner.execute(client, item, state)
+            return runner, state
+
+    runner, state = asyncio.run(run())
+    assert state['session_token'].startswith('stub-session-')
+    assert all(s.errors == 0 for s in runner.stats.values())
+    print("   ✅ session_token extracted")
+
+
+def test_run_edge_collection():
+    """The shipped Edge collection (bridge_host={{bridge_host}}) runs like `run --var base_url=...`."""
+    print("\n🧪 Testing Edge collection run...")
+    items = load_items(EDGE_COLLECTION)
+
+    async def run():
+        async with StubServer() as server:
+            overrides = {'base_url': server.base_url, 'device_id': 'd1'}
+            resolver = load_runner_resolver([EDGE_COLLECTION], overrides=overrides)
+            resolver.resolved(item_variables(items))
+            runner = CollectionRunner(resolver)
+            return await runner.run_sequence(items, 1), sum(server.request_counts.values())
+
+    results, requests = asyncio.run(run())
+    assert requests == len(items) and not any('cycle' in (r.error or '') for r in results)
+    assert load_runner_resolver([EDGE_COLLECTION]).resolved()['bridge_host'] == '{{bridge_host}}'
+    print(f"   ✅ {requests} Edge requests sent; the self-referencing bridge_host is left as is")
+
+
+def _window(latency: float, count: int, errors: int = 0, transport_errors: bool = False) -> Window:
+    window = Window(0.0)
+    stats = window.endpoints.setdefault('Svc.Rpc', EndpointStats())
+    for i in range(count):
+        status = None if transport_errors and i < errors else 200
+        stats.record(latency * (1 + (i % 10) / 100), status, i >= errors)
+    return window
+
+
+def test_drift_detector():
+    """Only a significant p99 or error-rate change raises an alert."""
+    print("\n🧪 Testing drift detection...")
+    detector = DriftDetector(warmup_windows=1, baseline_windows=2)
+    windows = [_window(0.050, 500), _window(0.010, 500), _window(0.010, 500), _window(0.010, 500)]
+    assert detector.check(windows) == []
+
+    windows.append(_window(0.020, 500))
+    metrics = {(a['endpoint'], a['metric']) for a in detector.check(windows)}
+    assert ('Svc.Rpc', 'p99') in metrics and ('*', 'p99') in metrics
+
+    windows.append(_window(0.010, 500, errors=50))
+    metrics = {a['metric'] for a in detector.check(windows)}
+    assert metrics == {'error_rate'}
+    assert flatten_numbers({'memory': {'rss': 5, 'ok': True}, 'cpu': [1.5]}) == {'memory.rss': 5.0, 'cpu.0': 1.5}
+    print("   ✅ Drift flagged only for real changes")
+
+
+def test_drift_outage_window():
+    """A window where every request fails at the transport level is an error-rate alert, not a crash."""
+    print("\n🧪 Testing drift detection during an outage...")
+    detector = DriftDetector(warmup_windows=1, baseline_windows=2)
+    windows = [_window(0.010, 500) for _ in range(3)]
+    windows.append(_window(0.010, 500, errors=500, transport_errors=True))
+    alerts = detector.check(windows)
+    assert {(a['endpoint'], a['metric']) for a in alerts} == {('Svc.Rpc', 'error_rate'), ('*', 'error_rate')}
+    assert all(a['current'] == 1.0 for a in alerts)
+    print("   ✅ Outage reported as error-rate drift")
+
+
+def test_short_soak():
+    """A short soak rolls windows and keeps per-endpoint stats."""
+    print("\n🧪 Testing short soak...")
+    items = [i for i in load_items(AUTH_COLLECTION) if i.is_read]
+
+    async def run():
+        async with StubServer() as server:
+            runner = CollectionRunner({'base_url': server.base_url, 'session_token': 't', 'user_id': 'u'})
+            scenario = Scenario.from_items('reads', items, [1.0] * len(items))
+            soak = SoakRunner(runner, scenario, duration=0.6, vus=2, rate=50, window=0.2, seed=1, quiet=True)
+            return await soak.run()
+
+    report = asyncio.run(run())
+    assert len(report['windows']) >= 3
+    assert sum(w['overall']['requests'] for w in report['windows']) == \
+        sum(e['requests'] for e in report['endpoints'].values())
+    print(f"   ✅ {len(report['windows'])} windows recorded")
+
+
+if __name__ == '__main__':
+    test_load_items()
+    test_run_extracts_variables()
+    test_run_edge_collection()
+    test_drift_detector()
+    test_drift_outage_window()
+    test_short_soak()
+    print("\n🎉 All collection runner tests passed!")
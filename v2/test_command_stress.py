@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the Edge API command stress scenario against the local stub server.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from command_stress import CommandStress, EDGE_COLLECTION
+from latency_stats import least_squares_slope
+from stub_server import StubServer
+
+
+def test_convergence_check():
+    """Only the device state counts as converged, not fields echoing the command."""
+    print("\n🧪 Testing convergence check...")
+    with open(EDGE_COLLECTION) as f:
+        stress = CommandStress(json.load(f), {}, ['lock-court-01'])
+    assert stress._converged({'state': 'LOCK_STATE_LOCKED'}, 'lock')
+    assert stress._converged({'status': {'lock_state': 'unlocked'}}, 'unlock')
+    # Not converged: the device is still unlocked, only the echoed command says "lock"
+    assert not stress._converged({'command_type': 'lock', 'action': 'lock', 'state': 'unlocked'}, 'lock')
+    assert not stress._converged({'command_type': 'lock', 'last_action': 'locked'}, 'lock')
+
+    stress.expect = ('status.lock_state', 'LOCK_STATE_{action}')
+    assert stress._converged({'status': {'lock_state': 'lock_state_unlock'}}, 'unlock')
+    assert not stress._converged({'status': {}}, 'unlock')
+    assert abs(least_squares_slope([(1, 0.01), (2, 0.02), (3, 0.03)]) - 0.01) < 1e-9
+    print("   ✅ State fields only; echoed actions ignored")
+
+
+def test_bursts_against_serialized_bridge():
+    """Serialized command execution shows up as queueing and slope."""
+    print("\n🧪 Testing command bursts...")
+    with open(EDGE_COLLECTION) as f:
+        collection = json.load(f)
+
+    async def run():
+        async with StubServer(command_ms=10) as server:
+            stress = CommandStress(
+                collection, {'base_url': server.base_url}, ['lock-court-01', 'lock-court-02'],
+                burst_size=4, bursts=2, burst_interval=0.05, baseline_samples=3, connect=True
+            )
+            return await stress.run()
+
+    report = asyncio.run(run())
+
+    assert report['commands']['requests'] == 8
+    assert report['commands']['errors'] == 0
+    assert report['convergence']['count'] == 8
+    assert report['convergence_timeouts'] == 0
+    assert report['serialization_ms_per_command'] > 5
+    assert [b['action'] for b in report['burst_details']] == ['unlock', 'lock']
+    print(f"   ✅ +{report['serialization_ms_per_command']}ms per in-flight command")
+
+
+if __name__ == '__main__':
+    test_convergence_check()
+    test_bursts_against_serialized_bridge()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for content-coding helpers and the compression benchmark.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from collection_runner import load_items
+from compression import available_encodings, compress, decompress, negotiate
+from compression_bench import bench_encoding, bench_request_bodies, recommendations
+from stub_server import StubServer
+
+VIDEOS = Path(__file__).parent / 'generated' / 'videos_service.postman_collection.json'
+VARIABLES = {'id': '1', 'user_id': '2', 'facility_id': '3'}
+
+
+def test_codecs():
+    """Every available coding round-trips and negotiation honours q-values."""
+    print("\n🧪 Testing codecs...")
+    data = b'{"videos": [' + b'{"id": 1, "title": "Court 3"},' * 50 + b'{}]}'
+    for encoding in available_encodings():
+        assert decompress(compress(data, encoding), encoding) == data
+    assert decompress(compress(compress(data, 'deflate'), 'gzip'), 'deflate, gzip') == data
+    assert negotiate('gzip;q=0.5, deflate') == 'deflate'
+    assert negotiate('gzip;q=0') == 'identity'
+    assert negotiate('') == 'identity'
+    print(f"   ✅ {', '.join(available_encodings())} round-trip")
+
+
+def test_response_encodings():
+    """gzip responses are smaller on the wire and decoded transparently."""
+    print("\n🧪 Testing response encodings...")
+    items = [i for i in load_items(VIDEOS) if i.name in ('Update Video', 'Get Videos')]
+
+    async def run():
+        async with StubServer(compress_min_bytes=128) as server:
+            variables = dict(VARIABLES, base_url=server.base_url)
+            identity = await bench_encoding(items, variables, 'identity', 3, 5.0)
+            gzip = await bench_encoding(items, variables, 'gzip', 3, 5.0)
+            return {'identity': identity, 'gzip': gzip}
+
+    results = asyncio.run(run())
+    update, listing = 'VideosService.UpdateVideo', 'VideosService.GetVideos'
+    assert results['identity'][update].wire_bytes == results['identity'][update].body_bytes
+    assert results['gzip'][update].codings == {'gzip': 3}
+    assert results['gzip'][update].wire_bytes < results['gzip'][update].body_bytes
+    assert results['gzip'][update].decode_cpu > 0
+    # Small responses stay below the stub's compression threshold
+    assert results['gzip'][listing].codings == {'identity': 3}
+    assert all(s.errors == 0 for per_key in results.values() for s in per_key.values())
+    assert isinstance(recommendations(results), list)
+    print(f"   ✅ {update}: {results['gzip'][update].summary()['ratio']:.2f} wire/decoded with gzip")
+
+
+def test_request_bodies():
+    """Compressed request bodies are accepted, or rejected with 415."""
+    print("\n🧪 Testing compressed request bodies...")
+    items = [i for i in load_items(VIDEOS) if i.name == 'Update Video']
+
+    async def run(compression: bool):
+        async with StubServer(compression=compression) as server:
+            variables = dict(VARIABLES, base_url=server.base_url)
+            return await bench_request_bodies(items, variables, 'gzip', 2, 5.0)
+
+    accepted = asyncio.run(run(True))['VideosService.UpdateVideo']
+    assert accepted['accepted'] == 2 and accepted['sent_bytes'] < accepted['raw_bytes']
+    rejected = asyncio.run(run(False))['VideosService.UpdateVideo']
+    assert rejected['accepted'] == 0 and rejected['statuses'] == {'415': 2}
+    print(f"   ✅ saved {accepted['saved_ratio']:.0%}; plain server answers 415")
+
+
+if __name__ == '__main__':
+    test_codecs()
+    test_response_encodings()
+    test_request_bodies()
+    print("\n🎉 All compression tests passed!")
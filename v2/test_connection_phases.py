@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Tests for per-phase request timings and the fresh / pooled / HTTP/2 modes.
+"""
+
+import asyncio
+import shutil
+import socket
+import ssl
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from connection_bench import bench_mode, summarize
+from collection_runner import load_items
+from http_client import HttpClient, Timings, open_timed_connection
+from http2_client import Http2Client, http2_available
+from stub_server import StubServer
+
+FACILITIES = Path(__file__).parent / 'generated' / 'facilities_service.postman_collection.json'
+
+
+def test_fresh_vs_pooled():
+    """Fresh connections pay connect on every request; pooled ones reuse."""
+    print("\n🧪 Testing fresh vs pooled phases...")
+    items = [i for i in load_items(FACILITIES) if i.name == 'Get Facilities']
+
+    async def run():
+        async with StubServer() as server:
+            variables = {'base_url': server.base_url}
+            fresh = await bench_mode('fresh', items, variables, 20, 2, 5.0)
+            pooled = await bench_mode('pooled', items, variables, 20, 2, 5.0)
+            return summarize(fresh)['phases'], summarize(pooled)['phases']
+
+    fresh, pooled = asyncio.run(run())
+    assert fresh.requests == pooled.requests == 20
+    assert fresh.reused == 0 and fresh.phases['connect'].count_above(0.000001) == 20
+    assert pooled.reused >= 18
+    assert fresh.handshake_share > pooled.handshake_share
+    print(f"   ✅ handshake share fresh {fresh.handshake_share:.0%} vs pooled {pooled.handshake_share:.0%}")
+
+
+def test_tls_phase():
+    """The TLS handshake is timed separately from TCP connect."""
+    print("\n🧪 Testing TLS phase...")
+    if not shutil.which('openssl'):
+        print("   ⚠️  openssl not available, skipping")
+        return
+
+    async def handle(reader, writer):
+        while (await reader.readline()) not in (b'\r\n', b''):
+            pass
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\n{}")
+        await writer.drain()
+        writer.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = f"{tmp}/cert.pem", f"{tmp}/key.pem"
+        subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-keyout', key,
+                        '-out', cert, '-days', '1', '-subj', '/CN=localhost',
+                        '-addext', 'subjectAltName=DNS:localhost'], check=True, capture_output=True)
+        server_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        server_context.load_cert_chain(cert, key)
+        client_context = ssl.create_default_context(cafile=cert)
+
+        async def run():
+            server = await asyncio.start_server(handle, '127.0.0.1', 0, ssl=server_context)
+            port = server.sockets[0].getsockname()[1]
+            async with HttpClient(ssl_context=client_context, pool=False) as client:
+                response = await client.request('GET', f"https://localhost:{port}/api/health")
+            server.close()
+            await server.wait_closed()
+            return response
+
+        response = asyncio.run(run())
+    assert response.status == 200
+    assert response.timings.tls > 0 and response.timings.connect > 0
+    print(f"   ✅ tls {response.timings.tls * 1000:.2f}ms, connect {response.timings.connect * 1000:.2f}ms")
+
+
+def test_http2_multiplexing():
+    """Concurrent HTTP/2 requests share one connection (h2c prior knowledge)."""
+    print("\n🧪 Testing HTTP/2 multiplexing...")
+    if not http2_available():
+        print("   ⚠️  h2 not installed, skipping")
+        return
+    import h2.config
+    import h2.connection
+    import h2.events
+
+    connections = []
+
+    async def handle(reader, writer):
+        connections.append(writer)
+        conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    conn.send_headers(event.stream_id, [(':status', '200'), ('content-type', 'application/json')])
+                    conn.send_data(event.stream_id, b'{"success": true}', end_stream=True)
+            writer.write(conn.data_to_send())
+            await writer.drain()
+
+    async def run():
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with Http2Client() as client:
+            responses = await asyncio.gather(*(
+                client.request('POST' if i % 2 else 'GET', f"http://127.0.0.1:{port}/api/facilities",
+                               body={'n': i} if i % 2 else None)
+                for i in range(10)))
+        server.close()
+        return responses
+
+    responses = asyncio.run(run())
+    assert [r.status for r in responses] == [200] * 10
+    assert responses[0].json() == {'success': True}
+    assert len(connections) == 1
+    assert sum(1 for r in responses if not r.timings.reused) == 1
+    print("   ✅ 10 requests over 1 connection")
+
+
+def test_address_fallback():
+    """A host whose first address refuses (dual-stack localhost) connects on the next one."""
+    print("\n🧪 Testing fallback across resolved addresses...")
+
+    async def run():
+        server = await asyncio.start_server(lambda reader, writer: writer.close(), '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        loop = asyncio.get_running_loop()
+        resolve = loop.getaddrinfo
+
+        async def first_address_dead(host, *args, **kwargs):
+            # 127.0.0.2 is loopback too, but nothing listens there
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.2', port))] + \
+                await resolve(host, *args, **kwargs)
+
+        loop.getaddrinfo = first_address_dead
+        timings = Timings()
+        try:
+            _, writer = await open_timed_connection('127.0.0.1', port, None, timings, 5.0)
+            peer = writer.get_extra_info('peername')
+            writer.close()
+        finally:
+            del loop.getaddrinfo
+            server.close()
+        return peer, timings
+
+    peer, timings = asyncio.run(run())
+    assert peer[0] == '127.0.0.1' and timings.connect > 0
+    print(f"   ✅ Connected to {peer[0]} after the first address refused")
+
+
+if __name__ == '__main__':
+    test_fresh_vs_pooled()
+    test_tls_phase()
+    test_http2_multiplexing()
+    test_address_fallback()
+    print("\n🎉 All connection phase tests passed!")
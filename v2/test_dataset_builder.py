@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for the multi-tenant dataset builder against the local stub server.
+"""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from dataset_builder import Checkpoint, DatasetBuilder, iteration_rows
+from generate_postman_collections import generate_environment
+from rpc_catalog import load_services
+from stub_server import StubServer
+
+CONFIG = {
+    'run_id': 'test',
+    'facilities': 3,
+    'users': 2,
+    'devices': 4,
+    'videos': 2,
+    'camera_ratio': 0.34,
+    'associate_videos': True,
+}
+
+
+def _build(checkpoint_path: Path):
+    async def run():
+        async with StubServer() as server:
+            services = load_services(proto_dir=Path('/nonexistent'))
+            builder = DatasetBuilder(server.base_url, services, Checkpoint(checkpoint_path, dict(CONFIG)),
+                                     concurrency=4)
+            await builder.build()
+            return builder, sum(server.request_counts.values())
+    return asyncio.run(run())
+
+
+def test_build_topology():
+    """Every facility gets users, memberships, devices and videos."""
+    print("\n🧪 Testing dataset build...")
+    with tempfile.TemporaryDirectory() as tmp:
+        builder, requests = _build(Path(tmp) / 'checkpoint.json')
+        index = builder.index()
+
+    assert not builder.failures
+    assert builder.device_plan() == ['bridge', 'lock', 'lock', 'camera']
+    assert len(index['facilities']) == 3
+    facility = index['facilities'][0]
+    assert len(facility['users']) == 2
+    assert facility['users'][0]['membership_id'] is not None
+    assert len(facility['devices']['lock']) == 2
+    assert len(facility['videos']) == 2
+    # facility + 2×(user + membership) + 4 devices + 2×(video + association)
+    assert requests == 3 * (1 + 4 + 4 + 4)
+    assert iteration_rows(index)[0]['camera_device_id'].startswith('test-camera-f1')
+    print(f"   ✅ {requests} requests created the topology")
+
+
+def test_resume_skips_created_entities():
+    """A second run with the same checkpoint sends no requests."""
+    print("\n🧪 Testing checkpoint resume...")
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = Path(tmp) / 'checkpoint.json'
+        _build(checkpoint)
+        _, requests = _build(checkpoint)
+
+    assert requests == 0
+    print("   ✅ Resume is idempotent")
+
+
+def test_checkpoint_journal():
+    """Creates survive a kill between snapshots; a torn journal line is ignored."""
+    print("\n🧪 Testing checkpoint journal...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'checkpoint.json'
+        checkpoint = Checkpoint(path, dict(CONFIG))
+        for n in range(3):
+            checkpoint.put(f'facility:{n}', {'id': f'f{n}'})
+        checkpoint._journal.close()  # killed before the next snapshot
+        with open(checkpoint.journal_path, 'a') as f:
+            f.write('["facility:3", {"id": ')
+
+        resumed = Checkpoint(path, {})
+        assert resumed.config == CONFIG
+        assert [resumed.get(f'facility:{n}') for n in range(4)] == [{'id': 'f0'}, {'id': 'f1'}, {'id': 'f2'}, None]
+        assert not resumed.journal_path.exists()
+    print("   ✅ 3 journaled creates recovered, torn line skipped")
+
+
+def test_dataset_environment_id():
+    """The dataset environment id is a slug like the other generated environments."""
+    print("\n🧪 Testing dataset environment id...")
+    assert generate_environment('Staging Dataset', 'http://x')['id'] == 'rallymate-staging-dataset'
+    assert generate_environment('Local', 'http://x')['id'] == 'rallymate-local'
+    print("   ✅ rallymate-staging-dataset")
+
+
+def main():
+    """Run all tests."""
+    tests = [test_build_topology, test_resume_skips_created_entities, test_checkpoint_journal,
+             test_dataset_environment_id]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"   ❌ {test.__name__} failed: {e}")
+    print(f"\nResult: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the distributed coordinator with subprocess workers and the stub server.
+"""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from distributed import Coordinator, parse_address, split_evenly
+from latency_stats import EndpointStats, LatencyHistogram
+from stub_server import StubServer
+
+FACILITIES = Path(__file__).parent / 'generated' / 'facilities_service.postman_collection.json'
+
+
+def test_helpers():
+    """Address parsing, share splitting and exact histogram merging."""
+    print("\n🧪 Testing helpers...")
+    assert parse_address('unix:/tmp/x.sock') == ('unix', '/tmp/x.sock')
+    assert parse_address('0.0.0.0:7070') == ('tcp', ('0.0.0.0', 7070))
+    assert split_evenly(10, 3) == [4, 3, 3]
+
+    a = [0.001 * i for i in range(1, 200)]
+    b = [0.002 * i for i in range(1, 300)]
+    merged = LatencyHistogram.from_samples(a).merge(LatencyHistogram.from_samples(b))
+    assert merged.buckets == LatencyHistogram.from_samples(a + b).buckets
+    print("   ✅ Helpers OK")
+
+
+def _plan(base_url: str) -> dict:
+    return {
+        'scenario': None, 'base_dir': None, 'collections': [str(FACILITIES)], 'weights': None,
+        'reads_only': True, 'think_time': None, 'variables': {'base_url': base_url, 'id': 'f-1', 'user_id': 'u-1'},
+        'duration': 1.0, 'vus': 4, 'rate': 200, 'seed': 1, 'max_connections': 20, 'timeout': 5.0,
+    }
+
+
+def _run(address: str, workers: int):
+    async def run():
+        async with StubServer() as server:
+            coordinator = Coordinator(_plan(server.base_url), workers, address, connect_timeout=20)
+            report = await coordinator.run(spawn=True)
+            served = sum(server.request_counts.values())
+            return report, served
+    return asyncio.run(run())
+
+
+def test_tcp_workers():
+    """Subprocess workers over TCP produce one merged report."""
+    print("\n🧪 Testing TCP workers...")
+    report, served = _run('127.0.0.1:0', 2)
+    assert report['failed_workers'] == 0
+    assert [w['vus'] for w in report['workers']] == [2, 2]
+    assert report['overall']['requests'] == served == sum(w['requests'] for w in report['workers'])
+    assert report['overall']['errors'] == 0
+    total = EndpointStats()
+    for data in report['stats'].values():
+        total.merge(EndpointStats.from_dict(data))
+    assert total.latency.count == served
+    print(f"   ✅ {served} requests from 2 workers")
+
+
+def test_unix_socket_workers():
+    """The same protocol works over a Unix socket."""
+    print("\n🧪 Testing Unix socket workers...")
+    with tempfile.TemporaryDirectory() as tmp:
+        report, served = _run(f"unix:{tmp}/coordinator.sock", 3)
+    assert report['failed_workers'] == 0
+    assert [w['vus'] for w in report['workers']] == [2, 1, 1]
+    assert report['overall']['requests'] == served
+    print(f"   ✅ {served} requests from 3 workers")
+
+
+if __name__ == '__main__':
+    test_helpers()
+    test_tcp_workers()
+    test_unix_socket_workers()
+    print("\n🎉 All distributed runner tests passed!")
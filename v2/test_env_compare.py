@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent multi-environment comparison and the production write guard.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from collection_runner import CollectionRunner, load_items
+from env_compare import (DEFAULT_PROTECTED, DEFAULT_WRITE_ALLOWLIST, WriteGuard, attribute_delta,
+                         compare_runners, format_comparison_table, parse_target, run_compare)
+from session_refresh import refresh_item
+from stub_server import StubServer
+
+GENERATED = Path(__file__).parent / 'generated'
+FACILITIES = GENERATED / 'facilities_service.postman_collection.json'
+VARIABLES = {'id': '1', 'user_id': '2'}
+
+
+def test_targets_and_guard():
+    """Environment names come from the files; only protected ones get the write guard."""
+    print("\n🧪 Testing targets and write guard...")
+    local = parse_target(str(GENERATED / 'rallymate-local.postman_environment.json'), DEFAULT_PROTECTED)
+    production = parse_target(str(GENERATED / 'rallymate-production.postman_environment.json'), DEFAULT_PROTECTED)
+    renamed = parse_target('edge=' + str(GENERATED / 'rallymate-production.postman_environment.json'), ['edge'])
+    assert (local.name, local.protected) == ('Local', False)
+    assert (production.name, production.protected, production.host) == ('Production', True, 'api.rallymate.io')
+    assert (renamed.name, renamed.protected) == ('edge', True)
+
+    # A production environment under another name is still protected: only loopback or --unprotected get writes
+    development = str(GENERATED / 'rallymate-development.postman_environment.json')
+    disguised = 'live=' + str(GENERATED / 'rallymate-production.postman_environment.json')
+    assert parse_target(disguised, []).protected and parse_target(development, DEFAULT_PROTECTED).protected
+    assert not parse_target(development, DEFAULT_PROTECTED, ['Development']).protected
+    assert not parse_target(disguised, [], ['live']).protected
+    assert parse_target(disguised, ['api.rallymate.io'], ['live']).protected
+
+    items = {item.name: item for item in load_items(FACILITIES)}
+    guard = WriteGuard(DEFAULT_WRITE_ALLOWLIST + ['Facilit*.UpdateFacility'])
+    assert guard(items['Get Facilities']) and guard(refresh_item()) and guard(items['Update Facility'])
+    assert not guard(items['Create Facility']) and not guard(items['Delete Facility'])
+    print("   ✅ Production protected, reads and allowlisted writes pass")
+
+
+def test_concurrent_comparison():
+    """Both environments run at once; production never sees a write; the slow server is blamed."""
+    print("\n🧪 Testing concurrent comparison...")
+    items = load_items(FACILITIES)
+
+    async def run():
+        async with StubServer(latency_ms=1) as local, StubServer(latency_ms=15) as production:
+            runners = {
+                'Local': CollectionRunner(dict(VARIABLES, base_url=local.base_url), trace_context=True),
+                'Production': CollectionRunner(dict(VARIABLES, base_url=production.base_url), trace_context=True,
+                                               write_guard=WriteGuard(DEFAULT_WRITE_ALLOWLIST)),
+            }
+            await run_compare(runners, SimpleNamespace(iterations=3), items)
+            return runners, dict(local.request_counts), dict(production.request_counts)
+
+    runners, local_counts, production_counts = asyncio.run(run())
+    assert {method for method, _ in production_counts} == {'GET'}
+    assert {'POST', 'PUT', 'DELETE'} <= {method for method, _ in local_counts}
+    assert runners['Production'].blocked == {'FacilitiesService.CreateFacility': 3,
+                                             'FacilitiesService.UpdateFacility': 3,
+                                             'FacilitiesService.DeleteFacility': 3}
+
+    endpoints = compare_runners(runners)
+    reads = endpoints['FacilitiesService.GetFacilities']
+    assert reads['Local']['requests'] == reads['Production']['requests'] == 3
+    delta = attribute_delta(reads['Production'], reads['Local'])
+    assert delta['p50_ms'] > 10 and delta['cause'] == 'server'
+    assert set(endpoints['FacilitiesService.CreateFacility']) == {'Local'}
+
+    table = format_comparison_table(endpoints, ['Local', 'Production'])
+    assert '(server)' in table and 'FacilitiesService.GetFacilities' in table
+    print(f"   ✅ 9 writes blocked on production, GetFacilities {delta['p50_ms']:+.1f}ms p50 (server)")
+
+
+if __name__ == '__main__':
+    test_targets_and_guard()
+    test_concurrent_comparison()
+    print("\n🎉 All environment comparison tests passed!")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the k6 / Locust load script exporters.
+"""
+
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from export_load_scripts import export_k6, export_locust, main, request_plan
+from rpc_catalog import load_service
+
+
+def _auth():
+    return load_service('auth', proto_dir=Path('/nonexistent'))
+
+
+def test_request_plan():
+    """Steps keep collection order, path templates and extraction rules."""
+    print("\n🧪 Testing request plan...")
+    plan = {step['name']: step for step in request_plan(_auth())}
+    verify = plan['AuthService.VerifyOTP']
+    assert verify['url'] == '{{base_url}}/api/auth/otp/verify'
+    assert ['session_token', 'session.session_token'] in verify['extract']
+
+    users = load_service('users', proto_dir=Path('/nonexistent'))
+    update = next(s for s in request_plan(users) if s['method'] == 'PUT' and '{{' in s['url'].split('/api')[1])
+    param = update['url'].split('{{')[-1].rstrip('}')
+    assert param not in (update['body'] or {})
+    print(f"   ✅ {len(plan)} steps planned")
+
+
+def test_scripts_are_valid():
+    """Generated Locust files compile and k6 scripts parse (when node is available)."""
+    print("\n🧪 Testing generated scripts...")
+    defaults = {'base_url': 'http://localhost:8080', 'session_token': ''}
+    locust_source = export_locust('auth', _auth(), defaults)
+    compile(locust_source, 'auth_locustfile.py', 'exec')
+    assert 'class AuthUser(HttpUser)' in locust_source
+
+    k6_source = export_k6('auth', _auth(), defaults)
+    assert "tags: { name: step.name }" in k6_source
+    if shutil.which('node'):
+        with tempfile.TemporaryDirectory() as tmp:
+            script = Path(tmp) / 'auth.mjs'
+            script.write_text(k6_source)
+            subprocess.run(['node', '--check', str(script)], check=True)
+        print("   ✅ k6 script parses")
+    print("   ✅ Locust file compiles")
+
+
+def test_secrets_not_exported():
+    """Secret environment values are blanked in the exported defaults."""
+    print("\n🧪 Testing secret environment values...")
+    with tempfile.TemporaryDirectory() as tmp:
+        environment = Path(tmp) / 'env.json'
+        environment.write_text(json.dumps({'values': [
+            {'key': 'base_url', 'value': 'https://api.example.test', 'type': 'default'},
+            {'key': 'session_token', 'value': 'live-session-token', 'type': 'secret'},
+            {'key': 'refresh_token', 'value': 'live-refresh-token', 'type': 'secret'},
+        ]}))
+        output = Path(tmp) / 'out'
+        assert main(['--services', 'auth', '--proto-dir', '/nonexistent', '--environment', str(environment),
+                     '--output-dir', str(output)]) == 0
+        scripts = [path.read_text() for path in output.rglob('*') if path.is_file()]
+    assert len(scripts) == 2 and all('https://api.example.test' in source for source in scripts)
+    assert not any('live-' in source for source in scripts)
+    print("   ✅ session_token and refresh_token exported empty")
+
+
+if __name__ == '__main__':
+    test_request_plan()
+    test_scripts_are_valid()
+    test_secrets_not_exported()
+    print("\n🎉 All exporter tests passed!")
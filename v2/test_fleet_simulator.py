@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for the device fleet simulator and its shared helpers.
+Runs against the in-process stub server, so no backend is needed.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fleet_simulator import FleetSimulator
+from latency_stats import LatencyHistogram
+from rpc_catalog import load_services, find_rpc, build_body, expand_path
+from stub_server import StubServer
+
+
+def test_histogram_percentiles():
+    """Histogram percentiles stay within bucket precision and merge exactly."""
+    print("\n🧪 Testing latency histogram...")
+    first = LatencyHistogram.from_samples(i / 1000.0 for i in range(1, 501))
+    second = LatencyHistogram.from_samples(i / 1000.0 for i in range(501, 1001))
+    merged = LatencyHistogram().merge(first).merge(second)
+
+    assert merged.count == 1000
+    assert abs(merged.percentile(50) - 0.5) < 0.5 * 0.02
+    assert abs(merged.percentile(99) - 0.99) < 0.99 * 0.02
+    assert LatencyHistogram.from_dict(merged.to_dict()).percentile(90) == merged.percentile(90)
+    print("   ✅ Percentiles and merge OK")
+
+
+def test_catalog_from_generated_collections():
+    """The RPC model is recovered from generated collections without protos."""
+    print("\n🧪 Testing RPC catalog...")
+    services = load_services(['locks'], proto_dir=Path('/nonexistent'))
+    register = find_rpc(services['locks'], 'RegisterLock')
+
+    assert register['http']['method'] == 'POST'
+    body = build_body(register, {'facility_id': 7})
+    assert body['facility_id'] == 7
+    assert expand_path('/api/locks/{device_id}', {'device_id': 'lock-1'}) == '/api/locks/lock-1'
+    print(f"   ✅ {len(services['locks']['rpcs'])} lock RPCs loaded")
+
+
+def test_fleet_against_stub():
+    """A small fleet registers, heartbeats and reports status."""
+    print("\n🧪 Testing fleet simulator...")
+
+    async def run():
+        async with StubServer() as server:
+            services = load_services(['bridge', 'locks', 'cameras'], proto_dir=Path('/nonexistent'))
+            simulator = FleetSimulator(
+                server.base_url, services, facility_ids=[1, 2],
+                devices_per_facility={'bridge': 1, 'lock': 3, 'camera': 2},
+                heartbeat_interval=0.2, status_interval=0.5, ramp_up=0.1,
+                duration=1.2, unregister=True, seed=42
+            )
+            return await simulator.run(), server.request_counts
+
+    report, counts = asyncio.run(run())
+
+    assert report['devices'] == 12
+    assert report['registered'] == 12
+    assert report['endpoints']['lock.register']['requests'] == 6
+    assert report['endpoints']['lock.heartbeat']['requests'] > 0
+    assert report['endpoints']['camera.unregister']['requests'] == 4
+    assert counts[('POST', '/api/bridges/register')] == 2
+    print(f"   ✅ {report['requests']} requests from {report['devices']} devices")
+
+
+def main():
+    """Run all tests."""
+    tests = [test_histogram_percentiles, test_catalog_from_generated_collections, test_fleet_against_stub]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"   ❌ {test.__name__} failed: {e}")
+    print(f"\nResult: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the generator's per-stage profiling hooks.
+"""
+
+import json
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from generator_profile import STAGES, StageProfiler, format_profile_table, profile_service
+
+SAMPLE_PROTO = '''
+syntax = "proto3";
+package rallymate.facilities;
+
+import "google/api/annotations.proto";
+
+enum FacilityType {
+  FACILITY_TYPE_UNSPECIFIED = 0;
+  FACILITY_TYPE_GYM = 1;
+}
+
+message Facility {
+  string id = 1;
+  string name = 2;
+  FacilityType type = 3;
+}
+
+message CreateFacilityRequest {
+  string name = 1;
+  string email = 2;
+  FacilityType type = 3;
+}
+
+message GetFacilityRequest {
+  string facility_id = 1;
+}
+
+service FacilitiesService {
+  rpc CreateFacility(CreateFacilityRequest) returns (Facility) {
+    option (google.api.http) = {
+      post: "/api/facilities"
+      body: "*"
+    };
+  }
+  rpc GetFacility(GetFacilityRequest) returns (Facility) {
+    option (google.api.http) = {
+      get: "/api/facilities/{facility_id}"
+    };
+  }
+}
+'''
+
+
+def write_proto(directory: Path) -> Path:
+    path = directory / 'facilities.proto'
+    path.write_text(SAMPLE_PROTO)
+    return path
+
+
+def test_stage_hooks():
+    """Every stage is reported to hooks and totalled per service."""
+    print("\n🧪 Testing stage hooks...")
+    samples = []
+    profiler = StageProfiler(hooks=[samples.append])
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / 'facilities_service.postman_collection.json'
+        collection = profile_service(write_proto(Path(tmp)), profiler, output)
+        assert json.loads(output.read_text()) == collection
+    assert len(collection['item']) == 2
+
+    report = profiler.report()['facilities']
+    assert set(report) == set(STAGES)
+    assert report['test_script']['calls'] == 2 and report['body']['calls'] == 1
+    assert all(s.service == 'facilities' and s.seconds >= 0 for s in samples)
+    assert len(samples) == sum(stage['calls'] for stage in report.values())
+    print(f"   ✅ {len(samples)} samples across {len(report)} stages")
+
+
+def test_tracemalloc_bytes():
+    """With tracemalloc running, stages also report allocated bytes."""
+    print("\n🧪 Testing tracemalloc accounting...")
+    profiler = StageProfiler()
+    with tempfile.TemporaryDirectory() as tmp:
+        proto = write_proto(Path(tmp))
+        tracemalloc.start()
+        try:
+            profile_service(proto, profiler)
+        finally:
+            tracemalloc.stop()
+    write = profiler.totals['facilities']['write']
+    assert write.peak_bytes > 0
+    table = format_profile_table(profiler)
+    assert 'alloc KiB' in table and 'test_script' in table
+    print(f"   ✅ write stage peaked at {write.peak_bytes} bytes")
+
+
+if __name__ == '__main__':
+    test_stage_hooks()
+    test_tracemalloc_bytes()
+    print("\n🎉 All generator profile tests passed!")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for the native gRPC vs REST-transcoded benchmark.
+"""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from grpc_bench import (ProtoCodec, bench_calls, build_report, format_report_table, grpc_base_url, grpc_frame,
+                        prepare_calls)
+from http2_client import http2_available
+from rpc_catalog import load_service
+from stub_server import GrpcStubServer, StubServer
+
+PROTO = '''
+syntax = "proto3";
+package rallymate.facilities.v1;
+
+service FacilitiesService {
+  rpc UpdateFacility(UpdateFacilityRequest) returns (FacilityResponse) {
+    option (google.api.http) = {
+      put: "/api/facilities/{facility_id}"
+      body: "*"
+    };
+  }
+  rpc GetFacility(GetFacilityRequest) returns (FacilityResponse) {
+    option (google.api.http) = {
+      get: "/api/facilities/{facility_id}"
+    };
+  }
+}
+
+enum FacilityStatus {
+  FACILITY_STATUS_UNSPECIFIED = 0;
+  FACILITY_STATUS_ACTIVE = 1;
+}
+
+message Address {
+  string city = 1;
+}
+
+message UpdateFacilityRequest {
+  int64 facility_id = 1;
+  string name = 2;
+  FacilityStatus status = 3;
+  repeated string tags = 4;
+  Address address = 5;
+  sint32 offset = 6;
+  bool public = 7;
+  repeated int32 courts = 8;
+  repeated FacilityStatus history = 9;
+}
+
+message GetFacilityRequest {
+  int64 facility_id = 1;
+}
+
+message FacilityResponse {
+  int64 facility_id = 1;
+  string name = 2;
+}
+'''
+
+
+def write_proto(tmp: str) -> Path:
+    proto_dir = Path(tmp)
+    (proto_dir / 'facilities.proto').write_text(PROTO)
+    return proto_dir
+
+
+def test_proto_codec():
+    """Messages encode to proto3 wire format and decode back."""
+    print("\n🧪 Testing protobuf codec...")
+    with tempfile.TemporaryDirectory() as tmp:
+        service = load_service('facilities', proto_dir=write_proto(tmp))
+    codec = ProtoCodec(service['messages'], service['enums'])
+    assert codec.encode('GetFacilityRequest', {'facility_id': 150}) == b'\x08\x96\x01'
+    assert codec.encode('Address', {'city': 'Oslo', 'unknown': 1}) == b'\x0a\x04Oslo'
+
+    message = {'facility_id': -2, 'name': 'Court 1', 'status': 'FACILITY_STATUS_ACTIVE', 'tags': ['a', 'b'],
+               'address': {'city': 'Oslo'}, 'offset': -3, 'public': True}
+    data = codec.encode('rallymate.facilities.v1.UpdateFacilityRequest', message)
+    assert codec.decode('UpdateFacilityRequest', data) == message
+    assert codec.encode('UpdateFacilityRequest', {'facilityId': 7}) == b'\x08\x07'
+    # proto3 servers pack repeated scalars into one length-delimited field
+    packed = b'\x42\x03\x01\x96\x01' + b'\x4a\x02\x00\x01'
+    assert codec.decode('UpdateFacilityRequest', packed) == {
+        'courts': [1, 150], 'history': ['FACILITY_STATUS_UNSPECIFIED', 'FACILITY_STATUS_ACTIVE']}
+    print(f"   ✅ {len(data)} bytes, enums/repeated/nested/zigzag round-trip, packed repeated decode")
+
+
+def test_prepare_calls():
+    """REST body plus path parameters form the gRPC message; collections fall back to JSON."""
+    print("\n🧪 Testing equivalent payloads...")
+    variables = {'base_url': 'http://gateway', 'facility_id': '42'}
+    with tempfile.TemporaryDirectory() as tmp:
+        services = {'facilities': load_service('facilities', proto_dir=write_proto(tmp))}
+    reads, _ = prepare_calls(services, variables)
+    assert [c.rpc['name'] for c in reads] == ['GetFacility']
+    calls, skipped = prepare_calls(services, variables, writes=True)
+    update = next(c for c in calls if c.rpc['name'] == 'UpdateFacility')
+    assert update.rest_url == 'http://gateway/api/facilities/42' and 'facility_id' not in update.rest_body
+    assert update.message['facility_id'] == '42' and update.message['name'] == update.rest_body['name']
+    assert update.grpc_path == '/rallymate.facilities.v1.FacilitiesService/UpdateFacility'
+    assert update.content_type == 'application/grpc+proto' and update.encode_message().startswith(b'\x08\x2a')
+    assert not skipped
+
+    generated = {'facilities': load_service('facilities', proto_dir=Path('/nonexistent'))}
+    calls, skipped = prepare_calls(generated, {'base_url': 'http://gateway', 'id': '1'}, package='rm',
+                                   only=['GetFacilities', 'FacilitiesService.GetFacility', 'Get User Facilities'])
+    assert [c.grpc_path for c in calls] == ['/rm.FacilitiesService/GetFacilities', '/rm.FacilitiesService/GetFacility']
+    assert skipped == ['FacilitiesService.GetUserFacilities']
+    assert all(c.content_type == 'application/grpc+json' for c in calls)
+    assert grpc_base_url('dev:50051') == 'http://dev:50051'
+    assert grpc_base_url('dev:50051', tls=True) == 'https://dev:50051'
+    assert grpc_base_url('https://grpc.example.com/') == 'https://grpc.example.com'
+    print("   ✅ Reads by default; path parameters join the message; no schema → application/grpc+json")
+
+
+def test_bench_against_stubs():
+    """Both transports reach the local stubs and every RPC gets a report row."""
+    print("\n🧪 Testing benchmark against local stubs...")
+    if not http2_available():
+        print("   ⚠️  h2 not installed, skipping")
+        return
+
+    async def run():
+        async with StubServer(latency_ms=1) as rest, GrpcStubServer(latency_ms=1) as grpc:
+            with tempfile.TemporaryDirectory() as tmp:
+                services = {'facilities': load_service('facilities', proto_dir=write_proto(tmp))}
+            calls, _ = prepare_calls(services, {'base_url': rest.base_url, 'facility_id': '7'}, writes=True)
+            results = await bench_calls(calls, grpc.target, 3)
+            return calls, results, dict(grpc.calls), dict(rest.request_counts)
+
+    calls, results, grpc_calls, rest_calls = asyncio.run(run())
+    report = build_report(calls, results)
+    assert set(report) == {'FacilitiesService.UpdateFacility', 'FacilitiesService.GetFacility'}
+    for row in report.values():
+        assert row['codec'] == 'proto' and row['rest']['errors'] == row['grpc']['errors'] == 0
+        assert row['rest']['requests'] == row['grpc']['requests'] == 3
+        assert row['grpc']['request_bytes'] >= len(grpc_frame(b'')) and row['rest']['cpu_us'] > 0
+    assert grpc_calls['/rallymate.facilities.v1.FacilitiesService/GetFacility'] == 4  # warm-up + 3
+    assert rest_calls[('PUT', '/api/facilities/7')] == 4
+    assert 'FacilitiesService.GetFacility' in format_report_table(report)
+    print("   ✅ REST and gRPC calls alternate with per-RPC latency, bytes and CPU")
+
+
+if __name__ == '__main__':
+    test_proto_codec()
+    test_prepare_calls()
+    test_bench_against_stubs()
+    print("\n🎉 All gRPC benchmark tests passed!")
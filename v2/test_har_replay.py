@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Tests for HAR import, template mapping and timed replay against the stub server.
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from har_replay import HarEntry, HarReplayer, TemplateIndex, default_collections, load_har, map_entries
+from collection_runner import RunItem, load_items
+from http_client import HttpClient
+from stub_server import StubServer
+
+
+def _entry(offset_ms: int, method: str, url: str, body=None, response=None, auth=None):
+    started = f"2026-01-01T10:00:{offset_ms // 1000:02d}.{offset_ms % 1000:03d}Z"
+    headers = [{'name': 'Content-Type', 'value': 'application/json'}, {'name': 'Host', 'value': 'x'}]
+    if auth:
+        headers.append({'name': 'Authorization', 'value': f"Bearer {auth}"})
+    return {
+        'startedDateTime': started,
+        'time': 40,
+        'request': {'method': method, 'url': url, 'headers': headers,
+                    **({'postData': {'text': json.dumps(body)}} if body else {})},
+        'response': {'status': 200, 'content': {'text': json.dumps(response or {})}},
+    }
+
+
+def _write_har(directory: str) -> Path:
+    base = 'https://api.rallymate.io'
+    entries = [
+        _entry(0, 'POST', f"{base}/api/auth/otp/verify", {'phone_number': '+1', 'otp_code': '1'},
+               {'session': {'session_token': 'captured-token-1', 'user_id': 'captured-user-1'}}),
+        _entry(300, 'POST', f"{base}/api/facilities", {'name': 'Court'},
+               {'facility': {'id': 'captured-facility-9'}}, auth='captured-token-1'),
+        _entry(600, 'GET', f"{base}/api/facilities/captured-facility-9", auth='captured-token-1'),
+        _entry(900, 'GET', f"{base}/api/facilities/user/captured-user-1", auth='captured-token-1'),
+        _entry(950, 'GET', f"{base}/static/app.js"),
+    ]
+    path = Path(directory) / 'session.har'
+    path.write_text(json.dumps({'log': {'version': '1.2', 'entries': list(reversed(entries))}}))
+    return path
+
+
+def test_mapping():
+    """Entries map onto items by method and path template."""
+    print("\n🧪 Testing HAR mapping...")
+    index = TemplateIndex([item for path in default_collections() for item in load_items(path)])
+    with tempfile.TemporaryDirectory() as tmp:
+        entries = load_har(_write_har(tmp))
+    counts = map_entries(entries, index)
+
+    assert [round(e.offset, 3) for e in entries] == [0.0, 0.3, 0.6, 0.9, 0.95]
+    assert entries[2].item.key == 'FacilitiesService.GetFacility'
+    assert entries[3].item.key == 'FacilitiesService.GetUserFacilities'
+    assert list(entries[3].params.values()) == ['captured-user-1']
+    assert counts['UNMATCHED GET /static/app.js'] == 1
+    assert 'Host' not in entries[0].headers
+    print(f"   ✅ {sum(1 for e in entries if e.item)}/{len(entries)} entries mapped")
+
+
+def test_timed_replay_with_remapping():
+    """Speed-up keeps relative timing and captured IDs are rewritten."""
+    print("\n🧪 Testing timed replay...")
+    index = TemplateIndex([item for path in default_collections() for item in load_items(path)])
+    with tempfile.TemporaryDirectory() as tmp:
+        entries = load_har(_write_har(tmp))
+    map_entries(entries, index)
+
+    async def run(speed, asap=False):
+        async with StubServer() as server:
+            replayer = HarReplayer(entries, server.base_url, speed=speed, asap=asap)
+            start = time.perf_counter()
+            report = await replayer.run()
+            return report, time.perf_counter() - start, dict(server.request_counts), replayer
+
+    report, elapsed, counts, replayer = asyncio.run(run(speed=2))
+    assert 0.45 <= elapsed < 1.0
+    assert report['entries'] == 4
+    assert all(row['errors'] == 0 for row in report['endpoints'].values())
+    assert replayer.remap['captured-token-1'].startswith('stub-session-')
+    assert not any('captured-facility-9' in path for _, path in counts)
+
+    report, elapsed, _, _ = asyncio.run(run(speed=1, asap=True))
+    assert elapsed < 0.4 and report['mode'] == 'asap'
+    print(f"   ✅ {report['remapped_values']} values remapped")
+
+
+def test_whole_value_rewrite():
+    """A learned ID is only swapped where it is the whole value, never inside a longer one."""
+    print("\n🧪 Testing whole-value remapping...")
+    item = RunItem('facilities', 'Create Facility', 'FacilitiesService.CreateFacility', 'POST', '{{base_url}}/x',
+                   {}, None, [('facility_id', 'facility.id')], None)
+    entry = HarEntry(0.0, 'POST', 'https://api/x', {}, None, 200, 0.01, json.dumps({'facility': {'id': 101}}))
+    entry.item = item
+    replayer = HarReplayer([], 'http://stub')
+    replayer._learn(entry, json.dumps({'facility': {'id': 7}}).encode())
+    replayer.remap['captured-token-1'] = 'token-2'
+    assert replayer.remap['101'] == '7'
+
+    assert replayer.rewrite_path('/api/facilities/101/devices/1015') == '/api/facilities/7/devices/1015'
+    assert replayer.rewrite_query('id=101&since=1710151015&phone=5551012&flag') == \
+        'id=7&since=1710151015&phone=5551012&flag'
+    assert replayer.rewrite_header('Bearer captured-token-1') == 'Bearer token-2'
+    body = replayer.rewrite_body(json.dumps({'facility_id': 101, 'ids': ['101', '1015'], 'active': True,
+                                             'phone': '+15551010101', 'note': 'room 101'}))
+    assert json.loads(body) == {'facility_id': 7, 'ids': ['7', '1015'], 'active': True,
+                                'phone': '+15551010101', 'note': 'room 101'}
+    assert replayer.rewrite_body('name=101') == 'name=101'
+    print("   ✅ 101 → 7 in whole segments, query values and JSON leaves; 1015 and timestamps untouched")
+
+
+def test_http2_header_names():
+    """Lowercase HTTP/2 header names replace the client's defaults instead of duplicating them."""
+    print("\n🧪 Testing HTTP/2 HAR headers...")
+    entry = _entry(0, 'POST', 'https://api.rallymate.io/api/facilities', {'name': 'Court'})
+    entry['request']['headers'] = [
+        {'name': ':method', 'value': 'POST'}, {'name': ':authority', 'value': 'api.rallymate.io'},
+        {'name': 'content-type', 'value': 'application/json; charset=utf-8'},
+        {'name': 'accept', 'value': 'application/json, text/plain'}, {'name': 'Accept', 'value': '*/*'},
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'h2.har'
+        path.write_text(json.dumps({'log': {'entries': [entry]}}))
+        har_entry = load_har(path)[0]
+    assert har_entry.headers == {'Accept': '*/*', 'content-type': 'application/json; charset=utf-8'}
+
+    heads = []
+
+    async def handle(reader, writer):
+        head = await reader.readuntil(b'\r\n\r\n')
+        heads.append(head.decode())
+        length = next(int(line.split(':')[1]) for line in head.decode().split('\r\n')
+                      if line.lower().startswith('content-length:'))
+        await reader.readexactly(length)
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\n{}')
+        await writer.drain()
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with HttpClient(pool=False) as client:
+            await HarReplayer([har_entry], f"http://127.0.0.1:{port}", asap=True).send(client, har_entry)
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(run())
+    names = [line.split(':')[0].lower() for line in heads[0].split('\r\n')[1:] if line]
+    assert names.count('content-type') == 1 and names.count('accept') == 1 and names.count('content-length') == 1
+    assert 'content-type: application/json; charset=utf-8' in heads[0] and ':authority' not in heads[0]
+    print(f"   ✅ {len(names)} headers sent, none duplicated")
+
+
+if __name__ == '__main__':
+    test_mapping()
+    test_timed_replay_with_remapping()
+    test_whole_value_rewrite()
+    test_http2_header_names()
+    print("\n🎉 All HAR replay tests passed!")
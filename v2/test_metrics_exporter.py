@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus/OpenMetrics runner exporter.
+"""
+
+import asyncio
+import sys
+import tempfile
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from collection_runner import CollectionRunner, load_items
+from metrics_exporter import MetricsServer, RunnerMetrics, TextfileWriter, endpoint_labels, parse_buckets
+from stub_server import StubServer
+
+FACILITIES = Path(__file__).parent / 'generated' / 'facilities_service.postman_collection.json'
+VARIABLES = {'id': '1', 'user_id': '2'}
+
+
+def run_with_metrics(buckets=(0.001, 0.01, 1.0)):
+    items = [i for i in load_items(FACILITIES) if i.method == 'GET']
+
+    async def run():
+        async with StubServer() as server:
+            runner = CollectionRunner(dict(VARIABLES, base_url=server.base_url), max_connections=2)
+            metrics = RunnerMetrics(runner, buckets)
+            runner.add_listener(metrics.record)
+            await runner.run_sequence(items, 3)
+            return items, runner, metrics
+
+    return asyncio.run(run())
+
+
+def test_labels_and_buckets():
+    """Endpoint keys split into service/rpc labels; bucket lists are validated."""
+    print("\n🧪 Testing labels and bucket parsing...")
+    assert endpoint_labels('FacilitiesService.GetFacilities') == ('FacilitiesService', 'GetFacilities')
+    assert endpoint_labels('auth/Send OTP') == ('auth', 'Send OTP')
+    assert parse_buckets('0.5, 0.1,0.25') == (0.1, 0.25, 0.5)
+    for bad in ('fast', '0,1'):
+        try:
+            parse_buckets(bad)
+            assert False, bad
+        except Exception as e:
+            assert 'ArgumentTypeError' in type(e).__name__
+    print("   ✅ Labels split and buckets sorted")
+
+
+def test_exposition():
+    """Counters, cumulative histogram buckets and in-flight gauges render correctly."""
+    print("\n🧪 Testing exposition format...")
+    items, runner, metrics = run_with_metrics()
+    text = metrics.render()
+    lines = text.splitlines()
+    key = items[0].key
+    service, rpc = endpoint_labels(key)
+    labels = f'service="{service}",rpc="{rpc}"'
+    assert f'rallymate_runner_requests_total{{{labels},method="GET",code="200"}} 3' in lines
+    buckets = [line for line in lines if line.startswith(f'rallymate_runner_request_duration_seconds_bucket{{{labels}')]
+    counts = [int(line.rsplit(' ', 1)[1]) for line in buckets]
+    assert len(buckets) == 4 and buckets[-1].split(' ')[0].endswith('le="+Inf"}')
+    assert counts == sorted(counts) and counts[-1] == 3
+    assert f'rallymate_runner_request_duration_seconds_count{{{labels}}} 3' in lines
+    assert f'rallymate_runner_in_flight_requests{{{labels}}} 0' in lines
+    assert '# EOF' not in text and metrics.render(openmetrics=True).endswith('# EOF\n')
+    assert '# TYPE rallymate_runner_requests counter' in metrics.render(openmetrics=True)
+    print(f"   ✅ {len(items)} endpoints × 3 requests exposed")
+
+
+def test_http_and_textfile():
+    """/metrics is scrapeable over HTTP and the textfile is written atomically."""
+    print("\n🧪 Testing /metrics endpoint and textfile output...")
+    _, _, metrics = run_with_metrics()
+    server = MetricsServer(metrics, port=0).start()
+    try:
+        request = urllib.request.Request(f'http://127.0.0.1:{server.port}/metrics',
+                                         headers={'Accept': 'application/openmetrics-text'})
+        with urllib.request.urlopen(request, timeout=5) as response:
+            assert response.headers['Content-Type'].startswith('application/openmetrics-text')
+            assert response.read().decode().endswith('# EOF\n')
+    finally:
+        server.stop()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'textfile' / 'rallymate_runner.prom'
+        writer = TextfileWriter(metrics, path, interval=0.05).start()
+        writer.stop()
+        assert path.read_text() == metrics.render()
+        assert [p.name for p in path.parent.iterdir()] == ['rallymate_runner.prom']
+    print("   ✅ Scraped over HTTP and written to the textfile")
+
+
+if __name__ == '__main__':
+    test_labels_and_buckets()
+    test_exposition()
+    test_http_and_textfile()
+    print("\n🎉 All metrics exporter tests passed!")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for the unified rallymate CLI and the shared generator engine.
+"""
+
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import generate_collection
+import rallymate
+
+SCRIPT_DIR = Path(__file__).parent
+PROTO = '''
+syntax = "proto3";
+package rallymate.locks;
+
+message Lock {
+  string id = 1;
+  string name = 2;
+}
+
+message GetLockRequest {
+  string lock_id = 1;
+}
+
+message CreateLockRequest {
+  string name = 1;
+  string facility_id = 2;
+}
+
+service LocksService {
+  rpc GetLock(GetLockRequest) returns (Lock) {
+    option (google.api.http) = {
+      get: "/api/locks/{lock_id}"
+    };
+  }
+  rpc CreateLock(CreateLockRequest) returns (Lock) {
+    option (google.api.http) = {
+      post: "/api/locks"
+      body: "*"
+    };
+  }
+}
+'''
+
+
+def without_ids(collection):
+    collection = json.loads(json.dumps(collection))
+    collection['info'].pop('_postman_id')
+    return collection
+
+
+def test_generate_single_service():
+    """`rallymate generate` and the generate_collection.py wrapper share one engine."""
+    print("\n🧪 Testing single-service generation...")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / 'locks.proto').write_text(PROTO)
+        output = tmp / 'locks.json'
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert rallymate.main(['generate', 'locks', '--proto-dir', str(tmp), '--output', str(output)]) == 0
+        from_cli = json.loads(output.read_text())
+        assert [i['name'] for i in from_cli['item']] == ['Get Lock', 'Create Lock']
+        assert not list(tmp.glob('*.postman_environment.json'))
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            assert generate_collection.main(['--proto-dir', str(tmp), '--service', 'locks']) == 0
+        assert without_ids(json.loads(stdout.getvalue())) == without_ids(from_cli)
+        assert 'Processing locks.proto' in stderr.getvalue()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert rallymate.main(['generate', 'cameras', '--proto-dir', str(tmp),
+                                   '--output-dir', str(tmp / 'out')]) == 1
+    print("   ✅ CLI and wrapper produce the same collection")
+
+
+def test_lazy_imports():
+    """Top-level help imports none of the tools."""
+    print("\n🧪 Testing lazy imports...")
+    code = ("import sys, rallymate, contextlib, io\n"
+            "with contextlib.redirect_stdout(io.StringIO()): rallymate.main(['--help'])\n"
+            "print([m for m in ('asyncio', 'generate_postman_collections', 'collection_runner') if m in sys.modules])")
+    output = subprocess.run([sys.executable, '-c', code], cwd=SCRIPT_DIR, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == '[]', output.stdout
+    print("   ✅ --help loads no tool modules")
+
+
+def test_dispatch_errors():
+    """Unknown commands and benchmarks are usage errors."""
+    print("\n🧪 Testing dispatch errors...")
+    for argv in (['nope'], ['bench', 'nope']):
+        try:
+            with contextlib.redirect_stderr(io.StringIO()):
+                rallymate.main(argv)
+            assert False, argv
+        except SystemExit as e:
+            assert e.code == 2
+    print("   ✅ Unknown commands rejected")
+
+
+if __name__ == '__main__':
+    test_generate_single_service()
+    test_lazy_imports()
+    test_dispatch_errors()
+    print("\n🎉 All CLI tests passed!")
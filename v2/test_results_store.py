@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent run-results store.
+"""
+
+import json
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from latency_stats import LatencyHistogram, mann_whitney
+from results_store import ResultStore, compare_stats, endpoint_matches, import_newman, main
+
+DAY = 86400.0
+START = 1_700_000_000.0
+
+
+def fill(store: ResultStore, rev: str, started_at: float, latency: float, errors: int = 0) -> str:
+    writer = store.writer('run', 'test', rev, flush_rows=7, started_at=started_at)
+    for i in range(50):
+        writer.add('FacilitiesService.GetFacilities', started_at + i, latency, 200, True, 120)
+        ok = i >= errors
+        writer.add('AuthService.SendOTP', started_at + i, latency * 2, 200 if ok else 503, ok, 40)
+    return writer.close()
+
+
+def test_columns_round_trip():
+    """Rows written in several flushes come back column by column."""
+    print("\n🧪 Testing column files...")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultStore(Path(tmp))
+        writer = store.writer('run', 'test', 'abc1234', flush_rows=7, started_at=START)
+        writer.add('FacilitiesService.GetFacilities', START, 0.010, 200, True, 120)
+        assert list(store.runs()) == []  # invisible until closed
+        writer.add('AuthService.SendOTP', START + 1.5, 0.250, None, False)
+        run_id = writer.close()
+
+        columns = store.columns(run_id)
+        assert list(columns['endpoint']) == [0, 1]
+        assert list(columns['offset_ms']) == [0, 1500]
+        assert list(columns['latency_us']) == [10000, 250000]
+        assert list(columns['status']) == [200, 0]
+        assert list(columns['ok']) == [1, 0]
+        assert store.meta(run_id)['endpoints'] == ['FacilitiesService.GetFacilities', 'AuthService.SendOTP']
+        assert not any(p.name.endswith('.partial') for p in store.runs_dir.iterdir())
+        print(f"   ✅ run {run_id}: {store.meta(run_id)['rows']} rows")
+
+
+def test_trends():
+    """Trends by run read the index; by revision they merge histograms."""
+    print("\n🧪 Testing trend queries...")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultStore(Path(tmp))
+        fill(store, 'aaa1111', START, 0.010)
+        fill(store, 'aaa1111', START + DAY, 0.012)
+        fill(store, 'bbb2222', START + 2 * DAY, 0.030, errors=5)
+
+        by_run = store.trend('FacilitiesService', 'GetFacilities')
+        assert [round(p['p50_ms']) for p in by_run] == [10, 12, 30]
+        by_rev = store.trend('auth', 'SendOTP', by='rev')
+        assert [(p['rev'], p['runs'], p['requests']) for p in by_rev] == [('aaa1111', 2, 100), ('bbb2222', 1, 50)]
+        assert by_rev[1]['error_rate'] == 0.1
+        assert len(store.trend(since=START + 1.5 * DAY)) == 1
+        assert len(list(store.runs(rev='bbb'))) == 1
+
+        run_id = by_run[0]['run_id']
+        timeline = store.timeline(run_id, 10, 'facilities')
+        assert [row['requests'] for row in timeline] == [10] * 5
+        print(f"   ✅ {len(by_run)} runs, {len(by_rev)} revisions, {len(timeline)} timeline windows")
+
+
+def test_endpoint_matching():
+    print("\n🧪 Testing endpoint matching...")
+    assert endpoint_matches('FacilitiesService.GetFacilities', 'facilities', 'getfacilities')
+    assert endpoint_matches('SystemSupportService.GetStatus', 'system_support')
+    assert not endpoint_matches('FacilitiesService.GetFacility', rpc='GetFacilities')
+    assert endpoint_matches('auth/Send OTP', 'auth', 'Send OTP')
+    print("   ✅ service and RPC filters")
+
+
+def test_import_newman():
+    """Newman JSON reports become runs keyed like the Python runner."""
+    print("\n🧪 Testing Newman import...")
+    description = ("**RPC:** GetFacilities\n**Request:** GetFacilitiesRequest\n**Response:** GetFacilitiesResponse"
+                   "\n**Endpoint:** GET /api/facilities")
+    report = {
+        'collection': {'info': {'name': 'rallymate FacilitiesService'}},
+        'run': {
+            'timings': {'started': START * 1000},
+            'executions': [
+                {'item': {'name': 'Get Facilities', 'request': {'description': description}},
+                 'response': {'code': 200, 'responseTime': 42, 'responseSize': 300}},
+                {'item': {'name': 'Get Facilities', 'request': {'description': description}},
+                 'response': {'code': 200, 'responseTime': 40},
+                 'assertions': [{'assertion': 'Status code is 200', 'error': {'message': 'nope'}}]},
+                {'item': {'name': 'Health'}, 'requestError': {'code': 'ECONNREFUSED'}},
+            ],
+        },
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'newman.json'
+        path.write_text(json.dumps(report))
+        store = ResultStore(Path(tmp) / 'store')
+        run_id = import_newman(store, path, 'ccc3333')
+        summary = store.summary(run_id)
+        assert summary['FacilitiesService.GetFacilities'].requests == 2
+        assert summary['FacilitiesService.GetFacilities'].errors == 1
+        assert summary['rallymate FacilitiesService/Health'].errors == 1
+        assert store.meta(run_id)['started_at'] == START
+        print(f"   ✅ {store.meta(run_id)['rows']} executions imported")
+
+
+def synthetic_run(store: ResultStore, rev: str, started_at: float, scale: Dict[str, float],
+                  error_rate: float = 0.0, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    writer = store.writer('run', 'synthetic', rev, started_at=started_at)
+    for i in range(400):
+        for key, median in scale.items():
+            ok = rng.random() >= error_rate
+            writer.add(key, started_at + i, median * rng.lognormvariate(0, 0.25), 200 if ok else 503, ok)
+    return writer.close()
+
+
+def test_mann_whitney():
+    """Identical distributions are not significant; a 10% shift is."""
+    print("\n🧪 Testing Mann-Whitney on histograms...")
+    rng = random.Random(7)
+    a = LatencyHistogram.from_samples(rng.lognormvariate(-3, 0.3) for _ in range(500))
+    b = LatencyHistogram.from_samples(rng.lognormvariate(-3, 0.3) for _ in range(500))
+    c = LatencyHistogram.from_samples(rng.lognormvariate(-3, 0.3) * 1.1 for _ in range(500))
+    assert mann_whitney(a, b)['p_value'] > 0.01
+    assert mann_whitney(a, c)['p_value'] < 1e-6 and mann_whitney(a, c)['prob_slower'] > 0.55
+    assert mann_whitney(c, a)['p_value'] > 0.99
+    print("   ✅ shift detected, null not rejected")
+
+
+def test_compare_runs():
+    """A 3× slowdown (50ms → 150ms) and an error spike fail the compare command."""
+    print("\n🧪 Testing run comparison...")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultStore(Path(tmp))
+        endpoints = {'FacilitiesService.GetFacilities': 0.050, 'AuthService.SendOTP': 0.020,
+                     'CamerasService.GetCameras': 0.030}
+        baseline = synthetic_run(store, 'aaa1111', START, endpoints, seed=1)
+        same = synthetic_run(store, 'aaa1111', START + DAY, endpoints, seed=2)
+        slower = synthetic_run(store, 'bbb2222', START + 2 * DAY,
+                               dict(endpoints, **{'FacilitiesService.GetFacilities': 0.150}), seed=3)
+
+        rows = {r['endpoint']: r for r in compare_stats(store.summary(baseline), store.summary(same))}
+        assert {r['verdict'] for r in rows.values()} == {'ok'}
+
+        rows = {r['endpoint']: r for r in compare_stats(store.summary(baseline), store.summary(slower))}
+        assert rows['FacilitiesService.GetFacilities']['verdict'] == 'regression'
+        assert rows['AuthService.SendOTP']['verdict'] == 'ok'
+        rows = {r['endpoint']: r for r in compare_stats(store.summary(slower), store.summary(baseline))}
+        assert rows['FacilitiesService.GetFacilities']['verdict'] == 'faster'
+
+        flaky = synthetic_run(store, 'ccc3333', START + 3 * DAY, endpoints, error_rate=0.05, seed=4)
+        rows = {r['endpoint']: r for r in compare_stats(store.summary(baseline), store.summary(flaky))}
+        assert all(r['verdict'] == 'regression' and 'errors' in r['reasons'][0] for r in rows.values())
+
+        assert main(['compare', baseline, same, '--store', tmp]) == 0
+        assert main(['compare', 'aaa1111', 'bbb2222', '--store', tmp]) == 1
+        assert main(['compare', 'aaa1111', 'bbb2222', '--store', tmp, '--endpoint', 'AuthService']) == 0
+        assert main(['compare', 'nope', 'latest', '--store', tmp]) == 2
+        print("   ✅ regression, improvement and error spike detected")
+
+
+def test_interrupted_run_is_stored():
+    """Ctrl-C during a runner command still closes the run, so it is not left as .partial."""
+    print("\n🧪 Testing interrupted runs...")
+    here = Path(__file__).parent
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    stub = subprocess.Popen([sys.executable, str(here / 'stub_server.py'), '--port', str(port)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 10
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                assert time.time() < deadline, 'stub server did not start'
+                time.sleep(0.05)
+        with tempfile.TemporaryDirectory() as tmp:
+            runner = subprocess.Popen(
+                [sys.executable, '-u', str(here / 'collection_runner.py'), 'run',
+                 str(here / 'generated' / 'facilities_service.postman_collection.json'),
+                 '--var', f"base_url=http://127.0.0.1:{port}", '--var', 'id=1', '--iterations', '100000',
+                 '--store', tmp], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+            assert 'Running' in runner.stdout.readline()
+            time.sleep(1.0)
+            # Python 3.11's wait_for can drop a cancellation that races a completed read,
+            # so press Ctrl-C again if the first one is lost, as a user would
+            for _ in range(10):
+                runner.send_signal(signal.SIGINT)
+                try:
+                    output = runner.communicate(timeout=2)[0]
+                    break
+                except subprocess.TimeoutExpired:
+                    continue
+            else:
+                runner.kill()
+                raise AssertionError('runner ignored Ctrl-C')
+            runs = list(ResultStore(Path(tmp)).runs())
+            assert len(runs) == 1 and runs[0]['rows'] > 0, output
+            assert not list((Path(tmp) / 'runs').glob('*.partial'))
+    finally:
+        stub.terminate()
+        stub.wait()
+    print(f"   ✅ Interrupted run stored with {runs[0]['rows']} rows")
+
+
+if __name__ == '__main__':
+    test_columns_round_trip()
+    test_trends()
+    test_endpoint_matching()
+    test_import_newman()
+    test_mann_whitney()
+    test_compare_runs()
+    test_interrupted_run_is_stored()
+    print("\n🎉 All results store tests passed!")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for weighted scenario mixes against the local stub server.
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from collection_runner import CollectionRunner, load_runner_variables
+from scenario import Scenario, ScenarioRunner, parse_think_time
+from stub_server import StubServer
+
+PRODUCTION_MIX = Path(__file__).parent / 'scenarios' / 'production-mix.json'
+
+
+def test_load_scenario():
+    """Items resolve by service and request or RPC name; body overrides apply."""
+    print("\n🧪 Testing scenario loading...")
+    scenario = Scenario.load(PRODUCTION_MIX)
+    shares = scenario.shares()
+    assert abs(shares['Get Facilities'] - 0.70) < 1e-9
+    unlock = next(e for e in scenario.entries if e.name == 'Unlock')
+    assert unlock.steps[1].item.body['action'] == 'UNLOCK'
+    assert [s.item.key for s in scenario.setup] == ['AuthService.SendOTP', 'AuthService.VerifyOTP']
+    assert len(scenario.collections) == 4
+    assert parse_think_time('0.5-2') == [0.5, 2.0] and parse_think_time('1') == 1.0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'rpc.json'
+        path.write_text(json.dumps({'mix': [{'service': 'facilities', 'item': 'GetFacility'}]}))
+        assert Scenario.load(path).entries[0].steps[0].item.name == 'Get Facility'
+        path.write_text(json.dumps({'mix': [{'service': 'facilities', 'item': 'List Everything'}]}))
+        try:
+            Scenario.load(path)
+            assert False, "unknown item should fail"
+        except ValueError as e:
+            assert 'Get Facilities' in str(e)
+    print(f"   ✅ {len(scenario.entries)} entries loaded")
+
+
+def test_mix_and_rate():
+    """Paced run honours the target rate and the weighted mix."""
+    print("\n🧪 Testing paced scenario run...")
+    scenario = Scenario.load(PRODUCTION_MIX)
+    scenario.think_time = None
+
+    async def run():
+        async with StubServer() as server:
+            variables = load_runner_variables(scenario.collections, overrides={'base_url': server.base_url})
+            runner = CollectionRunner(variables)
+            report = await ScenarioRunner(runner, scenario, vus=5, rate=200, seed=7).run(1.0)
+            return report, runner
+
+    report, runner = asyncio.run(run())
+    assert 150 <= report['iterations'] <= 210
+    assert abs(report['mix']['Get Facilities']['actual'] - 0.70) < 0.1
+    # Setup ran once per VU and its token was used afterwards
+    assert runner.stats['AuthService.SendOTP'].requests == 5
+    assert all(stats.errors == 0 for stats in runner.stats.values())
+    print(f"   ✅ {report['iterations']} iterations at {report['achieved_rate']}/s")
+
+
+if __name__ == '__main__':
+    test_load_scenario()
+    test_mix_and_rate()
+    print("\n🎉 All scenario tests passed!")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Tests for proactive, single-flight session refresh (runner and generated script).
+"""
+
+import asyncio
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from collection_runner import CollectionRunner, RunItem, load_items
+from generate_postman_collections import PostmanCollectionGenerator
+from session_refresh import parse_expiry
+from stub_server import StubServer
+
+# Minimal Postman sandbox: records sendRequest calls and answers with a new session (refreshCode 200)
+PM_SANDBOX = '''
+const vars = {refresh_token: 'r1', session_token: 's1', session_expires_at: String(Date.now() / 1000 + 5)};
+const sent = [];
+const pm = {
+    collectionVariables: {get: (k) => vars[k], set: (k, v) => { vars[k] = v; }, unset: (k) => { delete vars[k]; }},
+    variables: {replaceIn: (s) => s.replace('{{base_url}}', 'http://stub')},
+    request: {url: {getPath: () => '/api/facilities'}},
+    sendRequest: (req, cb) => { sent.push(req); cb(null, {code: refreshCode, json: () => ({session: {
+        session_token: 's2', refresh_token: 'r2', expires_at: Date.now() / 1000 + 3600}})}); }
+};
+'''
+
+
+AUTH_COLLECTION = Path(__file__).parent / 'generated' / 'auth_service.postman_collection.json'
+
+
+def login_item() -> RunItem:
+    """The shipped Verify OTP item, whose test script only stores the tokens."""
+    return next(item for item in load_items(AUTH_COLLECTION) if item.name == 'Verify OTP')
+
+
+def facilities_item(base_url: str) -> RunItem:
+    return RunItem('facilities', 'Get Facilities', 'FacilitiesService.GetFacilities', 'GET',
+                   f"{base_url}/api/facilities", {}, None, [], '{{session_token}}')
+
+
+def test_parse_expiry():
+    """Seconds, milliseconds, Timestamp objects and RFC 3339 strings."""
+    print("\n🧪 Testing expiry parsing...")
+    assert parse_expiry(1760000000) == parse_expiry('1760000000') == parse_expiry(1760000000000) == 1760000000
+    assert parse_expiry({'seconds': '1760000000'}) == 1760000000
+    assert parse_expiry('2025-10-09T08:53:20Z') == 1760000000
+    assert parse_expiry(None) is None and parse_expiry('soon') is None
+    print("   ✅ All formats map to epoch seconds")
+
+
+def test_single_flight_refresh():
+    """Concurrent users sharing an expiring token cause exactly one refresh and no 401s."""
+    print("\n🧪 Testing single-flight refresh...")
+
+    async def scenario():
+        async with StubServer(session_ttl=1.0, enforce_sessions=True) as server:
+            runner = CollectionRunner({'base_url': server.base_url}, refresh_margin=0.5)
+            async with runner.client() as client:
+                seed = runner.new_state()
+                assert (await runner.execute(client, login_item(), seed)).ok
+                assert parse_expiry(seed['session_expires_at']) is not None
+                await asyncio.sleep(0.6)
+                states = [runner.new_state(dict(seed)) for _ in range(20)]
+                results = await asyncio.gather(*(runner.execute(client, facilities_item(server.base_url), state)
+                                                 for state in states))
+
+                # No expiry known: the 401 itself triggers a refresh and one retry
+                stale = runner.new_state({'session_token': 'expired', 'refresh_token': states[0]['refresh_token']})
+                retried = await runner.execute(client, facilities_item(server.base_url), stale)
+            return server.refreshes, results, runner.refresher.summary(), retried, stale
+
+    refreshes, results, summary, retried, stale = asyncio.run(scenario())
+    assert all(r.ok for r in results), [r.error for r in results]
+    assert refreshes == 2 and summary == {'refreshes': 2, 'shared': 19, 'failures': 0}
+    assert retried.ok and stale['session_token'].startswith('stub-session-')
+    print(f"   ✅ 20 users, {refreshes} refreshes (one proactive, one after a 401)")
+
+
+def test_failed_refresh_cooldown():
+    """A rejected refresh token is not retried by every request that finds it due."""
+    print("\n🧪 Testing refresh cooldown after a failure...")
+
+    async def scenario():
+        async with StubServer(enforce_sessions=True) as server:
+            runner = CollectionRunner({'base_url': server.base_url}, refresh_margin=60)
+            state = runner.new_state({'session_token': 'expired', 'refresh_token': 'revoked',
+                                      'session_expires_at': time.time() - 1})
+            async with runner.client() as client:
+                results = [await runner.execute(client, facilities_item(server.base_url), state) for _ in range(5)]
+            return server.request_counts, results, runner.refresher.summary()
+
+    counts, results, summary = asyncio.run(scenario())
+    assert [r.status for r in results] == [401] * 5
+    assert counts[('POST', '/api/auth/session/refresh')] == 1 and summary['failures'] == 1
+    print("   ✅ One refresh attempt for 5 due requests")
+
+
+def prerequest_script() -> List[str]:
+    service = {'name': 'FacilitiesService', 'rpcs': []}
+    events = PostmanCollectionGenerator(service, None).generate_collection()['event']
+    assert [e['listen'] for e in events] == ['prerequest']
+    return events[0]['script']['exec']
+
+
+def run_prerequest_twice(refresh_code: int) -> Dict:
+    """Sandbox state after running the script for two requests in a row."""
+    script = '\n'.join(prerequest_script())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'prerequest.js'
+        path.write_text(f"const refreshCode = {refresh_code};\n" + PM_SANDBOX +
+                        '{\n' + script + '\n}\n{\n' + script + '\n}\n'
+                        'console.log(JSON.stringify({sent: sent.length, url: sent[0].url, vars: vars}));')
+        output = subprocess.run(['node', str(path)], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_generated_prerequest_script():
+    """The collection-level script refreshes once before expiry (run under node)."""
+    print("\n🧪 Testing generated pre-request script...")
+    prerequest_script()
+    if not shutil.which('node'):
+        print("   ⚠️  node not installed, skipping script execution")
+        return
+    state = run_prerequest_twice(200)
+    assert state['sent'] == 1 and state['url'] == 'http://stub/api/auth/session/refresh'
+    assert state['vars']['session_token'] == 's2' and state['vars']['refresh_token'] == 'r2'
+    assert state['vars']['session_expires_at'] > time.time() + 3000
+    print("   ✅ One refresh request, new tokens stored")
+
+
+def test_generated_script_failed_refresh():
+    """A failed refresh leaves the guard set, so the next request waits out the cooldown."""
+    print("\n🧪 Testing generated script after a failed refresh...")
+    lines = prerequest_script()
+    failure = lines.index("        if (err || res.code !== 200) {")
+    end = lines.index("        }", failure)
+    assert not any('unset' in line for line in lines[failure:end])
+    assert any("set('session_refresh_started', Date.now())" in line for line in lines[failure:end])
+    if not shutil.which('node'):
+        print("   ⚠️  node not installed, skipping script execution")
+        return
+    state = run_prerequest_twice(503)
+    assert state['sent'] == 1 and state['vars']['session_token'] == 's1'
+    assert state['vars']['session_refresh_started'] > (time.time() - 60) * 1000
+    print("   ✅ Guard kept after a 503; the second request sent no refresh")
+
+
+if __name__ == '__main__':
+    test_parse_expiry()
+    test_single_flight_refresh()
+    test_failed_refresh_cooldown()
+    test_generated_prerequest_script()
+    test_generated_script_failed_refresh()
+    print("\n🎉 All session refresh tests passed!")
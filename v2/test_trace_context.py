@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for traceparent injection and Server-Timing attribution.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from collection_runner import CollectionRunner, load_items
+from generate_postman_collections import PostmanCollectionGenerator
+from stub_server import StubServer
+from trace_context import (NETWORK, attribute_latency, parse_server_timing, parse_traceparent, traceparent)
+
+FACILITIES = Path(__file__).parent / 'generated' / 'facilities_service.postman_collection.json'
+VARIABLES = {'id': '1', 'user_id': '2'}
+
+
+def test_header_parsing():
+    """traceparent round-trips and Server-Timing durations become seconds."""
+    print("\n🧪 Testing header parsing...")
+    trace_id, span_id, flags = parse_traceparent(traceparent())
+    assert len(trace_id) == 32 and len(span_id) == 16 and flags == '01'
+    assert parse_traceparent('00-' + '0' * 32 + '-' + '1' * 16 + '-01') is None
+    assert parse_traceparent('garbage') is None
+
+    timing = parse_server_timing('gateway;dur=1.5, handler;desc="db";dur=8, cache;desc=hit, db;dur=2, db;dur=1')
+    assert timing == {'gateway': 0.0015, 'handler': 0.008, 'db': 0.003}
+    assert parse_server_timing(None) == {}
+
+    phases = attribute_latency(0.020, {'gateway': 0.002, 'handler': 0.010})
+    assert abs(phases[NETWORK] - 0.008) < 1e-9
+    assert abs(attribute_latency(0.020, {'total': 0.015, 'db': 0.005})[NETWORK] - 0.005) < 1e-9
+    assert attribute_latency(0.020, {}) == {}
+    print("   ✅ traceparent and Server-Timing parsed")
+
+
+def test_runner_injection():
+    """Every request carries a unique trace ID that reaches the server and the result."""
+    print("\n🧪 Testing runner trace injection...")
+    items = [i for i in load_items(FACILITIES) if i.method == 'GET']
+
+    async def run():
+        async with StubServer(latency_ms=2) as server:
+            runner = CollectionRunner(dict(VARIABLES, base_url=server.base_url), trace_context=True)
+            results = await runner.run_sequence(items, 3)
+            return runner, results, list(server.trace_ids)
+
+    runner, results, received = asyncio.run(run())
+    trace_ids = [r.trace_id for r in results]
+    assert len(set(trace_ids)) == len(results) and trace_ids == received
+    assert all(r.to_dict()['trace_id'] == r.trace_id for r in results)
+
+    stats = runner.trace_stats[items[0].key]
+    summary = stats.summary()
+    assert stats.timed == 3 and {'gateway', 'handler', NETWORK} <= set(summary['phases'])
+    assert summary['phases']['handler']['mean_ms'] >= 2
+    slowest = summary['slowest']
+    assert slowest[0]['latency_ms'] >= slowest[-1]['latency_ms'] and slowest[0]['trace_id'] in trace_ids
+    print(f"   ✅ {len(results)} unique trace IDs propagated and attributed")
+
+
+def test_generator_script():
+    """--trace-context adds collection-level pre-request and test scripts."""
+    print("\n🧪 Testing generator trace scripts...")
+    service = {'name': 'FacilitiesService', 'rpcs': []}
+    assert 'event' not in PostmanCollectionGenerator(service, None, session_refresh=False).generate_collection()
+    events = PostmanCollectionGenerator(service, None, trace_context=True).generate_collection()['event']
+    assert [e['listen'] for e in events] == ['prerequest', 'test']
+    assert any('traceparent' in line for line in events[0]['script']['exec'])
+    assert any('Server-Timing' in line for line in events[1]['script']['exec'])
+    print("   ✅ Pre-request script injects traceparent")
+
+
+if __name__ == '__main__':
+    test_header_parsing()
+    test_runner_injection()
+    test_generator_script()
+    print("\n🎉 All trace context tests passed!")
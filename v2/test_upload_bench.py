@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming upload benchmark against the local stub server.
+"""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from http_client import HttpClient
+from rpc_catalog import load_service
+from stub_server import StubServer
+from upload_bench import UploadBenchmark, parse_size, MB
+
+
+def test_parse_size():
+    """Human-readable sizes convert to bytes."""
+    print("\n🧪 Testing size parsing...")
+    assert parse_size('512KB') == 512 * 1024
+    assert parse_size('8MB') == 8 * MB
+    assert parse_size('2.5GB') == int(2.5 * 1024 ** 3)
+    assert parse_size('100') == 100
+    print("   ✅ Sizes parsed")
+
+
+def test_streaming_uploads():
+    """Synthetic and file uploads stream every byte in chunks."""
+    print("\n🧪 Testing streaming uploads...")
+
+    async def run(**kwargs):
+        async with StubServer() as server:
+            videos = load_service('videos', proto_dir=Path('/nonexistent'))
+            bench = UploadBenchmark(server.base_url, chunk_size=MB, concurrency=2, uploads=3,
+                                    videos_service=videos, **kwargs)
+            report = await bench.run()
+            return report, server.request_counts
+
+    report, counts = asyncio.run(run(total_size=3 * MB + 123))
+    assert report['completed'] == 3
+    assert report['chunk_latency']['count'] == 12
+    assert counts[('POST', '/api/videos/upload')] == 3
+
+    with tempfile.NamedTemporaryFile() as f:
+        f.write(b'x' * (2 * MB))
+        f.flush()
+        report, _ = asyncio.run(run(total_size=2 * MB, source_file=Path(f.name), chunked=True))
+    assert report['completed'] == 3
+    assert report['chunk_latency']['count'] == 6
+    print(f"   ✅ {report['aggregate_mb_per_s']} MB/s against the stub")
+
+
+def test_buffer_limits_restored():
+    """Streaming lowers the write buffer limit only for the upload, not for the pooled connection."""
+    print("\n🧪 Testing write buffer limits around a streamed body...")
+
+    async def chunks():
+        for _ in range(4):
+            yield b'x' * 32768
+
+    async def run():
+        async with StubServer() as server, HttpClient(max_connections=1) as client:
+            await client.request('GET', f"{server.base_url}/api/videos/1")
+            conn = next(iter(client._idle.values()))[0]
+            limits = conn.writer.transport.get_write_buffer_limits()
+            sizes = []
+            response = await client.request('PUT', f"{server.base_url}/api/videos/1/content", body=chunks(),
+                                            on_chunk=lambda size, seconds: sizes.append(size))
+            assert response.timings.reused and next(iter(client._idle.values()))[0] is conn
+            return response.ok, sizes, limits, conn.writer.transport.get_write_buffer_limits()
+
+    ok, sizes, limits, restored = asyncio.run(run())
+    assert ok and sizes == [32768] * 4
+    assert restored == limits
+    print(f"   ✅ Limits {restored} restored after streaming")
+
+
+def test_register_bad_response():
+    """A non-JSON or non-object UploadVideo response is an upload error, not a crash."""
+    print("\n🧪 Testing malformed UploadVideo responses...")
+
+    async def run(payload: bytes):
+        async def handle(reader, writer):
+            head = await reader.readuntil(b'\r\n\r\n')
+            length = next((int(line.split(b':')[1]) for line in head.split(b'\r\n')
+                           if line.lower().startswith(b'content-length')), 0)
+            await reader.readexactly(length)
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nConnection: close\r\n'
+                         b'Content-Length: %d\r\n\r\n%s' % (len(payload), payload))
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        videos = load_service('videos', proto_dir=Path('/nonexistent'))
+        bench = UploadBenchmark(f"http://127.0.0.1:{port}", total_size=MB, chunk_size=MB, uploads=2,
+                                videos_service=videos)
+        report = await bench.run()
+        server.close()
+        return report, bench.errors
+
+    for payload in (b'<html>gateway error</html>', b'[1, 2]'):
+        report, errors = asyncio.run(run(payload))
+        assert report['completed'] == 0 and len(errors) == 2, errors
+        assert all('UploadVideo returned' in e for e in errors)
+    print("   ✅ Both uploads recorded as errors")
+
+
+if __name__ == '__main__':
+    test_parse_size()
+    test_streaming_uploads()
+    test_buffer_limits_restored()
+    test_register_bad_response()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled variable engine (layering, cycles, invalidation).
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from variables import Template, VariableCycleError, VariableResolver, substitute
+
+ENVIRONMENT = {
+    'base_url': 'http://{{bridge_host}}:{{bridge_port}}',
+    'bridge_host': 'raspberrypi.local',
+    'bridge_port': '8080',
+}
+
+
+def test_layering_and_cycles():
+    """Higher layers win, nested references expand, cycles are reported."""
+    print("\n🧪 Testing layering and cycles...")
+    resolver = VariableResolver(globals={'bridge_port': '1', 'tenant': 'acme'}, collection={'bridge_host': 'x'},
+                                environment=ENVIRONMENT, overrides={'bridge_port': 9000})
+    assert resolver.resolved() == {'bridge_port': 9000, 'tenant': 'acme', 'bridge_host': 'raspberrypi.local',
+                                   'base_url': 'http://raspberrypi.local:9000'}
+    assert resolver.layer_of('bridge_port') == 'overrides' and resolver.layer_of('tenant') == 'globals'
+    assert resolver.scope({'bridge_host': '10.0.0.5'}).resolve('base_url') == 'http://10.0.0.5:9000'
+
+    cyclic = VariableResolver(environment={'a': '{{b}}/x', 'b': '{{a}}', 'c': 'ok'})
+    try:
+        cyclic.resolved()
+        assert False, 'cycle not detected'
+    except VariableCycleError as e:
+        assert e.cycle in (('a', 'b', 'a'), ('b', 'a', 'b'))
+    assert cyclic.scope().resolve('c') == 'ok'
+    assert cyclic.resolved(['c']) == {'a': '{{b}}/x', 'b': '{{a}}', 'c': 'ok'}
+
+    # A self-reference is not a cycle: Postman leaves the placeholder as is
+    edge = VariableResolver(collection={'bridge_host': '{{bridge_host}}', 'path': '/{{bridge_host}}/x',
+                                        'base_url': 'http://{{bridge_host}}:8080'})
+    assert edge.resolved() == {'bridge_host': '{{bridge_host}}', 'path': '/{{bridge_host}}/x',
+                               'base_url': 'http://{{bridge_host}}:8080'}
+    assert edge.scope({'bridge_host': 'bridge.lan'}).resolve('base_url') == 'http://bridge.lan:8080'
+    print("   ✅ Postman precedence, runtime overrides nested values, a → b → a rejected, self-references kept")
+
+
+def test_render_matches_substitute():
+    """Compiled templates render exactly like substitute()."""
+    print("\n🧪 Testing compiled templates...")
+    variables = {'facility_id': 42, 'name': 'Court', 'base_url': 'http://h'}
+    for value in ('{{base_url}}/api/facilities/{{facility_id}}?q={{ name }}', '{{facility_id}}', '{{missing}}',
+                  'no placeholders', {'id': '{{facility_id}}', 'tags': ['{{name}}', 1, None, '{{x}}']}, 3.5):
+        scope = VariableResolver(environment=variables).scope()
+        assert scope.render(Template(value)) == substitute(value, variables), value
+    print("   ✅ Typed whole placeholders, embedded and unknown ones")
+
+
+def test_invalidation():
+    """Setting a variable re-renders only the templates that depend on it."""
+    print("\n🧪 Testing dependency invalidation...")
+    scope = VariableResolver(environment=ENVIRONMENT).scope({'lock_id': 'L1'})
+    url = Template('{{base_url}}/api/locks/{{lock_id}}')
+    other = Template({'device': '{{device_id}}'})
+    first_url, first_other = scope.render(url), scope.render(other)
+    assert first_url == 'http://raspberrypi.local:8080/api/locks/L1'
+
+    scope['device_id'] = 'cam-1'
+    assert scope.render(url) is first_url
+    assert scope.render(other) == {'device': 'cam-1'} and first_other == {'device': '{{device_id}}'}
+
+    scope['bridge_host'] = 'bridge.lan'
+    assert scope.render(url) == 'http://bridge.lan:8080/api/locks/L1'
+    scope['lock_id'] = 'L2'
+    del scope['bridge_host']
+    assert scope.render(url) == 'http://raspberrypi.local:8080/api/locks/L2'
+    print("   ✅ Unrelated changes keep the cached render; transitive changes refresh it")
+
+
+if __name__ == '__main__':
+    test_layering_and_cycles()
+    test_render_matches_substitute()
+    test_invalidation()
+    print("\n🎉 All variable engine tests passed!")
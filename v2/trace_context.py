@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+W3C trace context and Server-Timing attribution for the load tools.
+
+With --trace-context the runner sends a `traceparent` header carrying a
+fresh trace ID on every request and records that ID with the result, so a
+slow sample from a load run can be looked up directly in the backend
+traces. `Server-Timing` response headers (e.g. `gateway;dur=1.2,
+handler;dur=8.4`) are parsed into per-phase server durations; whatever
+client latency the server does not account for is attributed to the
+network.
+
+The generator emits the same behaviour for Postman as an optional
+collection-level pre-request script (see generate_postman_collections.py).
+"""
+
+import heapq
+import random
+import re
+from typing import Dict, List, Optional, Tuple
+
+from latency_stats import LatencyHistogram
+
+TRACE_VERSION = '00'
+# Sampled flag: ask the backend to keep the trace
+TRACE_FLAGS = '01'
+# Server-Timing metric that, when present, covers the whole server side
+TOTAL_METRIC = 'total'
+NETWORK = 'network'
+SLOWEST_SAMPLES = 5
+
+_random = random.SystemRandom()
+DURATION_PATTERN = re.compile(r'^\s*dur\s*=\s*"?([0-9.eE+-]+)"?\s*$')
+
+
+def new_trace_id() -> str:
+    """32 lowercase hex digits, never all zeros."""
+    return f"{_random.getrandbits(128) or 1:032x}"
+
+
+def new_span_id() -> str:
+    return f"{_random.getrandbits(64) or 1:016x}"
+
+
+def traceparent(trace_id: Optional[str] = None, span_id: Optional[str] = None) -> str:
+    """'00-<trace-id>-<parent-id>-01' header value."""
+    return f"{TRACE_VERSION}-{trace_id or new_trace_id()}-{span_id or new_span_id()}-{TRACE_FLAGS}"
+
+
+def parse_traceparent(value: str) -> Optional[Tuple[str, str, str]]:
+    """(trace_id, span_id, flags) from a traceparent header, or None when malformed."""
+    parts = value.strip().lower().split('-')
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    if set(parts[1]) == {'0'} or set(parts[2]) == {'0'}:
+        return None
+    return parts[1], parts[2], parts[3]
+
+
+def parse_server_timing(value: Optional[str]) -> Dict[str, float]:
+    """Server-Timing header → {metric: seconds}; metrics without dur are skipped.
+
+    Repeated metrics are summed (e.g. several db calls).
+    """
+    timings: Dict[str, float] = {}
+    if not value:
+        return timings
+    for entry in value.split(','):
+        name, *params = entry.split(';')
+        name = name.strip()
+        for param in params:
+            match = DURATION_PATTERN.match(param)
+            if name and match:
+                try:
+                    timings[name] = timings.get(name, 0.0) + float(match.group(1)) / 1000.0
+                except ValueError:
+                    pass
+                break
+    return timings
+
+
+def attribute_latency(latency: float, server_timing: Dict[str, float]) -> Dict[str, float]:
+    """Split client latency into the server phases plus the unaccounted network time.
+
+    A 'total' metric is taken as the whole server time; otherwise the
+    phases are assumed to be sequential and summed.
+    """
+    if not server_timing:
+        return {}
+    server = server_timing.get(TOTAL_METRIC, sum(server_timing.values()))
+    phases = dict(server_timing)
+    phases[NETWORK] = max(latency - server, 0.0)
+    return phases
+
+
+class TraceStats:
+    """Server-Timing phase histograms and the slowest traced samples for one endpoint."""
+
+    def __init__(self, keep: int = SLOWEST_SAMPLES):
+        self.keep = keep
+        self.phases: Dict[str, LatencyHistogram] = {}
+        self.requests = 0
+        self.timed = 0
+        self._slowest: List[Tuple[float, str, Optional[int]]] = []
+
+    def record(self, latency: float, trace_id: Optional[str], server_timing: Dict[str, float],
+               status: Optional[int] = None):
+        self.requests += 1
+        if trace_id:
+            sample = (latency, trace_id, status)
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, sample)
+            elif latency > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, sample)
+        phases = attribute_latency(latency, server_timing)
+        if phases:
+            self.timed += 1
+            for phase, seconds in phases.items():
+                self.phases.setdefault(phase, LatencyHistogram()).record(seconds)
+
+    @property
+    def slowest(self) -> List[Tuple[float, str, Optional[int]]]:
+        return sorted(self._slowest, reverse=True)
+
+    def summary(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'server_timed': self.timed,
+            'phases': {phase: {'mean_ms': round(hist.mean * 1000, 3),
+                               'p50_ms': round(hist.percentile(50) * 1000, 3),
+                               'p99_ms': round(hist.percentile(99) * 1000, 3)}
+                       for phase, hist in sorted(self.phases.items())},
+            'slowest': [{'trace_id': trace_id, 'latency_ms': round(latency * 1000, 3), 'status': status}
+                        for latency, trace_id, status in self.slowest],
+        }
+
+
+def format_server_timing_table(stats: Dict[str, TraceStats]) -> str:
+    """Mean ms per Server-Timing phase (network last) per endpoint."""
+    names = sorted({phase for s in stats.values() for phase in s.phases if phase != NETWORK}) + [NETWORK]
+    header = f"{'Endpoint':<40} " + ' '.join(f"{name[:10]:>10}" for name in names)
+    lines = [header, '-' * len(header)]
+    for key in sorted(stats):
+        phases = stats[key].phases
+        if not phases:
+            continue
+        lines.append(f"{key[:40]:<40} " + ' '.join(
+            f"{phases[name].mean * 1000:>10.2f}" if name in phases else f"{'-':>10}" for name in names))
+    return '\n'.join(lines)
+
+
+def format_slowest_traces(stats: Dict[str, TraceStats], limit: int = 10) -> str:
+    """The slowest traced requests across all endpoints, for lookup in the tracing backend."""
+    samples = sorted(((latency, key, trace_id, status) for key, s in stats.items()
+                      for latency, trace_id, status in s.slowest), reverse=True)[:limit]
+    return '\n'.join(f"   {latency * 1000:>9.2f}ms  {trace_id}  {key} ({status or 'error'})"
+                     for latency, key, trace_id, status in samples)
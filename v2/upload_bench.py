@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Chunked streaming upload benchmark for the rallymate videos service.
+
+Streams real or synthetic files of any size (several GB is fine) in chunks,
+never holding more than one chunk in memory, and reports:
+- Aggregate and per-upload throughput (MB/s)
+- Per-chunk write latency (time to hand a chunk to the network, including
+  backpressure) with tail percentiles and stall counts
+
+Each upload optionally registers metadata first through the parsed
+UploadVideo RPC (with the real file size), then streams the bytes to
+--content-path. The byte-transfer endpoint is not described by the protos,
+so its path template is configurable.
+
+Usage:
+    python upload_bench.py --base-url http://localhost:8080 --size 2GB \\
+        --chunk-size 8MB --concurrency 4 --uploads 16
+    python upload_bench.py --file recording.mp4 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+from http_client import HttpClient, HttpError
+from latency_stats import LatencyHistogram
+from rpc_catalog import load_service, find_rpc, build_body, expand_path
+
+SIZE_UNITS = {'': 1, 'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+MB = 1024 * 1024
+
+
+def parse_size(text: str) -> int:
+    """Parse sizes such as '512KB', '8MB' or '2.5GB' into bytes."""
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMG]?B?)\s*', text.upper())
+    if not match:
+        raise ValueError(f"Invalid size: {text}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+async def synthetic_chunks(total_size: int, chunk_size: int) -> AsyncIterator[bytes]:
+    """Yield total_size bytes of random-looking data, one reused block at a time."""
+    block = os.urandom(min(chunk_size, total_size))
+    remaining = total_size
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        yield block if size == len(block) else block[:size]
+        remaining -= size
+
+
+async def file_chunks(path: Path, chunk_size: int) -> AsyncIterator[bytes]:
+    """Yield a file's contents chunk by chunk, reading off the event loop."""
+    loop = asyncio.get_running_loop()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = await loop.run_in_executor(None, f.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+class UploadBenchmark:
+    """Run N concurrent streaming uploads and collect throughput statistics."""
+
+    def __init__(self, base_url: str, total_size: int, chunk_size: int = 8 * MB,
+                 source_file: Optional[Path] = None, concurrency: int = 4, uploads: int = 4,
+                 videos_service: Optional[Dict] = None, content_path: str = '/api/videos/{video_id}/content',
+                 method: str = 'PUT', facility_id: str = '1', chunked: bool = False,
+                 stall_ms: float = 1000.0, session_token: Optional[str] = None, timeout: float = 300.0):
+        self.base_url = base_url.rstrip('/')
+        self.total_size = total_size
+        self.chunk_size = chunk_size
+        self.source_file = source_file
+        self.concurrency = concurrency
+        self.uploads = uploads
+        self.metadata_rpc = find_rpc(videos_service, 'UploadVideo') if videos_service else None
+        self.content_path = content_path
+        self.method = method
+        self.facility_id = facility_id
+        self.chunked = chunked
+        self.stall_seconds = stall_ms / 1000.0
+        self.session_token = session_token
+        self.timeout = timeout
+        self.chunk_latency = LatencyHistogram()
+        self.upload_latency = LatencyHistogram()
+        self.upload_rates: List[float] = []
+        self.stalls = 0
+        self.bytes_sent = 0
+        self.errors: List[str] = []
+
+    def _chunks(self) -> AsyncIterator[bytes]:
+        if self.source_file:
+            return file_chunks(self.source_file, self.chunk_size)
+        return synthetic_chunks(self.total_size, self.chunk_size)
+
+    def _on_chunk(self, size: int, seconds: float):
+        self.chunk_latency.record(seconds)
+        self.bytes_sent += size
+        if seconds >= self.stall_seconds:
+            self.stalls += 1
+
+    async def _register(self, client: HttpClient, index: int) -> Optional[str]:
+        """Create the video record via UploadVideo and return its ID."""
+        rpc = self.metadata_rpc
+        variables = {'facility_id': self.facility_id}
+        filename = self.source_file.name if self.source_file else f"bench-upload-{index}.mp4"
+        body = build_body(rpc, variables, {'filename': filename})
+        for key in list(body):
+            if 'file_size' in key:
+                body[key] = self.total_size
+        response = await client.request(rpc['http']['method'],
+                                        self.base_url + expand_path(rpc['http']['path'], variables),
+                                        body=body)
+        if not response.ok:
+            raise HttpError(f"UploadVideo returned HTTP {response.status}")
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise HttpError(f"UploadVideo returned invalid JSON: {e}") from e
+        if data is not None and not isinstance(data, dict):
+            raise HttpError(f"UploadVideo returned {type(data).__name__}, expected an object")
+        video = (data or {}).get('video')
+        return str(video.get('id', index)) if isinstance(video, dict) else str(index)
+
+    async def _upload(self, client: HttpClient, index: int):
+        try:
+            video_id = await self._register(client, index) if self.metadata_rpc else str(index)
+            url = self.base_url + expand_path(self.content_path, {'video_id': video_id, 'id': video_id})
+            headers = {'Content-Type': 'video/mp4'}
+            start = time.perf_counter()
+            response = await client.request(
+                self.method, url, headers=headers, body=self._chunks(),
+                content_length=None if self.chunked else self.total_size,
+                on_chunk=self._on_chunk
+            )
+            elapsed = time.perf_counter() - start
+        except HttpError as e:
+            self.errors.append(f"upload {index}: {e}")
+            return
+
+        if not response.ok:
+            self.errors.append(f"upload {index}: HTTP {response.status}")
+            return
+        self.upload_latency.record(elapsed)
+        self.upload_rates.append(self.total_size / MB / elapsed if elapsed else 0.0)
+
+    async def run(self) -> Dict:
+        """Run every upload with at most `concurrency` in flight."""
+        headers = {'Authorization': f"Bearer {self.session_token}"} if self.session_token else {}
+        queue = asyncio.Queue()
+        for index in range(1, self.uploads + 1):
+            queue.put_nowait(index)
+
+        async def worker(client: HttpClient):
+            while not queue.empty():
+                await self._upload(client, queue.get_nowait())
+
+        started = time.perf_counter()
+        async with HttpClient(max_connections=self.concurrency, timeout=self.timeout,
+                              default_headers=headers) as client:
+            await asyncio.gather(*(worker(client) for _ in range(self.concurrency)))
+        wall = time.perf_counter() - started
+
+        rates = sorted(self.upload_rates)
+        chunk = self.chunk_latency
+        return {
+            'file_size_bytes': self.total_size,
+            'chunk_size_bytes': self.chunk_size,
+            'concurrency': self.concurrency,
+            'uploads': self.uploads,
+            'completed': len(rates),
+            'errors': self.errors,
+            'wall_time_s': round(wall, 3),
+            'aggregate_mb_per_s': round(self.bytes_sent / MB / wall, 2) if wall else 0.0,
+            'per_upload_mb_per_s': {
+                'min': round(rates[0], 2) if rates else 0.0,
+                'p50': round(rates[len(rates) // 2], 2) if rates else 0.0,
+                'max': round(rates[-1], 2) if rates else 0.0,
+            },
+            'upload_time': self.upload_latency.summary(),
+            'chunk_latency': dict(chunk.summary(), **{'p999_ms': round(chunk.percentile(99.9) * 1000, 3)}),
+            'stalls': self.stalls,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark chunked streaming video uploads')
+    parser.add_argument('--base-url', default='http://localhost:8080', help='REST gateway base URL')
+    parser.add_argument('--file', help='Upload this file instead of synthetic data')
+    parser.add_argument('--size', default='256MB', help='Synthetic file size (e.g. 512MB, 4GB)')
+    parser.add_argument('--chunk-size', default='8MB', help='Chunk size for streaming')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent uploads (N)')
+    parser.add_argument('--uploads', type=int, help='Total uploads (default: same as concurrency)')
+    parser.add_argument('--content-path', default='/api/videos/{video_id}/content',
+                        help='Path template that receives the bytes')
+    parser.add_argument('--method', default='PUT', help='HTTP method for the byte upload')
+    parser.add_argument('--no-metadata', action='store_true', help='Skip the UploadVideo metadata call')
+    parser.add_argument('--facility-id', default='1', help='Facility ID for UploadVideo')
+    parser.add_argument('--chunked', action='store_true', help='Use chunked transfer encoding')
+    parser.add_argument('--stall-ms', type=float, default=1000.0, help='Chunk latency counted as a stall')
+    parser.add_argument('--timeout', type=float, default=300.0, help='Per-operation timeout in seconds')
+    parser.add_argument('--proto-dir', help='Directory containing proto files')
+    parser.add_argument('--generated-dir', help='Directory with generated collections (fallback model)')
+    parser.add_argument('--session-token', default=os.environ.get('RALLYMATE_SESSION_TOKEN'),
+                        help='Bearer token (default: $RALLYMATE_SESSION_TOKEN)')
+    parser.add_argument('--report', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    source_file = Path(args.file) if args.file else None
+    if source_file and not source_file.exists():
+        print(f"❌ File not found: {source_file}")
+        return 1
+    total_size = source_file.stat().st_size if source_file else parse_size(args.size)
+
+    videos_service = None
+    if not args.no_metadata:
+        videos_service = load_service('videos', args.proto_dir, args.generated_dir)
+        if not videos_service or not find_rpc(videos_service, 'UploadVideo'):
+            print("⚠️  UploadVideo RPC not found - streaming without metadata")
+
+    bench = UploadBenchmark(
+        args.base_url, total_size, parse_size(args.chunk_size), source_file,
+        args.concurrency, args.uploads or args.concurrency, videos_service,
+        args.content_path, args.method, args.facility_id, args.chunked,
+        args.stall_ms, args.session_token, args.timeout
+    )
+
+    print("🎥 rallymate Video Upload Benchmark")
+    print("=" * 60)
+    print(f"📦 {bench.uploads} uploads × {total_size / MB:.1f} MB, "
+          f"{bench.chunk_size / MB:.1f} MB chunks, {bench.concurrency} concurrent")
+
+    report = asyncio.run(bench.run())
+
+    chunk = report['chunk_latency']
+    print(f"\n   ✅ {report['completed']}/{report['uploads']} uploads in {report['wall_time_s']}s")
+    print(f"   📈 Aggregate: {report['aggregate_mb_per_s']} MB/s")
+    rates = report['per_upload_mb_per_s']
+    print(f"   📈 Per upload: min {rates['min']} / p50 {rates['p50']} / max {rates['max']} MB/s")
+    print(f"   ⏱️  Chunk latency: p50 {chunk['p50_ms']}ms, p99 {chunk['p99_ms']}ms, "
+          f"p99.9 {chunk['p999_ms']}ms, max {chunk['max_ms']}ms")
+    print(f"   🐢 Stalls (≥{args.stall_ms:.0f}ms): {report['stalls']}")
+    for error in report['errors'][:5]:
+        print(f"   ❌ {error}")
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Report saved: {args.report}")
+
+    return 1 if report['errors'] else 0
+
+
+if __name__ == '__main__':
+    exit(main())
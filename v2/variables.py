@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Postman-style {{variable}} substitution for the rallymate load tools.
+
+Strings that are exactly one placeholder (e.g. "{{facility_id}}") are
+replaced by the raw variable value so numeric IDs stay numeric in JSON
+bodies; placeholders embedded in longer strings are stringified.
+
+substitute() scans with a regex on every call, which is fine for one-off
+use. The runner instead compiles each URL/header/body once (Template),
+layers variables like Postman (VariableResolver) and renders per virtual
+user through a VariableScope that caches results and invalidates only
+what depends on a variable when it changes.
+"""
+
+import itertools
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+VARIABLE_PATTERN = re.compile(r'\{\{\s*([\w.-]+)\s*\}\}')
+
+
+def substitute(value: Any, variables: Dict[str, Any]) -> Any:
+    """Recursively replace {{name}} placeholders in strings, lists and dicts.
+
+    Unknown variables are left untouched so they stay visible in requests.
+    """
+    if isinstance(value, str):
+        whole = VARIABLE_PATTERN.fullmatch(value)
+        if whole and whole.group(1) in variables:
+            return variables[whole.group(1)]
+        return VARIABLE_PATTERN.sub(
+            lambda m: str(variables[m.group(1)]) if m.group(1) in variables else m.group(0),
+            value
+        )
+    if isinstance(value, list):
+        return [substitute(v, variables) for v in value]
+    if isinstance(value, dict):
+        return {k: substitute(v, variables) for k, v in value.items()}
+    return value
+
+
+def load_environment(env_data: Dict) -> Dict[str, Any]:
+    """Flatten a Postman environment/collection 'values' or 'variable' list."""
+    entries = env_data.get('values') or env_data.get('variable') or []
+    return {
+        entry['key']: entry.get('value', '')
+        for entry in entries
+        if entry.get('enabled', True)
+    }
+
+
+def resolve_variables(variables: Dict[str, Any], max_depth: int = 10) -> Dict[str, Any]:
+    """Expand variables that reference other variables (e.g. base_url).
+
+    Substitution repeats until nothing changes, so chains such as
+    base_url -> bridge_host resolve regardless of definition order.
+    """
+    resolved = dict(variables)
+    for _ in range(max_depth):
+        updated = {key: substitute(value, resolved) for key, value in resolved.items()}
+        if updated == resolved:
+            break
+        resolved = updated
+    return resolved
+
+
+# Postman precedence, lowest first; a VariableScope's runtime values sit above all of these
+LAYERS = ('globals', 'collection', 'environment', 'overrides')
+
+MISSING = object()
+_serials = itertools.count()
+
+
+class VariableCycleError(ValueError):
+    """Variables that (indirectly) refer to themselves."""
+
+    def __init__(self, cycle: Tuple[str, ...]):
+        self.cycle = cycle
+        super().__init__(f"Variable cycle: {' → '.join(cycle)}")
+
+
+class Template:
+    """A string, list or dict compiled once into literal and {{variable}} segments.
+
+    Rendering walks the segments with a lookup function instead of scanning
+    the text with a regex each time. `names` holds the variables the
+    template depends on (directly); templates without any render to the
+    original value, which callers must treat as read-only.
+    """
+
+    __slots__ = ('serial', 'value', 'parts', 'children', 'whole', 'names')
+
+    def __init__(self, value: Any):
+        self.serial = next(_serials)
+        self.value = value
+        self.parts: Optional[List] = None
+        self.children = None
+        self.whole: Optional[str] = None
+        names: Set[str] = set()
+        if isinstance(value, str):
+            whole = VARIABLE_PATTERN.fullmatch(value)
+            if whole:
+                self.whole = whole.group(1)
+                names.add(self.whole)
+            elif '{{' in value:
+                parts, position = [], 0
+                for match in VARIABLE_PATTERN.finditer(value):
+                    if match.start() > position:
+                        parts.append(value[position:match.start()])
+                    parts.append((match.group(1), match.group(0)))
+                    names.add(match.group(1))
+                    position = match.end()
+                if position < len(value):
+                    parts.append(value[position:])
+                if names:
+                    self.parts = parts
+        elif isinstance(value, (list, dict)):
+            items = value.items() if isinstance(value, dict) else enumerate(value)
+            self.children = [(key, Template(child)) for key, child in items]
+            for _, child in self.children:
+                names.update(child.names)
+        self.names = frozenset(names)
+
+    def render(self, lookup: Callable[[str], Any]) -> Any:
+        """Substitute with `lookup(name)`, which returns MISSING for unknown variables.
+
+        Like substitute(): a whole-string placeholder keeps the variable's
+        type, embedded ones are stringified and unknown ones stay visible.
+        """
+        if not self.names:
+            return self.value
+        if self.whole is not None:
+            value = lookup(self.whole)
+            return self.value if value is MISSING else value
+        if self.parts is not None:
+            out = []
+            for part in self.parts:
+                if part.__class__ is str:
+                    out.append(part)
+                else:
+                    value = lookup(part[0])
+                    out.append(part[1] if value is MISSING else str(value))
+            return ''.join(out)
+        if isinstance(self.value, dict):
+            return {key: child.render(lookup) for key, child in self.children}
+        return [child.render(lookup) for _, child in self.children]
+
+
+class VariableResolver:
+    """Layered variables: globals < collection < environment < overrides.
+
+    Values may refer to other variables (base_url = http://{{bridge_host}}:{{bridge_port}});
+    they are resolved lazily per VariableScope, which adds the runtime layer.
+    """
+
+    def __init__(self, globals: Optional[Dict[str, Any]] = None, collection: Optional[Dict[str, Any]] = None,
+                 environment: Optional[Dict[str, Any]] = None, overrides: Optional[Dict[str, Any]] = None):
+        given = {'globals': globals, 'collection': collection, 'environment': environment, 'overrides': overrides}
+        self.layers = {layer: dict(given[layer] or {}) for layer in LAYERS}
+        self.merged: Dict[str, Any] = {}
+        for layer in LAYERS:
+            self.merged.update(self.layers[layer])
+        self._templates: Dict[str, Template] = {}
+
+    def layer_of(self, name: str) -> Optional[str]:
+        return next((layer for layer in reversed(LAYERS) if name in self.layers[layer]), None)
+
+    def compile(self, raw: str) -> Template:
+        """Compiled template for a variable value, shared by every scope."""
+        template = self._templates.get(raw)
+        if template is None:
+            template = self._templates[raw] = Template(raw)
+        return template
+
+    def scope(self, values: Optional[Dict[str, Any]] = None) -> 'VariableScope':
+        return VariableScope(self, values)
+
+    def resolved(self, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Every variable expanded; raises VariableCycleError on a cycle through `names` (default: all).
+
+        Other variables caught in a cycle keep their unexpanded value.
+        """
+        scope = self.scope()
+        required = set(self.merged if names is None else names)
+        values = {}
+        for name in self.merged:
+            try:
+                values[name] = scope.resolve(name)
+            except VariableCycleError:
+                if name in required:
+                    raise
+                values[name] = self.merged[name]
+        return values
+
+
+class VariableScope(dict):
+    """Runtime variables of one virtual user over a shared VariableResolver.
+
+    It is a plain dict of the runtime values, so it can be seeded and read
+    like the old `state` dicts. Resolved variables and rendered templates
+    are cached; setting a variable drops only the entries that depend on
+    it, directly or through other variables.
+    """
+
+    def __init__(self, resolver: VariableResolver, values: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        self.resolver = resolver
+        self._values: Dict[str, Any] = {}
+        self._rendered: Dict[int, Any] = {}
+        # variable → variables and template serials that used it
+        self._dependents: Dict[str, Set] = {}
+        if values:
+            self.update(values)
+
+    def __setitem__(self, name: str, value: Any):
+        old = self.get(name, MISSING)
+        if old is value or (type(old) is type(value) and old == value):
+            return
+        super().__setitem__(name, value)
+        self.invalidate(name)
+
+    def __delitem__(self, name: str):
+        super().__delitem__(name)
+        self.invalidate(name)
+
+    def update(self, *args, **kwargs):
+        for name, value in dict(*args, **kwargs).items():
+            self[name] = value
+
+    def setdefault(self, name: str, default: Any = None) -> Any:
+        if name not in self:
+            self[name] = default
+        return self[name]
+
+    def pop(self, name: str, *default) -> Any:
+        had = name in self
+        value = super().pop(name, *default)
+        if had:
+            self.invalidate(name)
+        return value
+
+    def clear(self):
+        names = list(self)
+        super().clear()
+        for name in names:
+            self.invalidate(name)
+
+    def invalidate(self, name: str):
+        """Forget `name` and everything resolved or rendered from it."""
+        pending = [name]
+        while pending:
+            current = pending.pop()
+            self._values.pop(current, None)
+            for dependent in self._dependents.pop(current, ()):
+                if isinstance(dependent, str):
+                    pending.append(dependent)
+                else:
+                    self._rendered.pop(dependent, None)
+
+    def resolve(self, name: str, default: Any = MISSING) -> Any:
+        """The fully expanded value of a variable, runtime values first."""
+        value = self._resolve(name, ())
+        return default if value is MISSING else value
+
+    def _resolve(self, name: str, stack: Tuple[str, ...]) -> Any:
+        value = self._values.get(name, MISSING)
+        if value is not MISSING:
+            return value
+        raw = dict.get(self, name, MISSING)
+        if raw is MISSING:
+            raw = self.resolver.merged.get(name, MISSING)
+            if raw is MISSING:
+                return MISSING
+        if isinstance(raw, str) and '{{' in raw:
+            template = self.resolver.compile(raw)
+            if name in stack:
+                if stack[-1] == name:
+                    return MISSING  # bridge_host={{bridge_host}}: left as is, like Postman
+                raise VariableCycleError(stack[stack.index(name):] + (name,))
+            inner = stack + (name,)
+            value = template.render(lambda n: self._resolve(n, inner))
+            for dependency in template.names:
+                self._dependents.setdefault(dependency, set()).add(name)
+        else:
+            value = raw
+        self._values[name] = value
+        return value
+
+    def render(self, template: Template) -> Any:
+        """Render with this scope's variables, reusing the last result until a dependency changes.
+
+        Returned containers are shared between calls; copy before mutating.
+        """
+        if not template.names:
+            return template.value
+        rendered = self._rendered.get(template.serial, MISSING)
+        if rendered is MISSING:
+            rendered = template.render(lambda n: self._resolve(n, ()))
+            self._rendered[template.serial] = rendered
+            for name in template.names:
+                self._dependents.setdefault(name, set()).add(template.serial)
+        return rendered